@@ -30,6 +30,8 @@ echo "📦 Building FAISS Lambda layer..."
 echo "  ├─ Copying shared modules..."
 cp "$SCRIPT_DIR/shared/faiss_helper.py" "$PYTHON_DIR/shared/"
 cp "$SCRIPT_DIR/shared/secrets_helper.py" "$PYTHON_DIR/shared/"
+cp "$SCRIPT_DIR/shared/lambda_runtime.py" "$PYTHON_DIR/shared/"
+cp "$SCRIPT_DIR/shared/s3_fetch.py" "$PYTHON_DIR/shared/"
 cp "$SCRIPT_DIR/shared/__init__.py" "$PYTHON_DIR/shared/"
 
 # Install Python dependencies
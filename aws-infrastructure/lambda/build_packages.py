@@ -62,8 +62,10 @@ def main():
     shared_dst = layer_dir / "shared"
     shared_dst.mkdir(parents=True, exist_ok=True)
     
-    shutil.copy2(shared_src / "secrets_helper.py", shared_dst)
-    shutil.copy2(shared_src / "__init__.py", shared_dst)
+    # faiss_helper needs numpy/faiss and ships in the FAISS layer instead
+    for module in sorted(shared_src.glob("*.py")):
+        if module.name != "faiss_helper.py":
+            shutil.copy2(module, shared_dst)
     
     # Create the layer zip
     layer_size = create_zip(
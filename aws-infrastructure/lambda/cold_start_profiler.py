@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Cold-start profiler for Lambda packages
+Measures what each handler imports at cold start and builds slim per-function layers
+
+Usage:
+    # Profile every handler against the layers in build/ (run build-all.sh first)
+    python cold_start_profiler.py
+
+    # Profile one handler and write the JSON report elsewhere
+    python cold_start_profiler.py --function rag_flashcard --report build/rag-report.json
+
+    # Build a precompiled, stripped layer with only what rag_flashcard imports
+    python cold_start_profiler.py --function rag_flashcard --build-layer --strip-sources
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+import compileall
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from build_packages import create_zip
+
+SCRIPT_DIR = Path(__file__).parent
+BUILD_DIR = SCRIPT_DIR / "build"
+
+# Lambda runtime the layers target (.pyc files are only valid for one version)
+LAMBDA_PYTHON_VERSION = (3, 11)
+
+# Handler directory -> modules the handler imports on first use rather than at
+# module level (lazy_import or function-level imports). They are profiled after
+# the handler import, since the first request still pays for them.
+FUNCTIONS = {
+    "speaking_evaluator": ["lambda_shared.gemini_client", "boto3"],
+    "writing_evaluator": ["lambda_shared.gemini_client", "boto3"],
+    "flashcard_generator": ["redis"],
+    "rag_flashcard": ["rag_pipeline", "google.generativeai"],
+    "evaluation_status": [],
+    "s3_upload": [],
+    "secure-ai-evaluator": [],
+}
+
+# Already present in the Lambda Python runtime; never shipped in layers
+RUNTIME_PROVIDED = {"boto3", "botocore", "s3transfer", "jmespath", "dateutil", "urllib3", "six"}
+
+# Our own code, shipped in the function zip or the shared-code layer
+PROJECT_PACKAGES = {"lambda_shared", "shared", "rag"}
+
+# Same clean-up as clean_layer() in build-all.sh
+STRIP_DIRS = {"__pycache__", "tests", "test", "docs", "examples", "example"}
+STRIP_SUFFIXES = (".pyi", ".md", ".rst")
+
+PHASE_MARKER = "### cold-start-profiler phase: "
+RESULT_MARKER = "### cold-start-profiler result: "
+
+_IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# Runs in a fresh interpreter with -X importtime, so nothing the profiler has
+# imported skews the numbers
+_BOOTSTRAP = """
+import sys, json, time, importlib
+
+deferred_modules = json.loads(sys.argv[1])
+result = {"handler_ms": None, "error": None, "deferred": {}}
+# Loaded by interpreter startup (site, .pth hooks), not by the handler
+baseline = set(sys.modules)
+
+sys.stderr.write("%(phase)shandler\\n")
+start = time.perf_counter()
+try:
+    import lambda_handler
+    result["handler_ms"] = round((time.perf_counter() - start) * 1000, 1)
+except BaseException as e:
+    result["error"] = f"{type(e).__name__}: {e}"
+
+sys.stderr.write("%(phase)sdeferred\\n")
+for name in deferred_modules:
+    start = time.perf_counter()
+    try:
+        importlib.import_module(name)
+        result["deferred"][name] = {"ms": round((time.perf_counter() - start) * 1000, 1)}
+    except BaseException as e:
+        result["deferred"][name] = {"error": f"{type(e).__name__}: {e}"}
+
+sys.stderr.write("%(phase)sprofiler\\n")
+modules = {}
+for name, module in list(sys.modules.items()):
+    if name in baseline:
+        continue
+    modules[name] = {
+        "file": getattr(module, "__file__", None),
+        "package": hasattr(module, "__path__"),
+    }
+result["modules"] = modules
+result["stdlib"] = sorted(getattr(sys, "stdlib_module_names", ())) + list(sys.builtin_module_names)
+
+try:
+    from importlib.metadata import packages_distributions
+    result["distributions"] = packages_distributions()
+except Exception:
+    result["distributions"] = {}
+
+print("%(result)s" + json.dumps(result))
+""" % {"phase": PHASE_MARKER, "result": RESULT_MARKER}
+
+
+def default_search_paths() -> List[Path]:
+    """Layer directories from build/ laid out the way Lambda mounts them under /opt/python."""
+    paths = [SCRIPT_DIR / "shared"]
+    for layer_python in sorted(BUILD_DIR.glob("*-layer/python")):
+        paths.append(layer_python)
+        for subdir in ("shared", "rag"):
+            if (layer_python / subdir).is_dir():
+                paths.append(layer_python / subdir)
+    return paths
+
+
+def parse_import_times(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse -X importtime output into one record per imported module.
+
+    Records before the first phase marker come from interpreter startup
+    and are tagged "startup".
+    """
+    records = []
+    phase = "startup"
+
+    for line in stderr.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            continue
+
+        match = _IMPORT_TIME_RE.match(line)
+        if not match:
+            continue
+
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": max(0, (len(indent) - 1) // 2),
+            "phase": phase
+        })
+
+    return records
+
+
+def _copy_unit(name: str, info: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Work out what has to be copied to ship a module: its package directory or
+    single file, and the site directory it is relative to.
+    """
+    file_path = info.get("file")
+    if not file_path:
+        return None
+
+    path = Path(file_path)
+    parts = name.split(".")
+    if info.get("package"):
+        path = path.parent
+    site_dir = path
+    for _ in parts:
+        site_dir = site_dir.parent
+
+    return {"path": str(path), "site_dir": str(site_dir)}
+
+
+def classify_dependencies(function_dir: Path, child: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split the loaded modules into stdlib, runtime-provided, project and
+    third-party, and find the smallest unit to copy for each third-party one.
+
+    Namespace packages (e.g. ``google``) have no file of their own, so the
+    copy unit is the first regular package below them
+    (``google/generativeai``), not the whole namespace.
+    """
+    modules = child.get("modules", {})
+    stdlib = set(child.get("stdlib", []))
+    distributions = child.get("distributions", {})
+    function_dir = function_dir.resolve()
+    shared_dir = (SCRIPT_DIR / "shared").resolve()
+
+    third_party: Dict[str, Dict[str, Any]] = {}
+    runtime, project = set(), set()
+
+    for name in sorted(modules):
+        top = name.split(".")[0]
+        if top in stdlib or top == "__main__":
+            continue
+        if top in RUNTIME_PROVIDED:
+            runtime.add(top)
+            continue
+
+        file_path = modules[name].get("file")
+        if top in PROJECT_PACKAGES or (file_path and (
+            Path(file_path).resolve().parent in (function_dir, shared_dir)
+        )):
+            project.add(top)
+            continue
+
+        # Smallest enclosing module that has its own file
+        parts = name.split(".")
+        unit_name = None
+        for i in range(1, len(parts) + 1):
+            prefix = ".".join(parts[:i])
+            if modules.get(prefix, {}).get("file"):
+                unit_name = prefix
+                break
+        if unit_name is None or unit_name in third_party:
+            continue
+
+        unit = _copy_unit(unit_name, modules[unit_name])
+        if unit is None:
+            continue
+        unit["distribution"] = ", ".join(distributions.get(top, [])) or None
+        third_party[unit_name] = unit
+
+    return {
+        "third_party": [{"module": name, **unit} for name, unit in sorted(third_party.items())],
+        "distributions": sorted({unit["distribution"] or name for name, unit in third_party.items()}),
+        "runtime_provided": sorted(runtime),
+        "project": sorted(project)
+    }
+
+
+def summarize(records: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    """Heaviest modules by self time and heaviest top-level packages overall."""
+    packages: Dict[str, float] = {}
+    for record in records:
+        name = record["module"].split(".")[0]
+        packages[name] = packages.get(name, 0.0) + record["self_ms"]
+
+    by_phase = {}
+    for phase in ("handler", "deferred"):
+        phase_records = [r for r in records if r["phase"] == phase]
+        by_phase[phase] = round(sum(r["self_ms"] for r in phase_records), 1)
+
+    return {
+        "import_ms": by_phase,
+        "top_modules": [
+            {k: r[k] for k in ("module", "self_ms", "cumulative_ms", "phase")}
+            for r in sorted(records, key=lambda r: r["self_ms"], reverse=True)[:top]
+        ],
+        "top_packages": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+    }
+
+
+def profile_function(
+    function_name: str,
+    search_paths: List[Path],
+    python: str = sys.executable,
+    top: int = 15
+) -> Dict[str, Any]:
+    """
+    Import a handler in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        function_name: Handler directory name
+        search_paths: Directories standing in for /opt/python and its subpaths
+        python: Interpreter to profile with (ideally the Lambda runtime's version)
+        top: Number of heaviest modules and packages to report
+
+    Returns:
+        Report dict with timings, heaviest imports and dependency sets
+    """
+    function_dir = SCRIPT_DIR / function_name
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(function_dir)] + [str(p) for p in search_paths])
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", _BOOTSTRAP, json.dumps(FUNCTIONS.get(function_name, []))],
+        cwd=function_dir,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+
+    child = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            child = json.loads(line[len(RESULT_MARKER):])
+
+    if child is None:
+        return {
+            "function": function_name,
+            "error": f"Profiler exited with {completed.returncode}: {completed.stderr.strip()[-500:]}"
+        }
+
+    # Drop what interpreter startup and the bootstrap itself import
+    records = [r for r in parse_import_times(completed.stderr) if r["phase"] not in ("startup", "profiler")]
+
+    return {
+        "function": function_name,
+        "error": child["error"],
+        "handler_ms": child["handler_ms"],
+        "deferred": child["deferred"],
+        **summarize(records, top),
+        "dependencies": classify_dependencies(function_dir, child)
+    }
+
+
+def print_report(report: Dict[str, Any], top: int) -> None:
+    print(f"📦 {report['function']}")
+
+    if report.get("error"):
+        print(f"  ❌ {report['error']}")
+        if "dependencies" not in report:
+            print()
+            return
+
+    if report.get("handler_ms") is not None:
+        print(f"  ⏱️  Handler import: {report['handler_ms']:.1f} ms")
+    for name, result in report.get("deferred", {}).items():
+        if "error" in result:
+            print(f"  ⚠️  Deferred {name}: {result['error']}")
+        else:
+            print(f"  ⏱️  Deferred {name}: {result['ms']:.1f} ms (first request)")
+
+    print("  Heaviest packages:")
+    for package in report["top_packages"][:top]:
+        print(f"    {package['self_ms']:>9.1f} ms  {package['package']}")
+
+    print("  Heaviest modules:")
+    for module in report["top_modules"][:top]:
+        print(f"    {module['self_ms']:>9.1f} ms  {module['module']} ({module['phase']})")
+
+    dependencies = report["dependencies"]
+    print(f"  Minimal dependency set: {', '.join(dependencies['distributions']) or '(none)'}")
+    if dependencies["runtime_provided"]:
+        print(f"  Provided by Lambda runtime: {', '.join(dependencies['runtime_provided'])}")
+    print()
+
+
+def _strip_layer(layer_dir: Path, strip_sources: bool) -> None:
+    for root, dirs, files in os.walk(layer_dir, topdown=True):
+        for name in [d for d in dirs if d in STRIP_DIRS]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            dirs.remove(name)
+
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(STRIP_SUFFIXES):
+                os.remove(path)
+            elif strip_sources and name.endswith(".py") and os.path.exists(path + "c"):
+                # Keep only the legacy-location .pyc, which imports without its source
+                os.remove(path)
+
+
+def build_slim_layer(
+    report: Dict[str, Any],
+    output_dir: Path,
+    optimize: int = 0,
+    strip_sources: bool = False
+) -> float:
+    """
+    Build a layer containing only the third-party modules a handler imports.
+
+    Modules are copied from wherever the profile found them, precompiled to
+    .pyc next to their sources (so they also load with sources removed), and
+    stripped of tests, docs and stubs. Vendored shared libraries
+    (``<package>.libs``) are copied alongside their package.
+
+    Args:
+        report: Report from profile_function
+        output_dir: Layer root; modules go under output_dir/python
+        optimize: Bytecode optimization level (1 drops asserts, 2 also docstrings)
+        strip_sources: Remove .py files that have a compiled .pyc
+
+    Returns:
+        Size of the layer zip in MB
+    """
+    if sys.version_info[:2] != LAMBDA_PYTHON_VERSION:
+        print(f"  ⚠️  Compiling with Python {sys.version_info[0]}.{sys.version_info[1]}; "
+              f"Lambda runs {LAMBDA_PYTHON_VERSION[0]}.{LAMBDA_PYTHON_VERSION[1]} and will ignore these .pyc files")
+
+    python_dir = output_dir / "python"
+    shutil.rmtree(output_dir, ignore_errors=True)
+    python_dir.mkdir(parents=True)
+
+    copied_libs = set()
+    for unit in report["dependencies"]["third_party"]:
+        source = Path(unit["path"])
+        site_dir = Path(unit["site_dir"])
+        destination = python_dir / source.relative_to(site_dir)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        if source.is_dir():
+            shutil.copytree(source, destination, dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns("__pycache__", "*.pyc"))
+        else:
+            shutil.copy2(source, destination)
+
+        top = unit["module"].split(".")[0].lower()
+        candidates = {top} | {d.strip().lower().replace("-", "_") for d in (unit["distribution"] or "").split(",") if d}
+        for libs in site_dir.glob("*.libs"):
+            if libs.name[:-len(".libs")].lower() in candidates and libs not in copied_libs:
+                shutil.copytree(libs, python_dir / libs.name, dirs_exist_ok=True)
+                copied_libs.add(libs)
+
+    compileall.compile_dir(str(python_dir), quiet=1, legacy=True, optimize=optimize)
+    _strip_layer(python_dir, strip_sources)
+
+    return create_zip(output_dir, output_dir.with_suffix(".zip"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile Lambda cold-start imports and build slim layers")
+    parser.add_argument("--function", action="append", choices=sorted(FUNCTIONS),
+                        help="Handler directory to profile (repeatable; default: all)")
+    parser.add_argument("--path", action="append", default=[],
+                        help="Extra directory standing in for /opt/python (repeatable)")
+    parser.add_argument("--python", default=sys.executable,
+                        help="Interpreter to profile with (default: this one)")
+    parser.add_argument("--top", type=int, default=15, help="Number of heaviest imports to show")
+    parser.add_argument("--report", default=str(BUILD_DIR / "cold-start-report.json"),
+                        help="Where to write the JSON report")
+    parser.add_argument("--build-layer", action="store_true",
+                        help="Build build/<function>-slim-layer.zip for each profiled function")
+    parser.add_argument("--optimize", type=int, choices=(0, 1, 2), default=0,
+                        help="Bytecode optimization level for --build-layer")
+    parser.add_argument("--strip-sources", action="store_true",
+                        help="Ship only .pyc files in --build-layer output")
+    args = parser.parse_args()
+
+    print("🔬 Profiling Lambda cold-start imports...\n")
+
+    search_paths = [Path(p).resolve() for p in args.path] + default_search_paths()
+    function_names = args.function or [name for name in FUNCTIONS if (SCRIPT_DIR / name).is_dir()]
+
+    reports = []
+    for function_name in function_names:
+        report = profile_function(function_name, search_paths, python=args.python, top=args.top)
+        reports.append(report)
+        print_report(report, args.top)
+
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": sys.version.split()[0],
+            "search_paths": [str(p) for p in search_paths],
+            "functions": reports
+        }, f, indent=2)
+    print(f"📍 Report: {report_path.absolute()}")
+
+    if not args.build_layer:
+        return
+
+    print("\n📦 Building slim layers...\n")
+    for report in reports:
+        if "dependencies" not in report:
+            print(f"  ⚠️  Skipped {report['function']} (profile failed)")
+            continue
+        if report.get("error"):
+            print(f"  ⚠️  {report['function']} did not import cleanly; layer may be incomplete")
+        build_slim_layer(
+            report,
+            BUILD_DIR / f"{report['function'].replace('_', '-')}-slim-layer",
+            optimize=args.optimize,
+            strip_sources=args.strip_sources
+        )
+
+
+if __name__ == "__main__":
+    main()
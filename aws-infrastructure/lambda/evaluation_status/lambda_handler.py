@@ -5,16 +5,75 @@ Polls DynamoDB for async evaluation results
 
 import json
 import os
+import sys
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from decimal import Decimal
 
-import boto3
 from boto3.dynamodb.conditions import Key
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Shared helpers (from Lambda layer)
+sys.path.insert(0, '/opt/python/shared')
+from attribute_codec import get_attribute_codec
+from lambda_runtime import get_env_table
+
+# Terminal results are cached per container. 'failed' is only written on a
+# job's last SQS attempt, but a DLQ redrive can still complete it later, so
+# failed results are only cached briefly
+COMPLETED_CACHE_TTL_SECONDS = int(os.environ.get('STATUS_CACHE_TTL_SECONDS', '300'))
+FAILED_CACHE_TTL_SECONDS = int(os.environ.get('STATUS_FAILED_CACHE_TTL_SECONDS', '10'))
+CACHE_MAX_ENTRIES = int(os.environ.get('STATUS_CACHE_MAX_ENTRIES', '1000'))
+
+# Completed results never change (status updates can't leave 'completed'), so
+# the client may keep them. They hold per-user transcripts and feedback, so
+# shared caches (CDNs, proxies) must not store them.
+# API Gateway's own stage cache is not used: its TTL applies to every response
+# of the method, so it would also serve stale pending/processing statuses.
+COMPLETED_CACHE_CONTROL = os.environ.get('STATUS_COMPLETED_CACHE_CONTROL', 'private, max-age=3600')
+COMPLETED_VARY = 'x-api-key'
+
+# Long polling (?wait=N): API Gateway's integration timeout is 29s
+LONG_POLL_MAX_WAIT_SECONDS = int(os.environ.get('LONG_POLL_MAX_WAIT_SECONDS', '20'))
+LONG_POLL_INITIAL_DELAY = 0.25
+LONG_POLL_MAX_DELAY = 2.0
+# Time kept in reserve to return the response before Lambda times out
+LONG_POLL_SAFETY_MARGIN_MS = 2000
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# Enough to answer pending/processing/failed polls
+STATUS_ATTRIBUTES = ['evaluation_id', 'user_id', 'status', 'evaluation_type', 'started_at', 'error_message']
+
+# Type-specific results; they are only written when a job completes
+RESULT_ATTRIBUTES = {
+    'writing': [
+        'overall_band', 'task_achievement_band', 'coherence_band', 'lexical_band',
+        'grammar_band', 'feedback', 'word_count', 'confidence_score'
+    ],
+    'speaking': [
+        'overall_band', 'fluency_band', 'lexical_band', 'grammar_band',
+        'pronunciation_band', 'transcript', 'duration', 'feedback', 'confidence_score'
+    ],
+    'flashcard': ['flashcards', 'document_id', 'chunk_count', 'page_count']
+}
+
+# Every poll reads the status and all result attributes in one request: jobs
+# that haven't completed have no result attributes, so this costs nothing
+# for them and saves a second read for completed ones
+READ_ATTRIBUTES = STATUS_ATTRIBUTES + ['created_at'] + sorted({
+    name for names in RESULT_ATTRIBUTES.values() for name in names
+})
+
+# Terminal responses, cached for warm starts
+_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
 
 class DecimalEncoder(json.JSONEncoder):
     """Handle Decimal types from DynamoDB"""
@@ -24,24 +83,296 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
+def create_response(
+    status_code: int,
+    body: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
     """Create API Gateway response"""
+    response_headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET,OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type,x-api-key,If-None-Match',
+        'Access-Control-Expose-Headers': 'ETag',
+        'Cache-Control': 'no-store'
+    }
+    if headers:
+        response_headers.update(headers)
+
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET,OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type,x-api-key'
-        },
+        'headers': response_headers,
         'body': json.dumps(body, cls=DecimalEncoder)
     }
 
 
+def _cache_get(cache_key: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        entry = _cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if time.time() >= expires_at:
+            del _cache[cache_key]
+            return None
+        _cache.move_to_end(cache_key)
+        return response
+
+
+def _cache_put(cache_key: str, response: Dict[str, Any], ttl_seconds: int) -> None:
+    if ttl_seconds <= 0:
+        return
+    with _cache_lock:
+        _cache[cache_key] = (time.time() + ttl_seconds, response)
+        _cache.move_to_end(cache_key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def _projection(attributes: List[str]) -> Dict[str, Any]:
+    """ProjectionExpression kwargs (names are aliased; 'status' and 'duration' are reserved words)"""
+    names = {f'#p{i}': name for i, name in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def read_evaluation(evaluation_id: str, user_id: Optional[str], attributes: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Read selected attributes of an evaluation.
+
+    Uses GetItem when the caller supplies user_id (the table's range key),
+    otherwise a Limit=1 query on the hash key.
+    """
+    table = get_env_table('DYNAMODB_EVALUATIONS')
+
+    if user_id:
+        response = table.get_item(
+            Key={'evaluation_id': evaluation_id, 'user_id': user_id},
+            **_projection(attributes)
+        )
+        return response.get('Item')
+
+    response = table.query(
+        KeyConditionExpression=Key('evaluation_id').eq(evaluation_id),
+        Limit=1,
+        **_projection(attributes)
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
+
+
+def build_completed_result(evaluation_id: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the completed response body from a decoded item"""
+    result = {
+        'evaluation_id': evaluation_id,
+        'status': 'completed',
+        'evaluation_type': item.get('evaluation_type'),
+        'user_id': item.get('user_id'),
+        'created_at': item.get('created_at'),
+        'results': {}
+    }
+
+    # Add type-specific results
+    eval_type = item.get('evaluation_type')
+
+    if eval_type == 'writing':
+        result['results'] = {
+            'overall_band': item.get('overall_band'),
+            'task_achievement_band': item.get('task_achievement_band'),
+            'coherence_band': item.get('coherence_band'),
+            'lexical_band': item.get('lexical_band'),
+            'grammar_band': item.get('grammar_band'),
+            'feedback': json.loads(item.get('feedback', '{}')),
+            'word_count': item.get('word_count'),
+            'confidence_score': item.get('confidence_score')
+        }
+    elif eval_type == 'speaking':
+        result['results'] = {
+            'overall_band': item.get('overall_band'),
+            'fluency_band': item.get('fluency_band'),
+            'lexical_band': item.get('lexical_band'),
+            'grammar_band': item.get('grammar_band'),
+            'pronunciation_band': item.get('pronunciation_band'),
+            'transcript': item.get('transcript'),
+            'duration': item.get('duration'),
+            'feedback': json.loads(item.get('feedback', '{}')),
+            'confidence_score': item.get('confidence_score')
+        }
+    elif eval_type == 'flashcard':
+        result['results'] = {
+            'flashcards': json.loads(item.get('flashcards', '[]')),
+            'document_id': item.get('document_id'),
+            'chunk_count': item.get('chunk_count'),
+            'page_count': item.get('page_count')
+        }
+
+    return result
+
+
+def _with_etag(response: Dict[str, Any], cache_control: str, vary: Optional[str] = None) -> Dict[str, Any]:
+    etag = '"' + hashlib.sha256(response['body'].encode('utf-8')).hexdigest()[:32] + '"'
+    response['headers']['ETag'] = etag
+    response['headers']['Cache-Control'] = cache_control
+    if vary:
+        response['headers']['Vary'] = vary
+    return response
+
+
+def _not_modified(response: Dict[str, Any], event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """304 response if the client already holds this version"""
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    if_none_match = request_headers.get('if-none-match')
+    etag = response['headers'].get('ETag')
+    if not if_none_match or not etag:
+        return None
+    if etag not in [tag.strip() for tag in if_none_match.split(',')] and if_none_match.strip() != '*':
+        return None
+    return {
+        'statusCode': 304,
+        'headers': dict(response['headers']),
+        'body': ''
+    }
+
+
+def get_status_response(evaluation_id: str, user_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Look up an evaluation and build its status response.
+
+    One projected read fetches the status and, for a completed job, its
+    results; completed and failed results are cached.
+    """
+    cache_key = f"{evaluation_id}:{user_id or ''}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        logger.info(f"♻️ Status cache hit: {evaluation_id}")
+        return cached
+
+    item = read_evaluation(evaluation_id, user_id, READ_ATTRIBUTES)
+
+    if not item:
+        # Not found - might still be pending in queue
+        return create_response(200, {
+            'evaluation_id': evaluation_id,
+            'status': 'pending',
+            'message': 'Evaluation is queued for processing'
+        })
+
+    status = item.get('status', 'unknown')
+
+    if status == 'completed':
+        # Large attributes are stored compressed or in S3
+        item = get_attribute_codec().decode_item(item)
+
+        response = _with_etag(
+            create_response(200, build_completed_result(evaluation_id, item)),
+            COMPLETED_CACHE_CONTROL,
+            COMPLETED_VARY
+        )
+        _cache_put(cache_key, response, COMPLETED_CACHE_TTL_SECONDS)
+        return response
+
+    elif status == 'processing':
+        return create_response(200, {
+            'evaluation_id': evaluation_id,
+            'status': 'processing',
+            'message': 'Evaluation is being processed',
+            'evaluation_type': item.get('evaluation_type'),
+            'started_at': item.get('started_at')
+        })
+
+    elif status == 'failed':
+        response = _with_etag(create_response(200, {
+            'evaluation_id': evaluation_id,
+            'status': 'failed',
+            'message': 'Evaluation failed',
+            'error': item.get('error_message', 'Unknown error'),
+            'evaluation_type': item.get('evaluation_type')
+        }), 'no-cache')
+        _cache_put(cache_key, response, FAILED_CACHE_TTL_SECONDS)
+        return response
+
+    else:
+        return create_response(200, {
+            'evaluation_id': evaluation_id,
+            'status': status,
+            'message': f'Unknown status: {status}'
+        })
+
+
+def _response_status(response: Dict[str, Any]) -> Optional[str]:
+    try:
+        return json.loads(response['body']).get('status')
+    except (ValueError, AttributeError):
+        return None
+
+
+def wait_for_status_change(
+    evaluation_id: str,
+    user_id: Optional[str],
+    wait_seconds: float,
+    since: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Long poll: return as soon as the job reaches a terminal status or
+    leaves the `since` status, or after wait_seconds.
+
+    Re-reads only the projected status attributes, backing off from
+    LONG_POLL_INITIAL_DELAY to LONG_POLL_MAX_DELAY between reads, so a
+    20s wait costs about a dozen reads.
+    """
+    deadline = time.time() + wait_seconds
+    delay = LONG_POLL_INITIAL_DELAY
+
+    while True:
+        response = get_status_response(evaluation_id, user_id)
+        status = _response_status(response)
+
+        if status in TERMINAL_STATUSES or (since and status != since):
+            return response
+
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return response
+
+        # Anything other than the first status seen counts as a change
+        since = since or status
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, LONG_POLL_MAX_DELAY)
+
+
+def _wait_seconds(query: Dict[str, Any], context: Any) -> float:
+    """Requested long-poll time, capped by the limit and the remaining invocation time"""
+    try:
+        wait_seconds = float(query.get('wait') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('wait must be a number of seconds')
+
+    wait_seconds = min(max(wait_seconds, 0.0), LONG_POLL_MAX_WAIT_SECONDS)
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        available = (context.get_remaining_time_in_millis() - LONG_POLL_SAFETY_MARGIN_MS) / 1000
+        wait_seconds = min(wait_seconds, max(available, 0.0))
+    return wait_seconds
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Get evaluation status by job_id (evaluation_id)
-    
+
+    Optional query parameters:
+        user_id: Turns the lookup into a GetItem
+        wait: Long poll for up to this many seconds (max 20) until the job
+            finishes or its status changes
+        since: Status the client already knows; with wait, return as soon
+            as the status differs from it
+
+    Without wait, every call answers right away from a single read.
+    Completed and failed results carry an ETag; send it back in
+    If-None-Match to get a 304. Clients subscribed to completion events
+    (SNS) only need this endpoint to fetch the result.
+
     Returns:
         - pending: Job is queued but not started
         - processing: Job is being processed
@@ -50,8 +381,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     try:
         # Extract evaluation_id from path
-        evaluation_id = event.get('pathParameters', {}).get('evaluation_id')
-        
+        evaluation_id = (event.get('pathParameters') or {}).get('evaluation_id')
+        query = event.get('queryStringParameters') or {}
+        user_id = query.get('user_id')
+
         if not evaluation_id:
             return create_response(400, {
                 'error': {
@@ -59,104 +392,25 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'message': 'evaluation_id is required'
                 }
             })
-        
-        logger.info(f"📋 Checking status for evaluation: {evaluation_id}")
-        
-        # Query DynamoDB
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(os.environ.get('DYNAMODB_EVALUATIONS'))
-        
-        # Query by evaluation_id (hash key)
-        response = table.query(
-            KeyConditionExpression=Key('evaluation_id').eq(evaluation_id),
-            Limit=1
-        )
-        
-        items = response.get('Items', [])
-        
-        if not items:
-            # Not found - might still be pending in queue
-            return create_response(200, {
-                'evaluation_id': evaluation_id,
-                'status': 'pending',
-                'message': 'Evaluation is queued for processing'
-            })
-        
-        item = items[0]
-        status = item.get('status', 'unknown')
-        
-        if status == 'completed':
-            # Return full results
-            result = {
-                'evaluation_id': evaluation_id,
-                'status': 'completed',
-                'evaluation_type': item.get('evaluation_type'),
-                'user_id': item.get('user_id'),
-                'created_at': item.get('created_at'),
-                'results': {}
-            }
-            
-            # Add type-specific results
-            eval_type = item.get('evaluation_type')
-            
-            if eval_type == 'writing':
-                result['results'] = {
-                    'overall_band': item.get('overall_band'),
-                    'task_achievement_band': item.get('task_achievement_band'),
-                    'coherence_band': item.get('coherence_band'),
-                    'lexical_band': item.get('lexical_band'),
-                    'grammar_band': item.get('grammar_band'),
-                    'feedback': json.loads(item.get('feedback', '{}')),
-                    'word_count': item.get('word_count'),
-                    'confidence_score': item.get('confidence_score')
-                }
-            elif eval_type == 'speaking':
-                result['results'] = {
-                    'overall_band': item.get('overall_band'),
-                    'fluency_band': item.get('fluency_band'),
-                    'lexical_band': item.get('lexical_band'),
-                    'grammar_band': item.get('grammar_band'),
-                    'pronunciation_band': item.get('pronunciation_band'),
-                    'transcript': item.get('transcript'),
-                    'duration': item.get('duration'),
-                    'feedback': json.loads(item.get('feedback', '{}')),
-                    'confidence_score': item.get('confidence_score')
-                }
-            elif eval_type == 'flashcard':
-                result['results'] = {
-                    'flashcards': json.loads(item.get('flashcards', '[]')),
-                    'document_id': item.get('document_id'),
-                    'chunk_count': item.get('chunk_count'),
-                    'page_count': item.get('page_count')
+
+        try:
+            wait_seconds = _wait_seconds(query, context)
+        except ValueError as e:
+            return create_response(400, {
+                'error': {
+                    'code': 'VALIDATION_ERROR',
+                    'message': str(e)
                 }
-            
-            return create_response(200, result)
-        
-        elif status == 'processing':
-            return create_response(200, {
-                'evaluation_id': evaluation_id,
-                'status': 'processing',
-                'message': 'Evaluation is being processed',
-                'evaluation_type': item.get('evaluation_type'),
-                'started_at': item.get('started_at')
-            })
-        
-        elif status == 'failed':
-            return create_response(200, {
-                'evaluation_id': evaluation_id,
-                'status': 'failed',
-                'message': 'Evaluation failed',
-                'error': item.get('error_message', 'Unknown error'),
-                'evaluation_type': item.get('evaluation_type')
             })
-        
+
+        logger.info(f"📋 Checking status for evaluation: {evaluation_id}")
+
+        if wait_seconds > 0:
+            response = wait_for_status_change(evaluation_id, user_id, wait_seconds, query.get('since'))
         else:
-            return create_response(200, {
-                'evaluation_id': evaluation_id,
-                'status': status,
-                'message': f'Unknown status: {status}'
-            })
-            
+            response = get_status_response(evaluation_id, user_id)
+        return _not_modified(response, event) or response
+
     except Exception as e:
         logger.error(f"Error checking evaluation status: {e}", exc_info=True)
         return create_response(500, {
@@ -0,0 +1,285 @@
+"""
+Per-container FAISS Index Cache
+Keeps loaded indices in memory and their artifacts in /tmp across warm starts
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from s3_fetch import FetchSpec, fetch_many
+
+logger = logging.getLogger()
+
+DEFAULT_CACHE_DIR = '/tmp/index-cache'
+DEFAULT_MEMORY_MB = 256
+DEFAULT_DISK_MB = 256
+DEFAULT_REVALIDATE_SECONDS = 300
+
+INDEX_FILENAME = 'index.faiss'
+CHUNKS_FILENAME = 'chunks.json'
+MANIFEST_FILENAME = 'manifest.json'
+
+# (local_index_path, local_chunks_path) -> (index_manager, chunks)
+IndexLoader = Callable[[str, str], Tuple[Any, List[Dict[str, Any]]]]
+
+
+@dataclass
+class CachedIndex:
+    """A loaded index plus the S3 identity it was loaded from."""
+    document_id: str
+    index_key: str
+    chunks_key: str
+    index_etag: str
+    chunks_etag: str
+    index_manager: Any
+    chunks: List[Dict[str, Any]]
+    size_bytes: int
+    validated_at: float = field(default_factory=time.time)
+
+
+class IndexCache:
+    """
+    Two-tier LRU cache for FAISS indices.
+
+    - Memory tier: loaded index managers keyed by document_id, bounded by
+      the on-disk size of their artifacts
+    - /tmp tier: raw index and chunks files with their S3 ETags, so a
+      memory eviction only costs a reload, not a download
+
+    Entries younger than ``revalidate_seconds`` are served without touching
+    S3. Older entries are revalidated with conditional GETs (If-None-Match)
+    and only re-downloaded when the ETag changed. Index and chunks are
+    fetched concurrently with ranged parts for large artifacts.
+
+    Usage:
+        cache = IndexCache(s3_client)
+        index_manager, chunks, status = cache.get(
+            document_id, bucket, index_key, chunks_key, loader
+        )
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_memory_bytes: int = DEFAULT_MEMORY_MB * 1024 * 1024,
+        max_disk_bytes: int = DEFAULT_DISK_MB * 1024 * 1024,
+        revalidate_seconds: float = DEFAULT_REVALIDATE_SECONDS
+    ):
+        self.s3_client = s3_client
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.revalidate_seconds = revalidate_seconds
+
+        self._entries: "OrderedDict[str, CachedIndex]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, s3_client: Any) -> "IndexCache":
+        """Create cache sized from INDEX_CACHE_* environment variables."""
+        return cls(
+            s3_client,
+            cache_dir=os.environ.get('INDEX_CACHE_DIR', DEFAULT_CACHE_DIR),
+            max_memory_bytes=int(os.environ.get('INDEX_CACHE_MEMORY_MB', DEFAULT_MEMORY_MB)) * 1024 * 1024,
+            max_disk_bytes=int(os.environ.get('INDEX_CACHE_DISK_MB', DEFAULT_DISK_MB)) * 1024 * 1024,
+            revalidate_seconds=float(os.environ.get('INDEX_CACHE_REVALIDATE_SECONDS', DEFAULT_REVALIDATE_SECONDS))
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        document_id: str,
+        bucket: str,
+        index_key: str,
+        chunks_key: str,
+        loader: IndexLoader
+    ) -> Tuple[Any, List[Dict[str, Any]], str]:
+        """
+        Get a loaded index for a document, downloading only what changed.
+
+        Args:
+            document_id: Document identifier (cache key)
+            bucket: S3 bucket holding the artifacts
+            index_key: S3 key of the FAISS index
+            chunks_key: S3 key of the chunks JSON
+            loader: Callable that loads (index_path, chunks_path) into (index_manager, chunks)
+
+        Returns:
+            Tuple of (index_manager, chunks, cache_status) where cache_status is
+            one of 'memory_hit', 'revalidated', 'disk_hit' or 'miss'
+        """
+        with self._lock:
+            entry = self._entries.get(document_id)
+
+            if entry and (entry.index_key, entry.chunks_key) != (index_key, chunks_key):
+                # Index was rebuilt under new paths
+                self._drop_entry(document_id)
+                entry = None
+
+            if entry and time.time() - entry.validated_at < self.revalidate_seconds:
+                self._entries.move_to_end(document_id)
+                self._touch(document_id)
+                return entry.index_manager, entry.chunks, 'memory_hit'
+
+            doc_dir = self._document_dir(document_id)
+            manifest = self._read_manifest(doc_dir)
+            if manifest and (manifest.get('index_key'), manifest.get('chunks_key')) != (index_key, chunks_key):
+                manifest = None
+
+            known_index_etag = entry.index_etag if entry else (manifest or {}).get('index_etag')
+            known_chunks_etag = entry.chunks_etag if entry else (manifest or {}).get('chunks_etag')
+
+            os.makedirs(doc_dir, exist_ok=True)
+            local_index_path = os.path.join(doc_dir, INDEX_FILENAME)
+            local_chunks_path = os.path.join(doc_dir, CHUNKS_FILENAME)
+
+            # Conditional GETs only make sense while the local copy still exists
+            index_result, chunks_result = fetch_many(self.s3_client, [
+                FetchSpec(bucket, index_key, local_index_path,
+                          known_index_etag if os.path.exists(local_index_path) else None),
+                FetchSpec(bucket, chunks_key, local_chunks_path,
+                          known_chunks_etag if os.path.exists(local_chunks_path) else None)
+            ])
+            index_etag, index_changed = index_result.etag, not index_result.not_modified
+            chunks_etag, chunks_changed = chunks_result.etag, not chunks_result.not_modified
+
+            self._write_manifest(doc_dir, {
+                'document_id': document_id,
+                'index_key': index_key,
+                'chunks_key': chunks_key,
+                'index_etag': index_etag,
+                'chunks_etag': chunks_etag
+            })
+
+            if entry and not index_changed and not chunks_changed:
+                entry.validated_at = time.time()
+                self._entries.move_to_end(document_id)
+                return entry.index_manager, entry.chunks, 'revalidated'
+
+            status = 'miss' if (index_changed or chunks_changed) else 'disk_hit'
+
+            index_manager, chunks = loader(local_index_path, local_chunks_path)
+            size_bytes = os.path.getsize(local_index_path) + os.path.getsize(local_chunks_path)
+
+            if entry:
+                self._drop_entry(document_id)
+
+            self._entries[document_id] = CachedIndex(
+                document_id=document_id,
+                index_key=index_key,
+                chunks_key=chunks_key,
+                index_etag=index_etag,
+                chunks_etag=chunks_etag,
+                index_manager=index_manager,
+                chunks=chunks,
+                size_bytes=size_bytes
+            )
+            self._memory_bytes += size_bytes
+
+            self._evict_memory(keep=document_id)
+            self._evict_disk(keep=document_id)
+
+            return index_manager, chunks, status
+
+    def invalidate(self, document_id: str) -> None:
+        """Drop a document from both tiers."""
+        with self._lock:
+            self._drop_entry(document_id)
+            shutil.rmtree(self._document_dir(document_id), ignore_errors=True)
+
+    def clear(self) -> None:
+        """Drop every cached document."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _drop_entry(self, document_id: str) -> None:
+        entry = self._entries.pop(document_id, None)
+        if entry:
+            self._memory_bytes -= entry.size_bytes
+
+    def _evict_memory(self, keep: str) -> None:
+        while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            oldest_id = next(iter(self._entries))
+            if oldest_id == keep:
+                break
+            self._drop_entry(oldest_id)
+            logger.info(f"♻️ Evicted index from memory cache: {oldest_id}")
+
+    def _evict_disk(self, keep: str) -> None:
+        documents = []
+        total_bytes = 0
+
+        for name in os.listdir(self.cache_dir):
+            doc_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(doc_dir):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(doc_dir, f))
+                for f in os.listdir(doc_dir)
+                if os.path.isfile(os.path.join(doc_dir, f))
+            )
+            manifest_path = os.path.join(doc_dir, MANIFEST_FILENAME)
+            last_used = os.path.getmtime(manifest_path) if os.path.exists(manifest_path) else 0
+            documents.append((last_used, doc_dir, size))
+            total_bytes += size
+
+        keep_dir = self._document_dir(keep)
+        for _, doc_dir, size in sorted(documents):
+            if total_bytes <= self.max_disk_bytes:
+                break
+            if doc_dir == keep_dir:
+                continue
+            shutil.rmtree(doc_dir, ignore_errors=True)
+            total_bytes -= size
+            logger.info(f"♻️ Evicted index from /tmp cache: {os.path.basename(doc_dir)}")
+
+    def _touch(self, document_id: str) -> None:
+        # Manifest mtime is the /tmp tier's LRU clock
+        try:
+            os.utime(os.path.join(self._document_dir(document_id), MANIFEST_FILENAME))
+        except OSError:
+            pass
+
+    def _document_dir(self, document_id: str) -> str:
+        safe_id = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in document_id)
+        return os.path.join(self.cache_dir, safe_id)
+
+    @staticmethod
+    def _read_manifest(doc_dir: str) -> Optional[Dict[str, Any]]:
+        manifest_path = os.path.join(doc_dir, MANIFEST_FILENAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Artifacts must still be on disk for the manifest to be useful
+        if not all(os.path.exists(os.path.join(doc_dir, name)) for name in (INDEX_FILENAME, CHUNKS_FILENAME)):
+            return None
+        return manifest
+
+    @staticmethod
+    def _write_manifest(doc_dir: str, manifest: Dict[str, Any]) -> None:
+        manifest_path = os.path.join(doc_dir, MANIFEST_FILENAME)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
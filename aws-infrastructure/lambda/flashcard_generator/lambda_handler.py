@@ -17,14 +17,13 @@ logger.setLevel(logging.INFO)
 # Add layers to path
 sys.path.insert(0, '/opt/python')
 sys.path.insert(0, '/opt/python/lib/python3.11/site-packages')
+sys.path.insert(0, '/opt/python/shared')
 
 # Import AI services (from Lambda layer)
 try:
     # Lambda layer packages are in /opt/python/lambda_shared/
     from lambda_shared.flashcard_generator import FlashcardGenerator, FlashcardGenerationError
     from lambda_shared.schemas import FlashcardGenerationRequest
-    import boto3
-    import redis
 except ImportError as e:
     logger.error(f"Import error: {e}")
     logger.error(f"Python path: {sys.path}")
@@ -37,6 +36,7 @@ try:
     from gemini_embeddings import GeminiEmbeddingGenerator
     from faiss_index_manager import FAISSIndexManager
     from config import RAGConfig
+    from index_cache import IndexCache
     
     RAG_AVAILABLE = True
     logger.info("✅ RAG components imported successfully (Gemini embeddings)")
@@ -48,17 +48,19 @@ except ImportError as e:
     logger.warning("⚠️ RAG-based generation will be disabled")
 
 # Import secrets helper (from shared module)
-sys.path.insert(0, '/opt/python/shared')
 try:
     from secrets_helper import get_gemini_api_key
 except ImportError as e:
     logger.error(f"Failed to import secrets_helper: {e}")
     get_gemini_api_key = None
 
+# AWS clients are created on first use and reused across warm starts
+from lambda_runtime import get_client, get_table, lazy_import, record_invocation
+
 # Global instances for warm starts (RAG components)
 _embedding_generator: Optional[Any] = None
-_index_manager: Optional[Any] = None
-_s3_client: Optional[Any] = None
+_index_cache: Optional[Any] = None
+_redis_client: Optional[Any] = None
 
 
 def log_metric(metric_name: str, data: Dict[str, Any]) -> None:
@@ -159,8 +161,7 @@ def _check_document_index(document_id: str) -> Optional[Dict[str, Any]]:
             return None
         
         # Query DynamoDB
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
+        table = get_table(table_name)
         
         response = table.get_item(
             Key={'document_id': document_id}
@@ -216,53 +217,80 @@ def _get_embedding_generator() -> Any:
     return _embedding_generator
 
 
-def _get_index_manager() -> Any:
+def _get_s3_client() -> Any:
+    """Get or create S3 client (cached for warm starts)."""
+    return get_client('s3')
+
+
+def _get_redis_client() -> Optional[Any]:
     """
-    Get or create FAISS index manager (cached for warm starts).
+    Get or create the Redis client (cached for warm starts).
     
-    Requirement 11.5: Log cache hit/miss for warm starts
+    The connection is only verified when the client is created; a failed
+    connection is retried on the next invocation.
     
     Returns:
-        FAISSIndexManager instance
+        Redis client, or None if Redis is not configured or unreachable
     """
-    global _index_manager
+    global _redis_client
     
-    if _index_manager is None:
-        logger.info("🔥 Cold start: Initializing FAISS index manager")
-        
-        # Structured logging for cache miss
-        log_entry = {
-            "metric": "cache_status",
-            "component": "index_manager",
-            "status": "miss",
-            "type": "cold_start"
-        }
-        logger.info(json.dumps(log_entry))
-        
-        _index_manager = FAISSIndexManager(config=RAGConfig)
-    else:
-        logger.info("♨️ Warm start: Reusing FAISS index manager (cache hit)")
-        
-        # Structured logging for cache hit
-        log_entry = {
-            "metric": "cache_status",
-            "component": "index_manager",
-            "status": "hit",
-            "type": "warm_start"
-        }
-        logger.info(json.dumps(log_entry))
+    if _redis_client is not None:
+        return _redis_client
+    
+    redis_host = os.environ.get('REDIS_HOST')
+    if not redis_host:
+        logger.info("ℹ️ Redis not configured - caching disabled")
+        return None
+    
+    try:
+        redis = lazy_import('redis')
+        client = redis.Redis(
+            host=redis_host,
+            port=int(os.environ.get('REDIS_PORT', 6379)),
+            decode_responses=True,
+            socket_connect_timeout=5,
+            ssl=True,
+            ssl_cert_reqs=None,
+        )
+        client.ping()
+        logger.info("✅ Redis connected successfully")
+    except Exception as redis_error:  # pylint: disable=broad-except
+        logger.warning(f"⚠️ Redis connection failed: {redis_error}. Continuing without cache")
+        return None
     
-    return _index_manager
+    _redis_client = client
+    return _redis_client
 
 
-def _get_s3_client() -> Any:
-    """Get or create S3 client (cached for warm starts)."""
-    global _s3_client
+def _get_index_cache() -> Any:
+    """Get or create the per-container index cache (cached for warm starts)."""
+    global _index_cache
+    
+    if _index_cache is None:
+        _index_cache = IndexCache.from_env(_get_s3_client())
+    
+    return _index_cache
+
+
+def _load_index_files(local_index_path: str, local_chunks_path: str) -> tuple[Any, List[Dict[str, Any]]]:
+    """
+    Load a FAISS index and its chunks from local files.
+    
+    Each cached document gets its own index manager so several hot
+    documents can stay loaded at once.
+    """
+    index_manager = FAISSIndexManager(config=RAGConfig)
+    index_manager.load_index(local_index_path)
     
-    if _s3_client is None:
-        _s3_client = boto3.client('s3')
+    logger.info(f"  ✅ Loaded {index_manager.index_type} index with {index_manager.num_vectors} vectors")
     
-    return _s3_client
+    with open(local_chunks_path, 'r', encoding='utf-8') as f:
+        chunks_data = json.load(f)
+    
+    chunks = chunks_data.get('chunks', [])
+    logger.info(f"  ✅ Loaded {len(chunks)} chunks")
+    
+    return index_manager, chunks
 
 
 def _load_index_from_s3(
@@ -270,13 +298,16 @@ def _load_index_from_s3(
     document_id: str
 ) -> tuple[Any, List[Dict[str, Any]]]:
     """
-    Load FAISS index and chunks from S3.
+    Load FAISS index and chunks from S3 through the per-container cache.
     
     Requirements:
     - 9.2: Download FAISS index from S3 to /tmp
     - 9.2: Load chunks JSON from S3
     - 7.4: Load index artifacts from S3
     
+    Hot documents are served from memory without touching S3; stale
+    entries are revalidated with conditional GETs on their ETags.
+    
     Args:
         index_metadata: Index metadata from DynamoDB
         document_id: Document identifier
@@ -291,8 +322,6 @@ def _load_index_from_s3(
     start_time = time.time()
     
     try:
-        s3_client = _get_s3_client()
-        
         # Get S3 paths from metadata
         s3_bucket = index_metadata.get('s3_bucket')
         index_path = index_metadata.get('s3_index_path')
@@ -301,44 +330,28 @@ def _load_index_from_s3(
         if not s3_bucket or not index_path or not chunks_path:
             raise ValueError("Missing S3 paths in index metadata")
         
-        logger.info(f"📥 Loading index from S3: s3://{s3_bucket}/{index_path}")
-        
-        # Download index to /tmp
-        local_index_path = f"/tmp/{document_id}_index.faiss"
-        s3_client.download_file(s3_bucket, index_path, local_index_path)
-        
-        index_size_mb = os.path.getsize(local_index_path) / (1024 * 1024)
-        logger.info(f"  ✅ Downloaded index ({index_size_mb:.2f} MB)")
-        
-        # Download chunks to /tmp
-        local_chunks_path = f"/tmp/{document_id}_chunks.json"
-        s3_client.download_file(s3_bucket, chunks_path, local_chunks_path)
+        logger.info(f"📥 Loading index: s3://{s3_bucket}/{index_path}")
         
-        chunks_size_mb = os.path.getsize(local_chunks_path) / (1024 * 1024)
-        logger.info(f"  ✅ Downloaded chunks ({chunks_size_mb:.2f} MB)")
-        
-        # Load index
-        index_manager = _get_index_manager()
-        index_manager.load_index(local_index_path)
-        
-        logger.info(f"  ✅ Loaded {index_manager.index_type} index with {index_manager.num_vectors} vectors")
-        
-        # Load chunks
-        with open(local_chunks_path, 'r', encoding='utf-8') as f:
-            chunks_data = json.load(f)
-        
-        chunks = chunks_data.get('chunks', [])
-        logger.info(f"  ✅ Loaded {len(chunks)} chunks")
-        
-        # Clean up local files
-        try:
-            os.remove(local_index_path)
-            os.remove(local_chunks_path)
-        except:
-            pass
+        index_cache = _get_index_cache()
+        index_manager, chunks, cache_status = index_cache.get(
+            document_id=document_id,
+            bucket=s3_bucket,
+            index_key=index_path,
+            chunks_key=chunks_path,
+            loader=_load_index_files
+        )
         
         load_time = time.time() - start_time
-        logger.info(f"✅ Index loaded in {load_time:.2f}s")
+        logger.info(f"✅ Index loaded in {load_time:.2f}s (cache: {cache_status})")
+        
+        # Requirement 11.2: Log cache hit/miss status
+        log_metric("index_cache", {
+            "document_id": document_id,
+            "status": cache_status,
+            "load_time_ms": round(load_time * 1000, 2),
+            "cached_documents": len(index_cache),
+            "cache_memory_mb": round(index_cache.memory_bytes / (1024 * 1024), 2)
+        })
         
         return index_manager, chunks
         
@@ -634,10 +647,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     - Caller supplies user_id directly in the request body
     Requirements: 9.1, 9.4, 9.5, 9.6
     """
+    record_invocation('flashcard-generator')
+    
     try:
         logger.info(f"📚 Processing flashcard generation: {event.get('set_id')}")
 
-        s3_client = boto3.client('s3')
+        s3_client = _get_s3_client()
 
         try:
             if get_gemini_api_key is not None:
@@ -652,27 +667,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.error(f"❌ Failed to obtain Gemini API key: {e}")
             raise ValueError(f"Authentication configuration error: {e}")
 
-        redis_client = None
-        try:
-            redis_host = os.environ.get('REDIS_HOST')
-            redis_port = int(os.environ.get('REDIS_PORT', 6379))
-
-            if redis_host:
-                redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    ssl=True,
-                    ssl_cert_reqs=None,
-                )
-                redis_client.ping()
-                logger.info("✅ Redis connected successfully")
-            else:
-                logger.info("ℹ️ Redis not configured - caching disabled")
-        except Exception as redis_error:  # pylint: disable=broad-except
-            logger.warning(f"⚠️ Redis connection failed: {redis_error}. Continuing without cache")
-            redis_client = None
+        redis_client = _get_redis_client()
 
         generator = FlashcardGenerator(
             gemini_api_key=gemini_api_key,
@@ -851,10 +846,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # Save to DynamoDB
         try:
-            dynamodb = boto3.resource('dynamodb')
             table_name = os.environ.get('DYNAMODB_FLASHCARD_SETS')
             if table_name:
-                flashcard_sets_table = dynamodb.Table(table_name)
+                flashcard_sets_table = get_table(table_name)
                 result_payload = result.model_dump()
 
                 flashcard_sets_table.put_item(
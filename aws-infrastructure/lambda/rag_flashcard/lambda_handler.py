@@ -10,7 +10,7 @@ import os
 import sys
 import logging
 import time
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Set
 
 # Configure logging
 logger = logging.getLogger()
@@ -18,21 +18,25 @@ logger.setLevel(logging.INFO)
 
 # Add layers to path
 sys.path.insert(0, '/opt/python')
+sys.path.insert(0, '/opt/python/shared')
 
-# Import boto3
-import boto3
+from s3_fetch import fetch
+from sqs_batch import is_final_attempt, is_retryable_status, is_sqs_event, parse_sqs_record, process_sqs_batch
+from lambda_runtime import get_client, get_env_table, lazy_import, record_invocation
+from dynamo_writer import EVALUATION_KEY, get_write_buffer, update_status
+from attribute_codec import get_attribute_codec
+from secrets_helper import get_gemini_api_key
+from completion_events import CompletionEvent, get_notifier
 
 # Global instances for warm starts
 _rag_instance = None
-_s3_client = None
+_gemini_model = None
+_gemini_model_key = None
 
 
 def get_s3_client():
     """Get cached S3 client."""
-    global _s3_client
-    if _s3_client is None:
-        _s3_client = boto3.client('s3')
-    return _s3_client
+    return get_client('s3')
 
 
 def get_rag_instance(api_key: str):
@@ -52,12 +56,12 @@ def get_rag_instance(api_key: str):
 
 
 def download_pdf_from_s3(bucket: str, key: str) -> str:
-    """Download PDF from S3 to /tmp."""
+    """Download PDF from S3 to /tmp using parallel ranged GETs."""
     s3 = get_s3_client()
     local_path = f"/tmp/{key.split('/')[-1]}"
     
     logger.info(f"Downloading s3://{bucket}/{key} to {local_path}")
-    s3.download_file(bucket, key, local_path)
+    fetch(s3, bucket, key, dest_path=local_path)
     
     return local_path
 
@@ -120,19 +124,26 @@ OUTPUT FORMAT (JSON):
 Return ONLY valid JSON."""
 
 
+def get_gemini_model(api_key: str):
+    """Get cached Gemini model; recreated only when the API key changes."""
+    global _gemini_model, _gemini_model_key
+    if _gemini_model is None or _gemini_model_key != api_key:
+        genai = lazy_import('google.generativeai')
+        genai.configure(api_key=api_key)
+        _gemini_model = genai.GenerativeModel(
+            model_name=os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash'),
+            generation_config={
+                'temperature': float(os.environ.get('GEMINI_TEMPERATURE', '0.3')),
+                'max_output_tokens': int(os.environ.get('GEMINI_MAX_TOKENS', '4096'))
+            }
+        )
+        _gemini_model_key = api_key
+    return _gemini_model
+
+
 def call_gemini(prompt: str, api_key: str) -> Dict:
     """Call Gemini API for flashcard generation."""
-    import google.generativeai as genai
-    
-    genai.configure(api_key=api_key)
-    
-    model = genai.GenerativeModel(
-        model_name=os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash'),
-        generation_config={
-            'temperature': float(os.environ.get('GEMINI_TEMPERATURE', '0.3')),
-            'max_output_tokens': int(os.environ.get('GEMINI_MAX_TOKENS', '4096'))
-        }
-    )
+    model = get_gemini_model(api_key)
     
     response = model.generate_content(prompt)
     
@@ -163,49 +174,31 @@ def parse_s3_url(pdf_url: str) -> tuple:
         raise ValueError(f"Invalid S3 URL format: {pdf_url}")
 
 
-def is_sqs_event(event: Dict[str, Any]) -> bool:
-    """Check if event is from SQS"""
-    return 'Records' in event and len(event['Records']) > 0 and event['Records'][0].get('eventSource') == 'aws:sqs'
-
-
-def parse_sqs_message(event: Dict[str, Any]) -> tuple:
-    """Parse SQS message and extract request data and job_id"""
-    record = event['Records'][0]
-    body = json.loads(record['body'])
-    
-    job_id = None
-    if 'messageAttributes' in record:
-        attrs = record['messageAttributes']
-        if 'RequestId' in attrs:
-            job_id = attrs['RequestId'].get('stringValue')
-    
-    return body, job_id
-
-
 def update_job_status(evaluation_id: str, user_id: str, status: str, error_message: str = None):
-    """Update job status in DynamoDB"""
+    """Update job status in DynamoDB (never moves a completed job back)"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(os.environ.get('DYNAMODB_FLASHCARD_SETS', os.environ.get('DYNAMODB_EVALUATIONS')))
+        table = get_env_table('DYNAMODB_FLASHCARD_SETS', os.environ.get('DYNAMODB_EVALUATIONS'))
         
-        item = {
-            'evaluation_id': evaluation_id,
-            'user_id': user_id,
+        attributes = {
             'evaluation_type': 'flashcard',
-            'status': status,
             'started_at': int(time.time())
         }
         
         if error_message:
-            item['error_message'] = error_message
+            attributes['error_message'] = error_message
         
-        table.put_item(Item=item)
-        logger.info(f"📝 Updated job status: {evaluation_id} -> {status}")
+        key = {'evaluation_id': evaluation_id, 'user_id': user_id}
+        if update_status(table, key, status, attributes):
+            logger.info(f"📝 Updated job status: {evaluation_id} -> {status}")
+            if status == 'failed':
+                get_notifier().publish(CompletionEvent(evaluation_id, user_id, 'flashcard', status, error_message))
+        else:
+            logger.info(f"⏭️ Job already completed, skipped status update: {evaluation_id} -> {status}")
     except Exception as e:
         logger.error(f"Failed to update job status: {e}")
 
 
-def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+def handle_event(event: Dict[str, Any], context: Any, sqs_record: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Lambda handler for RAG-based flashcard generation.
     
@@ -232,7 +225,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Or API Gateway format with body as JSON string.
     """
     start_time = time.time()
-    is_async = is_sqs_event(event)
+    is_async = sqs_record is not None
     job_id = None
     request = None
     
@@ -240,7 +233,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Parse request based on event source
         if is_async:
             logger.info("📨 Processing async flashcard generation from SQS")
-            request, job_id = parse_sqs_message(event)
+            request, job_id = parse_sqs_record(sqs_record)
             if job_id and not request.get('set_id'):
                 request['set_id'] = job_id
             if job_id:
@@ -273,15 +266,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         document_id = request.get('document_id', s3_key)
         question_types = request.get('question_types', ['DEFINITION', 'VOCABULARY', 'COMPREHENSION'])
         
-        # Get API key from Secrets Manager
+        # Get API key from Secrets Manager (TTL-cached across warm starts)
         api_key = None
         secret_arn = os.environ.get('GEMINI_API_KEY_SECRET_ARN')
         
         if secret_arn:
             try:
-                secrets_client = boto3.client('secretsmanager')
-                response = secrets_client.get_secret_value(SecretId=secret_arn)
-                api_key = response['SecretString']
+                api_key = get_gemini_api_key()
                 logger.info("🔐 Retrieved Gemini API key from Secrets Manager")
             except Exception as e:
                 logger.error(f"❌ Failed to get secret: {e}")
@@ -296,23 +287,47 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.info(f"Processing: s3://{s3_bucket}/{s3_key}")
         logger.info(f"Parameters: query='{query[:50]}...', num_cards={num_cards}, top_k={top_k}")
         
-        # Step 1: Download PDF
-        download_start = time.time()
-        local_pdf = download_pdf_from_s3(s3_bucket, s3_key)
-        download_time = time.time() - download_start
-        logger.info(f"Download time: {download_time:.2f}s")
+        # Step 1: Reuse a saved index for this exact PDF version if one exists
+        s3 = get_s3_client()
+        rag = get_rag_instance(api_key)
+        index_bucket = os.environ.get('RAG_INDEX_BUCKET', s3_bucket)
         
-        # Step 2: Index document with RAG
+        download_time = 0.0
         index_start = time.time()
-        rag = get_rag_instance(api_key)
         
-        # Reset vector store for new document
-        rag._vector_store = None
-        rag._chunks = []
+        etag = s3.head_object(Bucket=s3_bucket, Key=s3_key)['ETag']
+        index_key = rag.index_key(s3_key, etag)
+        
+        if rag.is_loaded(index_key):
+            index_result = rag.index_summary()
+            index_source = 'memory'
+        else:
+            index_result = rag.load_index(s3, index_bucket, index_key)
+            index_source = 'saved'
+        
+        if index_result is None:
+            # Step 2: Download and index document with RAG
+            download_start = time.time()
+            local_pdf = download_pdf_from_s3(s3_bucket, s3_key)
+            download_time = time.time() - download_start
+            logger.info(f"Download time: {download_time:.2f}s")
+            
+            index_result = rag.index_document(local_pdf, document_id=s3_key, index_key=index_key)
+            index_source = 'built'
+            
+            try:
+                rag.save_index(s3, index_bucket, index_key)
+            except Exception as e:
+                # A missing saved index only costs a rebuild next time
+                logger.warning(f"⚠️ Failed to save index: {e}")
+            
+            try:
+                os.remove(local_pdf)
+            except:
+                pass
         
-        index_result = rag.index_document(local_pdf, document_id=s3_key)
         index_time = time.time() - index_start
-        logger.info(f"Index time: {index_time:.2f}s, chunks: {index_result['chunk_count']}")
+        logger.info(f"Index time: {index_time:.2f}s, chunks: {index_result['chunk_count']}, source: {index_source}")
         
         # Step 3: Retrieve relevant chunks using HYBRID approach
         retrieve_start = time.time()
@@ -339,12 +354,6 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         generate_time = time.time() - generate_start
         logger.info(f"Generate time: {generate_time:.2f}s")
         
-        # Clean up
-        try:
-            os.remove(local_pdf)
-        except:
-            pass
-        
         total_time = time.time() - start_time
         
         # Build response
@@ -358,7 +367,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 's3_key': s3_key,
                 'pdf_url': f"s3://{s3_bucket}/{s3_key}",
                 'page_count': index_result['page_count'],
-                'chunk_count': index_result['chunk_count']
+                'chunk_count': index_result['chunk_count'],
+                'index_source': index_source
             },
             'retrieval': {
                 'method': retrieval_method,
@@ -376,7 +386,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'index_time_ms': round(index_time * 1000),
                 'retrieve_time_ms': round(retrieve_time * 1000),
                 'generate_time_ms': round(generate_time * 1000),
-                'total_time_ms': round(total_time * 1000)
+                'total_time_ms': round(total_time * 1000),
+                'embedding': rag.embedding_metrics
             }
         }
         
@@ -385,9 +396,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Save to DynamoDB for async polling
         if is_async and job_id:
             try:
-                dynamodb = boto3.resource('dynamodb')
-                table = dynamodb.Table(os.environ.get('DYNAMODB_EVALUATIONS'))
-                table.put_item(Item={
+                item = {
                     'evaluation_id': job_id,
                     'user_id': user_id,
                     'evaluation_type': 'flashcard',
@@ -397,8 +406,22 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'chunk_count': index_result['chunk_count'],
                     'page_count': index_result['page_count'],
                     'created_at': int(time.time())
-                })
-                logger.info(f"✅ Saved flashcard results to DynamoDB: {job_id}")
+                }
+                
+                # Flashcards are stored compressed; batched and flushed before the Lambda returns
+                get_write_buffer().put(
+                    os.environ.get('DYNAMODB_EVALUATIONS'),
+                    get_attribute_codec().encode_item(item, ('flashcards',), EVALUATION_KEY),
+                    key_names=EVALUATION_KEY,
+                    tag=sqs_record.get('messageId')
+                )
+                logger.info(f"✅ Queued flashcard results for DynamoDB: {job_id}")
+                
+                # Announced after the write-behind buffer is flushed
+                get_notifier().queue(
+                    CompletionEvent(job_id, user_id, 'flashcard', 'completed'),
+                    tag=sqs_record.get('messageId')
+                )
             except Exception as e:
                 logger.error(f"❌ Failed to save to DynamoDB: {e}")
             
@@ -411,10 +434,87 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Update job status for async failures
         if is_async and job_id:
-            update_job_status(job_id, request.get('user_id', 'unknown') if request else 'unknown', 'failed', str(e))
+            # Only the last attempt marks the job failed; earlier ones leave it
+            # 'processing' since a retry may still succeed
+            if is_final_attempt(sqs_record):
+                update_job_status(job_id, request.get('user_id', 'unknown') if request else 'unknown', 'failed', str(e))
+            else:
+                logger.warning(f"🔁 Attempt failed, SQS will retry: {job_id}")
             raise  # Re-raise for SQS retry/DLQ
         
         return create_response(500, {
             'error': str(e),
             'error_type': type(e).__name__
         })
+
+
+def process_sqs_record(record: Dict[str, Any], context: Any) -> None:
+    """
+    Process one SQS record
+    
+    Raises on retryable failures (5xx, throttling) so the record is reported
+    as a batch item failure. Client errors would fail the same way on every
+    retry, so the message is acknowledged and the job marked failed instead.
+    A retryable failure on the last attempt also marks the job failed, then
+    raises so the message moves to the DLQ.
+    """
+    response = handle_event({}, context, sqs_record=record)
+    status_code = response.get('statusCode')
+    if status_code == 200:
+        return
+    retryable = is_retryable_status(status_code)
+    if retryable and not is_final_attempt(record):
+        raise RuntimeError(f"Flashcard generation failed with status {status_code}: {response.get('body')}")
+    
+    if retryable:
+        logger.error(f"❌ Flashcard generation failed on its last attempt with status {status_code}: {response.get('body')}")
+    else:
+        logger.warning(f"⚠️ Flashcard generation rejected with status {status_code}, not retrying: {response.get('body')}")
+    try:
+        request, job_id = parse_sqs_record(record)
+    except ValueError:
+        request, job_id = {}, None
+    if job_id:
+        update_job_status(job_id, request.get('user_id', 'unknown'), 'failed', response.get('body'))
+    if retryable:
+        raise RuntimeError(f"Flashcard generation failed with status {status_code}: {response.get('body')}")
+
+
+def flush_results() -> Set[str]:
+    """Write buffered results, then announce the jobs whose results were persisted"""
+    failed_tags = get_write_buffer().flush()
+    get_notifier().publish_pending(failed_tags)
+    return failed_tags
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Lambda entry point.
+    
+    SQS batches are drained record by record within the remaining
+    invocation time; only failed records are returned to the queue via
+    batchItemFailures. The warm RAG instance holds one document at a
+    time, so records run sequentially. Everything else is a single sync
+    request.
+    
+    Result items are buffered and written together with BatchWriteItem
+    before returning; records whose results could not be written are
+    reported as failures too. Completion events are published once the
+    results are written, so clients don't need to poll.
+    """
+    record_invocation('rag-flashcard')
+    
+    if is_sqs_event(event):
+        return process_sqs_batch(
+            event,
+            context,
+            lambda record: process_sqs_record(record, context),
+            max_workers=1,
+            min_record_time_ms=60000,
+            on_batch_end=flush_results
+        )
+    
+    try:
+        return handle_event(event, context)
+    finally:
+        flush_results()
@@ -5,25 +5,51 @@ Optimized with parallel embedding calls and hybrid query generation.
 """
 
 import os
+import sys
 import json
 import time
 import math
 import re
+import gzip
+import base64
+import random
+import hashlib
 import logging
+import threading
+from array import array
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from dataclasses import dataclass
-from collections import Counter
+from collections import Counter, deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
 import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
 # Constants
 TITAN_MODEL_ID = "amazon.titan-embed-text-v2:0"
-MAX_PARALLEL_EMBEDDINGS = 10  # Concurrent Bedrock calls
+MAX_PARALLEL_EMBEDDINGS = 10  # Initial concurrent Bedrock calls (adapts at runtime)
+MAX_EMBEDDING_CONCURRENCY = int(os.environ.get('BEDROCK_MAX_CONCURRENCY', '64'))
+MAX_EMBEDDING_RETRIES = 6
+RETRY_BASE_DELAY = 0.2  # seconds
+RETRY_MAX_DELAY = 10.0  # seconds
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException'
+}
+# Retried like throttles, but without shrinking the concurrency limit
+TRANSIENT_ERROR_CODES = {
+    'InternalServerException',
+    'ModelTimeoutException'
+}
+INDEX_FORMAT_VERSION = 1
+INDEX_PREFIX = "rag-indexes"
 
 
 @dataclass
@@ -34,23 +60,125 @@ class RAGConfig:
     top_k: int = 5
 
 
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for a throttled backend.
+    
+    Additive increase: every successful call grows the limit by 1/limit,
+    i.e. roughly +1 per window of calls. Multiplicative decrease: a
+    throttle halves the limit, but only for calls started after the last
+    decrease, so a burst of throttles from one window only counts once. The limit
+    persists on warm starts, so it converges on the account's quota.
+    """
+    
+    def __init__(self, initial: int = MAX_PARALLEL_EMBEDDINGS, minimum: int = 1,
+                 maximum: int = MAX_EMBEDDING_CONCURRENCY, backoff_ratio: float = 0.5):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial, minimum), self.maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        
+        # Metrics
+        self._successes = 0
+        self._throttles = 0
+        self._errors = 0
+        self._latencies = deque(maxlen=1000)
+    
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+    
+    def acquire(self) -> None:
+        """Block until a slot under the current limit is free."""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+    
+    def release(self, outcome: str, latency: float) -> None:
+        """
+        Return a slot and adjust the limit.
+        
+        Args:
+            outcome: 'success', 'throttled' or 'error'
+            latency: Call latency in seconds
+        """
+        with self._condition:
+            self._in_flight -= 1
+            self._latencies.append(latency)
+            
+            if outcome == 'success':
+                self._successes += 1
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+            elif outcome == 'throttled':
+                self._throttles += 1
+                now = time.monotonic()
+                if now - latency >= self._last_decrease:
+                    self._limit = max(self.minimum, self._limit * self.backoff_ratio)
+                    self._last_decrease = now
+            else:
+                self._errors += 1
+            
+            self._condition.notify_all()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of limiter state and per-call latency."""
+        with self._condition:
+            latencies = sorted(self._latencies)
+        
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+        
+        return {
+            'concurrency_limit': self.limit,
+            'successes': self._successes,
+            'throttles': self._throttles,
+            'errors': self._errors,
+            'latency_p50_ms': percentile(0.50),
+            'latency_p95_ms': percentile(0.95),
+            'latency_max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0
+        }
+
+
 class TitanEmbeddings:
-    """Amazon Titan Text Embeddings V2 via Bedrock with parallel processing."""
+    """
+    Amazon Titan Text Embeddings V2 via Bedrock with adaptive parallelism.
+    
+    Concurrency is governed by an AdaptiveConcurrencyLimiter instead of a
+    fixed pool size; throttled calls and transient errors (5xx, timeouts,
+    dropped connections) are retried with full-jitter backoff.
+    """
     
     def __init__(self, model_id: str = TITAN_MODEL_ID, region: str = None):
         self.model_id = model_id
         self.region = region or os.environ.get('BEDROCK_REGION', 'us-east-1')
         self._client = None
+        self.limiter = AdaptiveConcurrencyLimiter()
+        self._retries = 0
         logger.info("TitanEmbeddings initialized: %s in %s", model_id, self.region)
     
     @property
     def client(self):
         if self._client is None:
-            self._client = boto3.client('bedrock-runtime', region_name=self.region)
+            # botocore's own retries would hide throttling from the limiter;
+            # embed() retries throttles and transient errors itself
+            self._client = boto3.client(
+                'bedrock-runtime',
+                region_name=self.region,
+                config=Config(
+                    retries={'max_attempts': 1, 'mode': 'standard'},
+                    max_pool_connections=MAX_EMBEDDING_CONCURRENCY
+                )
+            )
         return self._client
     
-    def embed(self, text: str) -> List[float]:
-        """Get embedding for single text using Titan V2."""
+    def _invoke(self, text: str) -> List[float]:
+        """Single Titan V2 call, no retry."""
         body = json.dumps({
             "inputText": text[:8000],
             "dimensions": 512,
@@ -67,21 +195,67 @@ class TitanEmbeddings:
         result = json.loads(response['body'].read())
         return result['embedding']
     
+    @staticmethod
+    def _is_throttle(error: Exception) -> bool:
+        return (isinstance(error, ClientError)
+                and error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES)
+    
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """5xx responses, timeouts and dropped connections (what botocore's standard mode retries)"""
+        if isinstance(error, (BotocoreConnectionError, HTTPClientError)):
+            return True
+        if isinstance(error, ClientError):
+            status_code = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+            return (error.response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES
+                    or status_code >= 500)
+        return False
+    
+    def embed(self, text: str) -> List[float]:
+        """Get embedding for single text using Titan V2, retrying throttles and transient errors."""
+        for attempt in range(MAX_EMBEDDING_RETRIES + 1):
+            self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                embedding = self._invoke(text)
+            except Exception as e:
+                throttled = self._is_throttle(e)
+                self.limiter.release('throttled' if throttled else 'error', time.monotonic() - start)
+                if attempt == MAX_EMBEDDING_RETRIES or not (throttled or self._is_transient(e)):
+                    raise
+            else:
+                self.limiter.release('success', time.monotonic() - start)
+                return embedding
+            
+            # Full jitter: sleep outside the limiter so other calls proceed
+            self._retries += 1
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))))
+    
     def _embed_single(self, idx_text: tuple) -> tuple:
         """Embed single text, returns (index, embedding) for ordering."""
         idx, text = idx_text
         embedding = self.embed(text)
         return (idx, embedding)
     
-    def embed_batch_parallel(self, texts: List[str], max_workers: int = MAX_PARALLEL_EMBEDDINGS) -> List[List[float]]:
-        """Embed multiple texts in PARALLEL using ThreadPoolExecutor."""
+    def metrics(self) -> Dict[str, Any]:
+        """Throughput, throttle and latency metrics accumulated by this instance."""
+        return {**self.limiter.metrics(), 'retries': self._retries}
+    
+    def embed_batch_parallel(self, texts: List[str], max_workers: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed multiple texts in PARALLEL.
+        
+        The pool is sized for the limiter's ceiling; the limiter decides
+        how many calls are actually in flight at any moment.
+        """
         if not texts:
             return []
         
+        max_workers = max_workers or min(self.limiter.maximum, len(texts))
         embeddings = [None] * len(texts)
         indexed_texts = list(enumerate(texts))
         
-        logger.info(f"Embedding {len(texts)} chunks with {max_workers} parallel workers...")
+        logger.info(f"Embedding {len(texts)} chunks (concurrency limit {self.limiter.limit}, pool {max_workers})...")
         start_time = time.time()
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -93,10 +267,11 @@ class TitanEmbeddings:
                 embeddings[idx] = embedding
                 completed += 1
                 if completed % 20 == 0:
-                    logger.info(f"Embedded {completed}/{len(texts)} chunks")
+                    logger.info(f"Embedded {completed}/{len(texts)} chunks (limit {self.limiter.limit})")
         
         elapsed = time.time() - start_time
         logger.info(f"Parallel embedding completed: {len(texts)} chunks in {elapsed:.2f}s ({elapsed/len(texts)*1000:.0f}ms/chunk)")
+        logger.info(f"Embedding metrics: {json.dumps(self.metrics())}")
         return embeddings
 
 
@@ -123,6 +298,9 @@ class LangChainRAG:
         self._embeddings: List[List[float]] = []
         self._titan = TitanEmbeddings(model_id=embedding_model)
         self._keywords: List[str] = []  # Extracted keywords for query generation
+        self._page_count: int = 0
+        self._document_id: Optional[str] = None
+        self._index_identity: Optional[str] = None  # Storage key of the loaded index
         
         logger.info("LangChainRAG initialized with parallel Titan V2 embeddings")
     
@@ -137,6 +315,7 @@ class LangChainRAG:
         if value is None:
             self._chunks = []
             self._embeddings = []
+            self._index_identity = None
     
     def _load_pdf(self, pdf_path: str) -> List[Dict]:
         """Load PDF and extract text from each page."""
@@ -189,13 +368,24 @@ class LangChainRAG:
             return 0.0
         return dot_product / (norm_a * norm_b)
     
-    def index_document(self, pdf_path: str, document_id: Optional[str] = None) -> Dict[str, Any]:
-        """Index a PDF document using Titan V2 embeddings."""
+    def index_document(
+        self,
+        pdf_path: str,
+        document_id: Optional[str] = None,
+        index_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Index a PDF document using Titan V2 embeddings.
+        
+        index_key, when given, records which saved-index slot this build
+        corresponds to so is_loaded() can recognise it on warm starts.
+        """
         start_time = time.time()
         pages = self._load_pdf(pdf_path)
         
         self._chunks = []
         self._embeddings = []
+        self._index_identity = None
         doc_id = document_id or Path(pdf_path).stem
         
         # Process each page into chunks
@@ -218,6 +408,10 @@ class LangChainRAG:
         texts = [c['text'] for c in self._chunks]
         self._embeddings = self._titan.embed_batch_parallel(texts)
         
+        self._page_count = len(pages)
+        self._document_id = doc_id
+        self._index_identity = index_key
+        
         processing_time = time.time() - start_time
         logger.info(f"Indexed {len(self._chunks)} chunks in {processing_time:.2f}s")
         
@@ -229,6 +423,133 @@ class LangChainRAG:
             'keywords': self._keywords[:10]
         }
     
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+    
+    def index_key(self, source_key: str, etag: str) -> str:
+        """
+        Storage key for a saved index of one version of a source PDF.
+        
+        Chunking settings and the embedding model are part of the key, so
+        changing either never serves an index built with the old ones.
+        """
+        source_hash = hashlib.sha256(source_key.encode('utf-8')).hexdigest()[:32]
+        fingerprint = "|".join([
+            etag.strip('"'),
+            self.config.embedding_model,
+            str(self.config.chunk_size),
+            str(self.config.chunk_overlap),
+            f"v{INDEX_FORMAT_VERSION}"
+        ])
+        version = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:32]
+        return f"{INDEX_PREFIX}/{source_hash}/{version}.json.gz"
+    
+    def is_loaded(self, index_key: str) -> bool:
+        """Check whether the index stored under index_key is already in memory."""
+        return bool(self._chunks) and self._index_identity == index_key
+    
+    def index_summary(self) -> Dict[str, Any]:
+        """Describe the loaded index in the same shape index_document returns."""
+        return {
+            'document_id': self._document_id,
+            'page_count': self._page_count,
+            'chunk_count': len(self._chunks),
+            'processing_time_seconds': 0.0,
+            'keywords': self._keywords[:10]
+        }
+    
+    def export_index(self) -> bytes:
+        """Serialize chunks, keywords and the embedding matrix to gzipped JSON."""
+        dimensions = len(self._embeddings[0]) if self._embeddings else 0
+        matrix = array('f', (value for embedding in self._embeddings for value in embedding))
+        if sys.byteorder != 'little':
+            matrix.byteswap()
+        
+        payload = {
+            'version': INDEX_FORMAT_VERSION,
+            'document_id': self._document_id,
+            'page_count': self._page_count,
+            'embedding_model': self.config.embedding_model,
+            'chunk_size': self.config.chunk_size,
+            'chunk_overlap': self.config.chunk_overlap,
+            'dimensions': dimensions,
+            'chunks': self._chunks,
+            'keywords': self._keywords,
+            # float32 little-endian, row-major (len(chunks) x dimensions)
+            'embeddings': base64.b64encode(matrix.tobytes()).decode('ascii')
+        }
+        return gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+    
+    def import_index(self, data: bytes) -> Dict[str, Any]:
+        """Restore an index produced by export_index."""
+        payload = json.loads(gzip.decompress(data))
+        if not isinstance(payload, dict):
+            raise ValueError("Index payload is not an object")
+        if payload.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version: {payload.get('version')}")
+        
+        matrix = array('f')
+        matrix.frombytes(base64.b64decode(payload['embeddings']))
+        if sys.byteorder != 'little':
+            matrix.byteswap()
+        
+        dimensions = payload['dimensions']
+        chunks = payload['chunks']
+        if dimensions * len(chunks) != len(matrix):
+            raise ValueError("Embedding matrix does not match chunk count")
+        
+        self._chunks = chunks
+        self._embeddings = [matrix[i * dimensions:(i + 1) * dimensions].tolist() for i in range(len(chunks))]
+        self._keywords = payload.get('keywords', [])
+        self._page_count = payload.get('page_count', 0)
+        self._document_id = payload.get('document_id')
+        self._index_identity = None
+        
+        return self.index_summary()
+    
+    def save_index(self, s3_client, bucket: str, index_key: str) -> None:
+        """Upload the current index to S3 under index_key."""
+        if not self._chunks:
+            raise ValueError("No document indexed.")
+        
+        body = self.export_index()
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=index_key,
+            Body=body,
+            ContentType='application/json',
+            ContentEncoding='gzip'
+        )
+        self._index_identity = index_key
+        logger.info(f"Saved index to s3://{bucket}/{index_key} ({len(body) / 1024:.1f} KB)")
+    
+    def load_index(self, s3_client, bucket: str, index_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a saved index from S3.
+        
+        Returns:
+            Index summary, or None if no usable index is saved under index_key
+            (a corrupt or old-format index is treated as missing, so the caller
+            rebuilds it and overwrites the object)
+        """
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=index_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None
+            raise
+        
+        try:
+            summary = self.import_index(response['Body'].read())
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            # gzip, JSON, base64 and version/shape errors all mean "rebuild"
+            logger.warning(f"⚠️ Ignoring unreadable saved index s3://{bucket}/{index_key}: {e}")
+            return None
+        self._index_identity = index_key
+        logger.info(f"Loaded saved index from s3://{bucket}/{index_key}: {summary['chunk_count']} chunks")
+        return summary
+    
     def retrieve(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Retrieve top-k most relevant chunks for a query."""
         if not self._chunks:
@@ -266,6 +587,11 @@ class LangChainRAG:
         
         return results
     
+    @property
+    def embedding_metrics(self) -> Dict[str, Any]:
+        """Bedrock call metrics for this container (limit, throttles, latency)."""
+        return self._titan.metrics()
+    
     def get_chunks(self) -> List[str]:
         """Get all chunk texts."""
         return [c['text'] for c in self._chunks]
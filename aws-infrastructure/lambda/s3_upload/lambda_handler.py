@@ -6,16 +6,207 @@ Generates secure presigned URLs for file uploads (audio, PDFs, images)
 import json
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import boto3
+from botocore.config import Config
 from datetime import datetime
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize S3 client
-s3_client = boto3.client('s3')
+# Signing is done locally; SigV4 with virtual-hosted URLs works for every region
+s3_client = boto3.client(
+    's3',
+    config=Config(signature_version='s3v4', s3={'addressing_style': 'virtual'})
+)
+
+UPLOAD_EXPIRES_IN = 900   # 15 minutes
+GET_EXPIRES_IN = 3600     # 1 hour
+MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', '10'))
+
+MB = 1024 * 1024
+
+
+def _env_bucket(*names: str) -> Optional[str]:
+    for name in names:
+        if os.environ.get(name):
+            return os.environ[name]
+    return None
+
+
+# Resolved once per container: bucket, key prefix and size limit per upload type
+# (Terraform sets AUDIO_BUCKET etc., the SAM template S3_BUCKET_*)
+UPLOAD_TYPES = {
+    'speaking_audio': {
+        'bucket': _env_bucket('S3_BUCKET_AUDIO', 'AUDIO_BUCKET'),
+        'prefix': 'uploads/speaking/{user_id}/{session_id}',
+        'max_bytes': 25 * MB
+    },
+    'flashcard_pdf': {
+        'bucket': _env_bucket('S3_BUCKET_DOCUMENTS', 'DOCUMENTS_BUCKET'),
+        'prefix': 'uploads/documents/{user_id}/{session_id}',
+        'max_bytes': 50 * MB
+    },
+    'writing_essay': {
+        'bucket': _env_bucket('S3_BUCKET_DOCUMENTS', 'DOCUMENTS_BUCKET'),
+        'prefix': 'uploads/writing/{user_id}/{session_id}',
+        'max_bytes': 5 * MB
+    },
+    'user_avatar': {
+        'bucket': _env_bucket('S3_BUCKET_RESULTS', 'RESULTS_BUCKET'),  # Or separate bucket
+        'prefix': 'uploads/avatars/{user_id}',
+        'max_bytes': 5 * MB
+    },
+    'general': {
+        'bucket': _env_bucket('S3_BUCKET_RESULTS', 'RESULTS_BUCKET'),
+        'prefix': 'uploads/{user_id}/{session_id}',
+        'max_bytes': 10 * MB
+    }
+}
+
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST,OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization,x-api-key'
+}
+
+
+def create_upload_slot(
+    user_id: str,
+    session_id: str,
+    upload_type: str,
+    file_spec: Dict[str, Any],
+    method: str = 'put',
+    include_get_url: bool = True,
+    key_suffix: str = ''
+) -> Dict[str, Any]:
+    """
+    Sign one upload.
+    
+    Args:
+        user_id: Owner of the upload
+        session_id: Session the file belongs to
+        upload_type: Key of UPLOAD_TYPES
+        file_spec: {'filename', 'content_type', optional 'size' in bytes}
+        method: 'put' for a presigned PUT URL, 'post' for a presigned POST
+            policy that S3 enforces the size limit on
+        include_get_url: Also sign a GET URL for reading the file back
+        key_suffix: Extra key component keeping batch uploads unique
+    
+    Returns:
+        Upload slot (upload_url/fields, file_url, bucket, key, ...)
+    
+    Raises:
+        ValueError: For invalid upload types, methods or sizes
+    """
+    config = UPLOAD_TYPES.get(upload_type)
+    if not config or not config['bucket']:
+        raise ValueError(f"Invalid upload_type: {upload_type}")
+    
+    filename = file_spec.get('filename')
+    if not filename:
+        raise ValueError("filename is required")
+    content_type = file_spec.get('content_type', 'application/octet-stream')
+    
+    max_bytes = config['max_bytes']
+    size = file_spec.get('size')
+    if size is not None:
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise ValueError(f"size must be a number of bytes: {filename}")
+        if size <= 0 or size > max_bytes:
+            raise ValueError(f"{filename} is {size} bytes; {upload_type} uploads must be 1-{max_bytes} bytes")
+    
+    # Generate S3 key with organized structure
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    prefix = config['prefix'].format(user_id=user_id, session_id=session_id)
+    key = f"{prefix}/{timestamp}{key_suffix}_{filename}"
+    bucket = config['bucket']
+    
+    slot = {
+        'file_url': f"s3://{bucket}/{key}",
+        'expires_in': UPLOAD_EXPIRES_IN,
+        'bucket': bucket,
+        'key': key,
+        'content_type': content_type,
+        'max_bytes': max_bytes,
+        'method': method.upper()
+    }
+    
+    if method == 'post':
+        # S3 rejects uploads outside the content-length range
+        post = s3_client.generate_presigned_post(
+            Bucket=bucket,
+            Key=key,
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, size or max_bytes]
+            ],
+            ExpiresIn=UPLOAD_EXPIRES_IN
+        )
+        slot['upload_url'] = post['url']
+        slot['fields'] = post['fields']
+    elif method == 'put':
+        params = {
+            'Bucket': bucket,
+            'Key': key,
+            'ContentType': content_type
+        }
+        # A signed Content-Length makes S3 reject bodies of any other size
+        if size is not None:
+            params['ContentLength'] = size
+        slot['upload_url'] = s3_client.generate_presigned_url(
+            'put_object',
+            Params=params,
+            ExpiresIn=UPLOAD_EXPIRES_IN,
+            HttpMethod='PUT'
+        )
+    else:
+        raise ValueError(f"Invalid method: {method} (expected 'put' or 'post')")
+    
+    if include_get_url:
+        slot['get_url'] = s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': bucket,
+                'Key': key
+            },
+            ExpiresIn=GET_EXPIRES_IN
+        )
+    
+    return slot
+
+
+def create_upload_slots(request_data: Dict[str, Any], user_id: str, session_id: str, upload_type: str) -> List[Dict[str, Any]]:
+    """Sign every file of a batch request (all-or-nothing validation)"""
+    files = request_data.get('files')
+    if not isinstance(files, list) or not files:
+        raise ValueError("files must be a non-empty list")
+    if len(files) > MAX_BATCH_FILES:
+        raise ValueError(f"At most {MAX_BATCH_FILES} files per request")
+    for index, file_spec in enumerate(files):
+        if not isinstance(file_spec, dict):
+            raise ValueError(f"files[{index}] must be an object")
+    
+    method = request_data.get('method', 'put')
+    include_get_url = bool(request_data.get('include_get_url', False))
+    
+    return [
+        create_upload_slot(
+            user_id,
+            session_id,
+            file_spec.get('upload_type', upload_type),
+            file_spec,
+            method=method,
+            include_get_url=include_get_url,
+            key_suffix=f"_{index:02d}"
+        )
+        for index, file_spec in enumerate(files)
+    ]
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -28,15 +219,29 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
       "session_id": "session-456",
       "filename": "audio.mp3",
       "content_type": "audio/mp3",
-      "upload_type": "speaking_audio" | "writing_essay" | "flashcard_pdf" | "user_avatar"
+      "upload_type": "speaking_audio" | "writing_essay" | "flashcard_pdf" | "user_avatar",
+      "size": 1048576,              # Optional; signed so S3 enforces it
+      "method": "put" | "post",     # Optional; "post" returns a POST policy with a size limit
+      "include_get_url": true       # Optional
     }
     
     Response:
     {
       "upload_url": "https://s3.amazonaws.com/...presigned...",
+      "fields": {...},              # POST only; send as form fields before the file
       "file_url": "s3://bucket/path/to/file",
       "expires_in": 900
     }
+    
+    Batch mode (e.g. all recordings of a speaking part in one call):
+    {
+      "user_id": "user-123",
+      "session_id": "session-456",
+      "upload_type": "speaking_audio",
+      "method": "post",
+      "files": [{"filename": "q1.mp3", "content_type": "audio/mp3", "size": 123456}, ...]
+    }
+    -> {"uploads": [<upload slot>, ...], "expires_in": 900}
     """
     try:
         logger.info("📤 Generating S3 presigned URL")
@@ -48,89 +253,40 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         user_id = request_data.get('user_id')
         session_id = request_data.get('session_id', 'default')
-        filename = request_data.get('filename')
-        content_type = request_data.get('content_type', 'application/octet-stream')
         upload_type = request_data.get('upload_type', 'general')
         
-        # Validate required fields
-        if not user_id or not filename:
-            raise ValueError("user_id and filename are required")
-        
-        # Determine bucket based on upload type
-        bucket_map = {
-            'speaking_audio': os.environ.get('S3_BUCKET_AUDIO'),
-            'flashcard_pdf': os.environ.get('S3_BUCKET_DOCUMENTS'),
-            'writing_essay': os.environ.get('S3_BUCKET_DOCUMENTS'),
-            'user_avatar': os.environ.get('S3_BUCKET_RESULTS'),  # Or separate bucket
-            'general': os.environ.get('S3_BUCKET_RESULTS')
-        }
-        
-        bucket = bucket_map.get(upload_type)
-        if not bucket:
-            raise ValueError(f"Invalid upload_type: {upload_type}")
-        
-        # Generate S3 key with organized structure
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if not user_id:
+            raise ValueError("user_id is required")
         
-        if upload_type == 'speaking_audio':
-            key = f"uploads/speaking/{user_id}/{session_id}/{timestamp}_{filename}"
-        elif upload_type == 'flashcard_pdf':
-            key = f"uploads/documents/{user_id}/{session_id}/{timestamp}_{filename}"
-        elif upload_type == 'writing_essay':
-            key = f"uploads/writing/{user_id}/{session_id}/{timestamp}_{filename}"
-        elif upload_type == 'user_avatar':
-            key = f"uploads/avatars/{user_id}/{timestamp}_{filename}"
+        if 'files' in request_data:
+            slots = create_upload_slots(request_data, user_id, session_id, upload_type)
+            logger.info(f"✅ Generated {len(slots)} presigned upload slot(s)")
+            body = {
+                'uploads': slots,
+                'expires_in': UPLOAD_EXPIRES_IN
+            }
         else:
-            key = f"uploads/{user_id}/{session_id}/{timestamp}_{filename}"
-        
-        logger.info(f"Generating presigned URL: bucket={bucket}, key={key}")
-        
-        # Generate presigned URL (15 minutes expiry)
-        presigned_url = s3_client.generate_presigned_url(
-            'put_object',
-            Params={
-                'Bucket': bucket,
-                'Key': key,
-                'ContentType': content_type
-            },
-            ExpiresIn=900,  # 15 minutes
-            HttpMethod='PUT'
-        )
-        
-        # Also generate GET presigned URL for accessing the file
-        get_presigned_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': bucket,
-                'Key': key
-            },
-            ExpiresIn=3600  # 1 hour
-        )
-        
-        file_url = f"s3://{bucket}/{key}"
-        
-        logger.info(f"✅ Presigned URL generated: {file_url}")
+            # Validate required fields
+            if not request_data.get('filename'):
+                raise ValueError("user_id and filename are required")
+            
+            body = create_upload_slot(
+                user_id,
+                session_id,
+                upload_type,
+                request_data,
+                method=request_data.get('method', 'put'),
+                include_get_url=bool(request_data.get('include_get_url', True))
+            )
+            logger.info(f"✅ Presigned URL generated: {body['file_url']}")
         
         # Return response
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Methods': 'POST,OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization,x-api-key'
-            },
-            'body': json.dumps({
-                'upload_url': presigned_url,
-                'file_url': file_url,
-                'get_url': get_presigned_url,
-                'expires_in': 900,
-                'bucket': bucket,
-                'key': key,
-                'content_type': content_type
-            })
+            'headers': CORS_HEADERS,
+            'body': json.dumps(body)
         }
-        
+    
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         return {
@@ -170,6 +326,5 @@ if __name__ == '__main__':
         'content_type': 'audio/mp3',
         'upload_type': 'speaking_audio'
     }
-    
-    print(lambda_handler(test_event, None))
 
+    print(lambda_handler(test_event, None))
@@ -1,29 +1,58 @@
 import json
 import boto3
 import os
+import sys
+import time
 import jwt
+from collections import OrderedDict
+from botocore.exceptions import ClientError
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+sys.path.insert(0, '/opt/python/shared')
+from dynamo_writer import WriteBehindBuffer
+from secrets_helper import get_secrets_manager
+
+# Daily evaluation limits by subscription tier
+DAILY_QUOTAS = {
+    'free': 10,         # 10 evaluations per day
+    'premium': 100,     # 100 evaluations per day
+    'enterprise': 1000  # 1000 evaluations per day
+}
+DEFAULT_DAILY_QUOTA = DAILY_QUOTAS['free']
+
+# One counter item per user per UTC day, removed by DynamoDB TTL
+QUOTA_TABLE = os.environ.get('USER_QUOTA_TABLE', 'user_quotas')
+QUOTA_COUNTER_RETENTION = timedelta(days=2)
+
+# User profiles (subscription tier) are cached across warm starts, least
+# recently used first out once the cache is full
+PROFILE_CACHE_TTL_SECONDS = int(os.environ.get('PROFILE_CACHE_TTL_SECONDS', '300'))
+PROFILE_CACHE_MAX_ENTRIES = int(os.environ.get('PROFILE_CACHE_MAX_ENTRIES', '1000'))
+_profile_cache: "OrderedDict[str, Any]" = OrderedDict()
+
 class SecureAIEvaluator:
     def __init__(self):
-        self.secrets_client = boto3.client('secretsmanager')
         self.dynamodb = boto3.resource('dynamodb')
         self.s3_client = boto3.client('s3')
         
-        # Cache for secrets
-        self._secrets_cache = {}
+        # Activity and result items are written together before returning
+        self.write_buffer = WriteBehindBuffer(self.dynamodb)
+        
+        # Shared TTL cache (survives warm starts); secrets not cached yet
+        # are loaded in one batch
+        self.secrets = get_secrets_manager()
+        self.secrets.prefetch(self.secret_names())
+        
+    def secret_names(self):
+        """Secrets this evaluator needs"""
+        prefix = f"{os.environ['PROJECT_NAME']}-{os.environ['ENVIRONMENT']}"
+        return [f"{prefix}-cognito-client-secret", f"{prefix}-gemini-api-key", f"{prefix}-bedrock-config"]
         
     def get_secret(self, secret_name: str) -> Dict[str, Any]:
         """Get secret from AWS Secrets Manager with caching"""
-        if secret_name in self._secrets_cache:
-            return self._secrets_cache[secret_name]
-        
         try:
-            response = self.secrets_client.get_secret_value(SecretId=secret_name)
-            secret_data = json.loads(response['SecretString'])
-            self._secrets_cache[secret_name] = secret_data
-            return secret_data
+            return self.secrets.get_json_secret(secret_name)
         except Exception as e:
             print(f"Error retrieving secret {secret_name}: {str(e)}")
             raise
@@ -90,10 +119,9 @@ class SecureAIEvaluator:
             raise
     
     def log_user_activity(self, user_id: str, activity_type: str, details: Dict[str, Any]):
-        """Log user activity for audit and analytics"""
+        """Log user activity for audit and analytics (buffered until flush_writes)"""
         try:
-            table = self.dynamodb.Table('user_activities')
-            table.put_item(Item={
+            self.write_buffer.put('user_activities', {
                 'user_id': user_id,
                 'activity_id': f"{activity_type}_{datetime.utcnow().isoformat()}",
                 'activity_type': activity_type,
@@ -105,48 +133,99 @@ class SecureAIEvaluator:
         except Exception as e:
             print(f"Error logging user activity: {str(e)}")
     
-    def check_user_quota(self, user_id: str, user_type: str) -> bool:
-        """Check if user has remaining quota for AI evaluations"""
+    def flush_writes(self):
+        """Write buffered activity and result items with BatchWriteItem"""
         try:
-            # Get user profile
-            users_table = self.dynamodb.Table('users')
-            response = users_table.get_item(Key={'user_id': user_id})
-            
-            if 'Item' not in response:
-                return False
+            self.write_buffer.flush()
+        except Exception as e:
+            print(f"Error flushing buffered writes: {str(e)}")
+    
+    def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user profile, cached for PROFILE_CACHE_TTL_SECONDS (missing profiles are not cached)"""
+        cached = _profile_cache.get(user_id)
+        if cached and cached[0] > time.time():
+            _profile_cache.move_to_end(user_id)
+            return cached[1]
+        
+        response = self.dynamodb.Table('users').get_item(
+            Key={'user_id': user_id},
+            ProjectionExpression='user_id, subscription_tier'
+        )
+        profile = response.get('Item')
+        if profile is not None:
+            _profile_cache[user_id] = (time.time() + PROFILE_CACHE_TTL_SECONDS, profile)
+            _profile_cache.move_to_end(user_id)
+            while len(_profile_cache) > PROFILE_CACHE_MAX_ENTRIES:
+                _profile_cache.popitem(last=False)
+        return profile
+    
+    def _quota_key(self, user_id: str, now: datetime) -> Dict[str, str]:
+        return {'quota_id': f"{user_id}#{now.strftime('%Y-%m-%d')}"}
+    
+    def check_user_quota(self, user_id: str, user_type: str) -> Optional[Dict[str, str]]:
+        """
+        Check and consume one unit of the user's daily AI evaluation quota.
+        
+        The per-day counter is incremented with a single conditional
+        UpdateItem, so the check costs one write however many evaluations
+        the user has made today. If the request then fails, pass the
+        returned key to release_user_quota(), so the unit goes back to the
+        day it was taken from even after midnight.
+        
+        Returns:
+            Key of the counter that was charged, or None if the quota is used up
+        """
+        try:
+            user_profile = self.get_user_profile(user_id)
+            if user_profile is None:
+                return None
             
-            user_profile = response['Item']
             subscription_tier = user_profile.get('subscription_tier', 'free')
+            daily_limit = DAILY_QUOTAS.get(subscription_tier, DEFAULT_DAILY_QUOTA)
             
-            # Define quotas based on subscription
-            quotas = {
-                'free': 10,      # 10 evaluations per day
-                'premium': 100,  # 100 evaluations per day
-                'enterprise': 1000  # 1000 evaluations per day
-            }
-            
-            daily_limit = quotas.get(subscription_tier, 10)
-            
-            # Check today's usage
-            evaluations_table = self.dynamodb.Table('evaluations')
-            today = datetime.utcnow().strftime('%Y-%m-%d')
+            now = datetime.utcnow()
+            midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+            quota_key = self._quota_key(user_id, now)
             
-            response = evaluations_table.query(
-                IndexName='user_id-created_at-index',
-                KeyConditionExpression='user_id = :user_id AND begins_with(created_at, :today)',
+            self.dynamodb.Table(QUOTA_TABLE).update_item(
+                Key=quota_key,
+                UpdateExpression='SET #user_id = :user_id, #expires_at = if_not_exists(#expires_at, :expires_at) ADD #count :one',
+                ConditionExpression='attribute_not_exists(#count) OR #count < :limit',
+                ExpressionAttributeNames={
+                    '#user_id': 'user_id',
+                    '#count': 'count',
+                    '#expires_at': 'expires_at'
+                },
                 ExpressionAttributeValues={
                     ':user_id': user_id,
-                    ':today': today
+                    ':one': 1,
+                    ':limit': daily_limit,
+                    ':expires_at': int((midnight + QUOTA_COUNTER_RETENTION - datetime(1970, 1, 1)).total_seconds())
                 }
             )
+            return quota_key
             
-            today_usage = len(response.get('Items', []))
-            
-            return today_usage < daily_limit
-            
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return None
+            print(f"Error checking user quota: {str(e)}")
+            return None
         except Exception as e:
             print(f"Error checking user quota: {str(e)}")
-            return False
+            return None
+    
+    def release_user_quota(self, quota_key: Dict[str, str]):
+        """Give back the unit consumed by check_user_quota (request failed)"""
+        try:
+            self.dynamodb.Table(QUOTA_TABLE).update_item(
+                Key=quota_key,
+                UpdateExpression='ADD #count :minus_one',
+                ConditionExpression='#count > :zero',
+                ExpressionAttributeNames={'#count': 'count'},
+                ExpressionAttributeValues={':minus_one': -1, ':zero': 0}
+            )
+        except Exception as e:
+            print(f"Error releasing user quota: {str(e)}")
 
 def handler(event, context):
     """
@@ -155,6 +234,8 @@ def handler(event, context):
     """
     print(f"Event: {json.dumps(event)}")
     
+    evaluator = None
+    quota_key = None
     try:
         # Initialize the evaluator
         evaluator = SecureAIEvaluator()
@@ -171,7 +252,8 @@ def handler(event, context):
         user_info = evaluator.validate_cognito_token(token)
         
         # Check user quota
-        if not evaluator.check_user_quota(user_info['user_id'], user_info['user_type']):
+        quota_key = evaluator.check_user_quota(user_info['user_id'], user_info['user_type'])
+        if quota_key is None:
             return {
                 'statusCode': 429,
                 'body': json.dumps({'error': 'Daily quota exceeded. Please upgrade your plan.'})
@@ -204,13 +286,14 @@ def handler(event, context):
         elif evaluation_type == 'flashcard':
             result = process_flashcard_generation(body, ai_config, user_info)
         else:
+            evaluator.release_user_quota(quota_key)
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': 'Invalid evaluation type'})
             }
         
         # Save evaluation result
-        save_evaluation_result(user_info['user_id'], evaluation_type, result)
+        save_evaluation_result(user_info['user_id'], evaluation_type, result, evaluator.write_buffer)
         
         return {
             'statusCode': 200,
@@ -228,10 +311,15 @@ def handler(event, context):
         
     except Exception as e:
         print(f"Error in secure AI evaluator: {str(e)}")
+        if quota_key is not None:
+            evaluator.release_user_quota(quota_key)
         return {
             'statusCode': 500,
             'body': json.dumps({'error': f'Internal server error: {str(e)}'})
         }
+    finally:
+        if evaluator is not None:
+            evaluator.flush_writes()
 
 def process_speaking_evaluation(body: Dict[str, Any], ai_config: Dict[str, Any], user_info: Dict[str, Any]) -> Dict[str, Any]:
     """Process speaking evaluation with AI"""
@@ -275,19 +363,22 @@ def process_flashcard_generation(body: Dict[str, Any], ai_config: Dict[str, Any]
         'total_count': 1
     }
 
-def save_evaluation_result(user_id: str, evaluation_type: str, result: Dict[str, Any]):
-    """Save evaluation result to DynamoDB"""
+def save_evaluation_result(user_id: str, evaluation_type: str, result: Dict[str, Any],
+                           write_buffer: Optional[WriteBehindBuffer] = None):
+    """Save evaluation result to DynamoDB (buffered when a write_buffer is given)"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table('evaluations')
-        
-        table.put_item(Item={
+        item = {
             'user_id': user_id,
             'evaluation_id': f"{evaluation_type}_{datetime.utcnow().isoformat()}",
             'evaluation_type': evaluation_type,
             'result': result,
             'created_at': datetime.utcnow().isoformat(),
             'status': 'completed'
-        })
+        }
+        
+        if write_buffer is not None:
+            write_buffer.put('evaluations', item)
+        else:
+            boto3.resource('dynamodb').Table('evaluations').put_item(Item=item)
     except Exception as e:
         print(f"Error saving evaluation result: {str(e)}")
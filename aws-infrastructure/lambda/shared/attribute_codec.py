@@ -0,0 +1,220 @@
+"""
+DynamoDB Attribute Codec
+Stores large attributes gzip-compressed as Binary, or in S3 near the item size limit
+"""
+
+import os
+import gzip
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger()
+
+DEFAULT_COMPRESS_THRESHOLD = 4 * 1024        # Smaller values don't shrink enough to pay off
+DEFAULT_OFFLOAD_THRESHOLD = 350 * 1024       # Headroom below the 400 KB item limit
+DEFAULT_OFFLOAD_PREFIX = 'dynamodb-attributes'
+COMPRESSION_LEVEL = 6
+
+GZIP_MAGIC = b'\x1f\x8b'
+# Map key marking an attribute whose value lives in S3
+POINTER_KEY = '__s3_pointer__'
+
+
+def _raw_bytes(value: Any) -> Optional[bytes]:
+    """Bytes of a Binary attribute (boto3 returns a Binary wrapper on reads)."""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    inner = getattr(value, 'value', None)
+    if isinstance(inner, (bytes, bytearray)):
+        return bytes(inner)
+    return None
+
+
+def attribute_size(value: Any) -> int:
+    """Approximate DynamoDB storage size of an attribute value in bytes."""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value)) // 2 + 2
+    raw = _raw_bytes(value)
+    if raw is not None:
+        return len(raw)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode('utf-8')) + attribute_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    return len(str(value).encode('utf-8'))
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate DynamoDB storage size of an item in bytes."""
+    return sum(len(name.encode('utf-8')) + attribute_size(value) for name, value in item.items())
+
+
+class AttributeCodec:
+    """
+    Transparent encoding for large string attributes.
+
+    - Values above ``compress_threshold`` bytes are gzip-compressed and
+      stored as Binary, which cuts item size (and read/write capacity) for
+      JSON feedback, transcripts and flashcards by several times
+    - If the item is still above ``offload_threshold``, the largest encoded
+      attributes are written to S3 and replaced by a pointer map
+
+    decode_item() reverses both, so readers get the original strings back
+    whether or not an attribute was encoded.
+
+    Usage:
+        codec = AttributeCodec.from_env()
+        item = codec.encode_item(item, ('feedback', 'transcript'), key_names=('evaluation_id', 'user_id'))
+        table.put_item(Item=item)
+        ...
+        item = codec.decode_item(table.get_item(Key=key)['Item'])
+    """
+
+    def __init__(
+        self,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
+        offload_bucket: Optional[str] = None,
+        offload_prefix: str = DEFAULT_OFFLOAD_PREFIX,
+        s3_client: Any = None
+    ):
+        self.compress_threshold = compress_threshold
+        self.offload_threshold = offload_threshold
+        self.offload_bucket = offload_bucket
+        self.offload_prefix = offload_prefix.strip('/')
+        self._s3_client = s3_client
+
+    @classmethod
+    def from_env(cls) -> "AttributeCodec":
+        """Create codec configured from ATTRIBUTE_* environment variables."""
+        return cls(
+            compress_threshold=int(os.environ.get('ATTRIBUTE_COMPRESS_THRESHOLD', DEFAULT_COMPRESS_THRESHOLD)),
+            offload_threshold=int(os.environ.get('ATTRIBUTE_OFFLOAD_THRESHOLD', DEFAULT_OFFLOAD_THRESHOLD)),
+            offload_bucket=os.environ.get('ATTRIBUTE_OFFLOAD_BUCKET'),
+            offload_prefix=os.environ.get('ATTRIBUTE_OFFLOAD_PREFIX', DEFAULT_OFFLOAD_PREFIX)
+        )
+
+    @property
+    def s3_client(self) -> Any:
+        if self._s3_client is None:
+            from lambda_runtime import get_client
+            self._s3_client = get_client('s3')
+        return self._s3_client
+
+    def encode_item(
+        self,
+        item: Dict[str, Any],
+        attributes: Sequence[str],
+        key_names: Sequence[str]
+    ) -> Dict[str, Any]:
+        """
+        Encode the given attributes of an item for storage.
+
+        Args:
+            item: Item to store (not modified)
+            attributes: String attributes that may be compressed or offloaded
+            key_names: Key attributes, used to name offloaded S3 objects
+
+        Returns:
+            New item with encoded attributes
+
+        Raises:
+            ValueError: If the item is too large and no offload bucket is configured
+        """
+        encoded = dict(item)
+        original_size = item_size(item)
+
+        for name in attributes:
+            value = encoded.get(name)
+            if not isinstance(value, str) or len(value) < self.compress_threshold:
+                continue
+            raw = value.encode('utf-8')
+            compressed = gzip.compress(raw, compresslevel=COMPRESSION_LEVEL)
+            if len(compressed) < len(raw):
+                encoded[name] = compressed
+
+        size = item_size(encoded)
+        if size > self.offload_threshold:
+            size = self._offload(encoded, attributes, key_names, size)
+
+        if size != original_size:
+            logger.info(f"🗜️ Encoded item attributes: {original_size / 1024:.1f} KB -> {size / 1024:.1f} KB")
+
+        return encoded
+
+    def _offload(
+        self,
+        item: Dict[str, Any],
+        attributes: Sequence[str],
+        key_names: Sequence[str],
+        size: int
+    ) -> int:
+        if not self.offload_bucket:
+            raise ValueError(
+                f"Item is {size / 1024:.0f} KB after compression; set ATTRIBUTE_OFFLOAD_BUCKET to store large attributes in S3"
+            )
+
+        key_path = '/'.join(str(item[name]) for name in key_names)
+        candidates = sorted(
+            (name for name in attributes if item.get(name) is not None),
+            key=lambda name: attribute_size(item[name]),
+            reverse=True
+        )
+
+        for name in candidates:
+            if size <= self.offload_threshold:
+                break
+
+            value = item[name]
+            body = value if isinstance(value, bytes) else gzip.compress(
+                str(value).encode('utf-8'), compresslevel=COMPRESSION_LEVEL
+            )
+            s3_key = f"{self.offload_prefix}/{key_path}/{name}.gz"
+            self.s3_client.put_object(
+                Bucket=self.offload_bucket,
+                Key=s3_key,
+                Body=body,
+                ContentEncoding='gzip'
+            )
+
+            pointer = {POINTER_KEY: {'bucket': self.offload_bucket, 'key': s3_key}}
+            size += attribute_size(pointer) - attribute_size(value)
+            item[name] = pointer
+            logger.info(f"📤 Offloaded attribute '{name}' to s3://{self.offload_bucket}/{s3_key} ({len(body) / 1024:.1f} KB)")
+
+        if size > self.offload_threshold:
+            raise ValueError(f"Item is still {size / 1024:.0f} KB after offloading large attributes")
+        return size
+
+    def decode_value(self, value: Any) -> Any:
+        """Decode one attribute value; values that were never encoded pass through."""
+        if isinstance(value, dict) and POINTER_KEY in value:
+            pointer = value[POINTER_KEY]
+            from s3_fetch import fetch
+            value = bytes(fetch(self.s3_client, pointer['bucket'], pointer['key']).body)
+
+        raw = _raw_bytes(value)
+        if raw is not None and raw[:2] == GZIP_MAGIC:
+            return gzip.decompress(raw).decode('utf-8')
+        return value
+
+    def decode_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of the item with every encoded attribute decoded."""
+        return {name: self.decode_value(value) for name, value in item.items()}
+
+
+# Codec configured from the environment, shared across warm starts
+_codec: Optional[AttributeCodec] = None
+
+
+def get_attribute_codec() -> AttributeCodec:
+    """Get the environment-configured codec (cached for warm starts)."""
+    global _codec
+    if _codec is None:
+        _codec = AttributeCodec.from_env()
+    return _codec
@@ -0,0 +1,193 @@
+"""
+Completion Events
+Announces finished async jobs (SNS, EventBridge, or in-process for local runs)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+EVENT_SOURCE = 'ielts.evaluations'
+EVENT_DETAIL_TYPE = 'EvaluationStatusChanged'
+
+
+@dataclass
+class CompletionEvent:
+    """A job reached a terminal status."""
+    evaluation_id: str
+    user_id: str
+    evaluation_type: str
+    status: str
+    error_message: Optional[str] = None
+    occurred_at: int = field(default_factory=lambda: int(time.time()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+class NullPublisher:
+    """Used when no destination is configured; events are only logged."""
+
+    def publish(self, event: CompletionEvent) -> None:
+        logger.debug(f"No completion destination configured, dropping event for {event.evaluation_id}")
+
+
+class SnsPublisher(NullPublisher):
+    """
+    Publishes to an SNS topic.
+
+    evaluation_type and status are sent as message attributes so
+    subscribers (e.g. a WebSocket fan-out) can use filter policies.
+    """
+
+    def __init__(self, topic_arn: str, sns_client: Any = None):
+        self.topic_arn = topic_arn
+        self._sns_client = sns_client
+
+    @property
+    def sns_client(self) -> Any:
+        if self._sns_client is None:
+            from lambda_runtime import get_client
+            self._sns_client = get_client('sns')
+        return self._sns_client
+
+    def publish(self, event: CompletionEvent) -> None:
+        self.sns_client.publish(
+            TopicArn=self.topic_arn,
+            Message=json.dumps(event.to_dict()),
+            MessageAttributes={
+                'evaluation_type': {'DataType': 'String', 'StringValue': event.evaluation_type or 'unknown'},
+                'status': {'DataType': 'String', 'StringValue': event.status}
+            }
+        )
+
+
+class EventBridgePublisher(NullPublisher):
+    """Publishes to an EventBridge bus (source ielts.evaluations)."""
+
+    def __init__(self, bus_name: str, events_client: Any = None):
+        self.bus_name = bus_name
+        self._events_client = events_client
+
+    @property
+    def events_client(self) -> Any:
+        if self._events_client is None:
+            from lambda_runtime import get_client
+            self._events_client = get_client('events')
+        return self._events_client
+
+    def publish(self, event: CompletionEvent) -> None:
+        response = self.events_client.put_events(Entries=[{
+            'EventBusName': self.bus_name,
+            'Source': EVENT_SOURCE,
+            'DetailType': EVENT_DETAIL_TYPE,
+            'Detail': json.dumps(event.to_dict())
+        }])
+        if response.get('FailedEntryCount'):
+            raise RuntimeError(f"EventBridge rejected event: {response.get('Entries')}")
+
+
+class LocalPublisher(NullPublisher):
+    """
+    In-process stand-in for local runs and tests; keeps every published event.
+    """
+
+    def __init__(self):
+        self.events: List[CompletionEvent] = []
+        self._lock = threading.Lock()
+
+    def publish(self, event: CompletionEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+
+
+class CompletionNotifier:
+    """
+    Sends completion events once the job result is durable.
+
+    Results are written through the write-behind buffer, so events for
+    completed jobs are queued with the record's tag and only published by
+    publish_pending() after the flush, skipping tags whose writes failed.
+    Failed-status events are published when the job is marked failed, which
+    only happens once SQS will not retry it.
+
+    Publishing is best effort: errors are logged, and clients still see
+    the result through the status endpoint.
+
+    Usage:
+        notifier = get_notifier()
+        notifier.queue(CompletionEvent(job_id, user_id, 'writing', 'completed'), tag=message_id)
+        failed_tags = get_write_buffer().flush()
+        notifier.publish_pending(failed_tags)
+    """
+
+    def __init__(self, publisher: Any):
+        self.publisher = publisher
+        self._pending: List[Tuple[CompletionEvent, Optional[str]]] = []
+        self._lock = threading.Lock()
+
+    def queue(self, event: CompletionEvent, tag: Optional[str] = None) -> None:
+        """Hold an event until publish_pending()."""
+        with self._lock:
+            self._pending.append((event, tag))
+
+    def publish(self, event: CompletionEvent) -> bool:
+        """Publish immediately. Returns False if publishing failed."""
+        try:
+            self.publisher.publish(event)
+            logger.info(f"📣 Published {event.status} event: {event.evaluation_id}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to publish {event.status} event for {event.evaluation_id}: {e}")
+            return False
+
+    def publish_pending(self, failed_tags: Iterable[str] = ()) -> None:
+        """Publish queued events, dropping those whose tag is in failed_tags."""
+        failed_tags = set(failed_tags)
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for event, tag in pending:
+            if tag is not None and tag in failed_tags:
+                continue
+            self.publish(event)
+
+
+def publisher_from_env() -> Any:
+    """
+    Pick the publisher from the environment:
+    COMPLETION_TOPIC_ARN (SNS), COMPLETION_EVENT_BUS (EventBridge), or
+    COMPLETION_EVENTS=local for the in-process stand-in.
+    """
+    topic_arn = os.environ.get('COMPLETION_TOPIC_ARN')
+    if topic_arn:
+        return SnsPublisher(topic_arn)
+
+    bus_name = os.environ.get('COMPLETION_EVENT_BUS')
+    if bus_name:
+        return EventBridgePublisher(bus_name)
+
+    if os.environ.get('COMPLETION_EVENTS', '').lower() == 'local':
+        return LocalPublisher()
+
+    return NullPublisher()
+
+
+# Process-wide notifier shared by all records of an invocation
+_notifier: Optional[CompletionNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> CompletionNotifier:
+    """Get the environment-configured notifier (cached for warm starts)."""
+    global _notifier
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = CompletionNotifier(publisher_from_env())
+        return _notifier
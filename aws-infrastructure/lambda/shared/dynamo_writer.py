@@ -0,0 +1,269 @@
+"""
+DynamoDB Write Helper
+Write-behind buffer for BatchWriteItem and conditional job status transitions
+"""
+
+import time
+import random
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+BATCH_WRITE_LIMIT = 25  # DynamoDB maximum requests per BatchWriteItem
+DEFAULT_MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 2.0
+
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable'
+}
+
+# A job never moves out of these statuses (e.g. an SQS redelivery must not
+# mark a finished evaluation as processing again)
+TERMINAL_STATUSES = ('completed',)
+
+# Key schema of the evaluations table
+EVALUATION_KEY = ('evaluation_id', 'user_id')
+
+
+@dataclass
+class PendingWrite:
+    """A buffered PutRequest and the callers (e.g. SQS message ids) waiting on it."""
+    table_name: str
+    item: Dict[str, Any]
+    tags: Set[str] = field(default_factory=set)
+
+
+class WriteBehindBuffer:
+    """
+    Buffers DynamoDB puts and writes them with BatchWriteItem.
+
+    Puts to the same key are coalesced (last write wins), so a record that
+    is written twice in one invocation costs one write. The buffer flushes
+    itself once a full batch is pending; call flush() before the Lambda
+    returns. Unprocessed items are retried with exponential backoff.
+
+    Each put can carry a tag (e.g. the SQS message id). flush() returns the
+    tags whose writes could not be persisted, so those records can be
+    reported as batch item failures and retried.
+
+    Usage:
+        buffer = WriteBehindBuffer()
+        buffer.put(table_name, item, key_names=('evaluation_id', 'user_id'), tag=message_id)
+        failed_tags = buffer.flush()
+    """
+
+    def __init__(
+        self,
+        dynamodb: Any = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY
+    ):
+        self._dynamodb = dynamodb
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._pending: Dict[Tuple, PendingWrite] = {}
+        self._failed_tags: Set[str] = set()
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @property
+    def dynamodb(self) -> Any:
+        if self._dynamodb is not None:
+            return self._dynamodb
+        # Resources aren't thread-safe; automatic flushes run on whichever thread put()
+        from lambda_runtime import get_resource
+        return get_resource('dynamodb')
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(
+        self,
+        table_name: str,
+        item: Dict[str, Any],
+        key_names: Optional[Sequence[str]] = None,
+        tag: Optional[str] = None
+    ) -> None:
+        """
+        Buffer a put.
+
+        Args:
+            table_name: DynamoDB table name
+            item: Item to write (boto3 resource types, e.g. Decimal for numbers)
+            key_names: Key attributes; puts with the same key are coalesced
+            tag: Identifier reported by flush() if this write fails
+        """
+        if not table_name:
+            raise ValueError("table_name is required")
+
+        with self._lock:
+            if key_names:
+                buffer_key = (table_name,) + tuple(item[name] for name in key_names)
+            else:
+                self._counter += 1
+                buffer_key = (table_name, self._counter)
+
+            write = self._pending.get(buffer_key)
+            if write is None:
+                write = self._pending[buffer_key] = PendingWrite(table_name, item)
+            else:
+                write.item = item
+            if tag:
+                write.tags.add(tag)
+
+            if len(self._pending) >= BATCH_WRITE_LIMIT:
+                self._flush_locked()
+
+    def flush(self) -> Set[str]:
+        """
+        Write everything buffered.
+
+        Returns:
+            Tags of writes that failed since the last flush (including
+            automatic flushes triggered by put)
+        """
+        with self._lock:
+            self._flush_locked()
+            failed_tags, self._failed_tags = self._failed_tags, set()
+        return failed_tags
+
+    def _flush_locked(self) -> None:
+        writes = list(self._pending.values())
+        self._pending.clear()
+        if not writes:
+            return
+
+        started = time.time()
+        failed = []
+        for start in range(0, len(writes), BATCH_WRITE_LIMIT):
+            failed.extend(self._write_batch(writes[start:start + BATCH_WRITE_LIMIT]))
+
+        for write in failed:
+            self._failed_tags.update(write.tags)
+
+        elapsed_ms = (time.time() - started) * 1000
+        if failed:
+            logger.error(f"❌ Flushed {len(writes) - len(failed)}/{len(writes)} buffered write(s) in {elapsed_ms:.0f}ms")
+        else:
+            logger.info(f"💾 Flushed {len(writes)} buffered write(s) in {elapsed_ms:.0f}ms")
+
+    def _write_batch(self, writes: List[PendingWrite]) -> List[PendingWrite]:
+        """Write up to 25 puts, retrying unprocessed items. Returns writes that failed."""
+        remaining = writes
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                # Full jitter backoff
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+            request_items: Dict[str, List[Dict[str, Any]]] = {}
+            for write in remaining:
+                request_items.setdefault(write.table_name, []).append({'PutRequest': {'Item': write.item}})
+
+            try:
+                response = self.dynamodb.batch_write_item(RequestItems=request_items)
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code')
+                if error_code in RETRYABLE_ERROR_CODES:
+                    logger.warning(f"⚠️ BatchWriteItem throttled ({error_code}), retrying {len(remaining)} item(s)")
+                    continue
+                logger.error(f"❌ BatchWriteItem failed: {e}")
+                return remaining
+            except Exception as e:
+                # botocore has already retried connection errors
+                logger.error(f"❌ BatchWriteItem failed: {e}")
+                return remaining
+
+            unprocessed = response.get('UnprocessedItems') or {}
+            if not unprocessed:
+                return []
+
+            remaining = [
+                write for write in remaining
+                if {'PutRequest': {'Item': write.item}} in unprocessed.get(write.table_name, [])
+            ]
+            logger.warning(f"⚠️ {len(remaining)} unprocessed item(s), retrying")
+
+        logger.error(f"❌ Gave up on {len(remaining)} item(s) after {self.max_attempts} attempts")
+        return remaining
+
+
+def update_status(
+    table: Any,
+    key: Dict[str, Any],
+    status: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    terminal_statuses: Sequence[str] = TERMINAL_STATUSES
+) -> bool:
+    """
+    Move a job to a new status with a conditional UpdateItem.
+
+    Only the given attributes are set (the rest of the item is left alone),
+    and the update is skipped if the job already reached a terminal status.
+
+    Args:
+        table: DynamoDB Table resource
+        key: Primary key of the job item
+        status: New status
+        attributes: Other attributes to set alongside the status
+        terminal_statuses: Statuses the job may not leave
+
+    Returns:
+        True if the status was written, False if the condition prevented it
+    """
+    names = {'#status': 'status'}
+    values = {':status': status}
+    assignments = ['#status = :status']
+
+    for i, (name, value) in enumerate((attributes or {}).items()):
+        names[f'#a{i}'] = name
+        values[f':a{i}'] = value
+        assignments.append(f'#a{i} = :a{i}')
+
+    condition = 'attribute_not_exists(#status)'
+    if terminal_statuses:
+        for i, terminal in enumerate(terminal_statuses):
+            values[f':t{i}'] = terminal
+        placeholders = ', '.join(f':t{i}' for i in range(len(terminal_statuses)))
+        condition += f' OR NOT #status IN ({placeholders})'
+
+    try:
+        table.update_item(
+            Key=key,
+            UpdateExpression='SET ' + ', '.join(assignments),
+            ConditionExpression=condition,
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+# Process-wide buffer shared by all records of an invocation
+_write_buffer: Optional[WriteBehindBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """Get the process-wide write-behind buffer (cached for warm starts)."""
+    global _write_buffer
+    with _write_buffer_lock:
+        if _write_buffer is None:
+            _write_buffer = WriteBehindBuffer()
+        return _write_buffer
@@ -0,0 +1,190 @@
+"""
+Lambda Runtime Helper
+Lazily-created clients shared across warm invocations, plus import-time
+profiling for cold starts
+
+boto3 clients are thread-safe and shared by the whole process. boto3
+resources, their Table objects and Gemini clients are not, so each thread
+(e.g. an SQS batch worker) gets its own. Per-thread resources wrap the
+shared client, so only the first one loads the service model; SQS workers
+live as long as the execution environment, so warm invocations reuse them.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import importlib
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger()
+
+# Roughly when the execution environment started loading our code
+_RUNTIME_LOADED_AT = time.time()
+
+_lock = threading.RLock()
+_clients: Dict[tuple, Any] = {}
+_resource_classes: Dict[tuple, Any] = {}
+_thread_local = threading.local()
+_import_timings: Dict[str, float] = {}
+_cold_start = True
+
+
+def lazy_import(module_name: str) -> Any:
+    """
+    Import a module on first use and record how long the import took.
+
+    Modules already in sys.modules cost nothing and are not recorded, so
+    the timings only show what this route actually paid for.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_timings[module_name] = round((time.perf_counter() - start) * 1000, 1)
+    return module
+
+
+def get_client(service_name: str, **kwargs) -> Any:
+    """
+    Get or create a boto3 client (cached for warm starts).
+
+    Clients are thread-safe and reused by every invocation of this
+    execution environment; kwargs are part of the cache key.
+    """
+    key = (service_name, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        if key not in _clients:
+            boto3 = lazy_import('boto3')
+            _clients[key] = boto3.client(service_name, **kwargs)
+            logger.info(f"🔌 Created {service_name} client")
+        return _clients[key]
+
+
+def _thread_cache(name: str) -> Dict[Any, Any]:
+    """Get a cache dict owned by the current thread."""
+    cache = getattr(_thread_local, name, None)
+    if cache is None:
+        cache = {}
+        setattr(_thread_local, name, cache)
+    return cache
+
+
+def get_resource(service_name: str, **kwargs) -> Any:
+    """
+    Get or create a boto3 resource (cached per thread for warm starts).
+
+    Resources are not thread-safe, so every thread gets its own. Only the
+    first one is built by boto3 (loading the service model); the others
+    wrap the shared, thread-safe client of get_client, which is cheap.
+    """
+    resources = _thread_cache('resources')
+    key = (service_name, tuple(sorted(kwargs.items())))
+    resource = resources.get(key)
+    if resource is not None:
+        return resource
+
+    with _lock:
+        resource_class = _resource_classes.get(key)
+        if resource_class is None:
+            boto3 = lazy_import('boto3')
+            resource = boto3.resource(service_name, **kwargs)
+            resource_class = _resource_classes[key] = type(resource)
+            _clients.setdefault(key, resource.meta.client)
+            logger.info(f"🔌 Created {service_name} resource")
+
+    if resource is None:
+        resource = resource_class(client=get_client(service_name, **kwargs))
+    resources[key] = resource
+    return resource
+
+
+def get_table(table_name: str) -> Any:
+    """Get a DynamoDB Table handle by name (cached per thread)."""
+    tables = _thread_cache('tables')
+    table = tables.get(table_name)
+    if table is None:
+        table = tables[table_name] = get_resource('dynamodb').Table(table_name)
+    return table
+
+
+def get_env_table(env_var: str, default: Optional[str] = None) -> Any:
+    """
+    Get a cached DynamoDB Table handle whose name is in an environment variable.
+
+    Raises:
+        ValueError: If the variable is not set and no default is given
+    """
+    table_name = os.environ.get(env_var, default)
+    if not table_name:
+        raise ValueError(f"{env_var} environment variable not set")
+    return get_table(table_name)
+
+
+def get_gemini_client(api_key: str) -> Any:
+    """
+    Get or create a GeminiClient for an API key (cached per thread).
+
+    Keeping the client keeps its circuit breaker state across invocations;
+    a rotated key simply gets a new client.
+    """
+    gemini_clients = _thread_cache('gemini_clients')
+    client = gemini_clients.get(api_key)
+    if client is None:
+        gemini_client = lazy_import('lambda_shared.gemini_client')
+        gemini_clients.clear()  # Drop clients for rotated-out keys
+        client = gemini_clients[api_key] = gemini_client.GeminiClient(api_key=api_key)
+        logger.info("🔌 Created Gemini client")
+    return client
+
+
+def import_timings() -> Dict[str, float]:
+    """Milliseconds spent in each lazy import so far."""
+    return dict(_import_timings)
+
+
+def record_invocation(function_name: str) -> bool:
+    """
+    Mark the start of an invocation.
+
+    On the first invocation of an execution environment, logs a
+    cold-start metric with the init duration and per-module import cost.
+
+    Returns:
+        True on a cold start, False on a warm start
+    """
+    global _cold_start
+
+    with _lock:
+        is_cold = _cold_start
+        _cold_start = False
+
+    if is_cold:
+        logger.info(json.dumps({
+            "metric": "cold_start",
+            "function": function_name,
+            "init_ms": round((time.time() - _RUNTIME_LOADED_AT) * 1000, 1),
+            "imports_ms": import_timings()
+        }))
+
+    return is_cold
+
+
+def reset() -> None:
+    """Drop all cached clients, including the current thread's (for tests)."""
+    global _cold_start, _thread_local
+
+    with _lock:
+        _clients.clear()
+        _resource_classes.clear()
+        _thread_local = threading.local()
+        _import_timings.clear()
+        _cold_start = True
@@ -0,0 +1,269 @@
+"""
+S3 Fetch Helper
+Concurrent, byte-range parallel downloads into memory or /tmp
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024  # 8 MB per ranged GET
+DEFAULT_MAX_WORKERS = 8              # Stay below botocore's default pool of 10 connections
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+@dataclass
+class FetchSpec:
+    """One object to fetch. Leave dest_path unset to fetch into memory."""
+    bucket: str
+    key: str
+    dest_path: Optional[str] = None
+    if_none_match: Optional[str] = None
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a fetch. body is set for in-memory fetches, path for file fetches."""
+    bucket: str
+    key: str
+    etag: Optional[str]
+    size: int = 0
+    content_type: Optional[str] = None
+    body: Optional[bytearray] = None
+    path: Optional[str] = None
+    not_modified: bool = False
+
+
+class _Sink:
+    """Random-access destination that ranged parts write into at their offsets."""
+
+    def __init__(self, size: int, dest_path: Optional[str]):
+        self.size = size
+        self.dest_path = dest_path
+        self.buffer: Optional[bytearray] = None
+        self._view: Optional[memoryview] = None
+        self._fd: Optional[int] = None
+        self._partial_path: Optional[str] = None
+
+        if dest_path:
+            self._partial_path = f"{dest_path}.part"
+            self._fd = os.open(self._partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.ftruncate(self._fd, size)
+        else:
+            self.buffer = bytearray(size)
+            self._view = memoryview(self.buffer)
+
+    def write_at(self, offset: int, data: bytes) -> None:
+        if self._fd is not None:
+            os.pwrite(self._fd, data, offset)
+        else:
+            self._view[offset:offset + len(data)] = data
+
+    def commit(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            os.replace(self._partial_path, self.dest_path)
+        elif self._view is not None:
+            self._view.release()
+            self._view = None
+
+    def abort(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                os.remove(self._partial_path)
+            except OSError:
+                pass
+        self.buffer = None
+        self._view = None
+
+
+def _stream_into(body: Any, sink: _Sink, offset: int) -> int:
+    """Copy a StreamingBody into the sink starting at offset. Returns bytes written."""
+    written = 0
+    for chunk in body.iter_chunks(chunk_size=STREAM_CHUNK_SIZE):
+        sink.write_at(offset + written, chunk)
+        written += len(chunk)
+    return written
+
+
+def _is_not_modified(error: ClientError) -> bool:
+    status_code = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+    error_code = error.response.get('Error', {}).get('Code')
+    return status_code == 304 or error_code in ('304', 'NotModified')
+
+
+def _fetch_first_part(
+    s3_client: Any,
+    spec: FetchSpec,
+    part_size: int
+) -> Tuple[FetchResult, Optional[_Sink]]:
+    """
+    GET the first byte range, which also tells us the object's size and ETag.
+
+    Returns the result and an open sink holding the first part; the caller
+    fetches any remaining parts into it and commits it. No sink is returned
+    when the object was not modified.
+    """
+    params = {'Bucket': spec.bucket, 'Key': spec.key, 'Range': f'bytes=0-{part_size - 1}'}
+    if spec.if_none_match:
+        params['IfNoneMatch'] = spec.if_none_match
+
+    try:
+        response = s3_client.get_object(**params)
+    except ClientError as e:
+        if _is_not_modified(e):
+            return FetchResult(spec.bucket, spec.key, spec.if_none_match, not_modified=True, path=spec.dest_path), None
+        if e.response.get('Error', {}).get('Code') != 'InvalidRange':
+            raise
+        # Empty objects reject any Range header
+        params.pop('Range')
+        response = s3_client.get_object(**params)
+
+    match = _CONTENT_RANGE_RE.match(response.get('ContentRange') or '')
+    if match and match.group(3) != '*':
+        total_size = int(match.group(3))
+    else:
+        total_size = response.get('ContentLength', 0)
+
+    result = FetchResult(
+        bucket=spec.bucket,
+        key=spec.key,
+        etag=response.get('ETag'),
+        size=total_size,
+        content_type=response.get('ContentType'),
+        path=spec.dest_path
+    )
+
+    sink = _Sink(total_size, spec.dest_path)
+    try:
+        _stream_into(response['Body'], sink, 0)
+    except Exception:
+        sink.abort()
+        raise
+
+    return result, sink
+
+
+def _fetch_range(s3_client: Any, spec: FetchSpec, etag: str, start: int, end: int, sink: _Sink) -> None:
+    # IfMatch guards against the object changing between ranged GETs
+    response = s3_client.get_object(
+        Bucket=spec.bucket,
+        Key=spec.key,
+        Range=f'bytes={start}-{end}',
+        IfMatch=etag
+    )
+    _stream_into(response['Body'], sink, start)
+
+
+def fetch_many(
+    s3_client: Any,
+    specs: List[FetchSpec],
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS
+) -> List[FetchResult]:
+    """
+    Fetch several S3 objects concurrently, splitting large ones into ranged parts.
+
+    Every object's first part is requested in parallel; the first response
+    reveals the object size, after which the remaining byte ranges of all
+    objects share one thread pool. Parts are written straight into a
+    preallocated buffer or /tmp file at their offsets, so no intermediate
+    full copy of the object is ever made.
+
+    Args:
+        s3_client: boto3 S3 client (clients are thread-safe)
+        specs: Objects to fetch
+        part_size: Bytes per ranged GET
+        max_workers: Maximum concurrent GETs
+
+    Returns:
+        FetchResult per spec, in the same order
+
+    Raises:
+        ClientError: If any GET fails (partial files are removed)
+    """
+    if not specs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        first_futures = [executor.submit(_fetch_first_part, s3_client, spec, part_size) for spec in specs]
+
+        first_parts = []
+        first_error = None
+        for future in first_futures:
+            try:
+                first_parts.append(future.result())
+            except Exception as e:
+                first_error = first_error or e
+                first_parts.append((None, None))
+
+        open_sinks = [sink for _, sink in first_parts if sink is not None]
+        if first_error is not None:
+            for sink in open_sinks:
+                sink.abort()
+            raise first_error
+
+        try:
+            futures = []
+            for spec, (result, sink) in zip(specs, first_parts):
+                if sink is None:
+                    continue
+                for start in range(part_size, result.size, part_size):
+                    end = min(start + part_size, result.size) - 1
+                    futures.append(executor.submit(_fetch_range, s3_client, spec, result.etag, start, end, sink))
+
+            for future in futures:
+                future.result()
+        except Exception:
+            for sink in open_sinks:
+                sink.abort()
+            raise
+
+    for result, sink in first_parts:
+        if sink is None:
+            continue
+        result.body = sink.buffer
+        sink.commit()
+        logger.info(f"📥 Fetched s3://{result.bucket}/{result.key} ({result.size / (1024 * 1024):.2f} MB)")
+
+    return [result for result, _ in first_parts]
+
+
+def fetch(
+    s3_client: Any,
+    bucket: str,
+    key: str,
+    dest_path: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS
+) -> FetchResult:
+    """
+    Fetch one S3 object into memory (dest_path=None) or to dest_path.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: S3 bucket
+        key: S3 key
+        dest_path: Local file to write, or None to return the body in memory
+        if_none_match: ETag for a conditional GET; not_modified is set on a 304
+        part_size: Bytes per ranged GET
+        max_workers: Maximum concurrent GETs
+
+    Returns:
+        FetchResult
+    """
+    spec = FetchSpec(bucket=bucket, key=key, dest_path=dest_path, if_none_match=if_none_match)
+    return fetch_many(s3_client, [spec], part_size=part_size, max_workers=max_workers)[0]
@@ -4,29 +4,75 @@ Provides cached access to secrets from AWS Secrets Manager
 """
 
 import os
-import boto3
+import json
+import time
 import logging
-from functools import lru_cache
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
 
+DEFAULT_TTL_SECONDS = int(os.environ.get('SECRETS_CACHE_TTL_SECONDS', '300'))
+# Secrets are refreshed in the background this long before they expire
+DEFAULT_REFRESH_AHEAD_SECONDS = int(os.environ.get('SECRETS_REFRESH_AHEAD_SECONDS', '60'))
+BATCH_GET_LIMIT = 20  # BatchGetSecretValue maximum SecretIdList length
+
+# Environment variables holding secret ARNs, fetched together at cold start
+SECRET_ARN_ENV_VARS = (
+    'GEMINI_API_KEY_SECRET_ARN',
+    'OPENAI_API_KEY_SECRET_ARN',
+    'BEDROCK_CONFIG_SECRET_ARN'
+)
+
+
+@dataclass
+class CachedSecret:
+    """A secret value and when it has to be fetched again."""
+    value: str
+    expires_at: float
+    refreshing: bool = False
+
 
 class SecretsManager:
     """
-    Helper class for AWS Secrets Manager with caching.
+    Helper class for AWS Secrets Manager with a TTL cache.
+    
+    - Each secret is cached for ``ttl_seconds`` so a rotation takes effect
+      without a redeploy
+    - Within ``refresh_ahead_seconds`` of expiry, the cached value is still
+      returned while a background thread fetches the new one, so requests
+      rarely wait on Secrets Manager
+    - If Secrets Manager is unavailable, an expired value is served rather
+      than failing the request
+    - prefetch() loads several secrets with BatchGetSecretValue (done for
+      the configured *_SECRET_ARN variables at cold start)
     
     Usage:
         secrets = SecretsManager()
         api_key = secrets.get_gemini_api_key()
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        refresh_ahead_seconds: int = DEFAULT_REFRESH_AHEAD_SECONDS,
+        client=None
+    ):
         """Initialize Secrets Manager client."""
-        self.client = boto3.client('secretsmanager')
+        if client is None:
+            from lambda_runtime import get_client
+            client = get_client('secretsmanager')
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = min(refresh_ahead_seconds, ttl_seconds)
+        
+        self._cache: Dict[str, CachedSecret] = {}
+        self._lock = threading.Lock()
         logger.info("✅ SecretsManager initialized")
     
-    @lru_cache(maxsize=128)
     def get_secret(self, secret_arn: str) -> str:
         """
         Get secret value from Secrets Manager with caching.
@@ -34,10 +80,11 @@ class SecretsManager:
         Caching reduces API calls and improves performance:
         - First call: Retrieves from Secrets Manager (~50-100ms)
         - Subsequent calls: Returns from cache (<1ms)
-        - Cache persists across Lambda invocations (warm starts)
+        - Cache persists across Lambda invocations (warm starts) and
+          expires after ttl_seconds
         
         Args:
-            secret_arn: ARN of the secret to retrieve
+            secret_arn: ARN (or name) of the secret to retrieve
             
         Returns:
             Secret value as string
@@ -46,11 +93,90 @@ class SecretsManager:
             ValueError: If secret not found or invalid parameters
             Exception: For other Secrets Manager errors
         """
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(secret_arn)
+            if cached is not None and now < cached.expires_at:
+                if now >= cached.expires_at - self.refresh_ahead_seconds and not cached.refreshing:
+                    cached.refreshing = True
+                    threading.Thread(target=self._refresh, args=(secret_arn,), daemon=True).start()
+                return cached.value
+        
+        try:
+            return self._fetch(secret_arn)
+        except Exception:
+            if cached is not None:
+                logger.warning(f"⚠️ Using expired cached secret, refresh failed: {secret_arn}")
+                return cached.value
+            raise
+    
+    def get_json_secret(self, secret_arn: str) -> dict:
+        """Get a secret holding a JSON object."""
+        return json.loads(self.get_secret(secret_arn))
+    
+    def prefetch(self, secret_arns: Iterable[str]) -> None:
+        """
+        Load secrets that aren't cached yet with BatchGetSecretValue.
+        
+        Failures are only logged; get_secret() fetches (and reports) them
+        individually later.
+        """
+        now = time.time()
+        with self._lock:
+            missing = list(dict.fromkeys(
+                arn for arn in secret_arns
+                if arn and (arn not in self._cache or now >= self._cache[arn].expires_at)
+            ))
+        if not missing:
+            return
+        
+        if len(missing) == 1 or not hasattr(self.client, 'batch_get_secret_value'):
+            for arn in missing:
+                try:
+                    self._fetch(arn)
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to prefetch secret {arn}: {e}")
+            return
+        
+        for start in range(0, len(missing), BATCH_GET_LIMIT):
+            chunk = missing[start:start + BATCH_GET_LIMIT]
+            try:
+                response = self.client.batch_get_secret_value(SecretIdList=chunk)
+            except ClientError as e:
+                logger.warning(f"⚠️ BatchGetSecretValue failed ({e.response['Error']['Code']}), secrets will be fetched individually")
+                continue
+            
+            for secret in response.get('SecretValues', []):
+                # Cache under the id the caller used (ARN or name)
+                for arn in chunk:
+                    if arn in (secret.get('ARN'), secret.get('Name')):
+                        self._store(arn, secret['SecretString'])
+            for error in response.get('Errors', []):
+                logger.warning(f"⚠️ Failed to prefetch secret {error.get('SecretId')}: {error.get('ErrorCode')}")
+        
+        logger.info(f"🔐 Prefetched {len(missing)} secret(s)")
+    
+    def _store(self, secret_arn: str, value: str) -> str:
+        with self._lock:
+            self._cache[secret_arn] = CachedSecret(value, time.time() + self.ttl_seconds)
+        return value
+    
+    def _refresh(self, secret_arn: str) -> None:
+        try:
+            self._fetch(secret_arn)
+        except Exception as e:
+            logger.warning(f"⚠️ Background secret refresh failed: {e}")
+            with self._lock:
+                cached = self._cache.get(secret_arn)
+                if cached is not None:
+                    cached.refreshing = False
+    
+    def _fetch(self, secret_arn: str) -> str:
         try:
             logger.info(f"🔐 Retrieving secret: {secret_arn}")
             response = self.client.get_secret_value(SecretId=secret_arn)
             logger.info(f"✅ Secret retrieved successfully")
-            return response['SecretString']
+            return self._store(secret_arn, response['SecretString'])
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -134,30 +260,29 @@ class SecretsManager:
         Raises:
             ValueError: If secret ARN is set but secret not found
         """
-        import json
-        
         secret_arn = os.environ.get('BEDROCK_CONFIG_SECRET_ARN')
         
         if not secret_arn:
             logger.info("ℹ️ BEDROCK_CONFIG_SECRET_ARN not configured")
             return None
         
-        config_str = self.get_secret(secret_arn)
-        return json.loads(config_str)
+        return self.get_json_secret(secret_arn)
     
     def clear_cache(self):
         """
         Clear the secrets cache.
         
         Useful for testing or if you need to force refresh secrets
-        (e.g., after rotation).
+        before the TTL (e.g., right after rotation).
         """
-        self.get_secret.cache_clear()
+        with self._lock:
+            self._cache.clear()
         logger.info("🔄 Secrets cache cleared")
 
 
 # Global instance (reused across Lambda invocations for warm starts)
 _secrets_manager = None
+_secrets_manager_lock = threading.Lock()
 
 
 def get_secrets_manager() -> SecretsManager:
@@ -165,19 +290,30 @@ def get_secrets_manager() -> SecretsManager:
     Get or create global SecretsManager instance.
     
     This ensures the same instance is reused across Lambda invocations
-    (warm starts), which maintains the cache.
+    (warm starts), which maintains the cache. On creation, the secrets
+    named by the *_SECRET_ARN environment variables (and the comma
+    separated SECRETS_PREFETCH list) are fetched in one batch.
     
     Returns:
         SecretsManager instance
     """
     global _secrets_manager
     
-    if _secrets_manager is None:
-        _secrets_manager = SecretsManager()
+    with _secrets_manager_lock:
+        if _secrets_manager is None:
+            _secrets_manager = SecretsManager()
+            _secrets_manager.prefetch(configured_secret_arns())
     
     return _secrets_manager
 
 
+def configured_secret_arns() -> List[str]:
+    """Secret ARNs configured for this function via environment variables."""
+    arns = [os.environ.get(name) for name in SECRET_ARN_ENV_VARS]
+    arns.extend(os.environ.get('SECRETS_PREFETCH', '').split(','))
+    return [arn.strip() for arn in arns if arn and arn.strip()]
+
+
 # Convenience functions for direct access
 def get_gemini_api_key() -> str:
     """Get Gemini API key from Secrets Manager."""
@@ -0,0 +1,258 @@
+"""
+SQS Batch Helper
+Processes every record of an SQS batch and reports partial batch failures
+"""
+
+import os
+import json
+import base64
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('SQS_BATCH_CONCURRENCY', '10'))
+# Time kept in reserve to report failures before Lambda times out
+DEFAULT_SAFETY_MARGIN_MS = 5000
+# Receives before SQS moves a message to the DLQ (maxReceiveCount in sqs.tf)
+DEFAULT_MAX_RECEIVE_COUNT = int(os.environ.get('SQS_MAX_RECEIVE_COUNT', '3'))
+
+# Worker pools live as long as the execution environment, so the per-thread
+# clients cached by lambda_runtime survive warm invocations
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def is_sqs_event(event: Dict[str, Any]) -> bool:
+    """Check if event is from SQS"""
+    return 'Records' in event and len(event['Records']) > 0 and event['Records'][0].get('eventSource') == 'aws:sqs'
+
+
+def parse_sqs_record(record: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Parse one SQS record and extract request data and job_id"""
+    body = json.loads(record['body'])
+
+    # Get job_id from message attributes (set by API Gateway)
+    job_id = None
+    if 'messageAttributes' in record:
+        attrs = record['messageAttributes']
+        if 'RequestId' in attrs:
+            job_id = attrs['RequestId'].get('stringValue')
+
+    return body, job_id
+
+
+def is_final_attempt(record: Dict[str, Any], max_receive_count: int = DEFAULT_MAX_RECEIVE_COUNT) -> bool:
+    """
+    Check if a failure of this record sends it to the DLQ instead of being retried
+
+    Receives that never started the record (batch deadline) don't count:
+    process_sqs_batch re-sends such records as new messages, whose receive
+    count starts over.
+    """
+    try:
+        receive_count = int(record.get('attributes', {}).get('ApproximateReceiveCount', max_receive_count))
+    except (TypeError, ValueError):
+        receive_count = max_receive_count
+    return receive_count >= max_receive_count
+
+
+def is_retryable_status(status_code: Any) -> bool:
+    """Check if a handler response may succeed when the record is retried (5xx, throttling or no status)"""
+    return not isinstance(status_code, int) or status_code == 429 or status_code >= 500
+
+
+class _NotStarted(Exception):
+    """The record was skipped because the batch ran out of time"""
+
+
+def _queue_url(queue_arn: str) -> str:
+    # arn:aws:sqs:<region>:<account>:<name>
+    _, _, _, region, account, name = queue_arn.split(':', 5)
+    return f"https://sqs.{region}.amazonaws.com/{account}/{name}"
+
+
+def _send_attributes(record: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Convert a record's messageAttributes back into SendMessage format"""
+    attributes = {}
+    for name, attr in (record.get('messageAttributes') or {}).items():
+        data_type = attr.get('dataType', 'String')
+        if attr.get('binaryValue') is not None:
+            attributes[name] = {'DataType': data_type, 'BinaryValue': base64.b64decode(attr['binaryValue'])}
+        elif attr.get('stringValue') is not None:
+            attributes[name] = {'DataType': data_type, 'StringValue': attr['stringValue']}
+    return attributes
+
+
+def requeue_records(records: List[Dict[str, Any]]) -> List[str]:
+    """
+    Send unstarted records back to their queue as new messages.
+
+    Unlike returning them in batchItemFailures (or resetting their
+    visibility), this doesn't use up one of their receives before the DLQ:
+    the new message's receive count starts over.
+
+    Returns:
+        Message ids of the records that could not be re-sent
+    """
+    from lambda_runtime import get_client
+
+    by_queue: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_queue.setdefault(record.get('eventSourceARN', ''), []).append(record)
+
+    failed = []
+    for queue_arn, queue_records in by_queue.items():
+        try:
+            queue_url = _queue_url(queue_arn)
+        except ValueError:
+            failed.extend(record.get('messageId') for record in queue_records)
+            continue
+
+        for i in range(0, len(queue_records), 10):
+            chunk = queue_records[i:i + 10]
+            entries = [
+                {
+                    'Id': str(n),
+                    'MessageBody': record['body'],
+                    'MessageAttributes': _send_attributes(record)
+                }
+                for n, record in enumerate(chunk)
+            ]
+            try:
+                response = get_client('sqs').send_message_batch(QueueUrl=queue_url, Entries=entries)
+            except Exception as e:
+                logger.error(f"Failed to re-send unstarted records: {e}")
+                failed.extend(record.get('messageId') for record in chunk)
+                continue
+            for entry in response.get('Failed', []):
+                failed.append(chunk[int(entry['Id'])].get('messageId'))
+
+    return failed
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the container's worker pool for a concurrency (threads start on demand)"""
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = _executors[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='sqs-batch'
+            )
+        return executor
+
+
+def _remaining_ms(context: Any) -> float:
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        return context.get_remaining_time_in_millis()
+    # Local runs have no deadline
+    return float('inf')
+
+
+def process_sqs_batch(
+    event: Dict[str, Any],
+    context: Any,
+    process_record: Callable[[Dict[str, Any]], None],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    min_record_time_ms: int = 0,
+    safety_margin_ms: int = DEFAULT_SAFETY_MARGIN_MS,
+    on_batch_end: Optional[Callable[[], Iterable[str]]] = None
+) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Process all records of an SQS event concurrently.
+
+    A record fails if process_record raises; failed records are returned to
+    the queue (requires ReportBatchItemFailures on the event source mapping).
+    Records that never started because less than min_record_time_ms
+    remained or the batch deadline (the Lambda timeout minus
+    safety_margin_ms) had passed are re-sent as new messages instead, so a
+    skip doesn't count as one of their attempts. Records already running at
+    the deadline are waited for, so a record is never retried while it is
+    still being processed.
+
+    Records run on a worker pool kept for the life of the execution
+    environment, so warm invocations reuse the same threads and their
+    cached clients.
+
+    Args:
+        event: SQS event
+        context: Lambda context (provides the remaining time)
+        process_record: Callable handling one record; raise to fail it
+        max_workers: Maximum records processed at once
+        min_record_time_ms: Don't start a record with less time than this left
+        safety_margin_ms: Time reserved for returning the response
+        on_batch_end: Called once all records are done (e.g. to flush buffered
+            writes); returns message ids that failed at that stage
+
+    Returns:
+        {'batchItemFailures': [{'itemIdentifier': message_id}, ...]}
+    """
+    records = event.get('Records', [])
+    started = time.time()
+    logger.info(f"📨 Processing SQS batch of {len(records)} record(s) with up to {max_workers} worker(s)")
+
+    deadline_passed = threading.Event()
+
+    def run(record: Dict[str, Any]) -> None:
+        if deadline_passed.is_set():
+            raise _NotStarted("Batch deadline passed before the record started")
+        remaining = _remaining_ms(context)
+        if remaining - safety_margin_ms < min_record_time_ms:
+            raise _NotStarted(f"Not enough time left to start record ({remaining:.0f}ms)")
+        process_record(record)
+
+    executor = _get_executor(max(1, max_workers))
+    futures = {executor.submit(run, record): record for record in records}
+
+    timeout = _remaining_ms(context) - safety_margin_ms
+    _, not_done = wait(futures, timeout=None if timeout == float('inf') else max(0.0, timeout / 1000))
+
+    if not_done:
+        # Queued records are not started any more; running ones are waited
+        # for, since reporting them as failed would process them twice
+        logger.warning(f"⏱️ Batch deadline reached with {len(not_done)} record(s) unfinished")
+        deadline_passed.set()
+        for future in not_done:
+            future.cancel()
+        wait(not_done)
+
+    failures = []
+    not_started = []
+    for future, record in futures.items():
+        message_id = record.get('messageId')
+        error = None if future.cancelled() else future.exception()
+        if future.cancelled() or isinstance(error, _NotStarted):
+            logger.warning(f"⏱️ Record {message_id} was not started before the deadline, re-queueing it")
+            not_started.append(record)
+        elif error is not None:
+            logger.error(f"❌ Record {message_id} failed: {error}")
+            failures.append({'itemIdentifier': message_id})
+
+    requeued = len(not_started)
+    if not_started:
+        # Fall back to a normal retry if the record can't be re-sent
+        for message_id in requeue_records(not_started):
+            failures.append({'itemIdentifier': message_id})
+            requeued -= 1
+
+    if on_batch_end is not None:
+        failed_ids = {failure['itemIdentifier'] for failure in failures}
+        batch_ids = {record.get('messageId') for record in records}
+        for message_id in on_batch_end():
+            # Ids from other batches would fail this whole batch
+            if message_id in batch_ids and message_id not in failed_ids:
+                logger.error(f"❌ Record {message_id} failed to persist its results")
+                failures.append({'itemIdentifier': message_id})
+                failed_ids.add(message_id)
+
+    elapsed = time.time() - started
+    logger.info(
+        f"✅ SQS batch done in {elapsed:.2f}s: {len(records) - len(failures) - requeued} succeeded, "
+        f"{requeued} re-queued, {len(failures)} failed"
+    )
+
+    return {'batchItemFailures': failures}
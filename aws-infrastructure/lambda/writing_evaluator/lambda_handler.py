@@ -8,7 +8,7 @@ import os
 import sys
 import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 
 # Configure logging
 logger = logging.getLogger()
@@ -17,22 +17,6 @@ logger.setLevel(logging.INFO)
 # Add layers to path
 sys.path.insert(0, '/opt/python')
 
-# Import AI services (from Lambda layer)
-try:
-    from lambda_shared.schemas import (
-        WritingEvaluationRequest,
-        WritingEvaluationResponse,
-        WritingFeedback,
-        CriterionFeedback,
-        QuotedExample
-    )
-    from lambda_shared.gemini_client import GeminiClient
-    import boto3
-except ImportError as e:
-    logger.error(f"Import error: {e}")
-    logger.error(f"Python path: {sys.path}")
-    raise
-
 # Import secrets helper (from shared module)
 try:
     sys.path.insert(0, '/opt/python/shared')
@@ -42,6 +26,13 @@ except ImportError as e:
     # Fallback to direct environment variable (legacy support)
     get_gemini_api_key = None
 
+from sqs_batch import is_final_attempt, is_retryable_status, is_sqs_event, parse_sqs_record, process_sqs_batch
+# AWS and Gemini clients are created on first use and reused across warm starts
+from lambda_runtime import get_env_table, get_gemini_client, record_invocation
+from dynamo_writer import EVALUATION_KEY, get_write_buffer, update_status
+from attribute_codec import get_attribute_codec
+from completion_events import CompletionEvent, get_notifier
+
 
 def create_error_response(
     status_code: int,
@@ -91,50 +82,29 @@ def create_error_response(
     }
 
 
-def is_sqs_event(event: Dict[str, Any]) -> bool:
-    """Check if event is from SQS"""
-    return 'Records' in event and len(event['Records']) > 0 and event['Records'][0].get('eventSource') == 'aws:sqs'
-
-
-def parse_sqs_message(event: Dict[str, Any]) -> tuple[Dict[str, Any], Optional[str]]:
-    """Parse SQS message and extract request data and job_id"""
-    record = event['Records'][0]
-    body = json.loads(record['body'])
-    
-    # Get job_id from message attributes (set by API Gateway)
-    job_id = None
-    if 'messageAttributes' in record:
-        attrs = record['messageAttributes']
-        if 'RequestId' in attrs:
-            job_id = attrs['RequestId'].get('stringValue')
-    
-    return body, job_id
-
-
 def update_job_status(evaluation_id: str, user_id: str, status: str, eval_type: str, error_message: str = None):
-    """Update job status in DynamoDB"""
+    """Update job status in DynamoDB (never moves a completed job back)"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(os.environ.get('DYNAMODB_EVALUATIONS'))
-        
-        item = {
-            'evaluation_id': evaluation_id,
-            'user_id': user_id,
+        attributes = {
             'evaluation_type': eval_type,
-            'status': status,
             'started_at': int(time.time())
         }
         
         if error_message:
-            item['error_message'] = error_message
+            attributes['error_message'] = error_message
         
-        table.put_item(Item=item)
-        logger.info(f"📝 Updated job status: {evaluation_id} -> {status}")
+        key = {'evaluation_id': evaluation_id, 'user_id': user_id}
+        if update_status(get_env_table('DYNAMODB_EVALUATIONS'), key, status, attributes):
+            logger.info(f"📝 Updated job status: {evaluation_id} -> {status}")
+            if status == 'failed':
+                get_notifier().publish(CompletionEvent(evaluation_id, user_id, eval_type, status, error_message))
+        else:
+            logger.info(f"⏭️ Job already completed, skipped status update: {evaluation_id} -> {status}")
     except Exception as e:
         logger.error(f"Failed to update job status: {e}")
 
 
-def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+def handle_event(event: Dict[str, Any], context: Any, sqs_record: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Lambda handler for writing evaluation
     
@@ -150,14 +120,14 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     - Expects user_id to be provided in the request payload for auditing
     Requirements: 9.4, 9.5, 9.6
     """
-    # Check if this is an SQS event (async processing)
-    is_async = is_sqs_event(event)
+    # An SQS record means async processing
+    is_async = sqs_record is not None
     job_id = None
     
     try:
         if is_async:
             logger.info("📨 Processing async writing evaluation from SQS")
-            request_data, job_id = parse_sqs_message(event)
+            request_data, job_id = parse_sqs_record(sqs_record)
             # Use job_id as session_id if not provided
             if job_id and not request_data.get('session_id'):
                 request_data['session_id'] = job_id
@@ -188,8 +158,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             logger.error(f"❌ Failed to get Gemini API key: {e}")
             raise ValueError(f"Authentication configuration error: {e}")
         
-        # Initialize Gemini client
-        gemini_client = GeminiClient(api_key=gemini_api_key)
+        # Reuse Gemini client across warm starts
+        gemini_client = get_gemini_client(gemini_api_key)
         
         # Extract user_id from request payload (API key authentication flow)
         user_id = request_data.get('user_id')
@@ -266,32 +236,42 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Save to DynamoDB
         try:
-            dynamodb = boto3.resource('dynamodb')
-            evaluations_table = dynamodb.Table(os.environ.get('DYNAMODB_EVALUATIONS'))
+            # Store evaluation result (batched and flushed before the Lambda returns)
+            item = {
+                'evaluation_id': session_id,
+                'user_id': user_id,
+                'evaluation_type': 'writing',
+                'task_type': task_type,
+                'essay_text': essay_content[:1000],  # Truncate for storage
+                'overall_band': str(result['overall_band']),
+                'task_achievement_band': str(result['task_achievement_band']),
+                'coherence_band': str(result['coherence_band']),
+                'lexical_band': str(result['lexical_band']),
+                'grammar_band': str(result['grammar_band']),
+                'feedback': json.dumps(result['feedback']),
+                'model_used': result['model_used'],
+                'word_count': word_count,
+                'cost': str(result['cost']),
+                'confidence_score': str(result['confidence_score']),
+                'created_at': result['evaluated_at'],
+                'status': 'completed'
+            }
             
-            # Store evaluation result
-            evaluations_table.put_item(
-                Item={
-                    'evaluation_id': session_id,
-                    'user_id': user_id,
-                    'evaluation_type': 'writing',
-                    'task_type': task_type,
-                    'essay_text': essay_content[:1000],  # Truncate for storage
-                    'overall_band': str(result['overall_band']),
-                    'task_achievement_band': str(result['task_achievement_band']),
-                    'coherence_band': str(result['coherence_band']),
-                    'lexical_band': str(result['lexical_band']),
-                    'grammar_band': str(result['grammar_band']),
-                    'feedback': json.dumps(result['feedback']),
-                    'model_used': result['model_used'],
-                    'word_count': word_count,
-                    'cost': str(result['cost']),
-                    'confidence_score': str(result['confidence_score']),
-                    'created_at': result['evaluated_at'],
-                    'status': 'completed'
-                }
+            # Large text is stored compressed (or in S3 near the item size limit)
+            get_write_buffer().put(
+                os.environ.get('DYNAMODB_EVALUATIONS'),
+                get_attribute_codec().encode_item(item, ('feedback',), EVALUATION_KEY),
+                key_names=EVALUATION_KEY,
+                tag=sqs_record.get('messageId') if sqs_record else None
             )
-            logger.info(f"✅ Saved writing evaluation to DynamoDB: {session_id}")
+            logger.info(f"✅ Queued writing evaluation for DynamoDB: {session_id}")
+            
+            # Announced after the write-behind buffer is flushed
+            if is_async:
+                get_notifier().queue(
+                    CompletionEvent(session_id, user_id, 'writing', 'completed'),
+                    tag=sqs_record.get('messageId')
+                )
         except Exception as e:
             logger.error(f"❌ Failed to save to DynamoDB: {e}")
             # Don't fail the request if DynamoDB save fails
@@ -319,7 +299,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         # Update job status for async failures
         if is_async and job_id:
-            update_job_status(job_id, request_data.get('user_id', 'unknown') if 'request_data' in dir() else 'unknown', 'failed', 'writing', error_message)
+            # Only the last attempt marks the job failed; earlier ones leave it
+            # 'processing' since a retry may still succeed
+            if is_final_attempt(sqs_record):
+                update_job_status(job_id, request_data.get('user_id', 'unknown') if 'request_data' in dir() else 'unknown', 'failed', 'writing', error_message)
+            else:
+                logger.warning(f"🔁 Attempt failed, SQS will retry: {job_id}")
             # For SQS, raise exception to trigger retry or DLQ
             raise
         
@@ -399,6 +384,75 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         )
 
 
+def process_sqs_record(record: Dict[str, Any], context: Any) -> None:
+    """
+    Process one SQS record
+    
+    Raises on retryable failures (5xx, throttling) so the record is reported
+    as a batch item failure. Client errors would fail the same way on every
+    retry, so the message is acknowledged and the job marked failed instead.
+    A retryable failure on the last attempt also marks the job failed, then
+    raises so the message moves to the DLQ.
+    """
+    response = handle_event({}, context, sqs_record=record)
+    status_code = response.get('statusCode')
+    if status_code == 200:
+        return
+    retryable = is_retryable_status(status_code)
+    if retryable and not is_final_attempt(record):
+        raise RuntimeError(f"Writing evaluation failed with status {status_code}: {response.get('body')}")
+    
+    if retryable:
+        logger.error(f"❌ Writing evaluation failed on its last attempt with status {status_code}: {response.get('body')}")
+    else:
+        logger.warning(f"⚠️ Writing evaluation rejected with status {status_code}, not retrying: {response.get('body')}")
+    try:
+        request_data, job_id = parse_sqs_record(record)
+    except ValueError:
+        request_data, job_id = {}, None
+    if job_id:
+        update_job_status(job_id, request_data.get('user_id', 'unknown'), 'failed', 'writing', response.get('body'))
+    if retryable:
+        raise RuntimeError(f"Writing evaluation failed with status {status_code}: {response.get('body')}")
+
+
+def flush_results() -> Set[str]:
+    """Write buffered results, then announce the jobs whose results were persisted"""
+    failed_tags = get_write_buffer().flush()
+    get_notifier().publish_pending(failed_tags)
+    return failed_tags
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    Lambda entry point.
+    
+    SQS batches are drained record by record concurrently within the remaining
+    invocation time; only failed records are returned to the queue via
+    batchItemFailures. Everything else is a single sync request.
+    
+    Result items are buffered and written together with BatchWriteItem
+    before returning; records whose results could not be written are
+    reported as failures too. Completion events are published once the
+    results are written, so clients don't need to poll.
+    """
+    record_invocation('writing-evaluator')
+    
+    if is_sqs_event(event):
+        return process_sqs_batch(
+            event,
+            context,
+            lambda record: process_sqs_record(record, context),
+            min_record_time_ms=15000,
+            on_batch_end=flush_results
+        )
+    
+    try:
+        return handle_event(event, context)
+    finally:
+        flush_results()
+
+
 def build_writing_prompt(essay_content: str, task_type: str, prompt: str, word_count: int) -> str:
     """Build evaluation prompt for Gemini"""
     return f"""You are an experienced IELTS examiner. Evaluate the following essay strictly per official IELTS Writing criteria.
@@ -76,6 +76,17 @@ resource "aws_iam_role_policy" "lambda_secrets" {
         Resource = [
           aws_secretsmanager_secret.gemini_api_key.arn
         ]
+      },
+      {
+        # Cold-start prefetch; GetSecretValue above still applies to each
+        # secret. If the batch call is denied, secrets are fetched one by one
+        Effect = "Allow"
+        Action = [
+          "secretsmanager:BatchGetSecretValue"
+        ]
+        Resource = [
+          aws_secretsmanager_secret.gemini_api_key.arn
+        ]
       }
     ]
   })
@@ -117,6 +128,7 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
@@ -181,7 +193,11 @@ resource "aws_iam_role_policy" "lambda_sqs" {
         Action = [
           "sqs:SendMessage"
         ]
+        # Main queues: records skipped at the batch deadline are re-sent
         Resource = [
+          aws_sqs_queue.writing_evaluation.arn,
+          aws_sqs_queue.speaking_evaluation.arn,
+          aws_sqs_queue.flashcard_generation.arn,
           aws_sqs_queue.writing_evaluation_dlq.arn,
           aws_sqs_queue.speaking_evaluation_dlq.arn,
           aws_sqs_queue.flashcard_generation_dlq.arn
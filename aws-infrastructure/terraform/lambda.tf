@@ -61,6 +61,8 @@ resource "aws_lambda_function" "rag_flashcard" {
       GEMINI_MODEL              = "gemini-2.0-flash"
       DOCUMENTS_BUCKET          = aws_s3_bucket.documents.id
       DYNAMODB_EVALUATIONS      = aws_dynamodb_table.evaluations.name
+      ATTRIBUTE_OFFLOAD_BUCKET  = aws_s3_bucket.results.id
+      COMPLETION_TOPIC_ARN      = aws_sns_topic.evaluation_completed.arn
       ENVIRONMENT               = var.environment
     }
   }
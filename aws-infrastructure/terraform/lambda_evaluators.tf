@@ -26,6 +26,8 @@ resource "aws_lambda_function" "writing_evaluator" {
     variables = {
       GEMINI_API_KEY_SECRET_ARN = aws_secretsmanager_secret.gemini_api_key.arn
       DYNAMODB_EVALUATIONS      = aws_dynamodb_table.evaluations.name
+      ATTRIBUTE_OFFLOAD_BUCKET  = aws_s3_bucket.results.id
+      COMPLETION_TOPIC_ARN      = aws_sns_topic.evaluation_completed.arn
       ENVIRONMENT               = var.environment
     }
   }
@@ -69,6 +71,8 @@ resource "aws_lambda_function" "speaking_evaluator" {
     variables = {
       GEMINI_API_KEY_SECRET_ARN = aws_secretsmanager_secret.gemini_api_key.arn
       DYNAMODB_EVALUATIONS      = aws_dynamodb_table.evaluations.name
+      ATTRIBUTE_OFFLOAD_BUCKET  = aws_s3_bucket.results.id
+      COMPLETION_TOPIC_ARN      = aws_sns_topic.evaluation_completed.arn
       AUDIO_BUCKET              = aws_s3_bucket.audio.id
       ENVIRONMENT               = var.environment
     }
@@ -99,15 +103,21 @@ resource "aws_lambda_function" "evaluation_status" {
   role             = aws_iam_role.lambda_execution.arn
   handler          = "lambda_handler.lambda_handler"
   runtime          = "python3.11"
-  timeout          = 10
+  timeout          = 30   # Long polls wait up to 20s (API Gateway limit is 29s)
   memory_size      = 256
   
   source_code_hash = fileexists("${path.module}/../lambda/build/evaluation-status.zip") ? filebase64sha256("${path.module}/../lambda/build/evaluation-status.zip") : null
   
+  # Shared layer provides the attribute codec for compressed results
+  layers = [
+    aws_lambda_layer_version.shared_layer.arn
+  ]
+  
   environment {
     variables = {
-      DYNAMODB_EVALUATIONS = aws_dynamodb_table.evaluations.name
-      ENVIRONMENT          = var.environment
+      DYNAMODB_EVALUATIONS       = aws_dynamodb_table.evaluations.name
+      LONG_POLL_MAX_WAIT_SECONDS = "20"
+      ENVIRONMENT                = var.environment
     }
   }
   
@@ -168,6 +168,11 @@ output "flashcard_generate_async_endpoint" {
 }
 
 output "evaluation_status_endpoint" {
-  description = "Evaluation status endpoint (poll for results)"
+  description = "Evaluation status endpoint (poll for results; ?wait=N to long poll)"
   value       = "${aws_api_gateway_stage.main.invoke_url}/evaluations/{evaluation_id}/status"
 }
+
+output "evaluation_completed_topic_arn" {
+  description = "SNS topic receiving evaluation completion events"
+  value       = aws_sns_topic.evaluation_completed.arn
+}
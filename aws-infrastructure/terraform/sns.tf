@@ -0,0 +1,34 @@
+# SNS Topic for Evaluation Completion Events
+# Evaluators publish when an async job completes or fails, so clients don't
+# have to poll the status endpoint (subscribe a WebSocket fan-out, webhook
+# or queue here)
+
+resource "aws_sns_topic" "evaluation_completed" {
+  name = "${local.name_prefix}-evaluation-completed"
+
+  tags = merge(local.common_tags, {
+    Name    = "${local.name_prefix}-evaluation-completed"
+    Feature = "status"
+  })
+}
+
+# Publish access for the evaluator Lambdas
+resource "aws_iam_role_policy" "lambda_sns" {
+  name = "${local.name_prefix}-lambda-sns"
+  role = aws_iam_role.lambda_execution.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "sns:Publish"
+        ]
+        Resource = [
+          aws_sns_topic.evaluation_completed.arn
+        ]
+      }
+    ]
+  })
+}
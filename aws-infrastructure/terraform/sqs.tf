@@ -113,8 +113,9 @@ resource "aws_sqs_queue" "flashcard_generation_dlq" {
 resource "aws_lambda_event_source_mapping" "writing_sqs" {
   event_source_arn                   = aws_sqs_queue.writing_evaluation.arn
   function_name                      = aws_lambda_function.writing_evaluator.arn
-  batch_size                         = 1  # Process one at a time for AI calls
-  maximum_batching_window_in_seconds = 0  # No batching delay
+  batch_size                         = 10  # Records are evaluated concurrently in one invocation
+  maximum_batching_window_in_seconds = 0   # No batching delay
+  function_response_types            = ["ReportBatchItemFailures"]  # Only failed records are retried
 
   scaling_config {
     maximum_concurrency = 5  # Limit concurrent executions
@@ -124,8 +125,9 @@ resource "aws_lambda_event_source_mapping" "writing_sqs" {
 resource "aws_lambda_event_source_mapping" "speaking_sqs" {
   event_source_arn                   = aws_sqs_queue.speaking_evaluation.arn
   function_name                      = aws_lambda_function.speaking_evaluator.arn
-  batch_size                         = 1
+  batch_size                         = 10
   maximum_batching_window_in_seconds = 0
+  function_response_types            = ["ReportBatchItemFailures"]
 
   scaling_config {
     maximum_concurrency = 5
@@ -135,8 +137,9 @@ resource "aws_lambda_event_source_mapping" "speaking_sqs" {
 resource "aws_lambda_event_source_mapping" "flashcard_sqs" {
   event_source_arn                   = aws_sqs_queue.flashcard_generation.arn
   function_name                      = aws_lambda_function.rag_flashcard.arn
-  batch_size                         = 1
+  batch_size                         = 3  # Processed sequentially; must fit in the 300s timeout
   maximum_batching_window_in_seconds = 0
+  function_response_types            = ["ReportBatchItemFailures"]
 
   scaling_config {
     maximum_concurrency = 3  # Lower for heavy PDF processing
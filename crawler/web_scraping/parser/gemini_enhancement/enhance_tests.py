@@ -42,6 +42,7 @@ from gemini_enhancement.exceptions import (
     ConfigurationError
 )
 from gemini_enhancement.logging_config import get_logger, setup_batch_logging
+from output_sink import write_json_file
 
 logger = get_logger(__name__)
 
@@ -401,9 +402,7 @@ def enhance_batch(
         # Save report if requested
         if report_file:
             report_path = Path(report_file)
-            report_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2)
+            write_json_file(report_path, summary)
             print(f"\n📄 Report saved to: {report_path}")
         
         return True
@@ -489,9 +488,7 @@ def resume_batch(
         # Save report if requested
         if report_file:
             report_path = Path(report_file)
-            report_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2)
+            write_json_file(report_path, summary)
             print(f"\n📄 Report saved to: {report_path}")
         
         return True
@@ -46,6 +46,11 @@ from .logging_config import (
     log_batch_summary
 )
 
+try:
+    from ..output_sink import write_json_file
+except ImportError:
+    from output_sink import write_json_file
+
 logger = get_logger(__name__)
 
 
@@ -164,16 +169,25 @@ class GeminiEnhancer(IEnhancer):
                     
                     # Acquire rate limit permission
                     logger.debug(f"Acquiring rate limit permission for {estimated_tokens} tokens")
-                    self.rate_limiter.acquire(estimated_tokens)
+                    reservation = self.rate_limiter.acquire(estimated_tokens)
                     
                     # Log API request
                     log_api_request(logger, test_number, test_type, len(prompt), estimated_tokens)
                     
                     # Call Gemini API
                     api_start = time.time()
-                    response = self.gemini_client.generate_content(prompt)
+                    try:
+                        response = self.gemini_client.generate_content(prompt)
+                    except Exception:
+                        # Failed calls don't consume the estimated tokens
+                        self.rate_limiter.cancel(reservation)
+                        raise
                     api_duration = time.time() - api_start
                     
+                    # Record actual token usage (estimate for now)
+                    actual_tokens = estimated_tokens
+                    self.rate_limiter.record_request(actual_tokens, reservation)
+                    
                     # Log API response
                     log_api_response(logger, test_number, test_type, len(response), api_duration, success=True)
                     
@@ -185,10 +199,6 @@ class GeminiEnhancer(IEnhancer):
                         extra={'test_number': test_number, 'test_type': test_type}
                     )
                     
-                    # Record actual token usage (estimate for now)
-                    actual_tokens = estimated_tokens
-                    self.rate_limiter.record_request(actual_tokens)
-                    
                     # Merge enhanced data with original
                     enhanced_data = self._merge_enhanced_data(
                         original_data, 
@@ -384,11 +394,9 @@ class GeminiEnhancer(IEnhancer):
             raise ProcessingError(f"Failed to load test data: {e}")
     
     def _save_enhanced_data(self, data: Dict[str, Any], output_path: Path) -> None:
-        """Save enhanced data to JSON file."""
+        """Save enhanced data to JSON file (written atomically)."""
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json_file(output_path, data)
         except Exception as e:
             raise ProcessingError(f"Failed to save enhanced data: {e}")
     
@@ -726,9 +734,7 @@ class GeminiEnhancer(IEnhancer):
     def _save_progress(self, progress: BatchProgress, progress_file: Path) -> None:
         """Save batch progress to file."""
         try:
-            progress_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress.to_dict(), f, indent=2)
+            write_json_file(progress_file, progress.to_dict())
         except Exception as e:
             logger.error(f"Failed to save progress: {e}")
     
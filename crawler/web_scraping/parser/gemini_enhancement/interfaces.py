@@ -247,7 +247,7 @@ class IRateLimiter(ABC):
     """
     
     @abstractmethod
-    def acquire(self, estimated_tokens: int = 0) -> None:
+    def acquire(self, estimated_tokens: int = 0) -> Any:
         """
         Acquire permission to make an API request.
         
@@ -256,18 +256,32 @@ class IRateLimiter(ABC):
         Args:
             estimated_tokens: Estimated tokens for the request
             
+        Returns:
+            Reservation handle to pass to record_request() or cancel()
+            
         Raises:
             RateLimitError: If rate limits cannot be satisfied
         """
         pass
     
     @abstractmethod
-    def record_request(self, tokens_used: int) -> None:
+    def record_request(self, tokens_used: int, reservation: Any = None) -> None:
         """
         Record a completed API request.
         
         Args:
             tokens_used: Actual tokens used by the request
+            reservation: Handle returned by acquire() for the request
+        """
+        pass
+    
+    @abstractmethod
+    def cancel(self, reservation: Any) -> None:
+        """
+        Give back a reservation whose request failed.
+        
+        Args:
+            reservation: Handle returned by acquire()
         """
         pass
     
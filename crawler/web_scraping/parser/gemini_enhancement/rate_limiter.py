@@ -6,13 +6,23 @@ This module implements rate limiting to ensure compliance with Gemini API quotas
 - 250,000 tokens per minute (TPM)
 - 1,000 requests per day
 
-The rate limiter uses a sliding window approach with blocking logic to prevent
-exceeding limits and implements automatic counter resets.
+Requests and tokens per minute are each limited by a token bucket that holds
+one minute's quota and refills continuously, so there are no window edges
+where two minutes' quota can be spent back to back. acquire() reserves the
+caller's request and tokens under a short lock and then sleeps outside it:
+concurrent callers are given consecutive slots instead of freezing each
+other, and record_request() can update the buckets while others wait.
+
+acquire() returns a Reservation for the request. Pass it to record_request()
+once the request has been sent, or to cancel() if it failed, so each
+estimate is settled against the request it was made for.
 """
 
+import asyncio
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from threading import Lock
 
 from .models import RateLimitStats
@@ -23,6 +33,85 @@ from .logging_config import get_logger
 logger = get_logger(__name__)
 
 
+class TokenBucket:
+    """
+    Token bucket that hands out reservations.
+    
+    Holds at most `capacity` tokens and refills at `rate` tokens per second.
+    reserve() takes the tokens at once, letting the bucket go into debt, and
+    returns how long the caller must wait before spending them. Later callers
+    see the debt and are scheduled after earlier ones, so reservations never
+    overdraw the quota however many callers there are.
+    """
+    
+    def __init__(self, capacity: float, rate: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            capacity: Maximum tokens held
+            rate: Tokens added per second
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+    
+    def available(self, now: float) -> float:
+        """
+        Tokens in the bucket at a monotonic time (negative while in debt).
+        
+        Args:
+            now: time.monotonic() value
+        
+        Returns:
+            Available tokens
+        """
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        return self.tokens
+    
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take tokens and return the wait before they may be used.
+        
+        Args:
+            amount: Tokens to take
+            now: time.monotonic() value
+        
+        Returns:
+            Seconds until the bucket has refilled enough to cover the reservation
+        """
+        available = self.available(now)
+        wait_time = max(0.0, (amount - available) / self.rate)
+        self.tokens -= amount
+        return wait_time
+    
+    def adjust(self, amount: float, now: float) -> None:
+        """
+        Take (or with a negative amount, give back) tokens without waiting.
+        
+        Args:
+            amount: Tokens to take
+            now: time.monotonic() value
+        """
+        self.tokens = min(self.capacity, self.available(now) - amount)
+
+
+@dataclass
+class Reservation:
+    """
+    A request slot handed out by RateLimiter.acquire().
+    
+    Attributes:
+        estimated_tokens: Tokens taken from the per-minute quota for the request
+        settled: Whether record_request() or cancel() has been called for it
+    """
+    estimated_tokens: int
+    settled: bool = False
+
+
 class RateLimiter:
     """
     Rate limiter for Gemini API requests.
@@ -31,6 +120,12 @@ class RateLimiter:
     API quota compliance. Tracks requests per minute, tokens per minute,
     and daily request counts.
     
+    Each acquire() reserves one request, its estimated tokens and a start
+    time at least `min_delay` after the previous reservation; the daily
+    quota counts reservations. record_request() charges or refunds the
+    difference between the actual and the estimated tokens of a
+    reservation, and cancel() gives its estimated tokens back.
+    
     Attributes:
         rpm_limit: Maximum requests per minute
         tpm_limit: Maximum tokens per minute
@@ -59,14 +154,18 @@ class RateLimiter:
         self.daily_limit = daily_limit
         self.min_delay = min_delay
         
-        # Current usage counters
-        self.current_rpm = 0
-        self.current_tpm = 0
+        # Per-minute quotas
+        self._rpm_bucket = TokenBucket(rpm_limit, rpm_limit / 60.0)
+        self._tpm_bucket = TokenBucket(tpm_limit, tpm_limit / 60.0)
+        
+        # Earliest monotonic start time for the next reservation (min_delay)
+        self._next_start = 0.0
+        
+        # Daily usage
         self.current_daily = 0
         
         # Time tracking
         self.last_request_time: Optional[datetime] = None
-        self.minute_window_start: Optional[datetime] = None
         self.day_start: Optional[datetime] = None
         
         # Thread safety
@@ -82,105 +181,131 @@ class RateLimiter:
             f"Daily={daily_limit}, MinDelay={min_delay}s"
         )
     
-    def acquire(self, estimated_tokens: int = 0) -> None:
+    @property
+    def current_rpm(self) -> int:
+        """Requests counted against the per-minute quota."""
+        with self._lock:
+            return self._usage(time.monotonic())[0]
+    
+    @property
+    def current_tpm(self) -> int:
+        """Tokens counted against the per-minute quota."""
+        with self._lock:
+            return self._usage(time.monotonic())[1]
+    
+    def acquire(self, estimated_tokens: int = 0) -> Reservation:
         """
         Acquire permission to make an API request.
         
-        This method blocks if necessary to ensure rate limits are not exceeded.
-        It checks:
+        Reserves a slot that satisfies:
         1. Daily quota
         2. Requests per minute limit
         3. Tokens per minute limit
         4. Minimum delay between requests
+        and blocks until it starts. Other threads can reserve their own
+        slots meanwhile.
         
         Args:
             estimated_tokens: Estimated tokens for the request (default: 0)
         
+        Returns:
+            Reservation to pass to record_request() or cancel()
+        
         Raises:
             QuotaExceededError: If daily quota is exhausted
-            RateLimitError: If rate limits cannot be satisfied
         """
-        with self._lock:
-            now = datetime.now()
-            
-            # Initialize time windows if first request
-            if self.minute_window_start is None:
-                self.minute_window_start = now
-            if self.day_start is None:
-                self.day_start = now
-            
-            # Reset counters if windows have expired
-            self._reset_counters_if_needed(now)
-            
-            # Check daily quota
-            if self.current_daily >= self.daily_limit:
-                raise QuotaExceededError(
-                    f"Daily quota of {self.daily_limit} requests exceeded",
-                    context={
-                        "current_daily": self.current_daily,
-                        "daily_limit": self.daily_limit
-                    }
-                )
-            
-            # Calculate wait time for RPM limit
-            rpm_wait = self._calculate_rpm_wait(now)
-            
-            # Calculate wait time for TPM limit
-            tpm_wait = self._calculate_tpm_wait(estimated_tokens, now)
-            
-            # Calculate wait time for minimum delay
-            min_delay_wait = self._calculate_min_delay_wait(now)
-            
-            # Take the maximum wait time
-            total_wait = max(rpm_wait, tpm_wait, min_delay_wait)
-            
-            if total_wait > 0:
-                logger.info(
-                    f"Rate limit: waiting {total_wait:.2f}s "
-                    f"(RPM: {rpm_wait:.2f}s, TPM: {tpm_wait:.2f}s, "
-                    f"MinDelay: {min_delay_wait:.2f}s)"
-                )
-                time.sleep(total_wait)
-                
-                # Recalculate current time after waiting
-                now = datetime.now()
-                self._reset_counters_if_needed(now)
-            
-            # Log warnings if approaching limits
-            self._log_limit_warnings()
-            
-            # Update last request time
-            self.last_request_time = now
+        reservation, wait_time = self._reserve(estimated_tokens)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return reservation
     
-    def record_request(self, tokens_used: int) -> None:
+    async def acquire_async(self, estimated_tokens: int = 0) -> Reservation:
+        """
+        Acquire permission to make an API request from a coroutine.
+        
+        Same as acquire(), but waits with asyncio.sleep so the event loop
+        keeps running other tasks. If the task is cancelled while waiting,
+        the reservation is given back in full.
+        
+        Args:
+            estimated_tokens: Estimated tokens for the request (default: 0)
+        
+        Returns:
+            Reservation to pass to record_request() or cancel()
+        
+        Raises:
+            QuotaExceededError: If daily quota is exhausted
+        """
+        reservation, wait_time = self._reserve(estimated_tokens)
+        if wait_time > 0:
+            try:
+                await asyncio.sleep(wait_time)
+            except asyncio.CancelledError:
+                self.cancel(reservation, request_sent=False)
+                raise
+        return reservation
+    
+    def record_request(self, tokens_used: int, reservation: Optional[Reservation] = None) -> None:
         """
         Record a completed API request.
         
-        Updates usage counters for RPM, TPM, and daily quotas.
+        Charges the difference between the tokens used and the reservation's
+        estimate. Without a reservation the request's tokens are charged in
+        full. A reservation that was already settled is ignored.
         
         Args:
             tokens_used: Number of tokens used in the request
+            reservation: Reservation returned by acquire() for the request
         """
         with self._lock:
-            now = datetime.now()
-            
-            # Reset counters if needed
-            self._reset_counters_if_needed(now)
-            
-            # Increment counters
-            self.current_rpm += 1
-            self.current_tpm += tokens_used
-            self.current_daily += 1
+            if reservation is not None and reservation.settled:
+                logger.warning("Ignoring record_request() for a reservation that was already settled")
+                return
+            now = time.monotonic()
+            estimated_tokens = 0
+            if reservation is not None:
+                estimated_tokens = reservation.estimated_tokens
+                reservation.settled = True
+            self._tpm_bucket.adjust(tokens_used - estimated_tokens, now)
             
+            current_rpm, current_tpm = self._usage(now)
             logger.debug(
-                f"Request recorded: RPM={self.current_rpm}/{self.rpm_limit}, "
-                f"TPM={self.current_tpm}/{self.tpm_limit}, "
+                f"Request recorded: RPM={current_rpm}/{self.rpm_limit}, "
+                f"TPM={current_tpm}/{self.tpm_limit}, "
                 f"Daily={self.current_daily}/{self.daily_limit}, "
-                f"Tokens={tokens_used}"
+                f"Tokens={tokens_used} (estimated {estimated_tokens})"
             )
             
             # Log warnings if approaching limits
-            self._log_limit_warnings()
+            self._log_limit_warnings(now)
+    
+    def cancel(self, reservation: Reservation, request_sent: bool = True) -> None:
+        """
+        Give back a reservation whose request failed.
+        
+        The estimated tokens are refunded. The request itself still counts
+        against the per-minute and daily quotas unless it was never sent,
+        since the API may have counted it. A reservation that was already
+        settled is ignored.
+        
+        Args:
+            reservation: Reservation returned by acquire()
+            request_sent: Whether the request reached the API (default: True)
+        """
+        with self._lock:
+            if reservation.settled:
+                return
+            reservation.settled = True
+            now = time.monotonic()
+            self._tpm_bucket.adjust(-reservation.estimated_tokens, now)
+            if not request_sent:
+                self._rpm_bucket.adjust(-1, now)
+                self.current_daily = max(0, self.current_daily - 1)
+            
+            logger.debug(
+                f"Reservation cancelled: refunded {reservation.estimated_tokens} tokens"
+                + ("" if request_sent else " and the request")
+            )
     
     def get_stats(self) -> RateLimitStats:
         """
@@ -190,18 +315,17 @@ class RateLimiter:
             RateLimitStats object with current usage information
         """
         with self._lock:
-            now = datetime.now()
-            self._reset_counters_if_needed(now)
+            self._reset_daily_if_needed(datetime.now())
+            current_rpm, current_tpm = self._usage(time.monotonic())
             
             return RateLimitStats(
                 requests_per_minute=self.rpm_limit,
                 tokens_per_minute=self.tpm_limit,
                 requests_per_day=self.daily_limit,
-                current_rpm=self.current_rpm,
-                current_tpm=self.current_tpm,
+                current_rpm=current_rpm,
+                current_tpm=current_tpm,
                 current_daily=self.current_daily,
                 last_request_time=self.last_request_time,
-                minute_window_start=self.minute_window_start,
                 day_start=self.day_start
             )
     
@@ -212,111 +336,125 @@ class RateLimiter:
         This is useful for testing or when starting a new processing session.
         """
         with self._lock:
-            self.current_rpm = 0
-            self.current_tpm = 0
+            self._rpm_bucket = TokenBucket(self.rpm_limit, self.rpm_limit / 60.0)
+            self._tpm_bucket = TokenBucket(self.tpm_limit, self.tpm_limit / 60.0)
+            self._next_start = 0.0
             self.current_daily = 0
             self.last_request_time = None
-            self.minute_window_start = None
             self.day_start = None
             
             logger.info("Rate limit counters manually reset")
     
-    def _reset_counters_if_needed(self, now: datetime) -> None:
+    def _reserve(self, estimated_tokens: int) -> Tuple[Reservation, float]:
         """
-        Reset counters if time windows have expired.
+        Reserve the next request slot.
         
         Args:
-            now: Current datetime
+            estimated_tokens: Estimated tokens for the request
+        
+        Returns:
+            Tuple of (reservation, seconds the caller must wait before sending the request)
+        
+        Raises:
+            QuotaExceededError: If daily quota is exhausted
         """
-        # Reset minute window if 60 seconds have passed
-        if self.minute_window_start:
-            elapsed_seconds = (now - self.minute_window_start).total_seconds()
-            if elapsed_seconds >= 60:
-                logger.debug(
-                    f"Resetting minute window: RPM was {self.current_rpm}, "
-                    f"TPM was {self.current_tpm}"
+        with self._lock:
+            now = time.monotonic()
+            wall_now = datetime.now()
+            
+            if self.day_start is None:
+                self.day_start = wall_now
+            self._reset_daily_if_needed(wall_now)
+            
+            # Check daily quota
+            if self.current_daily >= self.daily_limit:
+                raise QuotaExceededError(
+                    f"Daily quota of {self.daily_limit} requests exceeded",
+                    context={
+                        "current_daily": self.current_daily,
+                        "daily_limit": self.daily_limit
+                    }
                 )
-                self.current_rpm = 0
-                self.current_tpm = 0
-                self.minute_window_start = now
-        
-        # Reset daily counter if 24 hours have passed
-        if self.day_start:
-            elapsed_hours = (now - self.day_start).total_seconds() / 3600
-            if elapsed_hours >= 24:
+            
+            # A request larger than the whole quota waits for a full bucket, no longer
+            tokens = min(max(0, estimated_tokens), self.tpm_limit)
+            
+            rpm_wait = self._rpm_bucket.reserve(1, now)
+            tpm_wait = self._tpm_bucket.reserve(tokens, now)
+            min_delay_wait = max(0.0, self._next_start - now)
+            total_wait = max(rpm_wait, tpm_wait, min_delay_wait)
+            
+            self._next_start = now + total_wait + self.min_delay
+            self.current_daily += 1
+            self.last_request_time = wall_now + timedelta(seconds=total_wait)
+            
+            if total_wait > 0:
                 logger.info(
-                    f"Resetting daily counter: was {self.current_daily} requests"
+                    f"Rate limit: waiting {total_wait:.2f}s "
+                    f"(RPM: {rpm_wait:.2f}s, TPM: {tpm_wait:.2f}s, "
+                    f"MinDelay: {min_delay_wait:.2f}s)"
                 )
-                self.current_daily = 0
-                self.day_start = now
+            
+            # Log warnings if approaching limits
+            self._log_limit_warnings(now)
+            
+            return Reservation(tokens), total_wait
     
-    def _calculate_rpm_wait(self, now: datetime) -> float:
+    def _usage(self, now: float) -> Tuple[int, int]:
         """
-        Calculate wait time needed for RPM limit.
+        Requests and tokens counted against the per-minute quotas.
+        
+        Includes reservations that haven't started yet, so it can exceed the
+        limits while callers are waiting. Must be called with the lock held.
         
         Args:
-            now: Current datetime
+            now: time.monotonic() value
         
         Returns:
-            Wait time in seconds
+            Tuple of (requests, tokens)
         """
-        if self.current_rpm >= self.rpm_limit:
-            # Need to wait until minute window resets
-            if self.minute_window_start:
-                elapsed = (now - self.minute_window_start).total_seconds()
-                wait_time = max(0, 60 - elapsed)
-                return wait_time
-        return 0.0
+        return (
+            round(self.rpm_limit - self._rpm_bucket.available(now)),
+            round(self.tpm_limit - self._tpm_bucket.available(now))
+        )
     
-    def _calculate_tpm_wait(self, estimated_tokens: int, now: datetime) -> float:
+    def _reset_daily_if_needed(self, now: datetime) -> None:
         """
-        Calculate wait time needed for TPM limit.
+        Reset the daily counter if 24 hours have passed.
         
         Args:
-            estimated_tokens: Estimated tokens for next request
             now: Current datetime
-        
-        Returns:
-            Wait time in seconds
         """
-        if self.current_tpm + estimated_tokens > self.tpm_limit:
-            # Need to wait until minute window resets
-            if self.minute_window_start:
-                elapsed = (now - self.minute_window_start).total_seconds()
-                wait_time = max(0, 60 - elapsed)
-                return wait_time
-        return 0.0
+        if self.day_start:
+            elapsed_hours = (now - self.day_start).total_seconds() / 3600
+            if elapsed_hours >= 24:
+                logger.info(
+                    f"Resetting daily counter: was {self.current_daily} requests"
+                )
+                self.current_daily = 0
+                self.day_start = now
     
-    def _calculate_min_delay_wait(self, now: datetime) -> float:
+    def _log_limit_warnings(self, now: float) -> None:
         """
-        Calculate wait time needed for minimum delay between requests.
+        Log warnings when approaching rate limits.
         
         Args:
-            now: Current datetime
-        
-        Returns:
-            Wait time in seconds
+            now: time.monotonic() value
         """
-        if self.last_request_time:
-            elapsed = (now - self.last_request_time).total_seconds()
-            wait_time = max(0, self.min_delay - elapsed)
-            return wait_time
-        return 0.0
-    
-    def _log_limit_warnings(self) -> None:
-        """Log warnings when approaching rate limits."""
+        current_rpm, current_tpm = self._usage(now)
+        
         # RPM warning
-        if self.current_rpm >= self.rpm_warning_threshold:
+        if current_rpm >= self.rpm_warning_threshold:
             logger.warning(
-                f"Approaching RPM limit: {self.current_rpm}/{self.rpm_limit} "
-                f"({self.current_rpm / self.rpm_limit * 100:.1f}%)"
+                f"Approaching RPM limit: {current_rpm}/{self.rpm_limit} "
+                f"({current_rpm / self.rpm_limit * 100:.1f}%)"
             )
         
         # TPM warning
-        if self.current_tpm >= self.tpm_warning_threshold:
+        if current_tpm >= self.tpm_warning_threshold:
             logger.warning(
-                f"Approaching TPM limit: {self.current_tpm}/{self.tpm_limit} "
-                f"({self.current_tpm / self.tpm_limit * 100:.1f}%)"
+                f"Approaching TPM limit: {current_tpm}/{self.tpm_limit} "
+                f"({current_tpm / self.tpm_limit * 100:.1f}%)"
             )
         
         # Daily warning
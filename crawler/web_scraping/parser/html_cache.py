@@ -0,0 +1,228 @@
+"""
+HTML Cache Module
+
+Content-addressed on-disk store for raw downloaded pages, so tests can be
+reparsed after an extractor fix without downloading them again, and pages
+that haven't changed can be revalidated with conditional GETs.
+
+Layout:
+    <cache_dir>/objects/ab/ab12...ef.html.gz   gzip-compressed page, named by its SHA-256
+    <cache_dir>/index.jsonl                    URL index, one JSON line per fetch (last line wins)
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default cache location, next to web_scraping/parsed
+DEFAULT_CACHE_DIR = "web_scraping/html_cache"
+
+
+@dataclass
+class CacheEntry:
+    """Index entry for a cached URL"""
+    url: str
+    sha256: str
+    size: int
+    fetched_at: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class HTMLCache:
+    """
+    Raw HTML store with a URL index
+    
+    Identical pages are stored once. The index is append-only: put() and
+    touch() add a line, and the index is compacted to one line per URL when
+    it is loaded with more than `compact_ratio` lines per URL.
+    
+    Thread-safe, so the crawler's download threads can share one instance.
+    
+    Usage:
+        cache = HTMLCache("web_scraping/html_cache")
+        cache.put(url, html, etag=response.headers.get('ETag'))
+        html = cache.get(url)
+    """
+    
+    INDEX_FILE = 'index.jsonl'
+    OBJECTS_DIR = 'objects'
+    
+    def __init__(self, cache_dir: str, compress_level: int = 6, compact_ratio: int = 2):
+        """
+        Initialize cache
+        
+        Args:
+            cache_dir: Cache directory (created if missing)
+            compress_level: gzip level for stored pages
+            compact_ratio: Compact the index when it has more lines than this many per URL
+        """
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / self.OBJECTS_DIR
+        self.index_file = self.cache_dir / self.INDEX_FILE
+        self.compress_level = compress_level
+        
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._index = None
+        
+        index_lines, bad_lines = self._load_index()
+        if bad_lines or index_lines > compact_ratio * max(1, len(self._entries)):
+            self.compact()
+        
+        logger.info(f"HTML cache: {len(self._entries)} pages in {self.cache_dir}")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+    
+    def _load_index(self) -> Tuple[int, int]:
+        """
+        Read the URL index
+        
+        Returns:
+            Tuple of (index lines read, unreadable lines such as a torn last write)
+        """
+        if not self.index_file.exists():
+            return 0, 0
+        
+        lines = 0
+        bad_lines = 0
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                lines += 1
+                try:
+                    entry = CacheEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    logger.warning(f"Skipping bad HTML cache index line {lines}")
+                    bad_lines += 1
+                    continue
+                self._entries[entry.url] = entry
+        
+        return lines, bad_lines
+    
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.html.gz"
+    
+    def _append_index(self, entry: CacheEntry) -> None:
+        """Append an index line (caller holds the lock)"""
+        if self._index is None:
+            self._index = open(self.index_file, 'a', encoding='utf-8')
+        self._index.write(json.dumps(asdict(entry)) + '\n')
+        self._index.flush()
+    
+    def get_entry(self, url: str) -> Optional[CacheEntry]:
+        """Get the index entry for a URL"""
+        return self._entries.get(url)
+    
+    def get(self, url: str) -> Optional[str]:
+        """
+        Get a cached page
+        
+        Returns:
+            HTML content, or None if the URL isn't cached or its file is missing or corrupt
+        """
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        
+        try:
+            with gzip.open(self._object_path(entry.sha256), 'rb') as f:
+                return f.read().decode('utf-8')
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning(f"Cached page for {url} is unreadable: {e}")
+            return None
+    
+    def put(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        """
+        Store a downloaded page
+        
+        Args:
+            url: Page URL
+            html: Page content
+            etag: ETag response header, for If-None-Match revalidation
+            last_modified: Last-Modified response header, for If-Modified-Since revalidation
+        
+        Returns:
+            The new index entry
+        """
+        data = html.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha256)
+        
+        # Content-addressed: an existing file already has these bytes
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp_path, 'wb', compresslevel=self.compress_level) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        
+        entry = CacheEntry(
+            url=url,
+            sha256=sha256,
+            size=len(data),
+            fetched_at=datetime.now().isoformat(),
+            etag=etag,
+            last_modified=last_modified
+        )
+        with self._lock:
+            self._entries[url] = entry
+            self._append_index(entry)
+        
+        return entry
+    
+    def touch(self, url: str) -> None:
+        """Record that a cached page was revalidated (304 Not Modified)"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return
+            entry = CacheEntry(**{**asdict(entry), 'fetched_at': datetime.now().isoformat()})
+            self._entries[url] = entry
+            self._append_index(entry)
+    
+    def urls(self) -> List[str]:
+        """All cached URLs"""
+        return list(self._entries)
+    
+    def compact(self) -> None:
+        """Rewrite the index with one line per URL"""
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+            
+            tmp_file = self.index_file.with_name(self.index_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(asdict(entry)) + '\n')
+            os.replace(tmp_file, self.index_file)
+        
+        logger.debug(f"Compacted HTML cache index ({len(self._entries)} entries)")
+    
+    def close(self) -> None:
+        """Close the index file"""
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
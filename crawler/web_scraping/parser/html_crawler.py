@@ -6,31 +6,71 @@ This module provides a robust HTML crawler with rate limiting, error handling,
 retry logic, and progress tracking capabilities.
 """
 
+import heapq
 import json
 import logging
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+try:
+    from .html_cache import HTMLCache
+except ImportError:
+    from html_cache import HTMLCache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
 class CrawlProgress:
-    """Tracks crawling progress for resume capability"""
+    """
+    Tracks crawling progress for resume capability
+    
+    Each mark_*() call appends one JSON line to a journal next to the
+    progress file (<progress_file>.journal). The journal is only fsynced
+    every `fsync_every` records or `fsync_interval` seconds. Every
+    `compact_every` records, and on save(), the state is written to the
+    progress file as a snapshot (to a temp file that then replaces it) and
+    the journal is removed.
+    
+    load() reads the snapshot and replays the journal records written after
+    it. A torn last line from a crash is ignored, so a crash can lose at
+    most the unsynced tail but never corrupts the progress file.
+    """
     
-    def __init__(self, progress_file: Path):
+    JOURNAL_SUFFIX = '.journal'
+    
+    def __init__(
+        self,
+        progress_file: Path,
+        compact_every: int = 500,
+        fsync_every: int = 20,
+        fsync_interval: float = 5.0
+    ):
         """
         Initialize progress tracker
         
         Args:
-            progress_file: Path to progress tracking file
+            progress_file: Path to progress tracking file (snapshot)
+            compact_every: Journal records between snapshots
+            fsync_every: Journal records between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
         """
-        self.progress_file = progress_file
+        self.progress_file = Path(progress_file)
+        self.journal_file = self.progress_file.with_name(self.progress_file.name + self.JOURNAL_SUFFIX)
+        self.compact_every = compact_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        
         self.total_tests = 0
         self.completed = 0
         self.failed = 0
@@ -40,43 +80,154 @@ class CrawlProgress:
         self.last_update = datetime.now()
         self.completed_tests: List[int] = []
         self.failed_tests: List[int] = []
+        self._completed_set: Set[int] = set()
+        self._failed_set: Set[int] = set()
+        
+        # Journal state: last written sequence number, records since the last snapshot/fsync
+        self._seq = 0
+        self._journal = None
+        self._journal_records = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
         
     def load(self) -> bool:
         """
-        Load progress from file
+        Load progress from the snapshot and replay the journal
         
         Returns:
-            True if progress was loaded, False if file doesn't exist
+            True if progress was loaded, False if neither file exists
         """
-        if not self.progress_file.exists():
+        if not self.progress_file.exists() and not self.journal_file.exists():
             return False
-            
+        
         try:
-            with open(self.progress_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if self.progress_file.exists():
+                with open(self.progress_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
-            self.total_tests = data.get('total_tests', 0)
-            self.completed = data.get('completed', 0)
-            self.failed = data.get('failed', 0)
-            self.skipped = data.get('skipped', 0)
-            self.current_test = data.get('current_test')
-            self.start_time = datetime.fromisoformat(data.get('start_time', datetime.now().isoformat()))
-            self.last_update = datetime.fromisoformat(data.get('last_update', datetime.now().isoformat()))
-            self.completed_tests = data.get('completed_tests', [])
-            self.failed_tests = data.get('failed_tests', [])
-            
-            logger.info(f"Loaded progress: {self.completed}/{self.total_tests} completed")
+                self.total_tests = data.get('total_tests', 0)
+                self.completed = data.get('completed', 0)
+                self.failed = data.get('failed', 0)
+                self.skipped = data.get('skipped', 0)
+                self.current_test = data.get('current_test')
+                self.start_time = datetime.fromisoformat(data.get('start_time', datetime.now().isoformat()))
+                self.last_update = datetime.fromisoformat(data.get('last_update', datetime.now().isoformat()))
+                self.completed_tests = data.get('completed_tests', [])
+                self.failed_tests = data.get('failed_tests', [])
+                self._completed_set = set(self.completed_tests)
+                self._failed_set = set(self.failed_tests)
+                self._seq = data.get('journal_seq', 0)
+            
+            replayed = self._replay_journal()
+            
+            logger.info(
+                f"Loaded progress: {self.completed}/{self.total_tests} completed"
+                + (f" ({replayed} journal records replayed)" if replayed else "")
+            )
             return True
             
         except Exception as e:
             logger.warning(f"Failed to load progress file: {e}")
             return False
     
-    def save(self) -> None:
-        """Save current progress to file"""
+    def _replay_journal(self) -> int:
+        """
+        Apply journal records newer than the snapshot
+        
+        Returns:
+            Number of records applied
+        """
+        if not self.journal_file.exists():
+            return 0
+        
+        replayed = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("record not terminated")
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash: cut it off so new records start on a fresh line
+                    logger.warning(f"Dropping incomplete journal record in {self.journal_file}")
+                    f.close()
+                    os.truncate(self.journal_file, valid_bytes)
+                    break
+                
+                valid_bytes += len(line)
+                if record.get('seq', 0) <= self._seq:
+                    continue
+                
+                self._apply(record['event'], record['test'])
+                self._seq = record['seq']
+                self.last_update = datetime.fromisoformat(record['time'])
+                self._journal_records += 1
+                replayed += 1
+        
+        return replayed
+    
+    def _apply(self, event: str, test_number: int) -> None:
+        """Apply one progress event to the in-memory state"""
+        self.current_test = test_number
+        
+        if event == 'completed':
+            self.completed += 1
+            if test_number not in self._completed_set:
+                self._completed_set.add(test_number)
+                self.completed_tests.append(test_number)
+        elif event == 'failed':
+            self.failed += 1
+            if test_number not in self._failed_set:
+                self._failed_set.add(test_number)
+                self.failed_tests.append(test_number)
+        elif event == 'skipped':
+            self.skipped += 1
+    
+    def _record(self, event: str, test_number: int) -> None:
+        """Apply an event and append it to the journal"""
+        self._apply(event, test_number)
+        self.last_update = datetime.now()
+        self._seq += 1
+        
         try:
-            self.last_update = datetime.now()
+            if self._journal is None:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
             
+            self._journal.write(json.dumps({
+                'seq': self._seq,
+                'event': event,
+                'test': test_number,
+                'time': self.last_update.isoformat()
+            }) + '\n')
+            self._journal.flush()
+            self._journal_records += 1
+            self._unsynced += 1
+            
+            if self._journal_records >= self.compact_every:
+                self.save()
+            elif self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+                
+        except Exception as e:
+            logger.error(f"Failed to write progress journal: {e}")
+    
+    def _sync(self) -> None:
+        """fsync the journal"""
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def save(self) -> None:
+        """
+        Write a snapshot of the current progress and remove the journal
+        
+        The snapshot is written to a temp file and renamed over the progress
+        file, so readers never see a half-written file.
+        """
+        try:
             data = {
                 'total_tests': self.total_tests,
                 'completed': self.completed,
@@ -86,39 +237,50 @@ class CrawlProgress:
                 'start_time': self.start_time.isoformat(),
                 'last_update': self.last_update.isoformat(),
                 'completed_tests': self.completed_tests,
-                'failed_tests': self.failed_tests
+                'failed_tests': self.failed_tests,
+                'journal_seq': self._seq
             }
             
             # Ensure directory exists
             self.progress_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
+            tmp_file = self.progress_file.with_name(self.progress_file.name + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.progress_file)
+            
+            # Records up to journal_seq are in the snapshot now. If we crash
+            # before removing the journal, replay skips them by sequence number.
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self.journal_file.exists():
+                self.journal_file.unlink()
+            
+            self._journal_records = 0
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
                 
         except Exception as e:
             logger.error(f"Failed to save progress: {e}")
     
+    def close(self) -> None:
+        """Write a final snapshot and release the journal"""
+        self.save()
+    
     def mark_completed(self, test_number: int) -> None:
         """Mark a test as completed"""
-        self.completed += 1
-        self.current_test = test_number
-        if test_number not in self.completed_tests:
-            self.completed_tests.append(test_number)
-        self.save()
+        self._record('completed', test_number)
     
     def mark_failed(self, test_number: int) -> None:
         """Mark a test as failed"""
-        self.failed += 1
-        self.current_test = test_number
-        if test_number not in self.failed_tests:
-            self.failed_tests.append(test_number)
-        self.save()
+        self._record('failed', test_number)
     
     def mark_skipped(self, test_number: int) -> None:
         """Mark a test as skipped"""
-        self.skipped += 1
-        self.current_test = test_number
-        self.save()
+        self._record('skipped', test_number)
     
     def get_summary(self) -> Dict:
         """
@@ -140,12 +302,91 @@ class CrawlProgress:
         }
 
 
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+    
+    def try_acquire(self, now: float) -> float:
+        """
+        Take a token if one is available
+        
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter for polite crawling
+    
+    Each host gets its own token bucket refilled once every `delay` seconds,
+    so requests to one host start at least `delay` apart (with burst=1) no
+    matter how many workers are downloading. Different hosts don't wait on
+    each other.
+    """
+    
+    def __init__(self, delay: float, burst: int = 1):
+        """
+        Initialize rate limiter
+        
+        Args:
+            delay: Minimum seconds between request starts per host (0 disables limiting)
+            burst: Requests a host may receive back to back after being idle
+        """
+        self.delay = delay
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def try_acquire(self, url: str) -> float:
+        """
+        Reserve a request slot for the URL's host without blocking
+        
+        Returns:
+            0 if the request may start now, otherwise seconds to wait before trying again
+        """
+        if self.delay <= 0:
+            return 0.0
+        
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(1.0 / self.delay, self.burst)
+            return bucket.try_acquire(time.monotonic())
+    
+    def acquire(self, url: str) -> None:
+        """Block until a request to the URL's host may start (sleeps outside the lock)"""
+        while True:
+            wait_time = self.try_acquire(url)
+            if wait_time <= 0:
+                return
+            time.sleep(wait_time)
+
+
 class HTMLCrawler:
     """
     HTML Crawler with rate limiting, error handling, and retry logic
     
     This crawler is designed to politely download HTML pages with proper
     rate limiting, exponential backoff retry logic, and progress tracking.
+    
+    With concurrency > 1, download_batch() runs several downloads at once.
+    Requests are still spaced `delay` seconds apart per host by a token
+    bucket, and retries are scheduled for their backoff time instead of
+    sleeping in a worker.
     """
     
     def __init__(
@@ -153,58 +394,152 @@ class HTMLCrawler:
         delay: float = 0.35,
         timeout: int = 30,
         max_retries: int = 3,
-        user_agent: str = "IELTSReaderBot/2.0 (+for education; polite crawling)"
+        user_agent: str = "IELTSReaderBot/2.0 (+for education; polite crawling)",
+        concurrency: int = 1,
+        burst: int = 1,
+        cache: Optional[HTMLCache] = None,
+        offline: bool = False
     ):
         """
         Initialize HTML crawler with configuration
         
         Args:
-            delay: Delay in seconds between requests (default: 0.35)
+            delay: Minimum delay in seconds between requests to the same host (default: 0.35)
             timeout: Request timeout in seconds (default: 30)
             max_retries: Maximum number of retry attempts (default: 3)
             user_agent: Custom User-Agent header
+            concurrency: Number of downloads in flight in download_batch (default: 1)
+            burst: Requests a host may receive back to back after being idle (default: 1)
+            cache: Raw HTML cache; pages are stored in it and revalidated with conditional GETs
+            offline: Serve pages from the cache only, without any network requests
         """
+        if offline and cache is None:
+            raise ValueError("offline mode needs an HTML cache")
+        
         self.delay = delay
         self.timeout = timeout
         self.max_retries = max_retries
         self.user_agent = user_agent
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.offline = offline
+        self.rate_limiter = HostRateLimiter(0 if offline else delay, burst)
         
-        # Create session with custom headers
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Create session with custom headers (worker threads get their own, see _get_session)
+        self.session = self._create_session()
+        self._thread_local = threading.local()
+        
+        logger.info(
+            f"Initialized HTMLCrawler (delay={delay}s, timeout={timeout}s, "
+            f"max_retries={max_retries}, concurrency={self.concurrency}"
+            f"{', offline' if offline else ''})"
+        )
+    
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session with the crawler's headers"""
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
+        adapter = HTTPAdapter(pool_maxsize=max(10, self.concurrency))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _get_session(self) -> requests.Session:
+        """Session for the calling thread (requests.Session isn't thread-safe)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
         
-        logger.info(f"Initialized HTMLCrawler (delay={delay}s, timeout={timeout}s, max_retries={max_retries})")
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = self._create_session()
+        return session
 
     def download_page(self, url: str, retry_count: int = 0) -> Optional[str]:
         """
         Download a single HTML page with error handling and retry logic
         
+        Waits for the host's rate limit before each attempt.
+        
         Args:
             url: URL to download
-            retry_count: Current retry attempt (used internally)
+            retry_count: Number of attempts already made
             
         Returns:
             HTML content as string, or None if failed
+        """
+        while True:
+            self.rate_limiter.acquire(url)
+            html_content, retryable = self._attempt_download(url, retry_count)
+            
+            if html_content is not None or not retryable:
+                return html_content
+            
+            if retry_count >= self.max_retries:
+                logger.error(f"Max retries ({self.max_retries}) exceeded for {url}")
+                return None
+            
+            # Exponential backoff
+            backoff_delay = self._backoff_delay(retry_count)
+            logger.info(f"Retrying in {backoff_delay:.2f}s... (attempt {retry_count + 2}/{self.max_retries + 1})")
+            time.sleep(backoff_delay)
+            retry_count += 1
+    
+    def _backoff_delay(self, retry_count: int) -> float:
+        """Exponential backoff delay before the next attempt"""
+        return self.delay * (2 ** retry_count)
+    
+    def _attempt_download(self, url: str, retry_count: int = 0) -> Tuple[Optional[str], bool]:
+        """
+        Make one download attempt
+        
+        Args:
+            url: URL to download
+            retry_count: Current retry attempt (for logging)
             
-        Raises:
-            requests.exceptions.RequestException: For unrecoverable errors
+        Returns:
+            Tuple of (HTML content or None, whether the failure is worth retrying)
         """
+        if self.offline:
+            html_content = self.cache.get(url)
+            if html_content is None:
+                logger.warning(f"Not in HTML cache: {url}")
+            return html_content, False
+        
         try:
             logger.debug(f"Downloading: {url} (attempt {retry_count + 1}/{self.max_retries + 1})")
             
+            # Revalidate a cached copy instead of downloading it again
+            cache_entry = self.cache.get_entry(url) if self.cache else None
+            headers = {}
+            if cache_entry is not None:
+                if cache_entry.etag:
+                    headers['If-None-Match'] = cache_entry.etag
+                if cache_entry.last_modified:
+                    headers['If-Modified-Since'] = cache_entry.last_modified
+            
             # Make HTTP request
-            response = self.session.get(url, timeout=self.timeout)
+            response = self._get_session().get(url, timeout=self.timeout, headers=headers or None)
+            
+            if response.status_code == 304 and cache_entry is not None:
+                cached_html = self.cache.get(url)
+                if cached_html is not None:
+                    self.cache.touch(url)
+                    logger.info(f"Not modified, using cached copy: {url}")
+                    return cached_html, False
+                
+                # Cached file is gone; fetch the page unconditionally
+                response = self._get_session().get(url, timeout=self.timeout)
             
             # Handle 404 errors gracefully
             if response.status_code == 404:
                 logger.warning(f"Page not found (404): {url}")
-                return None
+                return None, False
             
             # Raise for other HTTP errors
             response.raise_for_status()
@@ -212,71 +547,137 @@ class HTMLCrawler:
             # Log success
             logger.info(f"Successfully downloaded: {url} ({len(response.text)} bytes)")
             
-            return response.text
+            if self.cache is not None:
+                self.cache.put(
+                    url,
+                    response.text,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            
+            return response.text, False
             
         except requests.exceptions.Timeout as e:
             logger.warning(f"Timeout downloading {url}: {e}")
-            return self._handle_retry(url, retry_count, e)
+            return None, True
             
         except requests.exceptions.ConnectionError as e:
             logger.warning(f"Connection error downloading {url}: {e}")
-            return self._handle_retry(url, retry_count, e)
+            return None, True
             
         except requests.exceptions.HTTPError as e:
             # Don't retry on client errors (4xx)
             if e.response.status_code >= 400 and e.response.status_code < 500:
                 logger.error(f"HTTP client error {e.response.status_code} for {url}")
-                return None
+                return None, False
             
             # Retry on server errors (5xx)
             logger.warning(f"HTTP server error {e.response.status_code} for {url}")
-            return self._handle_retry(url, retry_count, e)
+            return None, True
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error downloading {url}: {e}")
-            return self._handle_retry(url, retry_count, e)
+            return None, True
             
         except Exception as e:
             logger.error(f"Unexpected error downloading {url}: {e}")
-            return None
+            return None, False
     
-    def _handle_retry(
+    def iter_downloads(
         self,
-        url: str,
-        retry_count: int,
-        error: Exception  # noqa: ARG002
-    ) -> Optional[str]:
+        urls: List[Tuple[int, str]],
+        concurrency: Optional[int] = None
+    ) -> Iterator[Tuple[int, str, Optional[str]]]:
         """
-        Handle retry logic with exponential backoff
+        Download pages concurrently, yielding each as soon as it finishes
+        
+        Attempts run on a thread pool. A scheduler on the calling thread
+        starts an attempt only when the host's token bucket allows it, and
+        puts failed attempts back on the schedule at their backoff time, so
+        workers never sleep and network waits overlap.
         
         Args:
-            url: URL that failed
-            retry_count: Current retry attempt
-            error: Exception that occurred (kept for logging context)
+            urls: List of tuples (test_number, url) to download
+            concurrency: Maximum downloads in flight (default: self.concurrency)
             
-        Returns:
-            Result of retry attempt, or None if max retries exceeded
+        Yields:
+            Tuples of (test_number, url, HTML content or None if failed), in completion order
         """
-        if retry_count >= self.max_retries:
-            logger.error(f"Max retries ({self.max_retries}) exceeded for {url}")
-            return None
+        concurrency = max(1, concurrency or self.concurrency)
         
-        # Calculate exponential backoff delay
-        backoff_delay = self.delay * (2 ** retry_count)
-        logger.info(f"Retrying in {backoff_delay:.2f}s... (attempt {retry_count + 2}/{self.max_retries + 1})")
+        # Scheduled attempts: (not_before, sequence, test_number, url, retry_count)
+        schedule: List[Tuple[float, int, int, str, int]] = []
+        for sequence, (test_number, url) in enumerate(urls):
+            heapq.heappush(schedule, (0.0, sequence, test_number, url, 0))
+        sequence = len(urls)
         
-        time.sleep(backoff_delay)
+        in_flight: Dict[Future, Tuple[int, str, int]] = {}
         
-        # Retry the download
-        return self.download_page(url, retry_count + 1)
-
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawler") as executor:
+            try:
+                while schedule or in_flight:
+                    # Start every due attempt the rate limiter allows
+                    now = time.monotonic()
+                    deferred = []
+                    while schedule and len(in_flight) < concurrency and schedule[0][0] <= now:
+                        item = heapq.heappop(schedule)
+                        _, item_sequence, test_number, url, retry_count = item
+                        wait_time = self.rate_limiter.try_acquire(url)
+                        if wait_time > 0:
+                            deferred.append((now + wait_time, item_sequence, test_number, url, retry_count))
+                            continue
+                        if retry_count == 0:
+                            logger.info(f"Downloading test {test_number}: {url}")
+                        future = executor.submit(self._attempt_download, url, retry_count)
+                        in_flight[future] = (test_number, url, retry_count)
+                    for item in deferred:
+                        heapq.heappush(schedule, item)
+                    
+                    # Wait for a download to finish or the next scheduled attempt
+                    timeout = None
+                    if schedule and len(in_flight) < concurrency:
+                        timeout = max(0.0, schedule[0][0] - time.monotonic())
+                    if not in_flight:
+                        if timeout:
+                            time.sleep(timeout)
+                        continue
+                    
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        test_number, url, retry_count = in_flight.pop(future)
+                        html_content, retryable = future.result()
+                        
+                        if html_content is None and retryable and retry_count < self.max_retries:
+                            backoff_delay = self._backoff_delay(retry_count)
+                            logger.info(
+                                f"Test {test_number}: retrying in {backoff_delay:.2f}s "
+                                f"(attempt {retry_count + 2}/{self.max_retries + 1})"
+                            )
+                            heapq.heappush(
+                                schedule,
+                                (time.monotonic() + backoff_delay, sequence, test_number, url, retry_count + 1)
+                            )
+                            sequence += 1
+                            continue
+                        
+                        if html_content is None and retryable:
+                            logger.error(f"Max retries ({self.max_retries}) exceeded for {url}")
+                        
+                        yield test_number, url, html_content
+            finally:
+                # Stopped early (e.g. KeyboardInterrupt): don't start queued attempts
+                for future in in_flight:
+                    future.cancel()
+    
     def download_batch(
         self,
         urls: List[Tuple[int, str]],
         output_dir: Path,
         skip_existing: bool = True,
         progress_file: Optional[Path] = None,
-        force: bool = False
+        force: bool = False,
+        on_page: Optional[Callable[[int, str], None]] = None,
+        output_exists: Optional[Callable[[int], bool]] = None
     ) -> Dict:
         """
         Download multiple pages with progress tracking and resume capability
@@ -287,6 +688,11 @@ class HTMLCrawler:
             skip_existing: Skip tests that already have JSON output files
             progress_file: Path to progress tracking file (optional)
             force: Force reprocessing of existing files
+            on_page: Called with (test_number, html) as each page arrives, instead of
+                keeping the page in downloaded_pages. No new downloads start while it
+                runs, so a blocking callback applies backpressure.
+            output_exists: Called with a test number to check whether its output is
+                already stored (default: the reading output file in output_dir)
             
         Returns:
             Summary dictionary with download statistics
@@ -314,6 +720,7 @@ class HTMLCrawler:
         
         # Track results
         downloaded_pages: Dict[int, str] = {}
+        downloaded_count = 0
         
         logger.info(f"Starting batch download of {len(urls)} tests")
         logger.info(f"Output directory: {output_dir}")
@@ -321,66 +728,74 @@ class HTMLCrawler:
         
         # Create progress bar
         with tqdm(total=len(urls), desc="Downloading tests") as pbar:
+            # Check which output files already exist
+            pending: List[Tuple[int, str]] = []
             for test_number, url in urls:
-                try:
-                    # Update progress bar description
-                    pbar.set_description(f"Test {test_number}")
-                    
-                    # Check if output file already exists
-                    if skip_existing and not force:
-                        output_file = self._get_output_filename(output_dir, test_number)
-                        if output_file.exists():
-                            logger.debug(f"Skipping test {test_number} (already exists)")
-                            progress.mark_skipped(test_number)
+                if skip_existing and not force:
+                    if output_exists is not None:
+                        exists = output_exists(test_number)
+                    else:
+                        exists = self._get_output_filename(output_dir, test_number).exists()
+                    if exists:
+                        logger.debug(f"Skipping test {test_number} (already exists)")
+                        progress.mark_skipped(test_number)
+                        pbar.update(1)
+                        continue
+                pending.append((test_number, url))
+            
+            # Download the pages (Requirement 9.2: Log each download attempt and status).
+            # Rate limiting is applied per host by iter_downloads().
+            try:
+                for test_number, url, html_content in self.iter_downloads(pending):
+                    try:
+                        # Update progress bar description
+                        pbar.set_description(f"Test {test_number}")
+                        
+                        if html_content is None:
+                            logger.warning(f"Failed to download test {test_number} after all retry attempts")
+                            progress.mark_failed(test_number)
                             pbar.update(1)
                             continue
-                    
-                    # Download the page (Requirement 9.2: Log each download attempt and status)
-                    logger.info(f"Downloading test {test_number}: {url}")
-                    html_content = self.download_page(url)
-                    
-                    if html_content is None:
-                        logger.warning(f"Failed to download test {test_number} after all retry attempts")
+                        
+                        logger.info(f"Successfully downloaded test {test_number} ({len(html_content)} bytes)")
+                        
+                        # Hand the page on, or store it for the caller
+                        if on_page is not None:
+                            on_page(test_number, html_content)
+                        else:
+                            downloaded_pages[test_number] = html_content
+                        downloaded_count += 1
+                        progress.mark_completed(test_number)
+                        
+                        # Update progress bar
+                        pbar.update(1)
+                        pbar.set_postfix({
+                            'completed': progress.completed,
+                            'failed': progress.failed,
+                            'skipped': progress.skipped
+                        })
+                        
+                    except Exception as e:
+                        # Log errors with test number, section, and stack trace (Requirement 9.4)
+                        logger.error(
+                            f"Error processing test {test_number}: {e}",
+                            exc_info=True,
+                            extra={'test_number': test_number, 'section': 'download'}
+                        )
                         progress.mark_failed(test_number)
                         pbar.update(1)
-                        continue
-                    
-                    logger.info(f"Successfully downloaded test {test_number} ({len(html_content)} bytes)")
-                    
-                    # Store the downloaded content
-                    downloaded_pages[test_number] = html_content
-                    progress.mark_completed(test_number)
-                    
-                    # Update progress bar
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'completed': progress.completed,
-                        'failed': progress.failed,
-                        'skipped': progress.skipped
-                    })
-                    
-                    # Rate limiting delay (except for last request)
-                    if test_number != urls[-1][0]:
-                        time.sleep(self.delay)
-                    
-                except KeyboardInterrupt:
-                    logger.warning("Download interrupted by user")
-                    progress.save()
-                    raise
-                    
-                except Exception as e:
-                    # Log errors with test number, section, and stack trace (Requirement 9.4)
-                    logger.error(
-                        f"Error processing test {test_number}: {e}",
-                        exc_info=True,
-                        extra={'test_number': test_number, 'section': 'download'}
-                    )
-                    progress.mark_failed(test_number)
-                    pbar.update(1)
+                        
+            except KeyboardInterrupt:
+                logger.warning("Download interrupted by user")
+                progress.save()
+                raise
+        
+        # Final snapshot (compacts the journal)
+        progress.close()
         
         # Generate summary
         summary = progress.get_summary()
-        summary['downloaded_pages'] = len(downloaded_pages)
+        summary['downloaded_pages'] = downloaded_count
         
         # Log completion time and duration (Requirement 9.6)
         end_time = datetime.now()
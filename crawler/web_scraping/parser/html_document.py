@@ -0,0 +1,142 @@
+"""
+HTML Document Module
+
+One parsed tree per downloaded page. The test parsers parse a page once into
+an HTMLDocument and hand its tags to the extractors, which read the tree
+without modifying it, so nothing needs to be cloned or re-parsed from a
+string. Text extracted from a node of a live document is cached for the
+document's lifetime.
+
+parse_html() counts every parse made through it, so profiling can compare
+parse counts and parse time per test.
+
+Pages can be parsed with the standard library's html.parser (the default) or
+with lxml, which is several times faster on the large Divi pages. The two
+build slightly different trees from malformed markup; parser_compat.py diffs
+the parsers' JSON output over saved pages before switching.
+"""
+
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
+
+# Tree builders supported for downloaded pages
+HTML_PARSERS = ('html.parser', 'lxml')
+
+# Default parser for downloaded pages
+HTML_PARSER = 'html.parser'
+
+# Parses made through parse_html() in this process
+_stats_lock = threading.Lock()
+_parse_count = 0
+_parse_seconds = 0.0
+
+# id(root soup) -> live HTMLDocument, so text caches can be found from any node
+_documents: 'weakref.WeakValueDictionary[int, HTMLDocument]' = weakref.WeakValueDictionary()
+
+
+def check_html_parser(parser: str) -> str:
+    """
+    Check that a page parser is supported and installed
+    
+    Returns:
+        The parser name
+    
+    Raises:
+        ValueError: If the parser is unknown or its package isn't installed
+    """
+    if parser not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser: {parser} (expected one of {', '.join(HTML_PARSERS)})")
+    if builder_registry.lookup(parser) is None:
+        raise ValueError(f"HTML parser '{parser}' is not installed (pip install {parser})")
+    return parser
+
+
+def parse_html(markup: str, parser: str = HTML_PARSER) -> BeautifulSoup:
+    """
+    Parse HTML with BeautifulSoup, counting the parse
+    
+    Args:
+        markup: HTML string
+        parser: BeautifulSoup tree builder
+    
+    Returns:
+        Parsed tree
+    """
+    global _parse_count, _parse_seconds
+    
+    start = time.perf_counter()
+    soup = BeautifulSoup(markup, parser)
+    elapsed = time.perf_counter() - start
+    
+    with _stats_lock:
+        _parse_count += 1
+        _parse_seconds += elapsed
+    return soup
+
+
+def parse_stats() -> Dict[str, Any]:
+    """Parses made through parse_html() in this process and their total time"""
+    with _stats_lock:
+        return {'parses': _parse_count, 'seconds': _parse_seconds}
+
+
+def reset_parse_stats() -> None:
+    """Reset the parse counters"""
+    global _parse_count, _parse_seconds
+    with _stats_lock:
+        _parse_count = 0
+        _parse_seconds = 0.0
+
+
+def count_words(element: Tag) -> int:
+    """Count the words in an element's text"""
+    return len(element.get_text(separator=' ', strip=True).split())
+
+
+class HTMLDocument:
+    """
+    A page parsed once
+    
+    The tree must not be modified while the document is alive, because text
+    cached for its nodes would go stale. Extractors that need a changed copy
+    of a node should copy it (copy.copy) instead of re-parsing str(node).
+    
+    Usage:
+        document = HTMLDocument(html_content)
+        passages = passage_extractor.extract_passages_with_fallback(document.soup)
+    """
+    
+    def __init__(self, html: str, parser: str = HTML_PARSER):
+        """
+        Parse a page
+        
+        Args:
+            html: HTML content of the page
+            parser: BeautifulSoup tree builder
+        """
+        self.soup = parse_html(html, parser)
+        # (id(node), options) -> (node, text); the node is kept so its id can't be reused
+        self._text_cache: Dict[Tuple[int, Any], Tuple[Tag, str]] = {}
+        _documents[id(self.soup)] = self
+    
+    @classmethod
+    def of(cls, element: Tag) -> Optional['HTMLDocument']:
+        """The live document an element belongs to, if any"""
+        root = element
+        while root.parent is not None:
+            root = root.parent
+        return _documents.get(id(root))
+    
+    def cached_text(self, element: Tag, options: Any) -> Optional[str]:
+        """Text previously stored for a node with the given extraction options"""
+        cached = self._text_cache.get((id(element), options))
+        return cached[1] if cached is not None else None
+    
+    def store_text(self, element: Tag, options: Any, text: str) -> None:
+        """Store the text extracted from a node"""
+        self._text_cache[(id(element), options)] = (element, text)
@@ -8,10 +8,15 @@ like scripts and inline JavaScript while maintaining safe HTML tags and attribut
 Requirements addressed: 10.1-10.7
 """
 
+import re
 import bleach
 from typing import Optional
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+
+try:
+    from .html_document import parse_html
+except ImportError:
+    from html_document import parse_html
 
 
 class HTMLSanitizer:
@@ -23,7 +28,8 @@ class HTMLSanitizer:
     relative to absolute paths.
     """
     
-    # HTML parser to use
+    # HTML parser to use; stays html.parser whatever parses the pages, because
+    # fragments are serialized back out and lxml would wrap them in <html><body>
     HTML_PARSER = 'html.parser'
     
     # Allowed HTML tags (Requirement 10.4)
@@ -58,6 +64,9 @@ class HTMLSanitizer:
     # Protocols allowed in URLs
     ALLOWED_PROTOCOLS = ['http', 'https', 'data']
     
+    # Elements whose content bleach would keep as text when stripping them
+    SCRIPT_OR_STYLE_PATTERN = re.compile(r'<\s*(?:script|style)\b', re.IGNORECASE)
+    
     def __init__(self):
         """Initialize the HTML sanitizer with default configuration."""
         pass
@@ -92,26 +101,29 @@ class HTMLSanitizer:
         
         # First pass: Remove scripts and styles using BeautifulSoup
         # This ensures complete removal of script/style content (Requirements 10.1, 10.3)
-        soup = BeautifulSoup(html, self.HTML_PARSER)
+        # Content cut from an already parsed page usually has neither, and its
+        # markup is already BeautifulSoup output, so the parse is skipped then.
+        if self.SCRIPT_OR_STYLE_PATTERN.search(html):
+            soup = parse_html(html, self.HTML_PARSER)
         
-        # Remove script tags and their content (Requirement 10.1)
-        for script in soup.find_all('script'):
-            script.decompose()
+            # Remove script tags and their content (Requirement 10.1)
+            for script in soup.find_all('script'):
+                script.decompose()
         
-        # Remove style tags and their content (Requirement 10.3)
-        for style in soup.find_all('style'):
-            style.decompose()
+            # Remove style tags and their content (Requirement 10.3)
+            for style in soup.find_all('style'):
+                style.decompose()
         
-        # Remove inline event handlers (Requirement 10.2)
-        # This is handled by bleach's attribute filtering, but we do a pre-pass
-        for tag in soup.find_all(True):
-            # Remove all attributes starting with 'on' (onclick, onload, etc.)
-            attrs_to_remove = [attr for attr in tag.attrs if attr.startswith('on')]
-            for attr in attrs_to_remove:
-                del tag[attr]
+            # Remove inline event handlers (Requirement 10.2)
+            # This is handled by bleach's attribute filtering, but we do a pre-pass
+            for tag in soup.find_all(True):
+                # Remove all attributes starting with 'on' (onclick, onload, etc.)
+                attrs_to_remove = [attr for attr in tag.attrs if attr.startswith('on')]
+                for attr in attrs_to_remove:
+                    del tag[attr]
         
-        # Convert back to string for bleach processing
-        html = str(soup)
+            # Convert back to string for bleach processing
+            html = str(soup)
         
         # Second pass: Use bleach to sanitize with whitelist
         # (Requirements 10.4, 10.5)
@@ -154,7 +166,7 @@ class HTMLSanitizer:
         if not html or not base_url:
             return html
         
-        soup = BeautifulSoup(html, self.HTML_PARSER)
+        soup = parse_html(html, self.HTML_PARSER)
         
         # Convert image URLs (Requirement 10.6)
         for img in soup.find_all('img'):
@@ -210,7 +222,7 @@ class HTMLSanitizer:
             return "", ["Empty or invalid HTML input"]
         
         # Track removed elements
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = parse_html(html, self.HTML_PARSER)
         
         # Count scripts
         scripts = soup.find_all('script')
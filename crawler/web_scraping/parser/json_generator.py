@@ -7,14 +7,16 @@ The output format is designed to be backend-ready for direct database insertion.
 
 import json
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 
 # Import models
 try:
     from .models import Passage, Question, Answer, ValidationResult
+    from .output_sink import OutputSink, FileSink
 except ImportError:
     from models import Passage, Question, Answer, ValidationResult
+    from output_sink import OutputSink, FileSink
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,15 @@ class JSONGenerator:
     - Validation results
     """
     
+    def __init__(self, sink: Optional[OutputSink] = None):
+        """
+        Initialize generator
+        
+        Args:
+            sink: Where save_to_file() writes (default: one file per test, written atomically)
+        """
+        self.sink = sink or FileSink()
+    
     def generate(
         self,
         metadata: Dict,
@@ -176,11 +187,7 @@ class JSONGenerator:
             pretty: If True, use pretty printing
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                if pretty:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(data, f, ensure_ascii=False)
+            self.sink.write(output_path, data, pretty)
             
             logger.info(f"Saved JSON output to: {output_path}")
         except Exception as e:
@@ -6,19 +6,51 @@ to question numbers. Handles various answer formats including lists, tables,
 and inline text specific to listening tests.
 """
 
-import re
+import html
 import logging
 from typing import List, Optional
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 try:
     from .listening_models import ListeningAnswer
     from .text_utils import TextUtils
     from .exceptions import AnswerExtractionError, HTMLParsingError
+    from .patterns import (
+        LISTENING_ANSWER_PATTERN,
+        LISTENING_ANSWER_RANGE_PATTERN,
+        LISTENING_ANSWER_SEPARATOR_PATTERN,
+        LISTENING_TAG_PATTERN,
+        LISTENING_NEXT_QUESTION_PATTERN,
+        LISTENING_QUESTION_LABEL_PATTERN,
+        LISTENING_NUMBER_PATTERN,
+        LISTENING_QUESTION_NUMBER_PATTERN,
+        LISTENING_PERIOD_NUMBER_PATTERN,
+        LISTENING_SPACE_NUMBER_PATTERN,
+        LISTENING_QUESTION_BLOCK_PATTERN,
+        LISTENING_NUMBERED_ANSWER_PATTERN,
+        LISTENING_NOTE_PATTERN,
+        LISTENING_TRAILING_NOTE_PATTERN
+    )
 except ImportError:
     from listening_models import ListeningAnswer
     from text_utils import TextUtils
     from exceptions import AnswerExtractionError, HTMLParsingError
+    from patterns import (
+        LISTENING_ANSWER_PATTERN,
+        LISTENING_ANSWER_RANGE_PATTERN,
+        LISTENING_ANSWER_SEPARATOR_PATTERN,
+        LISTENING_TAG_PATTERN,
+        LISTENING_NEXT_QUESTION_PATTERN,
+        LISTENING_QUESTION_LABEL_PATTERN,
+        LISTENING_NUMBER_PATTERN,
+        LISTENING_QUESTION_NUMBER_PATTERN,
+        LISTENING_PERIOD_NUMBER_PATTERN,
+        LISTENING_SPACE_NUMBER_PATTERN,
+        LISTENING_QUESTION_BLOCK_PATTERN,
+        LISTENING_NUMBERED_ANSWER_PATTERN,
+        LISTENING_NOTE_PATTERN,
+        LISTENING_TRAILING_NOTE_PATTERN
+    )
 
 
 logger = logging.getLogger(__name__)
@@ -41,16 +73,13 @@ class ListeningAnswerExtractor:
     def __init__(self):
         """Initialize the ListeningAnswerExtractor with regex patterns."""
         # Pattern for "1. ANSWER" or "1) ANSWER" or "1: ANSWER"
-        self.answer_pattern = re.compile(
-            r'^(\d+)[\.\):\s]+(.+)$',
-            re.MULTILINE
-        )
+        self.answer_pattern = LISTENING_ANSWER_PATTERN
         
         # Pattern for range format "1-5: answer1, answer2, ..."
-        self.range_pattern = re.compile(
-            r'(\d+)[-–](\d+)[\.\):\s]+(.+)$',
-            re.MULTILINE
-        )
+        self.range_pattern = LISTENING_ANSWER_RANGE_PATTERN
+        
+        # Tags and comments left in answer text
+        self.tag_pattern = LISTENING_TAG_PATTERN
         
         # Column to section mapping for row 11
         self.column_to_section = {
@@ -272,7 +301,7 @@ class ListeningAnswerExtractor:
                     answer_text = match.group(2).strip()
                     
                     # Extract only the answer part (stop at next question number)
-                    next_q_match = re.search(r'\s+\d+[\.\):\s]', answer_text)
+                    next_q_match = LISTENING_NEXT_QUESTION_PATTERN.search(answer_text)
                     if next_q_match:
                         answer_text = answer_text[:next_q_match.start()].strip()
                     
@@ -294,7 +323,7 @@ class ListeningAnswerExtractor:
                     answers_text = match.group(3)
                     
                     # Split by comma or semicolon
-                    answer_list = re.split(r'[,;]', answers_text)
+                    answer_list = LISTENING_ANSWER_SEPARATOR_PATTERN.split(answers_text)
                     answer_list = [a.strip() for a in answer_list if a.strip()]
                     
                     # Map answers to question numbers
@@ -371,7 +400,7 @@ class ListeningAnswerExtractor:
                         continue
                     
                     # Pattern 2: "Question 1: Answer" or "Q1: Answer"
-                    question_pattern = re.match(r'(?:Question|Q)\s*(\d+)\s*:?\s*(.+)', text, re.IGNORECASE)
+                    question_pattern = LISTENING_QUESTION_LABEL_PATTERN.match(text)
                     if question_pattern:
                         q_num = int(question_pattern.group(1))
                         
@@ -474,7 +503,7 @@ class ListeningAnswerExtractor:
                 q_num = int(q_num_text)
             except ValueError:
                 # Try to extract number from text like "Q1", "Question 1", etc.
-                num_match = re.search(r'\d+', q_num_text)
+                num_match = LISTENING_NUMBER_PATTERN.search(q_num_text)
                 if num_match:
                     q_num = int(num_match.group())
             
@@ -535,7 +564,7 @@ class ListeningAnswerExtractor:
                 answers_text = match.group(3)
                 
                 # Split by comma or semicolon
-                answer_list = re.split(r'[,;]', answers_text)
+                answer_list = LISTENING_ANSWER_SEPARATOR_PATTERN.split(answers_text)
                 answer_list = [a.strip() for a in answer_list if a.strip()]
                 
                 # Map answers to question numbers
@@ -557,7 +586,7 @@ class ListeningAnswerExtractor:
         # Skip this if we already found range format answers
         if not answers:
             question_positions = []
-            for match in re.finditer(r'(\d+)[\.\):\s]+', text):
+            for match in LISTENING_QUESTION_NUMBER_PATTERN.finditer(text):
                 q_num = int(match.group(1))
                 start_pos = match.end()
                 question_positions.append((q_num, start_pos, match.start()))
@@ -588,9 +617,7 @@ class ListeningAnswerExtractor:
         
         # If pattern 1 didn't work well, try pattern 2: "Question 1: Answer text"
         if len(answers) < 5:  # Arbitrary threshold - if we got very few answers, try another pattern
-            question_pattern = re.compile(r'[Qq]uestion\s+(\d+)\s*:?\s*(.+?)(?=[Qq]uestion\s+\d+|$)', re.DOTALL)
-            
-            for match in question_pattern.finditer(text):
+            for match in LISTENING_QUESTION_BLOCK_PATTERN.finditer(text):
                 q_num = int(match.group(1))
                 
                 if q_num in seen_questions:
@@ -610,9 +637,7 @@ class ListeningAnswerExtractor:
         
         # Pattern 4: Just numbers and text in sequence "1 Answer"
         if len(answers) < 5:
-            simple_pattern = re.compile(r'^\s*(\d+)\s+([A-Za-z].+?)(?=\s+\d+\s+[A-Za-z]|$)', re.MULTILINE)
-            
-            for match in simple_pattern.finditer(text):
+            for match in LISTENING_NUMBERED_ANSWER_PATTERN.finditer(text):
                 q_num = int(match.group(1))
                 
                 if q_num in seen_questions:
@@ -658,7 +683,7 @@ class ListeningAnswerExtractor:
         text = text.strip()
         
         # Remove parenthetical notes like "(noun)", "(surname)", "(verb)"
-        text = re.sub(r'\s*\([^)]*\)\s*$', '', text)
+        text = LISTENING_TRAILING_NOTE_PATTERN.sub('', text)
         
         # Remove trailing periods, commas (but keep them if part of the answer)
         if text.endswith('.') and len(text) > 2:
@@ -894,7 +919,7 @@ class ListeningAnswerExtractor:
         
         # Pattern 1: "1. answer" (with period) - try this first
         period_matches = []
-        for match in re.finditer(r'(\d+)\.\s*', text):
+        for match in LISTENING_PERIOD_NUMBER_PATTERN.finditer(text):
             q_num = int(match.group(1))
             # Only include question numbers in the expected range
             if start_q <= q_num <= end_q:
@@ -902,7 +927,7 @@ class ListeningAnswerExtractor:
         
         # Pattern 2: "1 answer" (space only)
         space_matches = []
-        for match in re.finditer(r'(\d+)\s+', text):
+        for match in LISTENING_SPACE_NUMBER_PATTERN.finditer(text):
             q_num = int(match.group(1))
             # Only include question numbers in the expected range
             if start_q <= q_num <= end_q:
@@ -977,16 +1002,15 @@ class ListeningAnswerExtractor:
         if not text:
             return ""
         
-        # Remove HTML tags using BeautifulSoup
+        # Remove HTML tags (answer text is short, so strip them instead of parsing it)
         if '<' in text and '>' in text:
-            soup = BeautifulSoup(text, 'html.parser')
-            text = soup.get_text()
+            text = html.unescape(self.tag_pattern.sub('', text))
         
         # Remove trailing punctuation (except for answers that are sentences)
         text = text.strip()
         
         # Remove parenthetical notes like "(noun)", "(surname)", "(verb)"
-        text = re.sub(r'\s*\([^)]*\)\s*', '', text)
+        text = LISTENING_NOTE_PATTERN.sub('', text)
         
         # Remove trailing periods, commas (but keep them if part of the answer)
         if text.endswith('.') and len(text) > 2:
@@ -10,10 +10,16 @@ Requirements: 2.1, 2.2, 2.3, 2.4
 import logging
 import re
 import requests
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Dict, Optional
 from bs4 import Tag
 
+try:
+    from .media_download_manager import MediaDownloadManager
+except ImportError:
+    from media_download_manager import MediaDownloadManager
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +30,7 @@ class ListeningAudioExtractor:
     This class handles:
     - Extracting audio URLs from various HTML formats
     - Extracting section titles from heading tags
-    - Downloading audio files to local storage
+    - Downloading audio files to local storage (in parallel, see submit_audio_file)
     - Generating proper file paths for audio files
     
     Requirements: 2.1, 2.2, 2.3, 2.4
@@ -32,14 +38,16 @@ class ListeningAudioExtractor:
     
     SUPPORTED_FORMATS = ['.mp3', '.wav', '.ogg', '.m4a']
     
-    def __init__(self, output_dir: str = "web_scraping/media"):
+    def __init__(self, output_dir: str = "web_scraping/media", downloader: Optional[MediaDownloadManager] = None):
         """
         Initialize the ListeningAudioExtractor.
         
         Args:
             output_dir: Base directory for storing audio files
+            downloader: Download manager for audio files (default: one for output_dir)
         """
         self.output_dir = Path(output_dir)
+        self.downloader = downloader or MediaDownloadManager(str(self.output_dir))
         logger.info(f"Initialized ListeningAudioExtractor with output dir: {self.output_dir}")
     
     def extract_audio_from_row(self, audio_row: Tag, section_num: int) -> Dict:
@@ -195,61 +203,68 @@ class ListeningAudioExtractor:
             >>> download_audio_file("https://example.com/audio.mp3", 3, 1)
             "listening/practice/test_03/listening_test_03_section_1.mp3"
         """
+        return self.audio_file_result(self.submit_audio_file(audio_url, test_num, section_num, force), audio_url)
+    
+    def submit_audio_file(self, audio_url: str, test_num: int,
+                          section_num: int, force: bool = False) -> Optional[Future]:
+        """
+        Start downloading a section's audio file on the download pool.
+        
+        Lets a test's sections download in parallel while the rest of the
+        page is parsed; pass the future to audio_file_result() for the path.
+        
+        Args:
+            audio_url: URL of the audio file to download
+            test_num: Test number (e.g., 1, 2, 3)
+            section_num: Section number (1-4)
+            force: Force re-download even if file exists
+            
+        Returns:
+            Future for the download, or None if there is no URL
+        """
         if not audio_url:
             logger.warning(f"No audio URL provided for test {test_num} section {section_num}")
             return None
         
-        try:
-            # Create directory structure: listening/practice/test_{num}/
-            test_dir = self.output_dir / "listening" / "practice" / f"test_{test_num:02d}"
-            test_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Determine file format from URL
-            file_format = self._get_format_from_url(audio_url)
-            
-            # Generate filename: listening_test_{num}_section_{section}.mp3
-            filename = f"listening_test_{test_num:02d}_section_{section_num}.{file_format}"
-            local_path = test_dir / filename
-            
-            # Check if file already exists
-            if local_path.exists() and not force:
-                file_size = local_path.stat().st_size
-                if file_size > 0:
-                    logger.info(f"Audio file already exists, skipping: {local_path}")
-                    # Return relative path from media directory
-                    return self._normalize_path(local_path)
-            
-            # Download the file
-            logger.info(f"Downloading audio from: {audio_url}")
-            response = requests.get(audio_url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            # Write file in chunks
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            # Verify file integrity
-            file_size = local_path.stat().st_size
-            if file_size == 0:
-                local_path.unlink()  # Delete empty file
-                logger.warning(f"Downloaded file is empty: {local_path}")
-                return None
-            
-            logger.info(f"Successfully downloaded: {filename} ({file_size} bytes)")
-            
-            # Return relative path from media directory
-            return self._normalize_path(local_path)
+        # Create directory structure: listening/practice/test_{num}/
+        test_dir = self.output_dir / "listening" / "practice" / f"test_{test_num:02d}"
+        
+        # Determine file format from URL
+        file_format = self._get_format_from_url(audio_url)
+        
+        # Generate filename: listening_test_{num}_section_{section}.mp3
+        filename = f"listening_test_{test_num:02d}_section_{section_num}.{file_format}"
+        
+        logger.debug(f"Queued audio download: {audio_url}")
+        return self.downloader.submit(audio_url, test_dir / filename, force)
+    
+    def audio_file_result(self, future: Optional[Future], audio_url: str) -> Optional[str]:
+        """
+        Wait for a download started by submit_audio_file().
+        
+        Requirement 2.4: Handle download errors gracefully (log warning, return None)
+        
+        Args:
+            future: Future returned by submit_audio_file
+            audio_url: URL of the audio file, for the log message
             
+        Returns:
+            Local file path (relative) or None if the download failed
+        """
+        if future is None:
+            return None
+        
+        try:
+            result = future.result()
         except requests.RequestException as e:
             logger.warning(f"Failed to download audio from {audio_url}: {e}")
             return None
         except Exception as e:
             logger.warning(f"Error downloading audio file: {e}")
-            if local_path.exists():
-                local_path.unlink()  # Clean up partial download
             return None
+        
+        # Return relative path from media directory
+        return self._normalize_path(result.path)
     
     def _get_format_from_url(self, url: str) -> str:
         """
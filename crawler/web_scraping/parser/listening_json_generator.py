@@ -33,6 +33,11 @@ except ImportError:
         UI_COMPONENT_MAP
     )
 
+try:
+    from .output_sink import OutputSink, FileSink
+except ImportError:
+    from output_sink import OutputSink, FileSink
+
 try:
     from .media_downloader import MediaFile
 except ImportError:
@@ -96,6 +101,15 @@ class ListeningJSONGenerator:
     - Validation results
     """
     
+    def __init__(self, sink: Optional[OutputSink] = None):
+        """
+        Initialize generator
+        
+        Args:
+            sink: Where save_to_file() writes (default: one file per test, written atomically)
+        """
+        self.sink = sink or FileSink()
+    
     def generate(
         self,
         metadata: Dict,
@@ -390,11 +404,7 @@ class ListeningJSONGenerator:
             pretty: If True, use pretty printing
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                if pretty:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                else:
-                    json.dump(data, f, ensure_ascii=False)
+            self.sink.write(output_path, data, pretty)
             
             logger.info(f"Saved JSON output to: {output_path}")
         except Exception as e:
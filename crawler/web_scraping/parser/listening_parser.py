@@ -9,7 +9,6 @@ from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import json
 import logging
-import re
 from bs4 import BeautifulSoup, Tag
 
 from parser.media_downloader import MediaDownloader, MediaFile
@@ -30,6 +29,14 @@ from parser.listening_json_generator import ListeningJSONGenerator
 from parser.exceptions import ParserError, ContentExtractionError, AnswerExtractionError, HTMLParsingError
 from parser.content_validator import ContentValidator
 from parser.text_utils import TextUtils
+from parser.patterns import (
+    LISTENING_SECTION_PATTERN,
+    LISTENING_OPTION_PATTERN,
+    LISTENING_BLANK_PATTERN,
+    LISTENING_DOTS_PATTERN,
+    LISTENING_QUESTION_BOUNDARY_PATTERNS,
+    LISTENING_TEST_NUMBER_PATTERN
+)
 
 logger = logging.getLogger(__name__)
 
@@ -227,12 +234,12 @@ class ListeningQuestionClassifier:
             return ListeningQuestionType.TABLE_COMPLETION
         
         # Check for option lists (A, B, C, D)
-        if re.search(r"[A-D][\.\):]", content_text):
+        if LISTENING_OPTION_PATTERN.search(content_text):
             logger.info("Inferred MULTIPLE_CHOICE_SINGLE from option pattern")
             return ListeningQuestionType.MULTIPLE_CHOICE_SINGLE
         
         # Check for numbered blanks or gaps
-        if re.search(r"\b\d+\b.*?_+", content_text) or re.search(r"\.{3,}", content_text):
+        if LISTENING_BLANK_PATTERN.search(content_text) or LISTENING_DOTS_PATTERN.search(content_text):
             logger.info("Inferred completion type from blank pattern")
             return ListeningQuestionType.SENTENCE_COMPLETION
         
@@ -251,7 +258,7 @@ class SectionDetector:
     """
     
     # Pattern to match section headings like "SECTION 1", "Section 2", etc.
-    SECTION_PATTERN = re.compile(r'SECTION\s+([1-4])', re.IGNORECASE)
+    SECTION_PATTERN = LISTENING_SECTION_PATTERN
     
     def detect_sections(self, soup: BeautifulSoup) -> List[Tag]:
         """
@@ -377,16 +384,6 @@ class SectionDetector:
         
         context_parts = []
         
-        # Question boundary markers
-        question_boundary_patterns = [
-            r'[Qq]uestions?\s+\d+',  # Questions 1-10
-            r'^\d+[\.\)]\s',  # Question number at start (1. or 1))
-            r'[Cc]omplete\s+the',  # Complete the form/table/etc
-            r'[Cc]hoose\s+(?:the|two|three)',  # Choose instructions
-            r'[Ww]rite\s+(?:NO\s+MORE|ONE\s+WORD)',  # Write instructions
-            r'[Mm]atch\s+',  # Match instructions
-            r'[Ll]abel\s+',  # Label instructions
-        ]
         
         # Look at the next siblings after the section heading
         current = section_tag.next_sibling
@@ -410,7 +407,7 @@ class SectionDetector:
                 break
             
             # Stop if we hit a question boundary marker
-            is_question_boundary = any(re.search(pattern, text) for pattern in question_boundary_patterns)
+            is_question_boundary = any(pattern.search(text) for pattern in LISTENING_QUESTION_BOUNDARY_PATTERNS)
             if is_question_boundary:
                 logger.debug(f"Stopped context extraction at question boundary: {text[:50]}...")
                 break
@@ -682,7 +679,7 @@ class IELTSListeningParser:
     
     def _extract_test_number(self, source: str) -> int:
         """Extract test number from URL or filename"""
-        match = re.search(r'test[-_]?(\d+)', source, re.I)
+        match = LISTENING_TEST_NUMBER_PATTERN.search(source)
         if match:
             return int(match.group(1))
         return 0
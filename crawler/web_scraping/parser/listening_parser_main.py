@@ -23,17 +23,22 @@ import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 # Import all components
 try:
     from .url_generator import URLGenerator
     from .html_crawler import HTMLCrawler, CrawlProgress
+    from .html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from .parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from .parse_engine import ParseEngine
+    from .html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from .listening_section_detector import ListeningSectionDetector
     from .listening_audio_extractor import ListeningAudioExtractor
+    from .media_download_manager import MediaDownloadManager, DEFAULT_MEDIA_WORKERS
     from .listening_question_extractor import ListeningQuestionExtractor
     from .listening_answer_extractor import ListeningAnswerExtractor
     from .listening_json_generator import ListeningJSONGenerator
+    from .output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, create_output_sink, write_json_file
     from .listening_validator import ListeningValidator
     from .logging_config import setup_logging, get_logger
     from .exceptions import ParserError, HTMLParsingError, ContentExtractionError, AnswerExtractionError
@@ -41,11 +46,17 @@ try:
 except ImportError:
     from url_generator import URLGenerator
     from html_crawler import HTMLCrawler, CrawlProgress
+    from html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from parse_engine import ParseEngine
+    from html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from listening_section_detector import ListeningSectionDetector
     from listening_audio_extractor import ListeningAudioExtractor
+    from media_download_manager import MediaDownloadManager, DEFAULT_MEDIA_WORKERS
     from listening_question_extractor import ListeningQuestionExtractor
     from listening_answer_extractor import ListeningAnswerExtractor
     from listening_json_generator import ListeningJSONGenerator
+    from output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, create_output_sink, write_json_file
     from listening_validator import ListeningValidator
     from logging_config import setup_logging, get_logger
     from exceptions import ParserError, HTMLParsingError, ContentExtractionError, AnswerExtractionError
@@ -160,7 +171,15 @@ class ListeningTestParser:
         media_dir: str = "web_scraping/media",
         delay: float = 0.35,
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        concurrency: int = 1,
+        workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[str] = None,
+        from_cache: bool = False,
+        html_parser: str = HTML_PARSER,
+        media_workers: int = DEFAULT_MEDIA_WORKERS,
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        async_writes: bool = False
     ):
         """
         Initialize the listening test parser.
@@ -171,6 +190,14 @@ class ListeningTestParser:
             delay: Delay between requests in seconds
             timeout: Request timeout in seconds
             max_retries: Maximum retry attempts for failed requests
+            concurrency: Number of pages downloaded in parallel (per-host delay still applies)
+            workers: Parse processes used by process_batch (0 parses in this process)
+            cache_dir: Raw HTML cache directory (None disables caching)
+            from_cache: Parse cached pages only, without network requests
+            html_parser: BeautifulSoup tree builder for pages ('html.parser' or 'lxml')
+            media_workers: Audio files downloaded in parallel (per parse process)
+            output_format: 'files' (one JSON file per test) or 'jsonl' (sharded bundles in output_dir)
+            async_writes: Write JSON on a background thread while the next page is parsed
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -178,14 +205,31 @@ class ListeningTestParser:
         self.media_dir = Path(media_dir)
         self.media_dir.mkdir(parents=True, exist_ok=True)
         
+        self.workers = workers
+        self.html_parser = check_html_parser(html_parser)
+        self.media_workers = media_workers
+        self.output_format = output_format
+        self.async_writes = async_writes
+        
         # Initialize all components
         self.url_generator = ListeningURLGenerator()
-        self.crawler = HTMLCrawler(delay=delay, timeout=timeout, max_retries=max_retries)
+        self.crawler = HTMLCrawler(
+            delay=delay,
+            timeout=timeout,
+            max_retries=max_retries,
+            concurrency=concurrency,
+            cache=HTMLCache(cache_dir) if cache_dir else None,
+            offline=from_cache
+        )
         self.section_detector = ListeningSectionDetector()
-        self.audio_extractor = ListeningAudioExtractor(output_dir=str(media_dir))
+        self.audio_extractor = ListeningAudioExtractor(
+            output_dir=str(media_dir),
+            downloader=MediaDownloadManager(str(media_dir), max_workers=media_workers, timeout=timeout)
+        )
         self.question_extractor = ListeningQuestionExtractor()
         self.answer_extractor = ListeningAnswerExtractor()
-        self.json_generator = ListeningJSONGenerator()
+        self.output_sink = create_output_sink(output_format, self.output_dir, 'listening', async_writes)
+        self.json_generator = ListeningJSONGenerator(self.output_sink)
         self.validator = ListeningValidator()
         
         logger.info(f"ListeningTestParser initialized (output_dir={output_dir}, media_dir={media_dir})")
@@ -216,8 +260,9 @@ class ListeningTestParser:
         try:
             logger.info(f"Parsing test {test_number}")
             
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Parse the page once; the extractors read this tree without re-parsing it
+            document = HTMLDocument(html_content, self.html_parser)
+            soup = document.soup
             
             # Step 1 & 2: Detect sections using row-based detection
             sections_dict = self.section_detector.detect_sections_by_rows(soup)
@@ -231,21 +276,31 @@ class ListeningTestParser:
             sections = []
             question_blocks = []
             
+            # Extract audio information and start every section's audio download,
+            # so the sections' audio files download in parallel
+            audio_infos = {}
+            audio_downloads = {}
+            for section_num in sorted(sections_dict.keys()):
+                audio_row = sections_dict[section_num].get('audio_row')
+                audio_infos[section_num] = self.audio_extractor.extract_audio_from_row(audio_row, section_num)
+                if download_media and audio_infos[section_num].get('audio_url'):
+                    audio_downloads[section_num] = self.audio_extractor.submit_audio_file(
+                        audio_infos[section_num]['audio_url'],
+                        test_number,
+                        section_num
+                    )
+            
             for section_num in sorted(sections_dict.keys()):
                 section_data = sections_dict[section_num]
-                audio_row = section_data.get('audio_row')
                 question_row = section_data.get('question_row')
+                audio_info = audio_infos[section_num]
                 
-                # Extract audio information
-                audio_info = self.audio_extractor.extract_audio_from_row(audio_row, section_num)
-                
-                # Download audio file if requested
+                # Wait for the audio file if it is being downloaded
                 audio_file_path = None
-                if download_media and audio_info.get('audio_url'):
-                    audio_file_path = self.audio_extractor.download_audio_file(
-                        audio_info['audio_url'],
-                        test_number,
-                        section_num
+                if section_num in audio_downloads:
+                    audio_file_path = self.audio_extractor.audio_file_result(
+                        audio_downloads[section_num],
+                        audio_info['audio_url']
                     )
                     if not audio_file_path:
                         logger.warning(f"Test {test_number}: Failed to download audio for section {section_num}")
@@ -348,7 +403,7 @@ class ListeningTestParser:
             # Check if output already exists
             output_path = self.output_dir / f"listening_test_{test_number:02d}.json"
             
-            if output_path.exists() and not force:
+            if not force and self.output_sink.exists(output_path):
                 logger.info(f"Test {test_number}: Output already exists, skipping")
                 return True
             
@@ -378,6 +433,7 @@ class ListeningTestParser:
             
             # Save JSON
             self.json_generator.save_to_file(json_data, str(output_path))
+            self.output_sink.flush()
             logger.info(f"Test {test_number}: Successfully saved to {output_path}")
             
             return True
@@ -444,69 +500,105 @@ class ListeningTestParser:
         # Generate URLs
         urls = [(i, self.url_generator.generate_listening_url(i)) for i in range(start, end + 1)]
         
-        # Download all pages (crawler has its own retry logic)
-        download_progress_path = Path(progress_file) if progress_file else Path("crawler_progress.json")
-        download_result = self.crawler.download_batch(
-            urls=urls,
-            output_dir=self.output_dir,
-            skip_existing=not force,
-            progress_file=download_progress_path,
-            force=force
-        )
-        
-        downloaded_pages = download_result['downloaded_pages']
-        
-        # Parse and save each downloaded page with retry logic
+        # Parse and save each page as it arrives, with retry logic
         successful = 0
         failed = 0
         skipped = 0
         error_details = []  # Track detailed error information
+        handed_off = set()
         
-        for test_number in range(start, end + 1):
-            # Check progress file before processing (skip already processed tests unless --force)
+        def on_page(test_number: int, html_content: str) -> None:
+            nonlocal skipped
+            handed_off.add(test_number)
             output_path = self.output_dir / f"listening_test_{test_number:02d}.json"
             
+            # Check progress file before processing (skip already processed tests unless --force)
             if not force and test_number in parse_progress.get('completed_tests', []):
-                if output_path.exists():
+                if self.output_sink.exists(output_path):
                     logger.debug(f"Test {test_number}: Already processed (in progress file), skipping")
                     skipped += 1
-                    continue
+                    return
             
-            # Check if we have downloaded content
-            if test_number not in downloaded_pages:
-                # Check if output already exists
-                if output_path.exists() and not force:
-                    logger.debug(f"Test {test_number}: Already processed, skipping")
-                    skipped += 1
-                    continue
-                else:
-                    error_msg = f"Test {test_number}: Not downloaded and no existing output"
-                    logger.warning(error_msg)
-                    failed += 1
-                    error_details.append({
-                        'test_number': test_number,
-                        'error_type': 'download_failed',
-                        'error_message': error_msg
-                    })
-                    self._update_progress(parse_progress, progress_path, test_number, 'failed')
-                    continue
+            try:
+                pipeline.submit(test_number, test_number, html_content, output_path, download_media, skip_validation)
+            except Exception as e:
+                # Never reached the pipeline, so on_result would not report it
+                on_result(test_number, None, e)
+                raise
+        
+        def on_result(test_number: int, error_detail: Optional[Dict], error: Optional[BaseException]) -> None:
+            nonlocal successful, failed
+            if error is not None:
+                error_detail = {
+                    'test_number': test_number,
+                    'error_type': type(error).__name__,
+                    'error_message': str(error)
+                }
+                logger.error(f"Test {test_number}: Error during processing: {error}")
             
-            # Process test with retry logic
-            success = self._process_test_with_retry(
-                test_number=test_number,
-                html_content=downloaded_pages[test_number],
-                output_path=output_path,
-                download_media=download_media,
-                skip_validation=skip_validation,
-                parse_progress=parse_progress,
-                progress_path=progress_path,
-                error_details=error_details
+            if error_detail is None:
+                # Save progress to JSON file after each test
+                self._update_progress(parse_progress, progress_path, test_number, 'completed')
+                successful += 1
+            else:
+                error_details.append(error_detail)
+                self._update_progress(parse_progress, progress_path, test_number, 'failed')
+                failed += 1
+        
+        # Download pages (crawler has its own retry logic); the pipeline holds up
+        # downloads while its queue is full
+        download_progress_path = Path(progress_file) if progress_file else Path("crawler_progress.json")
+        with ParsePipeline(
+            ParseEngine,
+            {
+                'test_type': 'listening',
+                'output_dir': str(self.output_dir),
+                'media_dir': str(self.media_dir),
+                'html_parser': self.html_parser,
+                'media_workers': self.media_workers,
+                'output_format': self.output_format,
+                'async_writes': self.async_writes
+            },
+            'parse_and_save',
+            on_result,
+            workers=self.workers,
+            inline_target=self
+        ) as pipeline:
+            download_result = self.crawler.download_batch(
+                urls=urls,
+                output_dir=self.output_dir,
+                skip_existing=not force,
+                progress_file=download_progress_path,
+                force=force,
+                on_page=on_page,
+                output_exists=lambda test_number: self.output_sink.exists(
+                    self.output_dir / f"listening_test_{test_number:02d}.json"
+                )
             )
+        
+        # Parse workers flush their own sinks when they exit
+        self.output_sink.flush()
+        
+        # Tests the crawler didn't hand over were skipped or failed to download
+        for test_number in range(start, end + 1):
+            if test_number in handed_off:
+                continue
             
-            if success:
-                successful += 1
+            # Check if output already exists
+            output_path = self.output_dir / f"listening_test_{test_number:02d}.json"
+            if not force and self.output_sink.exists(output_path):
+                logger.debug(f"Test {test_number}: Already processed, skipping")
+                skipped += 1
             else:
+                error_msg = f"Test {test_number}: Not downloaded and no existing output"
+                logger.warning(error_msg)
                 failed += 1
+                error_details.append({
+                    'test_number': test_number,
+                    'error_type': 'download_failed',
+                    'error_message': error_msg
+                })
+                self._update_progress(parse_progress, progress_path, test_number, 'failed')
         
         # Calculate duration
         end_time = datetime.now()
@@ -558,20 +650,25 @@ class ListeningTestParser:
         
         return summary
     
-    def _process_test_with_retry(
+    def close(self) -> None:
+        """Finish queued JSON writes and audio downloads"""
+        self.output_sink.close()
+        self.audio_extractor.downloader.close()
+    
+    def parse_and_save(
         self,
         test_number: int,
         html_content: str,
         output_path: Path,
         download_media: bool,
         skip_validation: bool,
-        parse_progress: Dict,
-        progress_path: Path,
-        error_details: List[Dict],
         max_retries: int = 3
-    ) -> bool:
+    ) -> Optional[Dict]:
         """
-        Process a single test with retry logic and exponential backoff.
+        Parse a downloaded test and save its JSON, with retry logic and exponential backoff.
+        
+        Parse stage of process_batch; runs in a ParsePipeline worker process,
+        so progress is recorded by the caller.
         
         Args:
             test_number: Test number to process
@@ -579,13 +676,10 @@ class ListeningTestParser:
             output_path: Path to save JSON output
             download_media: Whether to download audio files
             skip_validation: Skip content validation
-            parse_progress: Progress tracking dictionary
-            progress_path: Path to progress file
-            error_details: List to append error details to
             max_retries: Maximum number of retry attempts
             
         Returns:
-            True if successful, False otherwise
+            None if successful, otherwise error details for the summary report
             
         Requirements: 5.4, 7.4, 7.5
         """
@@ -614,24 +708,19 @@ class ListeningTestParser:
                         continue
                     else:
                         # Max retries exceeded
-                        error_details.append({
+                        return {
                             'test_number': test_number,
                             'error_type': 'parsing_failed',
                             'error_message': 'Parsing returned None after all retries',
                             'attempts': max_retries
-                        })
-                        self._update_progress(parse_progress, progress_path, test_number, 'failed')
-                        return False
+                        }
                 
                 # Save JSON
                 self.json_generator.save_to_file(json_data, str(output_path))
                 
                 logger.info(f"Test {test_number}: Successfully processed")
                 
-                # Save progress to JSON file after each test
-                self._update_progress(parse_progress, progress_path, test_number, 'completed')
-                
-                return True
+                return None
                 
             except Exception as e:
                 error_msg = f"Test {test_number}: Error during processing (attempt {attempt + 1}/{max_retries}): {e}"
@@ -645,17 +734,20 @@ class ListeningTestParser:
                     continue
                 else:
                     # Max retries exceeded - log error with test number and details
-                    error_details.append({
+                    logger.error(f"Test {test_number}: Max retries ({max_retries}) exceeded")
+                    return {
                         'test_number': test_number,
                         'error_type': type(e).__name__,
                         'error_message': str(e),
                         'attempts': max_retries
-                    })
-                    self._update_progress(parse_progress, progress_path, test_number, 'failed')
-                    logger.error(f"Test {test_number}: Max retries ({max_retries}) exceeded")
-                    return False
+                    }
         
-        return False
+        return {
+            'test_number': test_number,
+            'error_type': 'parsing_failed',
+            'error_message': 'No parse attempts were made',
+            'attempts': max_retries
+        }
     
     def _load_progress(self, progress_file: Path) -> Dict[str, Any]:
         """
@@ -722,8 +814,7 @@ class ListeningTestParser:
             # Ensure directory exists
             progress_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump(progress, f, indent=2)
+            write_json_file(progress_file, progress)
                 
         except Exception as e:
             logger.error(f"Failed to save progress: {e}")
@@ -762,8 +853,7 @@ class ListeningTestParser:
             }
             
             # Save report
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            write_json_file(report_file, report)
             
             logger.info(f"Summary report saved to: {report_file}")
             
@@ -1000,6 +1090,61 @@ Examples:
         default=3,
         help='Maximum retry attempts (default: 3)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of parallel downloads; --delay still spaces requests per host (default: 1)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Parse processes; pages are parsed while the rest download, 0 parses in-process (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '--media-workers',
+        type=int,
+        default=DEFAULT_MEDIA_WORKERS,
+        help=f'Audio files downloaded in parallel per parse process (default: {DEFAULT_MEDIA_WORKERS})'
+    )
+    
+    # Raw HTML cache options
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'Raw HTML cache; cached pages are revalidated with conditional GETs (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not store or revalidate raw HTML'
+    )
+    parser.add_argument(
+        '--from-cache',
+        action='store_true',
+        help='Reparse from the raw HTML cache only, without network requests (implies --force)'
+    )
+    parser.add_argument(
+        '--html-parser',
+        choices=HTML_PARSERS,
+        default=HTML_PARSER,
+        help=f'BeautifulSoup parser for pages; lxml is faster, check it with parser_compat first (default: {HTML_PARSER})'
+    )
+    
+    # JSON output options
+    parser.add_argument(
+        '--output-format',
+        choices=OUTPUT_FORMATS,
+        default=DEFAULT_OUTPUT_FORMAT,
+        help=f'files: one JSON file per test; jsonl: sharded bundles for bulk export (default: {DEFAULT_OUTPUT_FORMAT})'
+    )
+    parser.add_argument(
+        '--async-writes',
+        action='store_true',
+        help='Write JSON on a background thread while the next page is parsed'
+    )
     
     # Logging options
     parser.add_argument(
@@ -1026,6 +1171,16 @@ Examples:
         parser.error("--start requires --end")
     if args.end and not args.start:
         parser.error("--end requires --start")
+    if args.from_cache and args.no_cache:
+        parser.error("--from-cache can't be used with --no-cache")
+    try:
+        check_html_parser(args.html_parser)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Reparsing from the cache redoes tests that already have output
+    if args.from_cache:
+        args.force = True
     
     # Setup logging
     log_level = 'DEBUG' if args.verbose else 'INFO'
@@ -1046,7 +1201,15 @@ Examples:
         media_dir=args.media_dir,
         delay=args.delay,
         timeout=args.timeout,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        from_cache=args.from_cache,
+        html_parser=args.html_parser,
+        media_workers=args.media_workers,
+        output_format=args.output_format,
+        async_writes=args.async_writes
     )
     
     try:
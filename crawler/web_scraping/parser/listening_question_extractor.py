@@ -5,8 +5,9 @@ This module provides the ListeningQuestionExtractor class for extracting questio
 from IELTS listening test HTML while preserving the original HTML structure.
 """
 
-from bs4 import Tag, BeautifulSoup
+from bs4 import Tag
 from typing import List, Dict
+import copy
 import re
 import logging
 from urllib.parse import urljoin
@@ -105,11 +106,16 @@ class ListeningQuestionExtractor:
         if not content:
             return ""
         
-        # Clone the content to avoid modifying the original
-        content_copy = BeautifulSoup(str(content), 'html.parser')
+        # Copy the content only if image URLs need rewriting, so the page tree
+        # isn't modified (copying doesn't re-parse)
+        has_relative_images = any(
+            not img['src'].startswith(('http://', 'https://', '//'))
+            for img in self._find_images(content) if img.get('src', '')
+        )
+        content_copy = copy.copy(content) if has_relative_images else content
         
         # Convert relative image URLs to absolute
-        for img in content_copy.find_all('img'):
+        for img in self._find_images(content_copy):
             src = img.get('src', '')
             if src and not src.startswith(('http://', 'https://', '//')):
                 # Convert relative URL to absolute
@@ -124,3 +130,10 @@ class ListeningQuestionExtractor:
         logger.debug(f"Preserved HTML structure ({len(html_str)} chars)")
         return html_str
 
+    def _find_images(self, content: Tag) -> List[Tag]:
+        """Find the img tags in content, including content itself"""
+        images = content.find_all('img')
+        if content.name == 'img':
+            images.insert(0, content)
+        return images
+
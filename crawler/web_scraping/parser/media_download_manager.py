@@ -0,0 +1,407 @@
+"""
+Media Download Manager
+
+Downloads listening audio for MediaDownloader and ListeningAudioExtractor.
+One manager keeps a pooled HTTP session per download thread and runs
+downloads on a thread pool, so the sections of a test download in parallel
+(and, with parse workers, several tests at once).
+
+- A download goes to <file>.part, which is kept if the download fails and
+  resumed with an HTTP Range request on the next attempt or run. The
+  response's ETag or Last-Modified is kept in <file>.part.validator and
+  sent as If-Range, so a file that changed on the server is fetched again
+  from the start instead of being spliced onto the old part.
+- Audio is read in large chunks and written through a large buffer.
+- Finished files are recorded with their SHA-256 in an index in the media
+  directory. A URL that was already downloaded, or content already stored
+  under another name, is hard-linked instead of being stored twice.
+
+Layout:
+    <media_dir>/media_index.jsonl   one JSON line per stored file (last line per URL wins)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Parallel downloads per manager
+DEFAULT_MEDIA_WORKERS = 4
+
+# Bytes read from the response at a time, and the file write buffer
+CHUNK_SIZE = 256 * 1024
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class MediaIndexEntry:
+    """Index entry for a stored media file"""
+    url: str
+    path: str  # Relative to the media directory
+    sha256: str
+    size: int
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a media download"""
+    url: str
+    path: Path
+    size: int
+    status: str  # 'downloaded', 'resumed', 'linked' or 'exists'
+    sha256: Optional[str] = None
+
+
+class MediaDownloadManager:
+    """
+    Pooled, resumable media downloads with checksum dedupe
+    
+    Thread-safe. Parse worker processes each create their own manager and
+    share the index file; lines are appended whole, so they don't interleave.
+    
+    Usage:
+        manager = MediaDownloadManager("web_scraping/media")
+        future = manager.submit(url, Path("web_scraping/media/listening/test_01/section_1.mp3"))
+        result = future.result()
+    """
+    
+    INDEX_FILE = 'media_index.jsonl'
+    PART_SUFFIX = '.part'
+    VALIDATOR_SUFFIX = '.validator'
+    
+    def __init__(
+        self,
+        media_dir: str,
+        max_workers: int = DEFAULT_MEDIA_WORKERS,
+        timeout: int = 30,
+        max_retries: int = 3,
+        user_agent: str = "IELTSReaderBot/2.0 (+for education; polite crawling)"
+    ):
+        """
+        Initialize the manager
+        
+        Args:
+            media_dir: Media root; downloads must be inside it to be indexed
+            max_workers: Parallel downloads (default: 4)
+            timeout: Request timeout in seconds (default: 30)
+            max_retries: Retries after a connection error or server error, resuming each time (default: 3)
+            user_agent: User-Agent header
+        """
+        self.media_dir = Path(media_dir)
+        self.index_file = self.media_dir / self.INDEX_FILE
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.user_agent = user_agent
+        
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._thread_local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # Latest entry per URL and per checksum
+        self._by_url: Dict[str, MediaIndexEntry] = {}
+        self._by_sha256: Dict[str, MediaIndexEntry] = {}
+        self._load_index()
+    
+    def __enter__(self) -> 'MediaDownloadManager':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _load_index(self) -> None:
+        """Read the media index, skipping unreadable lines"""
+        if not self.index_file.exists():
+            return
+        
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = MediaIndexEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    logger.warning(f"Skipping bad media index line {line_number}")
+                    continue
+                self._by_url[entry.url] = entry
+                self._by_sha256[entry.sha256] = entry
+        
+        logger.info(f"Media index: {len(self._by_sha256)} files in {self.media_dir}")
+    
+    def _record(self, entry: MediaIndexEntry) -> None:
+        """Add an index entry and append it to the index file"""
+        with self._lock:
+            self._by_url[entry.url] = entry
+            self._by_sha256[entry.sha256] = entry
+            self.media_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(asdict(entry)) + '\n')
+    
+    def _stored_file(self, entry: Optional[MediaIndexEntry]) -> Optional[Path]:
+        """Path of an indexed file, if it is still on disk with the indexed size"""
+        if entry is None:
+            return None
+        path = self.media_dir / entry.path
+        try:
+            return path if path.stat().st_size == entry.size else None
+        except OSError:
+            return None
+    
+    def _relative_path(self, path: Path) -> Optional[str]:
+        """Path relative to the media directory with forward slashes, or None if outside it"""
+        try:
+            return path.resolve().relative_to(self.media_dir.resolve()).as_posix()
+        except ValueError:
+            return None
+    
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session for media downloads"""
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': self.user_agent,
+            # Byte ranges must refer to the file itself, not a compressed encoding
+            'Accept-Encoding': 'identity',
+            'Connection': 'keep-alive',
+        })
+        adapter = HTTPAdapter(pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _get_session(self) -> requests.Session:
+        """Session for the calling thread (requests.Session isn't thread-safe)"""
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = self._create_session()
+        return session
+    
+    def _url_lock(self, url: str) -> threading.Lock:
+        """Lock held while a URL downloads, so a second request for it waits and links"""
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+    
+    def submit(self, url: str, path: Path, force: bool = False) -> 'Future[DownloadResult]':
+        """
+        Start a download on the download pool
+        
+        Returns:
+            Future for download(url, path, force)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="media")
+            return self._executor.submit(self.download, url, path, force)
+    
+    def download(self, url: str, path: Path, force: bool = False) -> DownloadResult:
+        """
+        Download a media file
+        
+        An existing non-empty file is kept unless force is set. A URL that is
+        already stored elsewhere is linked without a request.
+        
+        Args:
+            url: Media URL
+            path: Local file path
+            force: Download again even if the file or URL is already stored
+        
+        Returns:
+            DownloadResult for the file
+        
+        Raises:
+            ValueError: If the downloaded file is empty
+            requests.RequestException: If the HTTP request fails (a partial file is kept for resuming)
+        """
+        path = Path(path)
+        if not force and path.exists():
+            size = path.stat().st_size
+            if size > 0:
+                logger.info(f"Audio file already exists, skipping: {path}")
+                return DownloadResult(url=url, path=path, size=size, status='exists')
+        
+        with self._url_lock(url):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Same URL stored under another name (e.g. audio shared between tests)
+            entry = self._by_url.get(url)
+            existing = None if force else self._stored_file(entry)
+            if existing is not None and existing.resolve() != path.resolve():
+                self._link(existing, path)
+                logger.info(f"Linked audio already downloaded from {url}: {path}")
+                return DownloadResult(url=url, path=path, size=entry.size, status='linked', sha256=entry.sha256)
+            
+            start = time.perf_counter()
+            part_path = path.with_name(path.name + self.PART_SUFFIX)
+            sha256, resumed = self._fetch_with_retries(url, part_path)
+            
+            self._validator_path(part_path).unlink(missing_ok=True)
+            size = part_path.stat().st_size
+            if size == 0:
+                part_path.unlink()
+                raise ValueError(f"Downloaded file is empty: {path}")
+            
+            # Same content already stored under another name
+            duplicate = self._stored_file(self._by_sha256.get(sha256))
+            if duplicate is not None and duplicate.resolve() != path.resolve() and self._link(duplicate, path, copy_fallback=False):
+                part_path.unlink()
+                status = 'linked'
+            else:
+                os.replace(part_path, path)
+                status = 'resumed' if resumed else 'downloaded'
+            
+            relative_path = self._relative_path(path)
+            if relative_path is not None:
+                self._record(MediaIndexEntry(url=url, path=relative_path, sha256=sha256, size=size))
+            
+            logger.info(f"Downloaded {path.name} ({size} bytes, {status}) in {time.perf_counter() - start:.1f}s")
+            return DownloadResult(url=url, path=path, size=size, status=status, sha256=sha256)
+    
+    def _link(self, source: Path, path: Path, copy_fallback: bool = True) -> bool:
+        """
+        Point path at source's content with a hard link
+        
+        Args:
+            source: Stored file
+            path: Path to create or replace
+            copy_fallback: Copy source if the file system can't link it
+        
+        Returns:
+            True if path now has source's content
+        """
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError as e:
+            if not copy_fallback:
+                logger.debug(f"Could not link {path} to {source}: {e}")
+                return False
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    
+    def _fetch_with_retries(self, url: str, part_path: Path) -> Tuple[str, bool]:
+        """
+        Fetch a URL into a part file, resuming after connection and server errors
+        
+        Returns:
+            Tuple of (SHA-256 of the file, whether an earlier part was resumed)
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._fetch(url, part_path)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code < 500:
+                    raise
+                error = e
+            
+            if attempt == self.max_retries:
+                raise error
+            backoff_delay = 2 ** attempt
+            logger.info(f"Audio download interrupted ({error}); resuming in {backoff_delay}s")
+            time.sleep(backoff_delay)
+    
+    def _fetch(self, url: str, part_path: Path) -> Tuple[str, bool]:
+        """
+        Fetch a URL into a part file, continuing from the bytes already in it
+        
+        Returns:
+            Tuple of (SHA-256 of the complete file, whether the part was resumed)
+        """
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        validator = self._read_validator(part_path, url) if offset else None
+        if offset and validator is None:
+            # Can't tell whether the part still matches the file on the server
+            logger.info(f"No validator for {part_path.name}, downloading from the start")
+            offset = 0
+        headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if offset else {}
+        
+        with self._get_session().get(url, stream=True, timeout=self.timeout, headers=headers) as response:
+            if offset and response.status_code == 416:
+                # Nothing left to fetch if the part already has every byte
+                if response.headers.get('Content-Range', '') == f'bytes */{offset}':
+                    return self._hash_file(part_path), True
+                part_path.unlink()
+                return self._fetch(url, part_path)
+            
+            response.raise_for_status()
+            
+            # Start over if the file changed (If-Range answers 200), or the server
+            # ignored the range or answered a different one
+            if offset and not (
+                response.status_code == 206
+                and response.headers.get('Content-Range', '').startswith(f'bytes {offset}-')
+            ):
+                offset = 0
+            
+            hasher = hashlib.sha256()
+            if offset:
+                logger.info(f"Resuming {part_path.name} at byte {offset}")
+                self._hash_file(part_path, hasher)
+            else:
+                self._write_validator(part_path, url, self._response_validator(response))
+            
+            with open(part_path, 'ab' if offset else 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        hasher.update(chunk)
+        
+        return hasher.hexdigest(), offset > 0
+    
+    def _validator_path(self, part_path: Path) -> Path:
+        """Sidecar file holding the If-Range validator of a part file"""
+        return part_path.with_name(part_path.name + self.VALIDATOR_SUFFIX)
+    
+    def _read_validator(self, part_path: Path, url: str) -> Optional[str]:
+        """If-Range value recorded when the part file was started from this URL"""
+        try:
+            data = json.loads(self._validator_path(part_path).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('url') != url:
+            return None
+        return data.get('if_range')
+    
+    def _write_validator(self, part_path: Path, url: str, validator: Optional[str]) -> None:
+        """Record the validator of a part file that is being started (or forget it)"""
+        validator_path = self._validator_path(part_path)
+        if validator is None:
+            validator_path.unlink(missing_ok=True)
+            return
+        validator_path.write_text(json.dumps({'url': url, 'if_range': validator}), encoding='utf-8')
+    
+    @staticmethod
+    def _response_validator(response: requests.Response) -> Optional[str]:
+        """If-Range value identifying a response's content (weak ETags can't be used)"""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+    
+    @staticmethod
+    def _hash_file(path: Path, hasher=None) -> str:
+        """SHA-256 of a file (fed into hasher if given)"""
+        hasher = hasher or hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(WRITE_BUFFER_SIZE), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+    
+    def close(self) -> None:
+        """Wait for running downloads and stop the download pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
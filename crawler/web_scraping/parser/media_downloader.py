@@ -8,9 +8,13 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional
 from pathlib import Path
 import logging
-import requests
 from bs4 import BeautifulSoup
 
+try:
+    from .media_download_manager import DownloadResult, MediaDownloadManager
+except ImportError:
+    from media_download_manager import DownloadResult, MediaDownloadManager
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,15 +45,18 @@ class MediaDownloader:
     
     SUPPORTED_FORMATS = ['.mp3', '.wav', '.ogg', '.m4a']
     
-    def __init__(self, output_dir: str = "web_scraping/media/listening"):
+    def __init__(self, output_dir: str = "web_scraping/media/listening",
+                 downloader: Optional[MediaDownloadManager] = None):
         """
         Initialize the media downloader
         
         Args:
             output_dir: Base directory for storing audio files
+            downloader: Download manager for audio files (default: one for output_dir)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.downloader = downloader or MediaDownloadManager(str(self.output_dir))
         logger.info(f"Media downloader initialized with output dir: {self.output_dir}")
     
     @staticmethod
@@ -137,76 +144,34 @@ class MediaDownloader:
             ValueError: If download fails or file is invalid
             requests.RequestException: If HTTP request fails
         """
-        # Create test-specific directory
-        test_dir = self.output_dir / f"test_{test_number:02d}"
-        test_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Determine file format
-        file_format = self._get_format_from_url(url)
-        
-        # Generate filename
-        filename = f"listening_test_{test_number:02d}_section_{section_number}.{file_format}"
-        local_path = test_dir / filename
-        
-        # Check if file already exists
-        if local_path.exists() and not force:
-            file_size = local_path.stat().st_size
-            if file_size > 0:
-                logger.info(f"Audio file already exists, skipping: {local_path}")
-                # Normalize path for viewer compatibility
-                normalized_path = self.normalize_media_path(str(local_path))
-                return MediaFile(
-                    url=url,
-                    local_path=normalized_path,
-                    file_size=file_size,
-                    section_number=section_number,
-                    format=file_format
-                )
-        
-        # Download the file
-        logger.info(f"Downloading audio: {url}")
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            # Write file in chunks
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            # Verify file integrity
-            file_size = local_path.stat().st_size
-            if file_size == 0:
-                local_path.unlink()  # Delete empty file
-                raise ValueError(f"Downloaded file is empty: {local_path}")
-            
-            logger.info(f"Successfully downloaded: {filename} ({file_size} bytes)")
-            
-            # Normalize path for viewer compatibility
-            normalized_path = self.normalize_media_path(str(local_path))
-            
-            return MediaFile(
-                url=url,
-                local_path=normalized_path,
-                file_size=file_size,
-                section_number=section_number,
-                format=file_format
-            )
-            
-        except requests.RequestException as e:
-            logger.error(f"Failed to download audio from {url}: {e}")
-            raise
+            result = self.downloader.download(url, self._audio_path(url, test_number, section_number), force)
         except Exception as e:
-            logger.error(f"Error processing audio file: {e}")
-            if local_path.exists():
-                local_path.unlink()  # Clean up partial download
+            logger.error(f"Failed to download audio from {url}: {e}")
             raise
+        
+        return self._media_file(result, section_number)
+    
+    def _audio_path(self, url: str, test_number: int, section_number: int) -> Path:
+        """Local path for a section's audio file"""
+        file_format = self._get_format_from_url(url)
+        filename = f"listening_test_{test_number:02d}_section_{section_number}.{file_format}"
+        return self.output_dir / f"test_{test_number:02d}" / filename
+    
+    def _media_file(self, result: DownloadResult, section_number: int) -> MediaFile:
+        """MediaFile for a finished download, with the path normalized for the viewer"""
+        return MediaFile(
+            url=result.url,
+            local_path=self.normalize_media_path(str(result.path)),
+            file_size=result.size,
+            section_number=section_number,
+            format=result.path.suffix.lstrip('.')
+        )
     
     def download_all_for_test(self, audio_urls: List[str], 
                              test_number: int) -> List[MediaFile]:
         """
-        Download all audio files for a test
+        Download all audio files for a test in parallel
         
         Args:
             audio_urls: List of audio URLs to download
@@ -216,11 +181,14 @@ class MediaDownloader:
             List of MediaFile objects for successfully downloaded files
         """
         media_files = []
+        futures = [
+            self.downloader.submit(url, self._audio_path(url, test_number, idx))
+            for idx, url in enumerate(audio_urls, start=1)
+        ]
         
-        for idx, url in enumerate(audio_urls, start=1):
+        for idx, future in enumerate(futures, start=1):
             try:
-                media_file = self.download_audio(url, test_number, idx)
-                media_files.append(media_file)
+                media_files.append(self._media_file(future.result(), idx))
             except Exception as e:
                 logger.error(f"Failed to download audio {idx} for test {test_number}: {e}")
                 # Continue with remaining downloads
@@ -0,0 +1,465 @@
+"""
+Output Sink Module
+
+Where parsed test JSON goes. The JSON generators hand each test document to
+an OutputSink instead of opening files themselves:
+
+- FileSink writes one pretty-printed file per test. The file is written
+  under a temporary name in the same directory and renamed over the target,
+  so an interrupted run never leaves a truncated JSON file behind.
+- BundleSink appends compact JSON lines to sharded .jsonl bundles for bulk
+  export. Seeding the backend from a few bundles is much faster than from
+  thousands of small files.
+- AsyncSink wraps either of them and writes on a background thread, so
+  encoding and disk I/O overlap the parsing of the next page.
+
+encode_json() uses orjson when it is installed (pip install orjson) and the
+standard library otherwise. The standard library's pretty printer runs in
+pure Python; orjson writes the same text roughly 40x faster, except that
+floats in exponent form come out as 1e-5 instead of 1e-05.
+
+Bundle layout:
+    <bundle_dir>/<name>-<pid>-<shard>.jsonl        one {"key": ..., "data": ...} line per document
+    <bundle_dir>/<name>-<pid>-<shard>.jsonl.part   shard still being written
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Output formats for the parsers' --output-format option
+OUTPUT_FORMATS = ('files', 'jsonl')
+DEFAULT_OUTPUT_FORMAT = 'files'
+
+# Documents per bundle shard
+DEFAULT_SHARD_SIZE = 500
+
+# Documents queued on an AsyncSink before write() blocks
+DEFAULT_MAX_PENDING = 64
+
+PathLike = Union[str, Path]
+
+if orjson is not None:
+    _ORJSON_PRETTY = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    _ORJSON_COMPACT = orjson.OPT_NON_STR_KEYS
+
+
+def encode_json(data: Any, pretty: bool = True) -> bytes:
+    """
+    Encode data as UTF-8 JSON, keeping non-ASCII characters as they are
+    
+    Args:
+        data: JSON-serializable data
+        pretty: Indent by two spaces (otherwise compact, without spaces)
+    
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=_ORJSON_PRETTY if pretty else _ORJSON_COMPACT)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits, which the standard library handles
+            pass
+    
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_json(payload: Union[bytes, str]) -> Any:
+    """Decode JSON text, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def atomic_write_bytes(path: PathLike, payload: bytes) -> None:
+    """
+    Replace a file's content so readers see either the old or the new file
+    
+    The payload is written to a temporary file next to the target, which is
+    then renamed over it. The temporary name is unique per process and
+    thread, so concurrent writers never share one.
+    
+    Args:
+        path: Target file (parent directories are created)
+        payload: New content
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_file(path: PathLike, data: Any, pretty: bool = True) -> None:
+    """
+    Write JSON to a file atomically
+    
+    Args:
+        path: Output file (parent directories are created)
+        data: JSON-serializable data
+        pretty: Indent by two spaces
+    """
+    atomic_write_bytes(path, encode_json(data, pretty))
+
+
+def read_bundle(path: PathLike) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Read the documents of a bundle shard
+    
+    Args:
+        path: .jsonl shard written by BundleSink
+    
+    Yields:
+        Tuples of (key, document); the key is the file name the document
+        would have had with FileSink
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                record = decode_json(line)
+                yield record['key'], record['data']
+
+
+class OutputSink:
+    """
+    Destination for parsed test documents
+    
+    Usage:
+        with FileSink() as sink:
+            sink.write("web_scraping/parsed/writing/practice/writing_test_05.json", json_data)
+    """
+    
+    def write(self, path: PathLike, data: Dict[str, Any], pretty: bool = True) -> None:
+        """
+        Store a document
+        
+        Args:
+            path: Output file the document belongs to
+            data: Test document
+            pretty: Indent by two spaces where the format allows it
+        """
+        raise NotImplementedError
+    
+    def exists(self, path: PathLike) -> bool:
+        """
+        Check whether a document for an output file is already stored
+        
+        Args:
+            path: Output file the document belongs to
+        """
+        return Path(path).exists()
+    
+    def take_pending_writes(self) -> List['Future[None]']:
+        """
+        Hand over the writes queued since the last call
+        
+        The caller becomes responsible for their outcome: a failed write
+        that was handed over isn't raised again by flush() or close().
+        Sinks that write synchronously have none.
+        
+        Returns:
+            Futures that complete when each write has finished
+        """
+        return []
+    
+    def flush(self) -> None:
+        """Make everything written so far visible on disk"""
+    
+    def close(self) -> None:
+        """Flush and release resources"""
+        self.flush()
+    
+    def __enter__(self) -> 'OutputSink':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class FileSink(OutputSink):
+    """One JSON file per document, written atomically"""
+    
+    def write(self, path: PathLike, data: Dict[str, Any], pretty: bool = True) -> None:
+        write_json_file(path, data, pretty)
+
+
+class BundleSink(OutputSink):
+    """
+    Sharded JSONL bundles for bulk export
+    
+    Each document becomes one compact line in the current shard. A shard is
+    written as <shard>.part and renamed to .jsonl when it is full, on
+    flush() and on close(), so readers only ever see complete shards. Shard
+    names include the process ID, so parse worker processes writing to the
+    same directory each fill their own shards.
+    
+    exists() looks a document up by key in the published shards of any
+    process and run, plus what this sink has written, so reruns skip tests
+    that are already bundled. Rerunning with --force appends a test again;
+    readers should keep the last document per key.
+    
+    Thread-safe.
+    """
+    
+    SHARD_SUFFIX = '.jsonl'
+    PART_SUFFIX = '.part'
+    
+    def __init__(
+        self,
+        bundle_dir: PathLike,
+        name: str = 'tests',
+        shard_size: int = DEFAULT_SHARD_SIZE
+    ):
+        """
+        Initialize bundle sink
+        
+        Args:
+            bundle_dir: Directory for the shards
+            name: Shard name prefix (e.g. the test type)
+            shard_size: Documents per shard
+        """
+        self.bundle_dir = Path(bundle_dir)
+        self.name = name
+        self.shard_size = max(1, shard_size)
+        
+        self._lock = threading.Lock()
+        self._file = None
+        self._shard_path: Optional[Path] = None
+        self._shard_count = 0
+        self._next_index = 0
+        self.shards: List[Path] = []
+        
+        # Keys of stored documents, and the shards they were read from
+        self._keys: Set[str] = set()
+        self._scanned: Set[Path] = set()
+    
+    def write(self, path: PathLike, data: Dict[str, Any], pretty: bool = True) -> None:
+        # Encoded outside the lock; bundles are always compact
+        line = encode_json({'key': Path(path).name, 'data': data}, pretty=False) + b'\n'
+        
+        with self._lock:
+            if self._file is None:
+                self._open_shard()
+            self._file.write(line)
+            self._keys.add(Path(path).name)
+            self._shard_count += 1
+            if self._shard_count >= self.shard_size:
+                self._finish_shard()
+    
+    def exists(self, path: PathLike) -> bool:
+        key = Path(path).name
+        with self._lock:
+            if key not in self._keys:
+                self._scan_shards()
+            return key in self._keys
+    
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._finish_shard()
+    
+    def _scan_shards(self) -> None:
+        """Read the keys of published shards not read yet (e.g. other workers' or earlier runs')"""
+        if not self.bundle_dir.is_dir():
+            return
+        for shard_path in sorted(self.bundle_dir.glob(f"{self.name}-*{self.SHARD_SUFFIX}")):
+            if shard_path in self._scanned:
+                continue
+            self._scanned.add(shard_path)
+            try:
+                self._keys.update(key for key, _ in read_bundle(shard_path))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not read bundle shard {shard_path}: {e}")
+    
+    def _open_shard(self) -> None:
+        """Start the next shard whose name isn't taken yet"""
+        self.bundle_dir.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        while True:
+            shard_path = self.bundle_dir / f"{self.name}-{pid}-{self._next_index:04d}{self.SHARD_SUFFIX}"
+            self._next_index += 1
+            if not shard_path.exists():
+                break
+        
+        self._shard_path = shard_path
+        self._file = open(shard_path.with_name(shard_path.name + self.PART_SUFFIX), 'wb')
+        self._shard_count = 0
+    
+    def _finish_shard(self) -> None:
+        """Close the current shard and publish it"""
+        self._file.close()
+        self._file = None
+        os.replace(self._shard_path.with_name(self._shard_path.name + self.PART_SUFFIX), self._shard_path)
+        self.shards.append(self._shard_path)
+        self._scanned.add(self._shard_path)
+        logger.info(f"Saved bundle shard {self._shard_path} ({self._shard_count} documents)")
+
+
+class AsyncSink(OutputSink):
+    """
+    Writes documents to another sink on a background thread
+    
+    write() only queues the document, blocking while `max_pending` documents
+    are waiting, so a slow disk holds up parsing instead of filling memory.
+    Documents must not be changed after they are queued.
+    
+    write() returns a Future for that document, so a failed write is
+    reported against the document that failed. Failed writes that were
+    not handed over by take_pending_writes() are raised as OSError from
+    flush() or close(), so the caller still learns about them.
+    """
+    
+    def __init__(self, sink: OutputSink, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Initialize async sink
+        
+        Args:
+            sink: Sink the writer thread writes to
+            max_pending: Documents queued before write() blocks
+        """
+        self.sink = sink
+        self._queue: 'queue.Queue[Optional[Tuple[PathLike, Dict[str, Any], bool, Future]]]' = queue.Queue(max(1, max_pending))
+        # Writes not handed over yet -> their output path (successful ones are dropped)
+        self._untaken: Dict[Future, str] = {}
+        self._untaken_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+    
+    def write(self, path: PathLike, data: Dict[str, Any], pretty: bool = True) -> 'Future[None]':
+        """
+        Queue a document
+        
+        Returns:
+            Future that completes once the document is written, or with the
+            error that stopped it
+        """
+        if self._closed:
+            raise RuntimeError("AsyncSink is closed")
+        
+        future: 'Future[None]' = Future()
+        with self._untaken_lock:
+            self._untaken[future] = str(path)
+        
+        # Started on first use, so a parser that never writes (e.g. the
+        # parent of parse worker processes) never forks with a live thread
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='output-sink-writer', daemon=True)
+            self._thread.start()
+        self._queue.put((path, data, pretty, future))
+        return future
+    
+    def take_pending_writes(self) -> List['Future[None]']:
+        with self._untaken_lock:
+            futures = list(self._untaken)
+            self._untaken.clear()
+        return futures
+    
+    def exists(self, path: PathLike) -> bool:
+        # Documents still queued aren't seen; flush() first if that matters
+        return self.sink.exists(path)
+    
+    def flush(self) -> None:
+        self._queue.join()
+        self.sink.flush()
+        self._raise_errors()
+    
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self.sink.close()
+        self._raise_errors()
+    
+    def _run(self) -> None:
+        """Writer thread: write queued documents until the stop marker"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, data, pretty, future = item
+                try:
+                    self.sink.write(path, data, pretty)
+                except Exception as e:
+                    logger.error(f"Failed to save JSON to {path}: {e}")
+                    future.set_exception(e)
+                else:
+                    with self._untaken_lock:
+                        self._untaken.pop(future, None)
+                    future.set_result(None)
+            finally:
+                self._queue.task_done()
+    
+    def _raise_errors(self) -> None:
+        """Raise the failed writes nobody took over since the last call"""
+        # Successful writes leave _untaken before completing, so done ones failed
+        with self._untaken_lock:
+            errors = [(path, future) for future, path in self._untaken.items() if future.done()]
+            for _, future in errors:
+                del self._untaken[future]
+        if errors:
+            path, future = errors[0]
+            error = future.exception()
+            raise OSError(f"{len(errors)} queued JSON write(s) failed; first: {path}: {error}")
+
+
+def create_output_sink(
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    bundle_dir: Optional[PathLike] = None,
+    name: str = 'tests',
+    async_writes: bool = False,
+    shard_size: int = DEFAULT_SHARD_SIZE
+) -> OutputSink:
+    """
+    Build the sink for a parser's output options
+    
+    Args:
+        output_format: 'files' (one JSON file per test) or 'jsonl' (sharded bundles)
+        bundle_dir: Directory for the bundles (required for 'jsonl')
+        name: Bundle shard name prefix
+        async_writes: Write on a background thread
+        shard_size: Documents per bundle shard
+    
+    Returns:
+        Output sink
+    """
+    if output_format == 'files':
+        sink: OutputSink = FileSink()
+    elif output_format == 'jsonl':
+        if bundle_dir is None:
+            raise ValueError("bundle_dir is required for jsonl output")
+        sink = BundleSink(bundle_dir, name, shard_size)
+    else:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    
+    if async_writes:
+        sink = AsyncSink(sink)
+    return sink
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Parse Stage Benchmark
+
+Times the ParsePipeline parse stage over a saved HTML corpus with different
+worker counts, so the multiprocess speedup can be measured without any
+network traffic.
+
+The corpus is a directory of saved test pages; the test number is the last
+number in each file name (e.g. reading_test_05.html). --fetch downloads a
+range of tests into the corpus first.
+
+Usage:
+    python -m web_scraping.parser.parse_benchmark --type reading --corpus html_corpus/reading --fetch 1 20
+    python -m web_scraping.parser.parse_benchmark --type reading --corpus html_corpus/reading --workers 1 2 4 8
+    python -m web_scraping.parser.parse_benchmark --type listening --corpus html_corpus/listening --repeat 3 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .html_crawler import HTMLCrawler
+    from .parse_engine import PARSERS, ParseEngine
+    from .parse_pipeline import ParsePipeline
+    from .html_document import HTML_PARSER, HTML_PARSERS, check_html_parser, parse_stats, reset_parse_stats
+    from .patterns import PATTERNS
+    from .logging_config import setup_logging, get_logger
+except ImportError:
+    from html_crawler import HTMLCrawler
+    from parse_engine import PARSERS, ParseEngine
+    from parse_pipeline import ParsePipeline
+    from html_document import HTML_PARSER, HTML_PARSERS, check_html_parser, parse_stats, reset_parse_stats
+    from patterns import PATTERNS
+    from logging_config import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+def load_corpus(corpus_dir: Path) -> List[Tuple[int, Path]]:
+    """
+    List the saved pages of a corpus
+    
+    Args:
+        corpus_dir: Directory with *.html files
+    
+    Returns:
+        List of (test_number, path) sorted by test number
+    """
+    corpus = []
+    for path in sorted(corpus_dir.glob('*.html')):
+        numbers = re.findall(r'\d+', path.stem)
+        if not numbers:
+            logger.warning(f"Skipping {path.name}: no test number in file name")
+            continue
+        corpus.append((int(numbers[-1]), path))
+    return sorted(corpus)
+
+
+def fetch_corpus(test_type: str, corpus_dir: Path, start: int, end: int, delay: float) -> int:
+    """
+    Download a range of test pages into the corpus (existing files are kept)
+    
+    Returns:
+        Number of pages downloaded
+    """
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    engine = ParseEngine(test_type, warm_up=False)
+    crawler = HTMLCrawler(delay=delay)
+    
+    downloaded = 0
+    for test_number in range(start, end + 1):
+        path = corpus_dir / f"{test_type}_test_{test_number:02d}.html"
+        if path.exists():
+            continue
+        
+        html_content = crawler.download_page(engine.source_url(test_number))
+        if html_content is None:
+            logger.warning(f"Test {test_number}: download failed, not added to corpus")
+            continue
+        
+        path.write_text(html_content, encoding='utf-8')
+        downloaded += 1
+    
+    return downloaded
+
+
+def run_benchmark(
+    test_type: str,
+    corpus: List[Tuple[int, Path]],
+    workers: int,
+    repeat: int = 1,
+    html_parser: str = HTML_PARSER
+) -> Dict[str, Any]:
+    """
+    Parse the corpus once with the given worker count
+    
+    Pages are read from disk as they are submitted, like pages arriving from
+    the crawler. Pool start-up (including each worker's ParseEngine) is timed
+    separately from parsing. Inline runs (workers=0) also report how many
+    BeautifulSoup parses each page took and how long they took, and how
+    often each registered pattern and selector was called.
+    
+    Args:
+        test_type: Test type of the corpus
+        corpus: List of (test_number, path)
+        workers: Worker processes (0 parses in this process)
+        repeat: Times each page is parsed
+        html_parser: BeautifulSoup parser for the pages
+    
+    Returns:
+        Result dictionary for this run
+    """
+    stats = {'parsed': 0, 'failed': 0, 'json_bytes': 0}
+    
+    def on_result(test_number: int, json_text: Optional[str], error: Optional[BaseException]) -> None:
+        if error is not None or json_text is None:
+            stats['failed'] += 1
+            return
+        stats['parsed'] += 1
+        stats['json_bytes'] += len(json_text.encode('utf-8'))
+    
+    startup_start = time.perf_counter()
+    engine_kwargs = {'test_type': test_type, 'html_parser': html_parser}
+    inline_engine = ParseEngine(**engine_kwargs) if workers == 0 else None
+    pipeline = ParsePipeline(
+        ParseEngine,
+        engine_kwargs,
+        'parse',
+        on_result,
+        workers=workers,
+        inline_target=inline_engine
+    )
+    pipeline.start()
+    startup_seconds = time.perf_counter() - startup_start
+    
+    reset_parse_stats()
+    PATTERNS.reset_stats()
+    parse_start = time.perf_counter()
+    with pipeline:
+        for _ in range(repeat):
+            for test_number, path in corpus:
+                pipeline.submit(test_number, test_number, path.read_text(encoding='utf-8'))
+    parse_seconds = time.perf_counter() - parse_start
+    
+    pages = len(corpus) * repeat
+    # Worker processes keep their own counters
+    html_parses = parse_stats() if workers == 0 else None
+    pattern_calls = PATTERNS.stats() if workers == 0 else None
+    return {
+        'workers': workers,
+        'pages': pages,
+        'parsed': stats['parsed'],
+        'failed': stats['failed'],
+        'json_bytes': stats['json_bytes'],
+        'startup_seconds': round(startup_seconds, 3),
+        'parse_seconds': round(parse_seconds, 3),
+        'pages_per_second': round(pages / parse_seconds, 2) if parse_seconds > 0 else None,
+        'html_parses_per_page': round(html_parses['parses'] / pages, 2) if html_parses else None,
+        'html_parse_seconds': round(html_parses['seconds'], 3) if html_parses else None,
+        'pattern_calls': pattern_calls
+    }
+
+
+def print_results(results: List[Dict[str, Any]], top_patterns: int = 10) -> None:
+    """Print results as a table with speedup relative to the first run"""
+    baseline = results[0]['parse_seconds'] if results else 0
+    
+    print()
+    print(f"{'workers':>8} {'pages':>6} {'failed':>6} {'startup s':>10} {'parse s':>9} {'pages/s':>9} {'speedup':>8}")
+    for result in results:
+        speedup = baseline / result['parse_seconds'] if result['parse_seconds'] else 0
+        result['speedup'] = round(speedup, 2)
+        print(
+            f"{result['workers']:>8} {result['pages']:>6} {result['failed']:>6} "
+            f"{result['startup_seconds']:>10.3f} {result['parse_seconds']:>9.3f} "
+            f"{result['pages_per_second'] or 0:>9.2f} {speedup:>7.2f}x"
+        )
+    
+    for result in results:
+        if result['html_parses_per_page'] is not None:
+            print(
+                f"workers={result['workers']}: {result['html_parses_per_page']} HTML parses per page, "
+                f"{result['html_parse_seconds']:.3f}s parsing HTML"
+            )
+    
+    for result in results:
+        if result['pattern_calls']:
+            print(f"workers={result['workers']}: most called patterns (calls per page)")
+            for name, calls in list(result['pattern_calls'].items())[:top_patterns]:
+                print(f"{calls / result['pages']:>10.1f}  {name}")
+    print()
+
+
+def main():
+    """Command-line interface for the parse benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the multiprocess parse stage over a saved HTML corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--type', choices=sorted(PARSERS), required=True, help='Test type of the corpus')
+    parser.add_argument('--corpus', type=str, required=True, help='Directory of saved *.html test pages')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[1, os.cpu_count() or 1],
+        help='Worker counts to compare, first is the baseline (default: 1 and the CPU count)'
+    )
+    parser.add_argument('--repeat', type=int, default=1, help='Parse each page this many times per run')
+    parser.add_argument('--html-parser', choices=HTML_PARSERS, default=HTML_PARSER, help='BeautifulSoup parser for the pages')
+    parser.add_argument('--fetch', type=int, nargs=2, metavar=('START', 'END'), help='Download this test range into the corpus first')
+    parser.add_argument('--delay', type=float, default=0.35, help='Delay between requests for --fetch')
+    parser.add_argument('--output', type=str, help='Also write results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show parser logging')
+    
+    args = parser.parse_args()
+    try:
+        check_html_parser(args.html_parser)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Parser INFO logging would dominate the timings
+    setup_logging(
+        log_level=logging.INFO if args.verbose else logging.ERROR,
+        enable_file_logging=False
+    )
+    
+    corpus_dir = Path(args.corpus)
+    if args.fetch:
+        downloaded = fetch_corpus(args.type, corpus_dir, args.fetch[0], args.fetch[1], args.delay)
+        print(f"Downloaded {downloaded} pages into {corpus_dir}")
+    
+    corpus = load_corpus(corpus_dir) if corpus_dir.exists() else []
+    if not corpus:
+        print(f"No *.html pages in {corpus_dir} (use --fetch START END to download some)")
+        return 1
+    
+    print(
+        f"Corpus: {len(corpus)} {args.type} pages, {sum(p.stat().st_size for _, p in corpus) / 1024:.0f} KiB, "
+        f"parser {args.html_parser}"
+    )
+    
+    results = []
+    for workers in args.workers:
+        print(f"Running with {workers} worker(s)...")
+        results.append(run_benchmark(args.type, corpus, workers, args.repeat, args.html_parser))
+    
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'test_type': args.type, 'corpus': str(corpus_dir), 'html_parser': args.html_parser, 'results': results},
+                f,
+                indent=2
+            )
+        print(f"Results saved to {args.output}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Parse Engine Module
+
+Per-process parsing state for ParsePipeline workers. Each worker builds one
+ParseEngine when it starts and keeps it for its whole life, so the test
+parser, its extractor instances and their compiled regexes are created
+once per process instead of once per page.
+"""
+
+import importlib
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+try:
+    from .output_sink import encode_json
+except ImportError:
+    from output_sink import encode_json
+
+logger = logging.getLogger(__name__)
+
+# test_type -> (module, parser class, URL generator method)
+PARSERS: Dict[str, Tuple[str, str, str]] = {
+    'reading': ('reading_parser_main', 'ReadingTestParser', 'generate_practice_url'),
+    'listening': ('listening_parser_main', 'ListeningTestParser', 'generate_listening_url'),
+    'writing': ('writing_parser_main', 'WritingTestParser', 'generate_writing_url'),
+    'speaking': ('speaking_parser_main', 'SpeakingTestParser', 'generate_speaking_url'),
+}
+
+# Extra parse_single_test arguments for parse(); media downloads don't belong in the parse stage
+PARSE_OPTIONS: Dict[str, Dict[str, Any]] = {
+    'listening': {'download_media': False},
+}
+
+
+def get_parser_class(test_type: str) -> type:
+    """
+    Import the test parser class for a test type
+    
+    Imported lazily because the *_parser_main modules import this package's
+    pipeline themselves.
+    """
+    if test_type not in PARSERS:
+        raise ValueError(f"Unknown test type: {test_type} (expected one of {', '.join(PARSERS)})")
+    
+    module_name, class_name, _ = PARSERS[test_type]
+    if __package__:
+        module = importlib.import_module(f".{module_name}", __package__)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def serialize_json(data: Dict[str, Any]) -> str:
+    """Serialize parsed test data the way the JSON generators write it"""
+    return encode_json(data).decode('utf-8')
+
+
+class ParseEngine:
+    """
+    Warm parsing state for one process
+    
+    Usage:
+        engine = ParseEngine('reading')
+        json_text = engine.parse(5, html_content)
+    
+    As a ParsePipeline factory:
+        ParsePipeline(ParseEngine, {'test_type': 'reading', 'output_dir': out}, 'parse', on_result)
+    """
+    
+    def __init__(self, test_type: str, warm_up: bool = True, **parser_kwargs: Any):
+        """
+        Initialize engine
+        
+        Args:
+            test_type: 'reading', 'listening', 'writing' or 'speaking'
+            warm_up: Run a tiny document through BeautifulSoup so the tree builder is loaded
+            **parser_kwargs: Passed to the test parser (e.g. output_dir, media_dir, html_parser)
+        """
+        self.test_type = test_type
+        self.parser = get_parser_class(test_type)(workers=0, **parser_kwargs)
+        self.parse_options = PARSE_OPTIONS.get(test_type, {})
+        self._url_method = getattr(self.parser.url_generator, PARSERS[test_type][2])
+        self.pages_parsed = 0
+        
+        if warm_up:
+            BeautifulSoup("<html><body><p>warm up</p></body></html>", self.parser.html_parser)
+        
+        logger.debug(f"ParseEngine ready ({test_type})")
+    
+    def source_url(self, test_number: int) -> str:
+        """URL a test page was downloaded from"""
+        return self._url_method(test_number)
+    
+    def parse_to_dict(self, test_number: int, html_content: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse a test page
+        
+        Returns:
+            Parsed test data, or None if parsing failed
+        """
+        self.pages_parsed += 1
+        return self.parser.parse_single_test(
+            test_number=test_number,
+            html_content=html_content,
+            url=self.source_url(test_number),
+            **self.parse_options
+        )
+    
+    def parse(self, test_number: int, html_content: str) -> Optional[str]:
+        """
+        Parse a test page to JSON text
+        
+        Args:
+            test_number: Test number
+            html_content: HTML content of the test page
+        
+        Returns:
+            Serialized JSON, or None if parsing failed
+        """
+        json_data = self.parse_to_dict(test_number, html_content)
+        if json_data is None:
+            return None
+        return serialize_json(json_data)
+    
+    @property
+    def output_sink(self) -> Any:
+        """The test parser's output sink (ParsePipeline tracks its background writes)"""
+        return self.parser.output_sink
+    
+    def parse_and_save(self, *args: Any) -> Any:
+        """Run the test parser's parse_and_save (the process_batch parse stage)"""
+        self.pages_parsed += 1
+        return self.parser.parse_and_save(*args)
+    
+    def close(self) -> None:
+        """Finish the test parser's queued writes (ParsePipeline calls this when a worker exits)"""
+        self.parser.close()
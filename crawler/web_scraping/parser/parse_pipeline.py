@@ -0,0 +1,298 @@
+"""
+Streaming Parse Pipeline Module
+
+Runs the parse-and-save stage of a batch on a process pool while the crawler
+is still downloading, so CPU-bound BeautifulSoup work overlaps network time
+and only a bounded number of pages is held in memory at once.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default number of parse processes
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Per-process target (e.g. a ReadingTestParser), built once by the pool initializer
+_worker_target = None
+
+# Queue the worker reports finished background writes on, as (key, error)
+_worker_writes = None
+
+
+def _init_worker(factory: Callable[..., Any], factory_kwargs: Dict[str, Any], writes: Any = None) -> None:
+    """Pool initializer: build this process's target"""
+    global _worker_target, _worker_writes
+    _worker_target = factory(**factory_kwargs)
+    _worker_writes = writes
+    
+    # Let the target finish buffered work (e.g. queued JSON writes) when the worker exits
+    if hasattr(_worker_target, 'close'):
+        Finalize(_worker_target, _worker_target.close, exitpriority=10)
+
+
+def _take_pending_writes(target: Any) -> List[Future]:
+    """Background writes the target's output sink queued since the last call"""
+    sink = getattr(target, 'output_sink', None)
+    if sink is None or not hasattr(sink, 'take_pending_writes'):
+        return []
+    return sink.take_pending_writes()
+
+
+def _report_when_written(key: Any, futures: List[Future], writes: Any) -> None:
+    """Put (key, error or None) on `writes` once every write of a page has finished"""
+    remaining = [len(futures)]
+    lock = threading.Lock()
+    
+    def on_done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        # Plain OSError, since the original may not pickle across processes
+        writes.put((key, OSError(f"JSON write failed: {errors[0]}") if errors else None))
+    
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def _run_target(target: Any, method: str, key: Any, args: tuple, writes: Any) -> Tuple[Any, bool]:
+    """
+    Run a target method and track the background writes it queued
+    
+    Returns:
+        Tuple of (method result, whether writes are still to be reported on `writes`)
+    """
+    try:
+        result = getattr(target, method)(*args)
+    except BaseException:
+        # The page fails anyway; don't let its writes be reported with the next one
+        _take_pending_writes(target)
+        raise
+    
+    futures = _take_pending_writes(target)
+    if futures:
+        _report_when_written(key, futures, writes)
+    return result, bool(futures)
+
+
+def _call_worker(method: str, key: Any, args: tuple) -> Tuple[Any, bool]:
+    """Run a target method in a worker process"""
+    return _run_target(_worker_target, method, key, args, _worker_writes)
+
+
+def _worker_ready() -> int:
+    """No-op task used to start the workers"""
+    return os.getpid()
+
+
+class ParsePipeline:
+    """
+    Bounded parse stage for streaming batches
+    
+    submit() hands a downloaded page to a worker process and blocks while
+    `max_pending` pages are queued or being parsed. Called from the crawler's
+    on_page callback, it also holds up the download scheduler, so downloads
+    never get more than the queue depth ahead of parsing and peak memory is
+    O(queue depth) instead of O(range).
+    
+    Results are passed to `on_result(key, result, error)` on the submitting
+    thread, so counters and progress files need no locking. If the target
+    has an output sink that writes in the background, a page is only
+    reported once its writes have finished, and a failed write is reported
+    as that page's error.
+    
+    Usage:
+        with ParsePipeline(ReadingTestParser, {'output_dir': out}, 'parse_and_save', on_result) as pipeline:
+            crawler.download_batch(urls, ..., on_page=lambda n, html: pipeline.submit(n, n, html, url))
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[..., Any],
+        factory_kwargs: Dict[str, Any],
+        method: str,
+        on_result: Callable[[Any, Any, Optional[BaseException]], None],
+        workers: int = DEFAULT_WORKERS,
+        max_pending: Optional[int] = None,
+        inline_target: Any = None
+    ):
+        """
+        Initialize pipeline
+        
+        Args:
+            factory: Picklable callable that builds the target in each worker (e.g. the parser class)
+            factory_kwargs: Keyword arguments for factory
+            method: Name of the target method called with the submitted arguments
+            on_result: Callback(key, result, error) for each finished page
+            workers: Number of worker processes (0 runs the method inline on inline_target)
+            max_pending: Pages queued or parsing before submit() blocks (default: 2 * workers)
+            inline_target: Object whose method is called when workers is 0
+        """
+        if workers <= 0 and inline_target is None:
+            raise ValueError("inline_target is required when workers is 0")
+        
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs
+        self.method = method
+        self.on_result = on_result
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending or 2 * self.workers)
+        self.inline_target = inline_target
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Future, Any] = {}
+        
+        # Pages parsed but still being written: key -> result, and outcomes
+        # of writes that finished before their page's result came back
+        self._writes: Any = queue.Queue() if self.workers == 0 else None
+        self._awaiting_writes: Dict[Any, Any] = {}
+        self._written: Dict[Any, Optional[BaseException]] = {}
+    
+    def __enter__(self) -> 'ParsePipeline':
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Interrupted: drop queued pages instead of parsing them
+        self.close(drain=exc_type is None)
+    
+    def start(self) -> None:
+        """
+        Start the worker processes
+        
+        Workers are started (and their targets built) before any download
+        threads exist, so forking never copies a lock held by another thread.
+        """
+        if self.workers == 0 or self._executor is not None:
+            return
+        
+        self._writes = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.factory, self.factory_kwargs, self._writes)
+        )
+        self._executor.submit(_worker_ready).result()
+        logger.info(f"Parse pipeline started ({self.workers} workers, queue depth {self.max_pending})")
+    
+    def submit(self, key: Any, *args: Any) -> None:
+        """
+        Queue a page for parsing, blocking while the queue is full
+        
+        Args:
+            key: Identifies the page in on_result (e.g. the test number)
+            *args: Arguments for the target method
+        """
+        if self.workers == 0:
+            self._run_inline(key, args)
+            return
+        
+        if self._executor is None:
+            self.start()
+        
+        # Backpressure: wait for a free slot
+        while len(self._pending) >= self.max_pending:
+            self._collect(block=True)
+        
+        future = self._executor.submit(_call_worker, self.method, key, args)
+        self._pending[future] = key
+        
+        # Report anything that already finished
+        self._collect(block=False)
+        self._collect_writes(block=False)
+    
+    def drain(self) -> None:
+        """Wait for every queued page and report its result"""
+        while self._pending:
+            self._collect(block=True)
+        while self._awaiting_writes:
+            self._collect_writes(block=True)
+    
+    def close(self, drain: bool = True) -> None:
+        """
+        Shut down the worker processes
+        
+        Args:
+            drain: Finish and report queued pages first (otherwise they are cancelled)
+        """
+        try:
+            if drain:
+                self.drain()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=not drain)
+                self._executor = None
+            self._pending.clear()
+            self._awaiting_writes.clear()
+            self._written.clear()
+    
+    def _run_inline(self, key: Any, args: tuple) -> None:
+        """Run the target method in this process"""
+        try:
+            result, writing = _run_target(self.inline_target, self.method, key, args, self._writes)
+        except Exception as e:
+            self.on_result(key, None, e)
+            return
+        self._finish(key, result, writing)
+        self._collect_writes(block=False)
+    
+    def _finish(self, key: Any, result: Any, writing: bool) -> None:
+        """Report a parsed page, or hold it until its writes have finished"""
+        if not writing:
+            self.on_result(key, result, None)
+        elif key in self._written:
+            self._report_written(key, result, self._written.pop(key))
+        else:
+            self._awaiting_writes[key] = result
+    
+    def _report_written(self, key: Any, result: Any, error: Optional[BaseException]) -> None:
+        if error is not None:
+            self.on_result(key, None, error)
+        else:
+            self.on_result(key, result, None)
+    
+    def _collect_writes(self, block: bool) -> None:
+        """Report pages whose writes have finished"""
+        if self._writes is None:
+            return
+        
+        while True:
+            try:
+                # Block for the first outcome only
+                key, error = self._writes.get(block=block and bool(self._awaiting_writes))
+            except queue.Empty:
+                return
+            block = False
+            
+            if key in self._awaiting_writes:
+                self._report_written(key, self._awaiting_writes.pop(key), error)
+            else:
+                self._written[key] = error
+    
+    def _collect(self, block: bool) -> None:
+        """Report finished pages to on_result"""
+        if not self._pending:
+            return
+        
+        done, _ = wait(
+            self._pending,
+            timeout=None if block else 0,
+            return_when=FIRST_COMPLETED
+        )
+        for future in done:
+            key = self._pending.pop(future)
+            try:
+                result, writing = future.result()
+            except Exception as e:
+                self.on_result(key, None, e)
+                continue
+            self._finish(key, result, writing)
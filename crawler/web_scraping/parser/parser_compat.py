@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Parser Backend Compatibility Check
+
+Parses a saved HTML corpus with two or more BeautifulSoup parsers and diffs
+the JSON each one produces against the first (html.parser by default), so a
+faster parser such as lxml can be switched on once its output matches.
+
+The corpus is the same directory of saved test pages parse_benchmark uses
+(fill it with `parse_benchmark --fetch START END`). Crawl timestamps are
+ignored when comparing. Exits with status 1 if any page differs or fails.
+
+Usage:
+    python -m web_scraping.parser.parser_compat --type reading --corpus html_corpus/reading
+    python -m web_scraping.parser.parser_compat --type listening --corpus html_corpus/listening --show 3 --output compat.json
+"""
+
+import argparse
+import difflib
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .parse_engine import PARSERS, ParseEngine, serialize_json
+    from .parse_benchmark import load_corpus
+    from .html_document import HTML_PARSERS, check_html_parser
+    from .logging_config import setup_logging, get_logger
+except ImportError:
+    from parse_engine import PARSERS, ParseEngine, serialize_json
+    from parse_benchmark import load_corpus
+    from html_document import HTML_PARSERS, check_html_parser
+    from logging_config import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+# Fields that change on every run
+VOLATILE_KEYS = {'crawledAt', 'crawl_date'}
+
+
+def strip_volatile(data: Any) -> Any:
+    """Copy parsed test data without its volatile fields"""
+    if isinstance(data, dict):
+        return {key: strip_volatile(value) for key, value in data.items() if key not in VOLATILE_KEYS}
+    if isinstance(data, list):
+        return [strip_volatile(value) for value in data]
+    return data
+
+
+def diff_outputs(
+    baseline: Optional[Dict[str, Any]],
+    candidate: Optional[Dict[str, Any]],
+    baseline_name: str,
+    candidate_name: str
+) -> List[str]:
+    """
+    Diff two parse results
+    
+    Returns:
+        Unified diff lines (empty if the outputs match)
+    """
+    def lines(data: Optional[Dict[str, Any]]) -> List[str]:
+        if data is None:
+            return ['<parse failed>']
+        return serialize_json(strip_volatile(data)).splitlines()
+    
+    return list(difflib.unified_diff(
+        lines(baseline),
+        lines(candidate),
+        fromfile=baseline_name,
+        tofile=candidate_name,
+        lineterm='',
+        n=2
+    ))
+
+
+def compare_corpus(
+    test_type: str,
+    corpus: List[Tuple[int, Path]],
+    parsers: List[str]
+) -> Dict[str, Any]:
+    """
+    Parse every page with each parser and diff against the first parser
+    
+    Args:
+        test_type: Test type of the corpus
+        corpus: List of (test_number, path)
+        parsers: Parser names, the first is the baseline
+    
+    Returns:
+        Report dictionary with per-page results and per-parser parse time
+    """
+    engines = {name: ParseEngine(test_type, html_parser=name) for name in parsers}
+    seconds = {name: 0.0 for name in parsers}
+    baseline_name = parsers[0]
+    pages = []
+    
+    for test_number, path in corpus:
+        html_content = path.read_text(encoding='utf-8')
+        
+        outputs = {}
+        for name, engine in engines.items():
+            start = time.perf_counter()
+            outputs[name] = engine.parse_to_dict(test_number, html_content)
+            seconds[name] += time.perf_counter() - start
+        
+        page = {'test_number': test_number, 'file': path.name, 'results': {}}
+        for name in parsers[1:]:
+            diff = diff_outputs(outputs[baseline_name], outputs[name], baseline_name, name)
+            if outputs[name] is None or outputs[baseline_name] is None:
+                status = 'same' if outputs[name] is outputs[baseline_name] else 'failed'
+            else:
+                status = 'different' if diff else 'same'
+            page['results'][name] = {'status': status, 'diff': diff}
+        pages.append(page)
+    
+    return {
+        'test_type': test_type,
+        'baseline': baseline_name,
+        'parsers': parsers,
+        'parse_seconds': {name: round(value, 3) for name, value in seconds.items()},
+        'pages': pages
+    }
+
+
+def print_report(report: Dict[str, Any], show: int, max_diff_lines: int = 60) -> int:
+    """
+    Print the comparison summary and the first `show` diffs per parser
+    
+    Returns:
+        Number of pages that differ or fail with any parser
+    """
+    baseline = report['baseline']
+    mismatched = set()
+    
+    print()
+    for name in report['parsers'][1:]:
+        counts = {'same': 0, 'different': 0, 'failed': 0}
+        shown = 0
+        for page in report['pages']:
+            result = page['results'][name]
+            counts[result['status']] += 1
+            if result['status'] == 'same':
+                continue
+            
+            mismatched.add(page['test_number'])
+            if shown < show:
+                shown += 1
+                print(f"--- Test {page['test_number']} ({page['file']}): {result['status']} with {name}")
+                for line in result['diff'][:max_diff_lines]:
+                    print(line)
+                if len(result['diff']) > max_diff_lines:
+                    print(f"... {len(result['diff']) - max_diff_lines} more diff lines")
+                print()
+        
+        print(
+            f"{name} vs {baseline}: {counts['same']} same, {counts['different']} different, "
+            f"{counts['failed']} failed to parse with one parser only"
+        )
+    
+    for name, seconds in report['parse_seconds'].items():
+        print(f"{name:>12}: {seconds:.3f}s total parse time")
+    print()
+    
+    return len(mismatched)
+
+
+def main():
+    """Command-line interface for the parser compatibility check."""
+    parser = argparse.ArgumentParser(
+        description="Diff the JSON output of BeautifulSoup parsers over a saved HTML corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--type', choices=sorted(PARSERS), required=True, help='Test type of the corpus')
+    parser.add_argument('--corpus', type=str, required=True, help='Directory of saved *.html test pages')
+    parser.add_argument(
+        '--parsers',
+        nargs='+',
+        choices=HTML_PARSERS,
+        default=list(HTML_PARSERS),
+        help=f"Parsers to compare, the first is the baseline (default: {' '.join(HTML_PARSERS)})"
+    )
+    parser.add_argument('--show', type=int, default=5, help='Diffs to print per parser (default: 5)')
+    parser.add_argument('--output', type=str, help='Also write the full report to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show parser logging')
+    
+    args = parser.parse_args()
+    if len(args.parsers) < 2:
+        parser.error("--parsers needs at least two parsers")
+    for name in args.parsers:
+        try:
+            check_html_parser(name)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    setup_logging(
+        log_level=logging.INFO if args.verbose else logging.ERROR,
+        enable_file_logging=False
+    )
+    
+    corpus_dir = Path(args.corpus)
+    corpus = load_corpus(corpus_dir) if corpus_dir.exists() else []
+    if not corpus:
+        print(f"No *.html pages in {corpus_dir} (parse_benchmark --fetch START END downloads some)")
+        return 1
+    
+    print(f"Comparing {', '.join(args.parsers)} on {len(corpus)} {args.type} pages")
+    report = compare_corpus(args.type, corpus, args.parsers)
+    mismatched = print_report(report, args.show)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report saved to {args.output}")
+    
+    if mismatched:
+        print(f"{mismatched} page(s) differ; keep {args.parsers[0]} for this test type")
+        return 1
+    
+    print(f"All pages match; {', '.join(args.parsers[1:])} can be used for {args.type} tests")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Pattern Registry Module
+
+Precompiled regular expressions and element selectors used in the
+extractors' per-paragraph and per-element loops. Each is built once at import
+and registered under a name, instead of being compiled inline (re.sub(r'...')
+in a loop, re.compile in a method) or rebuilt as a `class_=lambda x: ...`
+predicate on every find_all call.
+
+Every pattern and selector counts its invocations, so profiling can see which
+ones a parse leans on; parse_benchmark reports the counts per page. Counters
+are per process and may undercount slightly when threads share a pattern.
+
+Usage:
+    from .patterns import PATTERNS, READING_ANSWER_NOTE_PATTERN, DIVI_COLUMN_SELECTOR
+    text = READING_ANSWER_NOTE_PATTERN.sub(' ', text)
+    columns = DIVI_COLUMN_SELECTOR.find_all(row, recursive=False)
+    PATTERNS.stats()  # {'reading_answer.note': 120, 'divi.column': 6, ...}
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from bs4 import SoupStrainer, Tag
+
+
+class CountedPattern:
+    """A compiled regular expression that counts its calls"""
+    
+    __slots__ = ('name', 'regex', 'calls')
+    
+    def __init__(self, name: str, pattern: str, flags: int = 0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.calls = 0
+    
+    def __repr__(self) -> str:
+        return f"CountedPattern({self.name!r}, {self.regex.pattern!r})"
+    
+    @property
+    def pattern(self) -> str:
+        return self.regex.pattern
+    
+    def search(self, string: str) -> Optional[re.Match]:
+        self.calls += 1
+        return self.regex.search(string)
+    
+    def match(self, string: str) -> Optional[re.Match]:
+        self.calls += 1
+        return self.regex.match(string)
+    
+    def finditer(self, string: str) -> Iterator[re.Match]:
+        self.calls += 1
+        return self.regex.finditer(string)
+    
+    def findall(self, string: str) -> List[Any]:
+        self.calls += 1
+        return self.regex.findall(string)
+    
+    def split(self, string: str, maxsplit: int = 0) -> List[str]:
+        self.calls += 1
+        return self.regex.split(string, maxsplit)
+    
+    def sub(self, repl: str, string: str, count: int = 0) -> str:
+        self.calls += 1
+        return self.regex.sub(repl, string, count)
+
+
+class ClassSelector:
+    """
+    Prebuilt filter for elements whose class attribute contains every token
+    
+    Matches like the `class_=lambda x: x and 'token' in x` predicates it
+    replaces (a substring test, so 'et_pb_column' also matches
+    'et_pb_column_1_3'), which is what the CSS selector in `css` means.
+    The strainer is built once, so find calls don't rebuild a filter.
+    """
+    
+    __slots__ = ('name', 'tokens', 'css', 'strainer', 'calls')
+    
+    def __init__(self, name: str, tag: str, *tokens: str):
+        self.name = name
+        self.tokens = tokens
+        self.css = tag + ''.join(f'[class*="{token}"]' for token in tokens)
+        self.strainer = SoupStrainer(tag, class_=self._matches_class)
+        self.calls = 0
+    
+    def __repr__(self) -> str:
+        return f"ClassSelector({self.name!r}, {self.css!r})"
+    
+    def _matches_class(self, value: Optional[str]) -> bool:
+        return bool(value) and all(token in value for token in self.tokens)
+    
+    def find(self, root: Tag) -> Optional[Tag]:
+        """First matching descendant of root"""
+        self.calls += 1
+        return root.find(self.strainer)
+    
+    def find_all(self, root: Tag, recursive: bool = True) -> List[Tag]:
+        """Matching descendants (or only children) of root, in document order"""
+        self.calls += 1
+        return root.find_all(self.strainer, recursive=recursive)
+    
+    def find_next(self, element: Tag) -> Optional[Tag]:
+        """First matching element after element in the document"""
+        self.calls += 1
+        return element.find_next(self.strainer)
+
+
+class PatternRegistry:
+    """Named patterns and selectors with their invocation counters"""
+    
+    def __init__(self):
+        self._entries: Dict[str, Union[CountedPattern, ClassSelector]] = {}
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+    
+    def _register(self, entry: Union[CountedPattern, ClassSelector]) -> Any:
+        if entry.name in self._entries:
+            raise ValueError(f"Pattern already registered: {entry.name}")
+        self._entries[entry.name] = entry
+        return entry
+    
+    def regex(self, name: str, pattern: str, flags: int = 0) -> CountedPattern:
+        """Compile and register a regular expression"""
+        return self._register(CountedPattern(name, pattern, flags))
+    
+    def class_selector(self, name: str, tag: str, *tokens: str) -> ClassSelector:
+        """Build and register a class selector"""
+        return self._register(ClassSelector(name, tag, *tokens))
+    
+    def get(self, name: str) -> Union[CountedPattern, ClassSelector]:
+        """Look up a registered pattern or selector"""
+        return self._entries[name]
+    
+    def stats(self, include_unused: bool = False) -> Dict[str, int]:
+        """
+        Invocation counts per pattern and selector
+        
+        Args:
+            include_unused: Also list entries that haven't been called
+        
+        Returns:
+            Dictionary of name -> calls, most called first
+        """
+        counts = [
+            (entry.name, entry.calls)
+            for entry in self._entries.values()
+            if include_unused or entry.calls
+        ]
+        return dict(sorted(counts, key=lambda item: item[1], reverse=True))
+    
+    def reset_stats(self) -> None:
+        """Reset all invocation counters"""
+        for entry in self._entries.values():
+            entry.calls = 0
+
+
+PATTERNS = PatternRegistry()
+
+
+# ============================================================================
+# DIVI PAGE STRUCTURE
+# ============================================================================
+
+DIVI_SECTION_SELECTOR = PATTERNS.class_selector('divi.section', 'div', 'et_pb_section')
+DIVI_ROW_SELECTOR = PATTERNS.class_selector('divi.row', 'div', 'et_pb_row')
+DIVI_COLUMN_SELECTOR = PATTERNS.class_selector('divi.column', 'div', 'et_pb_column')
+DIVI_TOGGLE_CONTENT_SELECTOR = PATTERNS.class_selector('divi.toggle_content', 'div', 'et_pb_toggle_content')
+
+
+# ============================================================================
+# READING CONTENT SEPARATOR
+# ============================================================================
+
+# Question markers - where questions start after a passage. One anchored
+# alternation instead of a search per marker.
+READING_QUESTION_MARKERS = [
+    r'Questions?\s+\d+',  # "Questions 1-5" or "Question 1"
+    r'Choose\s+the\s+correct',  # "Choose the correct..."
+    r'Choose\s+correct',  # "Choose correct..."
+    r'Write\s+(?:NO\s+MORE|ONE\s+WORD)',  # "Write NO MORE THAN..." or "Write ONE WORD..."
+    r'Complete\s+the',  # "Complete the..."
+    r'Label\s+the',  # "Label the..."
+    r'Match\s+',  # "Match the..." or "Match each..."
+    r'\d{1,2}[\.\)]\s+(?:What|Where|When|Who|Why|How|Which|Choose|Complete|Write|Label|Match|Do|Is|Are|Does)',  # Question number followed by question word
+    r'Do\s+the\s+following\s+statements',  # "Do the following statements..."
+    r'You\s+should\s+spend\s+about\s+\d+\s+minutes',  # Time instructions
+    r'In\s+boxes?\s+\d+',  # "In boxes 1-5..." or "In box 1..."
+    r'on\s+your\s+answer\s+sheet',  # Answer sheet instructions
+]
+READING_QUESTION_MARKER_PATTERN = PATTERNS.regex(
+    'reading_separator.question_marker',
+    r'^(?:' + '|'.join(READING_QUESTION_MARKERS) + ')',
+    re.IGNORECASE
+)
+
+# Instructions that aren't passage content
+READING_INSTRUCTION_PATTERN = PATTERNS.regex(
+    'reading_separator.instruction',
+    r'^(?:You\s+should\s+spend|based\s+on\s+Reading\s+Passage|Reading\s+Passage\s+\d+\s+has|Answer\s+the\s+questions)',
+    re.IGNORECASE
+)
+
+# Multiple choice options (A, B, C, D, E) followed by a capital letter
+READING_OPTION_PATTERN = PATTERNS.regex('reading_separator.option', r'^[A-E]\s+[A-Z]')
+
+# "READING PASSAGE 1" headings, the heading prefix before a title, and the passage number
+READING_PASSAGE_HEADING_PATTERN = PATTERNS.regex(
+    'reading_separator.passage_heading', r'READING\s+PASSAGE\s+[1-3]', re.IGNORECASE
+)
+READING_PASSAGE_PREFIX_PATTERN = PATTERNS.regex(
+    'reading_separator.passage_prefix', r'READING\s+PASSAGE\s+[1-3]\s*:?\s*', re.IGNORECASE
+)
+READING_PASSAGE_NUMBER_PATTERN = PATTERNS.regex(
+    'reading_separator.passage_number', r'PASSAGE\s+([1-3])', re.IGNORECASE
+)
+
+
+# ============================================================================
+# READING ANSWER EXTRACTOR
+# ============================================================================
+
+READING_ANSWER_SECTION_SELECTOR = PATTERNS.class_selector(
+    'reading_answer.section', 'div', 'et_pb_section_3', 'et_section_regular'
+)
+READING_ANSWER_ROW_SELECTOR = PATTERNS.class_selector('reading_answer.row', 'div', 'et_pb_row_16')
+
+# Question numbers before answers: "14 answer" between <br/> tags, "14. answer" in a <p>
+READING_ANSWER_LINE_NUMBER_PATTERN = PATTERNS.regex('reading_answer.line_number', r'^\d+\s+')
+READING_ANSWER_NUMBER_PATTERN = PATTERNS.regex('reading_answer.number', r'^\d+\.\s*')
+
+# Notes in parentheses like "(capital optional)"
+READING_ANSWER_NOTE_PATTERN = PATTERNS.regex('reading_answer.note', r'\s*\([^)]*\)\s*')
+
+# Headings before the answer section, and passage markers inside it
+READING_ANSWER_HEADING_PATTERN = PATTERNS.regex(
+    'reading_answer.heading', r'answer.*reading.*test', re.IGNORECASE
+)
+READING_ANSWERS_HEADING_PATTERN = PATTERNS.regex('reading_answer.answers_heading', r'answers?', re.IGNORECASE)
+READING_ANSWER_PASSAGE_PATTERN = PATTERNS.regex(
+    'reading_answer.passage', r'(?:reading\s+)?passage\s+([1-3])', re.IGNORECASE
+)
+
+
+# ============================================================================
+# LISTENING ANSWER EXTRACTOR
+# ============================================================================
+
+# "1. ANSWER" or "1) ANSWER" or "1: ANSWER"
+LISTENING_ANSWER_PATTERN = PATTERNS.regex('listening_answer.answer', r'^(\d+)[\.\):\s]+(.+)$', re.MULTILINE)
+
+# Range format "1-5: answer1, answer2, ..." and its answer separators
+LISTENING_ANSWER_RANGE_PATTERN = PATTERNS.regex(
+    'listening_answer.range', r'(\d+)[-–](\d+)[\.\):\s]+(.+)$', re.MULTILINE
+)
+LISTENING_ANSWER_SEPARATOR_PATTERN = PATTERNS.regex('listening_answer.separator', r'[,;]')
+
+# Tags and comments left in answer text
+LISTENING_TAG_PATTERN = PATTERNS.regex('listening_answer.tag', r'<!--.*?-->|</?[A-Za-z][^>]*>', re.DOTALL)
+
+# Start of the next question inside an answer
+LISTENING_NEXT_QUESTION_PATTERN = PATTERNS.regex('listening_answer.next_question', r'\s+\d+[\.\):\s]')
+
+# "Question 1: Answer" or "Q1: Answer" on one line
+LISTENING_QUESTION_LABEL_PATTERN = PATTERNS.regex(
+    'listening_answer.question_label', r'(?:Question|Q)\s*(\d+)\s*:?\s*(.+)', re.IGNORECASE
+)
+
+# Number in a question cell like "Q1"
+LISTENING_NUMBER_PATTERN = PATTERNS.regex('listening_answer.number', r'\d+')
+
+# Question numbers in running answer text: "1. apartment 2. Jones", "1 apartment 2 Jones"
+LISTENING_QUESTION_NUMBER_PATTERN = PATTERNS.regex('listening_answer.question_number', r'(\d+)[\.\):\s]+')
+LISTENING_PERIOD_NUMBER_PATTERN = PATTERNS.regex('listening_answer.period_number', r'(\d+)\.\s*')
+LISTENING_SPACE_NUMBER_PATTERN = PATTERNS.regex('listening_answer.space_number', r'(\d+)\s+')
+
+# "Question 1: Answer text" up to the next "Question N"
+LISTENING_QUESTION_BLOCK_PATTERN = PATTERNS.regex(
+    'listening_answer.question_block',
+    r'[Qq]uestion\s+(\d+)\s*:?\s*(.+?)(?=[Qq]uestion\s+\d+|$)',
+    re.DOTALL
+)
+
+# "1 Answer" lines
+LISTENING_NUMBERED_ANSWER_PATTERN = PATTERNS.regex(
+    'listening_answer.numbered_answer',
+    r'^\s*(\d+)\s+([A-Za-z].+?)(?=\s+\d+\s+[A-Za-z]|$)',
+    re.MULTILINE
+)
+
+# Parenthetical notes like "(noun)", "(surname)", anywhere or at the end
+LISTENING_NOTE_PATTERN = PATTERNS.regex('listening_answer.note', r'\s*\([^)]*\)\s*')
+LISTENING_TRAILING_NOTE_PATTERN = PATTERNS.regex('listening_answer.trailing_note', r'\s*\([^)]*\)\s*$')
+
+
+# ============================================================================
+# LISTENING PARSER
+# ============================================================================
+
+# Section headings like "SECTION 1", "Section 2"
+LISTENING_SECTION_PATTERN = PATTERNS.regex('listening_parser.section', r'SECTION\s+([1-4])', re.IGNORECASE)
+
+# Question type hints: option lists (A, B, C, D), numbered blanks, dotted gaps
+LISTENING_OPTION_PATTERN = PATTERNS.regex('listening_parser.option', r"[A-D][\.\):]")
+LISTENING_BLANK_PATTERN = PATTERNS.regex('listening_parser.blank', r"\b\d+\b.*?_+")
+LISTENING_DOTS_PATTERN = PATTERNS.regex('listening_parser.dots', r"\.{3,}")
+
+# Question boundary markers that end a section's context. Kept as separate
+# patterns: they aren't anchored, and an alternation of them scans slower.
+LISTENING_QUESTION_BOUNDARY_PATTERNS = (
+    PATTERNS.regex('listening_parser.boundary.questions', r'[Qq]uestions?\s+\d+'),  # Questions 1-10
+    PATTERNS.regex('listening_parser.boundary.number', r'^\d+[\.\)]\s'),  # Question number at start (1. or 1))
+    PATTERNS.regex('listening_parser.boundary.complete', r'[Cc]omplete\s+the'),  # Complete the form/table/etc
+    PATTERNS.regex('listening_parser.boundary.choose', r'[Cc]hoose\s+(?:the|two|three)'),  # Choose instructions
+    PATTERNS.regex('listening_parser.boundary.write', r'[Ww]rite\s+(?:NO\s+MORE|ONE\s+WORD)'),  # Write instructions
+    PATTERNS.regex('listening_parser.boundary.match', r'[Mm]atch\s+'),  # Match instructions
+    PATTERNS.regex('listening_parser.boundary.label', r'[Ll]abel\s+'),  # Label instructions
+)
+
+# Test number in a URL or file name
+LISTENING_TEST_NUMBER_PATTERN = PATTERNS.regex('listening_parser.test_number', r'test[-_]?(\d+)', re.IGNORECASE)
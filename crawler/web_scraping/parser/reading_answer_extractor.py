@@ -9,15 +9,44 @@ Requirements: 3.1, 3.2, 3.3, 3.4, 3.5, 3.6, 3.7, 6.2, 6.5
 """
 
 from bs4 import BeautifulSoup, Tag
-from typing import Optional, List
-import re
+from typing import Optional, List, Tuple, Union
 
 try:
+    from .html_document import parse_html
     from .logging_config import get_logger
     from .exceptions import AnswerExtractionError, HTMLParsingError
+    from .patterns import (
+        READING_ANSWER_SECTION_SELECTOR,
+        READING_ANSWER_ROW_SELECTOR,
+        READING_ANSWER_LINE_NUMBER_PATTERN,
+        READING_ANSWER_NUMBER_PATTERN,
+        READING_ANSWER_NOTE_PATTERN,
+        READING_ANSWER_HEADING_PATTERN,
+        READING_ANSWERS_HEADING_PATTERN,
+        READING_ANSWER_PASSAGE_PATTERN,
+        DIVI_SECTION_SELECTOR,
+        DIVI_ROW_SELECTOR,
+        DIVI_COLUMN_SELECTOR,
+        DIVI_TOGGLE_CONTENT_SELECTOR
+    )
 except ImportError:
+    from html_document import parse_html
     from logging_config import get_logger
     from exceptions import AnswerExtractionError, HTMLParsingError
+    from patterns import (
+        READING_ANSWER_SECTION_SELECTOR,
+        READING_ANSWER_ROW_SELECTOR,
+        READING_ANSWER_LINE_NUMBER_PATTERN,
+        READING_ANSWER_NUMBER_PATTERN,
+        READING_ANSWER_NOTE_PATTERN,
+        READING_ANSWER_HEADING_PATTERN,
+        READING_ANSWERS_HEADING_PATTERN,
+        READING_ANSWER_PASSAGE_PATTERN,
+        DIVI_SECTION_SELECTOR,
+        DIVI_ROW_SELECTOR,
+        DIVI_COLUMN_SELECTOR,
+        DIVI_TOGGLE_CONTENT_SELECTOR
+    )
 
 logger = get_logger(__name__)
 
@@ -25,16 +54,26 @@ logger = get_logger(__name__)
 class AnswerData:
     """Data class for storing extracted answer information."""
     
-    def __init__(self, passage1_answers: str, passage2_answers: str, passage3_answers: str, raw_html: str = ""):
+    def __init__(
+        self,
+        passage1_answers: str,
+        passage2_answers: str,
+        passage3_answers: str,
+        raw_html: str = "",
+        answer_lists: Optional[List[List[str]]] = None
+    ):
         self.passage1_answers = passage1_answers
         self.passage2_answers = passage2_answers
         self.passage3_answers = passage3_answers
         self.raw_html = raw_html
         
-        # Parse answers into clean lists
-        self.passage1_list = self._parse_answers_to_list(passage1_answers)
-        self.passage2_list = self._parse_answers_to_list(passage2_answers)
-        self.passage3_list = self._parse_answers_to_list(passage3_answers)
+        # Parse answers into clean lists, unless the extractor already read them from the page tree
+        if answer_lists is not None:
+            self.passage1_list, self.passage2_list, self.passage3_list = answer_lists
+        else:
+            self.passage1_list = self._parse_answers_to_list(passage1_answers)
+            self.passage2_list = self._parse_answers_to_list(passage2_answers)
+            self.passage3_list = self._parse_answers_to_list(passage3_answers)
     
     def _parse_answers_to_list(self, html_content: str) -> List[str]:
         """
@@ -57,11 +96,22 @@ class AnswerData:
             return []
         
         # Parse HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = parse_html(html_content)
         
         # Find all paragraphs
-        paragraphs = soup.find_all('p')
+        return self.parse_answer_paragraphs(soup.find_all('p'))
+    
+    @staticmethod
+    def parse_answer_paragraphs(paragraphs: List[Tag]) -> List[str]:
+        """
+        Read clean answer strings from answer paragraphs.
         
+        Args:
+            paragraphs: <p> tags of one passage's answers, in document order
+        
+        Returns:
+            List of clean answer strings
+        """
         answers = []
         
         for p in paragraphs:
@@ -85,10 +135,10 @@ class AnswerData:
                         continue
                     
                     # Remove question numbers (e.g., "1. ", "14. ", etc.)
-                    text = re.sub(r'^\d+\s+', '', text)
+                    text = READING_ANSWER_LINE_NUMBER_PATTERN.sub('', text)
                     
                     # Remove notes in parentheses like "(capital optional)"
-                    text = re.sub(r'\s*\([^)]*\)\s*', ' ', text)
+                    text = READING_ANSWER_NOTE_PATTERN.sub(' ', text)
                     
                     # Clean up extra whitespace
                     text = ' '.join(text.split())
@@ -103,10 +153,10 @@ class AnswerData:
                     continue
                 
                 # Remove question numbers (e.g., "1. ", "14. ", etc.)
-                text = re.sub(r'^\d+\.\s*', '', text)
+                text = READING_ANSWER_NUMBER_PATTERN.sub('', text)
                 
                 # Remove notes in parentheses like "(capital optional)"
-                text = re.sub(r'\s*\([^)]*\)\s*', ' ', text)
+                text = READING_ANSWER_NOTE_PATTERN.sub(' ', text)
                 
                 # Clean up extra whitespace
                 text = ' '.join(text.split())
@@ -183,9 +233,7 @@ class ReadingAnswerExtractor:
         logger.info("Searching for answer section using et_pb_section_3 pattern")
         
         # Search for div with specific class pattern
-        answer_section = soup.find('div', class_=lambda x: x and 
-                                   'et_pb_section_3' in x and 
-                                   'et_section_regular' in x)
+        answer_section = READING_ANSWER_SECTION_SELECTOR.find(soup)
         
         if answer_section:
             logger.info("Found answer section with class et_pb_section_3")
@@ -216,8 +264,7 @@ class ReadingAnswerExtractor:
         logger.debug("Searching for answer row using et_pb_row_16 pattern")
         
         # Search for div with specific class pattern
-        answer_row = answer_section.find('div', class_=lambda x: x and 
-                                        'et_pb_row_16' in x)
+        answer_row = READING_ANSWER_ROW_SELECTOR.find(answer_section)
         
         if answer_row:
             logger.info("Found answer row with class et_pb_row_16")
@@ -252,21 +299,12 @@ class ReadingAnswerExtractor:
         
         logger.info("Extracting answer columns from answer row")
         
-        # Find all column divs within the row
-        # Columns typically have class "et_pb_column"
-        columns = answer_row.find_all('div', class_=lambda x: x and 'et_pb_column' in x, recursive=False)
-        
-        logger.debug(f"Found {len(columns)} columns in answer row")
-        
         # Extract content from each column
         answer_contents = []
         
-        for i, column in enumerate(columns[:3], start=1):  # Only take first 3 columns
+        for i, (column, toggle_contents) in enumerate(self._find_answer_columns(answer_row), start=1):
             logger.debug(f"Processing column {i}")
             
-            # Find et_pb_toggle_content divs within this column
-            toggle_contents = column.find_all('div', class_=lambda x: x and 'et_pb_toggle_content' in x)
-            
             if toggle_contents:
                 # Combine all toggle content divs in this column
                 column_html_parts = []
@@ -292,6 +330,57 @@ class ReadingAnswerExtractor:
         logger.info(f"Successfully extracted answers from {len(answer_contents)} columns")
         return answer_contents[:3]  # Return only first 3
     
+    def extract_answer_lists(self, answer_row: Tag) -> List[List[str]]:
+        """
+        Extract clean answer lists from the three columns.
+        
+        Reads the same content as extract_answer_columns() directly from the
+        page tree, so AnswerData doesn't have to parse the column HTML again.
+        
+        Args:
+            answer_row: Tag for et_pb_row_16
+        
+        Returns:
+            List of 3 answer lists (one per passage)
+        """
+        if not answer_row:
+            return [[], [], []]
+        
+        answer_lists = []
+        for column, toggle_contents in self._find_answer_columns(answer_row):
+            if toggle_contents:
+                paragraphs = [p for toggle in toggle_contents for p in toggle.find_all('p')]
+            else:
+                paragraphs = column.find_all('p')
+            answer_lists.append(AnswerData.parse_answer_paragraphs(paragraphs))
+        
+        while len(answer_lists) < 3:
+            answer_lists.append([])
+        
+        return answer_lists
+    
+    def _find_answer_columns(self, answer_row: Tag) -> List[Tuple[Tag, List[Tag]]]:
+        """
+        Find the first three answer columns and their toggle content divs.
+        
+        Args:
+            answer_row: Tag for et_pb_row_16
+        
+        Returns:
+            List of (column, et_pb_toggle_content divs in the column)
+        """
+        # Find all column divs within the row
+        # Columns typically have class "et_pb_column"
+        columns = DIVI_COLUMN_SELECTOR.find_all(answer_row, recursive=False)
+        
+        logger.debug(f"Found {len(columns)} columns in answer row")
+        
+        # Only take first 3 columns
+        return [
+            (column, DIVI_TOGGLE_CONTENT_SELECTOR.find_all(column))
+            for column in columns[:3]
+        ]
+    
     def extract_answers(self, soup: BeautifulSoup) -> AnswerData:
         """
         Extract answers for all three passages.
@@ -344,7 +433,8 @@ class ReadingAnswerExtractor:
                 passage1_answers=answer_columns[0],
                 passage2_answers=answer_columns[1],
                 passage3_answers=answer_columns[2],
-                raw_html=str(answer_section)
+                raw_html=str(answer_section),
+                answer_lists=self.extract_answer_lists(answer_row)
             )
             
             logger.info("Successfully extracted answers using primary method")
@@ -386,27 +476,26 @@ class ReadingAnswerExtractor:
         logger.warning("HTML structure variation detected - using fallback extraction")
         
         # Strategy 1: Look for "Answer" heading and find the section after it
-        answer_heading_pattern = re.compile(r'answer.*reading.*test', re.IGNORECASE)
         all_headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
         
         for heading in all_headings:
             heading_text = heading.get_text(separator=' ', strip=True)
             
-            if answer_heading_pattern.search(heading_text):
+            if READING_ANSWER_HEADING_PATTERN.search(heading_text):
                 logger.info(f"Found answer heading: {heading_text}")
                 
                 # Find the next et_pb_section after this heading
                 current = heading
                 while current:
-                    current = current.find_next('div', class_=lambda x: x and 'et_pb_section' in x)
+                    current = DIVI_SECTION_SELECTOR.find_next(current)
                     if current:
                         # Check if this section has columns with passage answers
-                        columns = current.find_all('div', class_=lambda x: x and 'et_pb_column' in x, recursive=False)
+                        columns = DIVI_COLUMN_SELECTOR.find_all(current, recursive=False)
                         if not columns:
                             # Look deeper for columns
-                            rows = current.find_all('div', class_=lambda x: x and 'et_pb_row' in x)
+                            rows = DIVI_ROW_SELECTOR.find_all(current)
                             for row in rows:
-                                columns = row.find_all('div', class_=lambda x: x and 'et_pb_column' in x, recursive=False)
+                                columns = DIVI_COLUMN_SELECTOR.find_all(row, recursive=False)
                                 if len(columns) >= 3:
                                     logger.info(f"Found answer section after heading with {len(columns)} columns")
                                     answer_columns = self.extract_answer_columns(row)
@@ -416,7 +505,8 @@ class ReadingAnswerExtractor:
                                             passage1_answers=answer_columns[0],
                                             passage2_answers=answer_columns[1],
                                             passage3_answers=answer_columns[2],
-                                            raw_html=str(current)
+                                            raw_html=str(current),
+                                            answer_lists=self.extract_answer_lists(row)
                                         )
                                         logger.info("Fallback extraction succeeded with heading-based section search")
                                         return answer_data
@@ -427,13 +517,13 @@ class ReadingAnswerExtractor:
         
         if answer_section:
             # Try to find any row with columns
-            all_rows = answer_section.find_all('div', class_=lambda x: x and 'et_pb_row' in x)
+            all_rows = DIVI_ROW_SELECTOR.find_all(answer_section)
             
             for row in all_rows:
                 logger.debug(f"Trying fallback with row: {row.get('class')}")
                 
                 # Look for columns in this row
-                columns = row.find_all('div', class_=lambda x: x and 'et_pb_column' in x, recursive=False)
+                columns = DIVI_COLUMN_SELECTOR.find_all(row, recursive=False)
                 
                 if len(columns) >= 3:
                     logger.info(f"Found alternative row with {len(columns)} columns")
@@ -444,19 +534,19 @@ class ReadingAnswerExtractor:
                             passage1_answers=answer_columns[0],
                             passage2_answers=answer_columns[1],
                             passage3_answers=answer_columns[2],
-                            raw_html=str(answer_section)
+                            raw_html=str(answer_section),
+                            answer_lists=self.extract_answer_lists(row)
                         )
                         logger.info("Fallback extraction succeeded with alternative row pattern")
                         return answer_data
         
         # Strategy 3: Look for "Answer" or "Answers" heading (generic)
-        answer_heading_pattern = re.compile(r'answers?', re.IGNORECASE)
         all_headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
         
         for heading in all_headings:
             heading_text = heading.get_text(separator=' ', strip=True)
             
-            if answer_heading_pattern.search(heading_text):
+            if READING_ANSWERS_HEADING_PATTERN.search(heading_text):
                 logger.info(f"Found answer heading: {heading_text}")
                 
                 # Extract content after this heading
@@ -484,8 +574,8 @@ class ReadingAnswerExtractor:
             # Get all content from answer section
             all_content = str(answer_section)
             
-            # Try to split by passage markers
-            passage_answers = self._split_answers_by_passage(all_content)
+            # Try to split by passage markers (searching the section in place)
+            passage_answers = self._split_answers_by_passage(answer_section)
             
             if len(passage_answers) == 3:
                 answer_data = AnswerData(
@@ -546,7 +636,7 @@ class ReadingAnswerExtractor:
         
         return '\n'.join(content_elements)
     
-    def _split_answers_by_passage(self, content: str) -> List[str]:
+    def _split_answers_by_passage(self, content: Union[str, Tag]) -> List[str]:
         """
         Split answer content by passage markers.
         
@@ -554,16 +644,14 @@ class ReadingAnswerExtractor:
         "Reading Passage 1", etc.
         
         Args:
-            content: HTML content string
+            content: HTML content string, or a Tag of the page tree to search
+                in place (content after a marker ends with its parent element)
             
         Returns:
             List of HTML strings, one per passage
         """
         # Create a BeautifulSoup object to work with
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Find passage markers
-        passage_pattern = re.compile(r'(?:reading\s+)?passage\s+([1-3])', re.IGNORECASE)
+        soup = content if isinstance(content, Tag) else parse_html(content)
         
         # Find all elements that might contain passage markers
         all_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'strong', 'b'])
@@ -571,7 +659,7 @@ class ReadingAnswerExtractor:
         passage_markers = []
         for element in all_elements:
             text = element.get_text(separator=' ', strip=True)
-            match = passage_pattern.search(text)
+            match = READING_ANSWER_PASSAGE_PATTERN.search(text)
             if match:
                 passage_num = int(match.group(1))
                 passage_markers.append((passage_num, element))
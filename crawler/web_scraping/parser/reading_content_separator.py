@@ -8,14 +8,29 @@ where questions were mixed into passage paragraphs.
 
 from bs4 import BeautifulSoup, Tag
 from typing import Dict, List, Tuple, Any, Optional
-import re
 
 try:
     from .text_utils import TextUtils
     from .logging_config import get_logger
+    from .patterns import (
+        READING_QUESTION_MARKER_PATTERN,
+        READING_INSTRUCTION_PATTERN,
+        READING_OPTION_PATTERN,
+        READING_PASSAGE_HEADING_PATTERN,
+        READING_PASSAGE_PREFIX_PATTERN,
+        READING_PASSAGE_NUMBER_PATTERN
+    )
 except ImportError:
     from text_utils import TextUtils
     from logging_config import get_logger
+    from patterns import (
+        READING_QUESTION_MARKER_PATTERN,
+        READING_INSTRUCTION_PATTERN,
+        READING_OPTION_PATTERN,
+        READING_PASSAGE_HEADING_PATTERN,
+        READING_PASSAGE_PREFIX_PATTERN,
+        READING_PASSAGE_NUMBER_PATTERN
+    )
 
 logger = get_logger(__name__)
 
@@ -33,32 +48,13 @@ class ReadingContentSeparator:
     into passage paragraphs, making proper content separation impossible.
     """
     
-    # Question marker patterns - comprehensive list to detect where questions start
-    QUESTION_MARKERS = [
-        r'^Questions?\s+\d+',  # "Questions 1-5" or "Question 1"
-        r'^Choose\s+the\s+correct',  # "Choose the correct..."
-        r'^Choose\s+correct',  # "Choose correct..."
-        r'^Write\s+(?:NO\s+MORE|ONE\s+WORD)',  # "Write NO MORE THAN..." or "Write ONE WORD..."
-        r'^Complete\s+the',  # "Complete the..."
-        r'^Label\s+the',  # "Label the..."
-        r'^Match\s+',  # "Match the..." or "Match each..."
-        r'^\d{1,2}[\.\)]\s+(?:What|Where|When|Who|Why|How|Which|Choose|Complete|Write|Label|Match|Do|Is|Are|Does)',  # Question number followed by question word
-        r'^Do\s+the\s+following\s+statements',  # "Do the following statements..."
-        r'^You\s+should\s+spend\s+about\s+\d+\s+minutes',  # Time instructions
-        r'^In\s+boxes?\s+\d+',  # "In boxes 1-5..." or "In box 1..."
-        r'^on\s+your\s+answer\s+sheet',  # Answer sheet instructions
-    ]
-    
-    # Option pattern - detects multiple choice options (A, B, C, D, E)
-    OPTION_PATTERN = r'^[A-E]\s+[A-Z]'
-    
     def __init__(self):
         """Initialize the ReadingContentSeparator."""
         logger.info("ReadingContentSeparator initialized")
         
-        # Compile regex patterns for efficiency
-        self.question_marker_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.QUESTION_MARKERS]
-        self.option_pattern = re.compile(self.OPTION_PATTERN)
+        # Precompiled patterns from the registry
+        self.question_marker_pattern = READING_QUESTION_MARKER_PATTERN
+        self.option_pattern = READING_OPTION_PATTERN
 
     
     def separate_content(self, soup: BeautifulSoup) -> Dict[str, Any]:
@@ -176,14 +172,12 @@ class ReadingContentSeparator:
         """
         boundaries = []
         
-        # Pattern to match "READING PASSAGE 1", "READING PASSAGE 2", etc.
-        passage_heading_pattern = re.compile(r'READING\s+PASSAGE\s+[1-3]', re.IGNORECASE)
-        
         # Find all headings that mark passage starts
         passage_headings = []
         for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
             heading_text = heading.get_text(separator=' ', strip=True)
-            if passage_heading_pattern.search(heading_text):
+            # Matches "READING PASSAGE 1", "READING PASSAGE 2", etc.
+            if READING_PASSAGE_HEADING_PATTERN.search(heading_text):
                 passage_headings.append(heading)
                 logger.debug(f"Found passage heading: {heading_text}")
         
@@ -358,11 +352,10 @@ class ReadingContentSeparator:
         if not text:
             return False
         
-        # Check against all compiled patterns
-        for pattern in self.question_marker_patterns:
-            if pattern.search(text):
-                logger.debug(f"Question marker detected: {text[:50]}")
-                return True
+        # Check against all question markers at once
+        if self.question_marker_pattern.search(text):
+            logger.debug(f"Question marker detected: {text[:50]}")
+            return True
         
         return False
 
@@ -414,7 +407,7 @@ class ReadingContentSeparator:
         
         # Check if there's a title after "READING PASSAGE X"
         # Pattern: "READING PASSAGE 1: Title" or "READING PASSAGE 1 Title"
-        title_match = re.sub(r'READING\s+PASSAGE\s+[1-3]\s*:?\s*', '', heading_text, flags=re.IGNORECASE)
+        title_match = READING_PASSAGE_PREFIX_PATTERN.sub('', heading_text)
         
         if title_match.strip():
             return title_match.strip()
@@ -428,7 +421,7 @@ class ReadingContentSeparator:
                 return next_text
         
         # Default: extract passage number and return generic title
-        passage_num_match = re.search(r'PASSAGE\s+([1-3])', heading_text, re.IGNORECASE)
+        passage_num_match = READING_PASSAGE_NUMBER_PATTERN.search(heading_text)
         if passage_num_match:
             return f"READING PASSAGE {passage_num_match.group(1)}"
         
@@ -522,15 +515,9 @@ class ReadingContentSeparator:
         Returns:
             True if text appears to be an instruction, False otherwise
         """
-        instruction_patterns = [
-            r'^You\s+should\s+spend',  # "You should spend about 20 minutes..."
-            r'^based\s+on\s+Reading\s+Passage',  # "based on Reading Passage 1"
-            r'^Reading\s+Passage\s+\d+\s+has',  # "Reading Passage 1 has..."
-            r'^Answer\s+the\s+questions',  # "Answer the questions below"
-        ]
-        
-        for pattern in instruction_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
+        # "You should spend about 20 minutes...", "based on Reading Passage 1",
+        # "Reading Passage 1 has...", "Answer the questions below"
+        if READING_INSTRUCTION_PATTERN.search(text):
+            return True
         
         return False
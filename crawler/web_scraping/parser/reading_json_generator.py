@@ -8,7 +8,6 @@ in a format suitable for the React frontend application.
 Requirements: 5.1, 5.2, 5.3, 5.4, 5.5, 5.6, 5.7, 5.8, 5.9, 5.10
 """
 
-import json
 import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
@@ -17,10 +16,12 @@ try:
     from .reading_passage_extractor import PassageData
     from .reading_answer_extractor import AnswerData
     from .logging_config import get_logger
+    from .output_sink import OutputSink, FileSink
 except ImportError:
     from reading_passage_extractor import PassageData
     from reading_answer_extractor import AnswerData
     from logging_config import get_logger
+    from output_sink import OutputSink, FileSink
 
 logger = get_logger(__name__)
 
@@ -47,8 +48,14 @@ class ReadingJSONGenerator:
     # Average reading speed (words per minute)
     AVERAGE_READING_SPEED = 250
     
-    def __init__(self):
-        """Initialize the ReadingJSONGenerator."""
+    def __init__(self, sink: Optional[OutputSink] = None):
+        """
+        Initialize the ReadingJSONGenerator.
+        
+        Args:
+            sink: Where save_json() writes (default: one file per test, written atomically)
+        """
+        self.sink = sink or FileSink()
         logger.info("ReadingJSONGenerator initialized")
     
     def generate_json(
@@ -195,7 +202,7 @@ class ReadingJSONGenerator:
         self,
         data: Dict[str, Any],
         output_path: str,
-        indent: int = 2
+        pretty: bool = True
     ) -> None:
         """
         Save JSON data to file with UTF-8 encoding.
@@ -207,7 +214,7 @@ class ReadingJSONGenerator:
         Args:
             data: Dictionary to save
             output_path: File path for output
-            indent: JSON indentation (default 2)
+            pretty: Indent by two spaces (default True)
             
         Raises:
             IOError: If file cannot be written
@@ -220,12 +227,9 @@ class ReadingJSONGenerator:
             ... )
         """
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            # Save with UTF-8 encoding and indentation (Requirements 5.7, 5.8)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=indent, ensure_ascii=False)
+            # Save with UTF-8 encoding and indentation (Requirements 5.7, 5.8);
+            # the sink creates the directory
+            self.sink.write(output_path, data, pretty)
             
             logger.info(f"Saved JSON to: {output_path}")
             
@@ -19,29 +19,38 @@ Requirements: All requirements integrated (Task 10)
 import argparse
 import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 # Import all components
 try:
     from .url_generator import URLGenerator
     from .html_crawler import HTMLCrawler, CrawlProgress
+    from .html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from .parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from .parse_engine import ParseEngine
+    from .html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from .reading_passage_extractor import ReadingPassageExtractor
     from .reading_answer_extractor import ReadingAnswerExtractor
     from .html_sanitizer import HTMLSanitizer
     from .reading_json_generator import ReadingJSONGenerator
-    from .content_validator import ContentValidator
+    from .output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, create_output_sink
+    from .content_validator import ContentValidator, ValidationResult
     from .logging_config import setup_logging, get_logger
     from .exceptions import ParserError, HTMLParsingError, ContentExtractionError, AnswerExtractionError
 except ImportError:
     from url_generator import URLGenerator
     from html_crawler import HTMLCrawler, CrawlProgress
+    from html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from parse_engine import ParseEngine
+    from html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from reading_passage_extractor import ReadingPassageExtractor
     from reading_answer_extractor import ReadingAnswerExtractor
     from html_sanitizer import HTMLSanitizer
     from reading_json_generator import ReadingJSONGenerator
-    from content_validator import ContentValidator
+    from output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, create_output_sink
+    from content_validator import ContentValidator, ValidationResult
     from logging_config import setup_logging, get_logger
     from exceptions import ParserError, HTMLParsingError, ContentExtractionError, AnswerExtractionError
 
@@ -66,7 +75,14 @@ class ReadingTestParser:
         output_dir: str = "web_scraping/parsed/reading/practice",
         delay: float = 0.35,
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        concurrency: int = 1,
+        workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[str] = None,
+        from_cache: bool = False,
+        html_parser: str = HTML_PARSER,
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        async_writes: bool = False
     ):
         """
         Initialize the reading test parser.
@@ -76,15 +92,36 @@ class ReadingTestParser:
             delay: Delay between requests in seconds
             timeout: Request timeout in seconds
             max_retries: Maximum retry attempts for failed requests
+            concurrency: Number of pages downloaded in parallel (per-host delay still applies)
+            workers: Parse processes used by process_batch (0 parses in this process)
+            cache_dir: Raw HTML cache directory (None disables caching)
+            from_cache: Parse cached pages only, without network requests
+            html_parser: BeautifulSoup tree builder for pages ('html.parser' or 'lxml')
+            output_format: 'files' (one JSON file per test) or 'jsonl' (sharded bundles in output_dir)
+            async_writes: Write JSON on a background thread while the next page is parsed
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.html_parser = check_html_parser(html_parser)
+        self.output_format = output_format
+        self.async_writes = async_writes
         
         # Initialize all components
         self.url_generator = URLGenerator()
-        self.crawler = HTMLCrawler(delay=delay, timeout=timeout, max_retries=max_retries)
+        self.passage_extractor = ReadingPassageExtractor()
+        self.answer_extractor = ReadingAnswerExtractor()
+        self.crawler = HTMLCrawler(
+            delay=delay,
+            timeout=timeout,
+            max_retries=max_retries,
+            concurrency=concurrency,
+            cache=HTMLCache(cache_dir) if cache_dir else None,
+            offline=from_cache
+        )
         self.sanitizer = HTMLSanitizer()
-        self.json_generator = ReadingJSONGenerator()
+        self.output_sink = create_output_sink(output_format, self.output_dir, 'reading', async_writes)
+        self.json_generator = ReadingJSONGenerator(self.output_sink)
         self.validator = ContentValidator()
         
         logger.info(f"ReadingTestParser initialized (output_dir={output_dir})")
@@ -111,22 +148,22 @@ class ReadingTestParser:
         try:
             logger.info(f"Parsing test {test_number}")
             
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Parse the page once; the extractors read this tree without re-parsing it
+            document = HTMLDocument(html_content, self.html_parser)
+            soup = document.soup
             
-            # Extract passages
-            passage_extractor = ReadingPassageExtractor(base_url=url)
+            # Extract passages (extractors are reused across tests)
+            self.passage_extractor.base_url = url
             try:
-                passages = passage_extractor.extract_passages_with_fallback(soup)
+                passages = self.passage_extractor.extract_passages_with_fallback(soup)
                 logger.info(f"Test {test_number}: Extracted {len(passages)} passages")
             except (HTMLParsingError, ContentExtractionError) as e:
                 logger.error(f"Test {test_number}: Failed to extract passages: {e}")
                 return None
             
             # Extract answers
-            answer_extractor = ReadingAnswerExtractor()
             try:
-                answers = answer_extractor.extract_answers(soup)
+                answers = self.answer_extractor.extract_answers(soup)
                 logger.info(f"Test {test_number}: Extracted answers")
             except AnswerExtractionError as e:
                 logger.error(f"Test {test_number}: Failed to extract answers: {e}")
@@ -200,7 +237,7 @@ class ReadingTestParser:
                 base_dir=str(self.output_dir.parent)
             )
             
-            if Path(output_path).exists() and not force:
+            if not force and self.output_sink.exists(output_path):
                 logger.info(f"Test {test_number}: Output already exists, skipping")
                 return True
             
@@ -229,6 +266,7 @@ class ReadingTestParser:
             
             # Save JSON
             self.json_generator.save_json(json_data, output_path)
+            self.output_sink.flush()
             logger.info(f"Test {test_number}: Successfully saved to {output_path}")
             
             return True
@@ -237,6 +275,55 @@ class ReadingTestParser:
             logger.error(f"Test {test_number}: Error during processing: {e}", exc_info=True)
             return False
     
+    def parse_and_save(
+        self,
+        test_number: int,
+        html_content: str,
+        url: str,
+        skip_validation: bool = False
+    ) -> Tuple[bool, Optional[ValidationResult]]:
+        """
+        Parse a downloaded test and save its JSON (parse stage of process_batch).
+        
+        Runs in a ParsePipeline worker process.
+        
+        Args:
+            test_number: Test number (1-111)
+            html_content: HTML content of the test page
+            url: Source URL
+            skip_validation: Skip content validation
+            
+        Returns:
+            Tuple of (saved, validation result or None if validation was skipped)
+        """
+        json_data = self.parse_single_test(
+            test_number=test_number,
+            html_content=html_content,
+            url=url,
+            skip_validation=skip_validation
+        )
+        
+        if json_data is None:
+            return False, None
+        
+        # Save JSON
+        output_path = self.json_generator.generate_output_path(
+            test_number,
+            test_type="practice",
+            base_dir=str(self.output_dir.parent)
+        )
+        self.json_generator.save_json(json_data, output_path)
+        
+        # Validate if not skipped
+        validation_result = None
+        if not skip_validation:
+            validation_result = self.validator.validate_reading_test(
+                json_data,
+                test_number=test_number
+            )
+        
+        return True, validation_result
+    
     def process_batch(
         self,
         start: int,
@@ -268,81 +355,94 @@ class ReadingTestParser:
         # Generate URLs
         urls = [(i, self.url_generator.generate_practice_url(i)) for i in range(start, end + 1)]
         
-        # Download all pages
-        progress_path = Path(progress_file) if progress_file else Path("crawler_progress.json")
-        download_result = self.crawler.download_batch(
-            urls=urls,
-            output_dir=self.output_dir,
-            skip_existing=not force,
-            progress_file=progress_path,
-            force=force
-        )
-        
-        downloaded_pages = download_result['downloaded_pages']
-        
-        # Parse and save each downloaded page
+        # Parse and save each page as it arrives
         successful = 0
         failed = 0
         skipped = 0
         validation_results = []
+        handed_off = set()
         
-        for test_number in range(start, end + 1):
+        def on_page(test_number: int, html_content: str) -> None:
+            handed_off.add(test_number)
+            url = self.url_generator.generate_practice_url(test_number)
             try:
-                # Check if we have downloaded content
-                if test_number not in downloaded_pages:
-                    # Check if output already exists
-                    output_path = self.json_generator.generate_output_path(
+                pipeline.submit(test_number, test_number, html_content, url, skip_validation)
+            except Exception as e:
+                # Never reached the pipeline, so on_result would not report it
+                on_result(test_number, None, e)
+                raise
+        
+        def on_result(test_number: int, result, error: Optional[BaseException]) -> None:
+            nonlocal successful, failed
+            if error is not None:
+                logger.error(f"Test {test_number}: Error during processing: {error}")
+                failed += 1
+                return
+            
+            saved, validation_result = result
+            if not saved:
+                logger.error(f"Test {test_number}: Parsing failed")
+                failed += 1
+                return
+            
+            if validation_result is not None:
+                validation_results.append(validation_result)
+            
+            successful += 1
+            logger.info(f"Test {test_number}: Successfully processed")
+        
+        # Download pages; the pipeline holds up downloads while its queue is full
+        progress_path = Path(progress_file) if progress_file else Path("crawler_progress.json")
+        with ParsePipeline(
+            ParseEngine,
+            {
+                'test_type': 'reading',
+                'output_dir': str(self.output_dir),
+                'html_parser': self.html_parser,
+                'output_format': self.output_format,
+                'async_writes': self.async_writes
+            },
+            'parse_and_save',
+            on_result,
+            workers=self.workers,
+            inline_target=self
+        ) as pipeline:
+            download_result = self.crawler.download_batch(
+                urls=urls,
+                output_dir=self.output_dir,
+                skip_existing=not force,
+                progress_file=progress_path,
+                force=force,
+                on_page=on_page,
+                output_exists=lambda test_number: self.output_sink.exists(
+                    self.json_generator.generate_output_path(
                         test_number,
                         test_type="practice",
                         base_dir=str(self.output_dir.parent)
                     )
-                    
-                    if Path(output_path).exists():
-                        logger.debug(f"Test {test_number}: Already processed, skipping")
-                        skipped += 1
-                        continue
-                    else:
-                        logger.warning(f"Test {test_number}: Not downloaded and no existing output")
-                        failed += 1
-                        continue
-                
-                # Parse the test
-                html_content = downloaded_pages[test_number]
-                url = self.url_generator.generate_practice_url(test_number)
-                
-                json_data = self.parse_single_test(
-                    test_number=test_number,
-                    html_content=html_content,
-                    url=url,
-                    skip_validation=skip_validation
-                )
-                
-                if json_data is None:
-                    logger.error(f"Test {test_number}: Parsing failed")
-                    failed += 1
-                    continue
-                
-                # Save JSON
-                output_path = self.json_generator.generate_output_path(
-                    test_number,
-                    test_type="practice",
-                    base_dir=str(self.output_dir.parent)
                 )
-                self.json_generator.save_json(json_data, output_path)
-                
-                # Validate if not skipped
-                if not skip_validation:
-                    validation_result = self.validator.validate_reading_test(
-                        json_data,
-                        test_number=test_number
-                    )
-                    validation_results.append(validation_result)
-                
-                successful += 1
-                logger.info(f"Test {test_number}: Successfully processed")
-                
-            except Exception as e:
-                logger.error(f"Test {test_number}: Error during processing: {e}", exc_info=True)
+            )
+        
+        # Parse workers flush their own sinks when they exit
+        self.output_sink.flush()
+        
+        # Tests the crawler didn't hand over were skipped or failed to download
+        for test_number in range(start, end + 1):
+            if test_number in handed_off:
+                continue
+            
+            # Check if output already exists
+            output_path = self.json_generator.generate_output_path(
+                test_number,
+                test_type="practice",
+                base_dir=str(self.output_dir.parent)
+            )
+            
+            if self.output_sink.exists(output_path):
+                logger.debug(f"Test {test_number}: Already processed, skipping")
+                skipped += 1
+            else:
+                logger.warning(f"Test {test_number}: Not downloaded and no existing output")
                 failed += 1
         
         # Generate validation summary if we have results
@@ -382,6 +482,10 @@ class ReadingTestParser:
         logger.info("=" * 70)
         
         return summary
+    
+    def close(self) -> None:
+        """Finish queued JSON writes"""
+        self.output_sink.close()
 
 
 def main():
@@ -487,6 +591,55 @@ Examples:
         default=3,
         help='Maximum retry attempts (default: 3)'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of parallel downloads; --delay still spaces requests per host (default: 1)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Parse processes; pages are parsed while the rest download, 0 parses in-process (default: {DEFAULT_WORKERS})'
+    )
+    
+    # Raw HTML cache options
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'Raw HTML cache; cached pages are revalidated with conditional GETs (default: {DEFAULT_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not store or revalidate raw HTML'
+    )
+    parser.add_argument(
+        '--from-cache',
+        action='store_true',
+        help='Reparse from the raw HTML cache only, without network requests (implies --force)'
+    )
+    parser.add_argument(
+        '--html-parser',
+        choices=HTML_PARSERS,
+        default=HTML_PARSER,
+        help=f'BeautifulSoup parser for pages; lxml is faster, check it with parser_compat first (default: {HTML_PARSER})'
+    )
+    
+    # JSON output options
+    parser.add_argument(
+        '--output-format',
+        choices=OUTPUT_FORMATS,
+        default=DEFAULT_OUTPUT_FORMAT,
+        help=f'files: one JSON file per test; jsonl: sharded bundles for bulk export (default: {DEFAULT_OUTPUT_FORMAT})'
+    )
+    parser.add_argument(
+        '--async-writes',
+        action='store_true',
+        help='Write JSON on a background thread while the next page is parsed'
+    )
     
     # Logging options
     parser.add_argument(
@@ -513,6 +666,16 @@ Examples:
         parser.error("--start requires --end")
     if args.end and not args.start:
         parser.error("--end requires --start")
+    if args.from_cache and args.no_cache:
+        parser.error("--from-cache can't be used with --no-cache")
+    try:
+        check_html_parser(args.html_parser)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Reparsing from the cache redoes tests that already have output
+    if args.from_cache:
+        args.force = True
     
     # Setup logging
     log_level = 'DEBUG' if args.verbose else 'INFO'
@@ -532,7 +695,14 @@ Examples:
         output_dir=args.output_dir,
         delay=args.delay,
         timeout=args.timeout,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        from_cache=args.from_cache,
+        html_parser=args.html_parser,
+        output_format=args.output_format,
+        async_writes=args.async_writes
     )
     
     try:
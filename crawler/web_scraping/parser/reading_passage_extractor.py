@@ -7,14 +7,16 @@ structure used by ieltstrainingonline.com.
 """
 
 from bs4 import BeautifulSoup, Tag
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 from urllib.parse import urljoin
 import re
 
 try:
+    from .html_document import count_words, parse_html
     from .logging_config import get_logger
     from .exceptions import ContentExtractionError, HTMLParsingError
 except ImportError:
+    from html_document import count_words, parse_html
     from logging_config import get_logger
     from exceptions import ContentExtractionError, HTMLParsingError
 
@@ -24,19 +26,24 @@ logger = get_logger(__name__)
 class PassageData:
     """Data class for storing extracted passage information."""
     
-    def __init__(self, title: str, order_index: int, content: str, images: List[str] = None):
+    def __init__(
+        self,
+        title: str,
+        order_index: int,
+        content: str,
+        images: List[str] = None,
+        word_count: Optional[int] = None
+    ):
         self.title = title
         self.order_index = order_index
         self.content = content
         self.images = images or []
-        self.word_count = self._calculate_word_count(content)
+        # Extractors count words on the page tree; content is only parsed when they don't
+        self.word_count = word_count if word_count is not None else self._calculate_word_count(content)
     
     def _calculate_word_count(self, html_content: str) -> int:
         """Calculate word count from HTML content."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text(separator=' ', strip=True)
-        words = text.split()
-        return len(words)
+        return count_words(parse_html(html_content))
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -158,18 +165,27 @@ class ReadingPassageExtractor:
         logger.warning("No title found in section, using default")
         return "Untitled Passage"
     
-    def extract_images(self, section: Tag) -> List[str]:
+    def extract_images(self, section: Union[Tag, List[Tag]]) -> List[str]:
         """
         Extract image URLs and convert to absolute URLs.
         
         Args:
-            section: BeautifulSoup Tag for the passage section
+            section: BeautifulSoup Tag for the passage section, or the
+                top-level elements of a passage's content
             
         Returns:
             List of absolute image URLs
         """
         images = []
-        img_tags = section.find_all('img')
+        if isinstance(section, list):
+            # A top-level element of the content may itself be an image
+            img_tags = []
+            for element in section:
+                if element.name == 'img':
+                    img_tags.append(element)
+                img_tags.extend(element.find_all('img'))
+        else:
+            img_tags = section.find_all('img')
         
         for img in img_tags:
             src = img.get('src')
@@ -229,7 +245,8 @@ class ReadingPassageExtractor:
                 title=title,
                 order_index=passage_number,
                 content=content,
-                images=images
+                images=images,
+                word_count=count_words(section)
             )
             
             logger.info(f"Successfully extracted passage {passage_number}: '{title}' ({passage.word_count} words)")
@@ -371,17 +388,18 @@ class ReadingPassageExtractor:
             next_heading = all_headings[current_index + 1][1] if current_index + 1 < len(all_headings) else None
             
             # Extract content between this heading and the next
-            content = self._extract_content_between_headings(heading, next_heading)
+            elements = self._extract_elements_between_headings(heading, next_heading)
+            content = '\n'.join(str(element) for element in elements)
             
             # Extract images
-            temp_soup = BeautifulSoup(content, 'html.parser')
-            images = self.extract_images(temp_soup)
+            images = self.extract_images(elements)
             
             passage = PassageData(
                 title=title,
                 order_index=passage_num,
                 content=content,
-                images=images
+                images=images,
+                word_count=sum(count_words(element) for element in elements)
             )
             
             logger.info(f"Fallback extracted passage {passage_num}: '{title}'")
@@ -394,14 +412,14 @@ class ReadingPassageExtractor:
                 context={"passage_number": passage_num}
             )
     
-    def _extract_content_between_headings(self, start_heading: Tag, end_heading: Optional[Tag]) -> str:
-        """Extract HTML content between two headings."""
+    def _extract_elements_between_headings(self, start_heading: Tag, end_heading: Optional[Tag]) -> List[Tag]:
+        """Extract the elements between two headings."""
         content_elements = []
         current = start_heading.find_next_sibling()
         
         while current and current != end_heading:
             if isinstance(current, Tag):
-                content_elements.append(str(current))
+                content_elements.append(current)
             current = current.find_next_sibling()
         
-        return '\n'.join(content_elements)
+        return content_elements
@@ -12,7 +12,6 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 import re
 from pathlib import Path
@@ -23,11 +22,21 @@ from bs4 import BeautifulSoup
 # Import components
 try:
     from .html_crawler import HTMLCrawler
+    from .html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from .parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from .parse_engine import ParseEngine
+    from .html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from .html_sanitizer import HTMLSanitizer
+    from .output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, OutputSink, FileSink, create_output_sink
     from .logging_config import setup_logging, get_logger
 except ImportError:
     from html_crawler import HTMLCrawler
+    from html_cache import HTMLCache, DEFAULT_CACHE_DIR
+    from parse_pipeline import ParsePipeline, DEFAULT_WORKERS
+    from parse_engine import ParseEngine
+    from html_document import HTMLDocument, HTML_PARSER, HTML_PARSERS, check_html_parser
     from html_sanitizer import HTMLSanitizer
+    from output_sink import OUTPUT_FORMATS, DEFAULT_OUTPUT_FORMAT, OutputSink, FileSink, create_output_sink
     from logging_config import setup_logging, get_logger
 
 logger = get_logger(__name__)
@@ -306,6 +315,9 @@ class SpeakingPartExtractor:
 class SpeakingJSONGenerator:
     """Generates JSON output for speaking tests."""
     
+    def __init__(self, sink: Optional[OutputSink] = None):
+        self.sink = sink or FileSink()
+    
     def generate_json(self, url: str, test_number: int, parts: List[Dict]) -> Dict[str, Any]:
         return {
             "test_metadata": {
@@ -325,10 +337,7 @@ class SpeakingJSONGenerator:
         }
     
     def save_to_file(self, data: Dict[str, Any], filepath: str) -> None:
-        path = Path(filepath)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self.sink.write(filepath, data)
         logger.info(f"Saved JSON to {filepath}")
 
 
@@ -340,15 +349,34 @@ class SpeakingTestParser:
         output_dir: str = "web_scraping/parsed/speaking/practice",
         delay: float = 0.35,
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        concurrency: int = 1,
+        workers: int = DEFAULT_WORKERS,
+        cache_dir: Optional[str] = None,
+        from_cache: bool = False,
+        html_parser: str = HTML_PARSER,
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        async_writes: bool = False
     ):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.html_parser = check_html_parser(html_parser)
+        self.output_format = output_format
+        self.async_writes = async_writes
         
         self.url_generator = SpeakingURLGenerator()
-        self.crawler = HTMLCrawler(delay=delay, timeout=timeout, max_retries=max_retries)
+        self.crawler = HTMLCrawler(
+            delay=delay,
+            timeout=timeout,
+            max_retries=max_retries,
+            concurrency=concurrency,
+            cache=HTMLCache(cache_dir) if cache_dir else None,
+            offline=from_cache
+        )
         self.part_extractor = SpeakingPartExtractor()
-        self.json_generator = SpeakingJSONGenerator()
+        self.output_sink = create_output_sink(output_format, self.output_dir, 'speaking', async_writes)
+        self.json_generator = SpeakingJSONGenerator(self.output_sink)
         
         logger.info(f"SpeakingTestParser initialized (output_dir={output_dir})")
 
@@ -356,7 +384,9 @@ class SpeakingTestParser:
         """Parse a single speaking test from HTML content."""
         try:
             logger.info(f"Parsing speaking test {test_number}")
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Parse the page once; the extractors read this tree without re-parsing it
+            document = HTMLDocument(html_content, self.html_parser)
+            soup = document.soup
             
             # Extract all parts
             parts = self.part_extractor.extract_parts(soup, url)
@@ -376,7 +406,7 @@ class SpeakingTestParser:
         try:
             output_path = self.output_dir / f"speaking_test_{test_number:02d}.json"
             
-            if output_path.exists() and not force:
+            if not force and self.output_sink.exists(output_path):
                 logger.info(f"Test {test_number}: Output already exists, skipping")
                 return True
             
@@ -396,6 +426,7 @@ class SpeakingTestParser:
                 return False
             
             self.json_generator.save_to_file(json_data, str(output_path))
+            self.output_sink.flush()
             logger.info(f"Test {test_number}: Successfully saved to {output_path}")
             
             return True
@@ -404,6 +435,16 @@ class SpeakingTestParser:
             logger.error(f"Test {test_number}: Error during processing: {e}", exc_info=True)
             return False
     
+    def parse_and_save(self, test_number: int, html_content: str, url: str, output_path: Path) -> bool:
+        """Parse a downloaded test and save its JSON (runs in a ParsePipeline worker)."""
+        json_data = self.parse_single_test(test_number=test_number, html_content=html_content, url=url)
+        
+        if json_data is None:
+            return False
+        
+        self.json_generator.save_to_file(json_data, str(output_path))
+        return True
+    
     def process_batch(self, start: int, end: int, force: bool = False, progress_file: Optional[str] = None) -> Dict[str, Any]:
         """Process a batch of speaking tests."""
         logger.info("=" * 70)
@@ -416,50 +457,80 @@ class SpeakingTestParser:
         # Generate URLs
         urls = [(i, self.url_generator.generate_speaking_url(i)) for i in range(start, end + 1)]
         
-        # Download all pages
-        progress_path = Path(progress_file) if progress_file else Path("speaking_crawler_progress.json")
-        download_result = self.crawler.download_batch(
-            urls=urls,
-            output_dir=self.output_dir,
-            skip_existing=not force,
-            progress_file=progress_path,
-            force=force
-        )
-        
-        downloaded_pages = download_result['downloaded_pages']
-        
-        # Parse and save each downloaded page
+        # Parse and save each page as it arrives
         successful = 0
         failed = 0
         skipped = 0
+        handed_off = set()
         
-        for test_number in range(start, end + 1):
-            output_path = self.output_dir / f"speaking_test_{test_number:02d}.json"
-            
-            if test_number not in downloaded_pages:
-                if output_path.exists() and not force:
-                    logger.debug(f"Test {test_number}: Already processed, skipping")
-                    skipped += 1
-                    continue
-                else:
-                    logger.warning(f"Test {test_number}: Not downloaded and no existing output")
-                    failed += 1
-                    continue
-            
-            html_content = downloaded_pages[test_number]
+        def on_page(test_number: int, html_content: str) -> None:
+            handed_off.add(test_number)
             url = self.url_generator.generate_speaking_url(test_number)
-            
-            json_data = self.parse_single_test(test_number=test_number, html_content=html_content, url=url)
-            
-            if json_data is None:
+            output_path = self.output_dir / f"speaking_test_{test_number:02d}.json"
+            try:
+                pipeline.submit(test_number, test_number, html_content, url, output_path)
+            except Exception as e:
+                # Never reached the pipeline, so on_result would not report it
+                on_result(test_number, None, e)
+                raise
+        
+        def on_result(test_number: int, saved: Optional[bool], error: Optional[BaseException]) -> None:
+            nonlocal successful, failed
+            if error is not None:
+                logger.error(f"Test {test_number}: Error during processing: {error}")
+                failed += 1
+                return
+            if not saved:
                 logger.error(f"Test {test_number}: Parsing failed")
                 failed += 1
-                continue
-            
-            self.json_generator.save_to_file(json_data, str(output_path))
+                return
             successful += 1
             logger.info(f"Test {test_number}: Successfully processed")
         
+        # Download pages; the pipeline holds up downloads while its queue is full
+        progress_path = Path(progress_file) if progress_file else Path("speaking_crawler_progress.json")
+        with ParsePipeline(
+            ParseEngine,
+            {
+                'test_type': 'speaking',
+                'output_dir': str(self.output_dir),
+                'html_parser': self.html_parser,
+                'output_format': self.output_format,
+                'async_writes': self.async_writes
+            },
+            'parse_and_save',
+            on_result,
+            workers=self.workers,
+            inline_target=self
+        ) as pipeline:
+            download_result = self.crawler.download_batch(
+                urls=urls,
+                output_dir=self.output_dir,
+                skip_existing=not force,
+                progress_file=progress_path,
+                force=force,
+                on_page=on_page,
+                output_exists=lambda test_number: self.output_sink.exists(
+                    self.output_dir / f"speaking_test_{test_number:02d}.json"
+                )
+            )
+        
+        # Parse workers flush their own sinks when they exit
+        self.output_sink.flush()
+        
+        # Tests the crawler didn't hand over were skipped or failed to download
+        for test_number in range(start, end + 1):
+            if test_number in handed_off:
+                continue
+            
+            output_path = self.output_dir / f"speaking_test_{test_number:02d}.json"
+            if not force and self.output_sink.exists(output_path):
+                logger.debug(f"Test {test_number}: Already processed, skipping")
+                skipped += 1
+            else:
+                logger.warning(f"Test {test_number}: Not downloaded and no existing output")
+                failed += 1
+        
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
         
@@ -482,6 +553,10 @@ class SpeakingTestParser:
         logger.info("=" * 70)
         
         return summary
+    
+    def close(self) -> None:
+        """Finish queued JSON writes."""
+        self.output_sink.close()
 
 
 def main():
@@ -510,6 +585,14 @@ Examples:
     parser.add_argument('--delay', type=float, default=0.35, help='Delay between requests')
     parser.add_argument('--timeout', type=int, default=30, help='Request timeout')
     parser.add_argument('--max-retries', type=int, default=3, help='Max retry attempts')
+    parser.add_argument('--concurrency', type=int, default=1, help='Parallel downloads (per-host delay still applies)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Parse processes (0 parses in-process)')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR, help='Raw HTML cache directory')
+    parser.add_argument('--no-cache', action='store_true', help='Do not store or revalidate raw HTML')
+    parser.add_argument('--from-cache', action='store_true', help='Reparse from the raw HTML cache only (implies --force)')
+    parser.add_argument('--html-parser', choices=HTML_PARSERS, default=HTML_PARSER, help='BeautifulSoup parser for pages (lxml is faster)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=DEFAULT_OUTPUT_FORMAT, help='files: one JSON file per test; jsonl: sharded bundles for bulk export')
+    parser.add_argument('--async-writes', action='store_true', help='Write JSON on a background thread while the next page is parsed')
     parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
     parser.add_argument('--log-dir', type=str, default='logs', help='Log directory')
     parser.add_argument('--no-file-logging', action='store_true', help='Disable file logging')
@@ -520,6 +603,16 @@ Examples:
         parser.error("--start requires --end")
     if args.end and not args.start:
         parser.error("--end requires --start")
+    if args.from_cache and args.no_cache:
+        parser.error("--from-cache can't be used with --no-cache")
+    try:
+        check_html_parser(args.html_parser)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Reparsing from the cache redoes tests that already have output
+    if args.from_cache:
+        args.force = True
     
     # Setup logging
     log_level = 'DEBUG' if args.verbose else 'INFO'
@@ -534,7 +627,14 @@ Examples:
         output_dir=args.output_dir,
         delay=args.delay,
         timeout=args.timeout,
-        max_retries=args.max_retries
+        max_retries=args.max_retries,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        from_cache=args.from_cache,
+        html_parser=args.html_parser,
+        output_format=args.output_format,
+        async_writes=args.async_writes
     )
     
     try:
@@ -5,17 +5,26 @@ This module provides utilities for extracting text from HTML elements
 while preserving proper spacing between words.
 """
 
-from bs4 import Tag, NavigableString
+from bs4 import Tag, NavigableString, CData
 import re
 from typing import Optional
 
 try:
+    from .html_document import HTMLDocument
     from .logging_config import get_logger
 except ImportError:
+    from html_document import HTMLDocument
     from logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# String types get_text() includes (comments, scripts and styles are left out)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Letter followed by digit ("boxes27") and digit followed by letter ("30on")
+LETTER_DIGIT_PATTERN = re.compile(r'([a-zA-Z])(\d)')
+DIGIT_LETTER_PATTERN = re.compile(r'(\d)([a-zA-Z])')
+
 
 class TextUtils:
     """
@@ -62,25 +71,33 @@ class TextUtils:
         if not element:
             return ""
         
-        # Clone the element to avoid modifying the original
-        from bs4 import BeautifulSoup
-        element_copy = BeautifulSoup(str(element), 'html.parser')
-        
-        # First pass: Add line breaks before bullet points if requested
-        if preserve_bullets:
-            TextUtils.add_line_breaks_before_bullets(element_copy)
-        
-        # Second pass: Add spacing around numbers
-        TextUtils.add_spacing_around_numbers(element_copy)
-        
-        # Third pass: Add spacing around inline elements
-        TextUtils.add_spacing_around_inline_elements(element_copy)
-        
-        # Fourth pass: Add spacing between adjacent text nodes
-        TextUtils.add_spacing_between_text_nodes(element_copy)
+        # Text of a live HTMLDocument node is extracted once per document
+        document = HTMLDocument.of(element)
+        if document is not None:
+            cached = document.cached_text(element, preserve_bullets)
+            if cached is not None:
+                return cached
+        
+        # Read the strings in place instead of cloning the element and running
+        # the in-place passes below on the clone. Only the bullet and number
+        # passes change the result: get_text(separator=' ', strip=True) already
+        # separates and strips every string, which is all the inline element
+        # and text node passes add.
+        strings = element.descendants if isinstance(element, Tag) else [element]
+        parts = []
+        for node in strings:
+            # Same strings get_text() reads: no comments, scripts or styles
+            if type(node) not in TEXT_STRING_TYPES:
+                continue
+        
+            text = str(node)
+            if preserve_bullets and '●' in text:
+                text = text.replace('●', '\n●')
+            text = TextUtils.space_numbers(text).strip()
+            if text:
+                parts.append(text)
         
-        # Extract text with space separator
-        text = element_copy.get_text(separator=' ', strip=True)
+        text = ' '.join(parts)
         
         # Normalize spacing (but preserve line breaks if bullets are present)
         if preserve_bullets:
@@ -91,8 +108,25 @@ class TextUtils:
         else:
             text = TextUtils.normalize_spacing(text)
         
+        if document is not None:
+            document.store_text(element, preserve_bullets, text)
         return text
     
+    @staticmethod
+    def space_numbers(text: str) -> str:
+        """
+        Add spaces between letters and digits in a string.
+        
+        Example:
+            >>> TextUtils.space_numbers('boxes27-30on your sheet')
+            'boxes 27-30 on your sheet'
+        """
+        # Add space before numbers when preceded by letters
+        text = LETTER_DIGIT_PATTERN.sub(r'\1 \2', text)
+        
+        # Add space after numbers when followed by letters
+        return DIGIT_LETTER_PATTERN.sub(r'\1 \2', text)
+    
     @staticmethod
     def normalize_spacing(text: str) -> str:
         """
@@ -192,13 +226,7 @@ class TextUtils:
         for text_node in element.find_all(string=True):
             text = str(text_node)
             
-            # Add space before numbers when preceded by letters
-            # Pattern: letter followed by digit
-            modified_text = re.sub(r'([a-zA-Z])(\d)', r'\1 \2', text)
-            
-            # Add space after numbers when followed by letters (but not in ranges)
-            # Pattern: digit followed by letter (not preceded by dash)
-            modified_text = re.sub(r'(\d)([a-zA-Z])', r'\1 \2', modified_text)
+            modified_text = TextUtils.space_numbers(text)
             
             # Replace the text node if modified
             if modified_text != text: